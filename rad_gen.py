@@ -138,6 +138,9 @@ def main(args: argparse.Namespace | None = None) -> Tuple[ Any | None, rg_ds.Tre
         # If a design sweep config file is specified, modify the flow settings for each design in sweep
         elif rad_gen_info["asic_dse"].mode.sweep_gen:
             ret_val = asic_dse.design_sweep(rad_gen_info["asic_dse"])
+            # Run the generated sweep points rather than just writing out scripts for them
+            if rad_gen_info["asic_dse"].mode.vlsi.run == "parallel":
+                asic_dse.run_sweep_points(rad_gen_info["asic_dse"], ret_val)
         elif rad_gen_info["asic_dse"].mode.vlsi.enable:
             asic_dse.run_asic_flow(rad_gen_info["asic_dse"])
     elif "coffe" in rad_gen_info.keys():
@@ -11,6 +11,11 @@ from pathlib import Path
 import json
 import copy
 import math
+import sqlite3
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 import pandas as pd
 
 from collections import defaultdict
@@ -135,6 +140,86 @@ def get_obj_dir_info(obj_dpath: str) -> dict:
                     info[key] = rep_info[0].get(key)
     return info
 
+# Name of the SQLite index of obj dir infos, written to the project outputs directory
+OBJ_DIR_INDEX_FNAME = "obj_dir_index.sqlite"
+
+def get_obj_dir_input_stamp(obj_dpath: str) -> str:
+    """
+        Returns a string identifying the state of the files `get_obj_dir_info` parses for an object directory,
+        made up of the modification times of syn-output-full.json and each of the stage report csvs (None if they don't exist).
+        If the stamp of an object directory is unchanged its info can be reused rather than parsed again.
+    """
+    syn_rundir_dpath = os.path.join(obj_dpath, "syn-rundir")
+    input_fpaths = [ os.path.join(syn_rundir_dpath, "syn-output-full.json") ] + [
+        os.path.join(obj_dpath, "reports", f"{rep_tag}_report.csv") for rep_tag in ["syn", "par", "timing", "power", "final"]
+    ]
+    input_mtimes = [ os.stat(fpath).st_mtime_ns if os.path.exists(fpath) else None for fpath in input_fpaths ]
+    return json.dumps([os.path.isdir(syn_rundir_dpath), input_mtimes])
+
+def open_obj_dir_index(index_fpath: str) -> sqlite3.Connection:
+    """
+        Opens (creating if needed) the SQLite index of obj dir infos at `index_fpath`.
+        Each row stores the parsed `get_obj_dir_info` of an obj dir along with its flow / QoR scores, keyed on the obj dir path and its input stamp.
+    """
+    conn = sqlite3.connect(index_fpath)
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS obj_dirs (
+            obj_dpath TEXT PRIMARY KEY,
+            input_stamp TEXT NOT NULL,
+            info TEXT NOT NULL,
+            flow_score INTEGER NOT NULL,
+            qor_score REAL
+        )"""
+    )
+    return conn
+
+def get_indexed_obj_dir_infos(obj_dirs_dpath: str, index_conn: sqlite3.Connection = None) -> Dict[str, dict]:
+    """
+        Returns the `get_obj_dir_info` of every object directory in `obj_dirs_dpath`, keyed by obj dir name.
+        If `index_conn` is provided infos are read from the index for obj dirs whose input files haven't changed since they were indexed,
+        only obj dirs which are new or have changed are parsed again (and updated in the index).
+    """
+    obj_dir_infos: Dict[str, dict] = {}
+    num_parsed: int = 0
+    for obj_dir in os.listdir(obj_dirs_dpath):
+        obj_dpath = os.path.abspath(os.path.join(obj_dirs_dpath, obj_dir))
+        if index_conn is None:
+            obj_dir_infos[obj_dir] = get_obj_dir_info(obj_dpath)
+            continue
+        input_stamp = get_obj_dir_input_stamp(obj_dpath)
+        row = index_conn.execute("SELECT input_stamp, info FROM obj_dirs WHERE obj_dpath = ?", (obj_dpath,)).fetchone()
+        if row and row[0] == input_stamp:
+            obj_dir_infos[obj_dir] = json.loads(row[1])
+            continue
+        obj_dir_info = get_obj_dir_info(obj_dpath)
+        num_parsed += 1
+        # QoR can only be scored for obj dirs which have delay and area results
+        qor_score = get_obj_dir_qor_score(obj_dir_info) if obj_dir_info.get("Delay") and obj_dir_info.get("Total Area") else None
+        index_conn.execute(
+            "INSERT OR REPLACE INTO obj_dirs (obj_dpath, input_stamp, info, flow_score, qor_score) VALUES (?, ?, ?, ?, ?)",
+            (obj_dpath, input_stamp, json.dumps(obj_dir_info), get_obj_dir_flow_score(obj_dir_info), qor_score),
+        )
+        obj_dir_infos[obj_dir] = obj_dir_info
+    if index_conn is not None:
+        index_conn.commit()
+        rg_utils.rad_gen_log(f"Parsed {num_parsed} new or changed obj dirs in {obj_dirs_dpath}, {len(obj_dir_infos) - num_parsed} read from index", rad_gen_log_fd)
+    return obj_dir_infos
+
+def get_indexed_max_flow_qor_scores(index_conn: sqlite3.Connection, obj_dpaths: List[str]) -> Dict[str, float | None]:
+    """
+        Returns the QoR score stored in the index for each of `obj_dpaths` which has gotten the furthest in the flow (highest flow score), keyed by obj dir path.
+        QoR scores are None for obj dirs without delay and area results.
+    """
+    # Only consider the obj dirs currently on disk, the index may have rows of obj dirs which have since been removed
+    index_conn.execute("CREATE TEMP TABLE IF NOT EXISTS cur_obj_dirs (obj_dpath TEXT PRIMARY KEY)")
+    index_conn.execute("DELETE FROM cur_obj_dirs")
+    index_conn.executemany("INSERT OR IGNORE INTO cur_obj_dirs (obj_dpath) VALUES (?)", [ (obj_dpath,) for obj_dpath in obj_dpaths ])
+    rows = index_conn.execute(
+        """SELECT obj_dirs.obj_dpath, obj_dirs.qor_score FROM obj_dirs JOIN cur_obj_dirs USING (obj_dpath)
+            WHERE obj_dirs.flow_score = (SELECT MAX(flow_score) FROM obj_dirs JOIN cur_obj_dirs USING (obj_dpath))"""
+    ).fetchall()
+    return { obj_dpath: qor_score for obj_dpath, qor_score in rows }
+
 def get_obj_dir_flow_score(obj_dir_info: dict) -> int:
     """
         Returns a score for the object directory based on how far it has gotten in the flow
@@ -226,24 +311,38 @@ def group_dicts(
 #     # Return the grouped data as a list of lists
 #     return list(grouped.values())
 
-def get_condensed_obj_dirs(obj_dirs_dpath: str) -> list[str]:
+def get_condensed_obj_dirs(obj_dirs_dpath: str, obj_dir_infos: Dict[str, dict] = None, index_conn: sqlite3.Connection = None) -> list[str]:
     """
         Returns a list of unique object directories that have been condensed (filtering out duplicates and keeping high QoR runs)
+        Uses the obj dir infos in `obj_dir_infos` (see `get_indexed_obj_dir_infos`) if provided, otherwise each obj dir is parsed once.
+        If `index_conn` is provided `obj_dir_infos` must have been indexed with it, the flow and QoR scores stored in the index are used rather than recomputed.
     """
     condensed_dirs: Set = set()
     print(f"Top LVL Module: {os.listdir(obj_dirs_dpath)[0]}, num_dirs: {len(os.listdir(obj_dirs_dpath))}")
     if len(os.listdir(obj_dirs_dpath)) > 1:
-        max_flow_score: int = max( 
-            [
-                get_obj_dir_flow_score(get_obj_dir_info(os.path.join(obj_dirs_dpath, obj_dir)))
-                    for obj_dir in os.listdir(obj_dirs_dpath)
+        if obj_dir_infos is None:
+            obj_dir_infos = get_indexed_obj_dir_infos(obj_dirs_dpath, index_conn)
+        # QoR scores of obj dirs read from the index
+        qor_scores: Dict[str, float | None] = {}
+        if index_conn is not None:
+            obj_dpath_qor_scores = get_indexed_max_flow_qor_scores(
+                index_conn, [ os.path.abspath(os.path.join(obj_dirs_dpath, obj_dir)) for obj_dir in obj_dir_infos ]
+            )
+            qor_scores = { os.path.basename(obj_dpath): qor_score for obj_dpath, qor_score in obj_dpath_qor_scores.items() }
+            # Find the object directories that have gone the furthest in the CAD flow
+            valid_obj_dirs = [ obj_dir for obj_dir in obj_dir_infos if obj_dir in qor_scores ]
+        else:
+            max_flow_score: int = max( 
+                [
+                    get_obj_dir_flow_score(obj_dir_info)
+                        for obj_dir_info in obj_dir_infos.values()
+                ]
+            )
+            # Find the object directories that have gone the furthest in the CAD flow
+            valid_obj_dirs = [ 
+                obj_dir for obj_dir, obj_dir_info in obj_dir_infos.items() 
+                    if get_obj_dir_flow_score(obj_dir_info) == max_flow_score
             ]
-        )
-        # Find the object directories that have gone the furthest in the CAD flow
-        valid_obj_dirs = [ 
-            obj_dir for obj_dir in os.listdir(obj_dirs_dpath) 
-                if get_obj_dir_flow_score(get_obj_dir_info(os.path.join(obj_dirs_dpath, obj_dir))) == max_flow_score
-        ]
         # Return a list of object directories which have unique VLSI parameters
         vlsi_fields = [
             "technology",
@@ -253,11 +352,11 @@ def get_condensed_obj_dirs(obj_dirs_dpath: str) -> list[str]:
         ]
         grouped_obj_dirs: list[list[dict]] = []
         # eliminate obj dirs without all vlsi fields
-        valid_obj_dirs = [ obj_dir for obj_dir in valid_obj_dirs if all(get_obj_dir_info(os.path.join(obj_dirs_dpath, obj_dir)).get(field) for field in vlsi_fields) ]
+        valid_obj_dirs = [ obj_dir for obj_dir in valid_obj_dirs if all(obj_dir_infos[obj_dir].get(field) for field in vlsi_fields) ]
         # Group the object directories by their VLSI parameters 
         grouped_obj_dirs = group_dicts(
             data=[
-                (obj_dir, get_obj_dir_info(os.path.join(obj_dirs_dpath, obj_dir)))
+                (obj_dir, obj_dir_infos[obj_dir])
                 for obj_dir in valid_obj_dirs
             ],
             group_fields=vlsi_fields,
@@ -265,7 +364,7 @@ def get_condensed_obj_dirs(obj_dirs_dpath: str) -> list[str]:
         # Iterate through groups and find the highest QoR score for each group
         for vlsi_group in grouped_obj_dirs:
             obj_dir_score_tup: list[tuple] = [
-                (obj_dir, get_obj_dir_qor_score(obj_dir_info))
+                (obj_dir, qor_scores[obj_dir] if qor_scores.get(obj_dir) is not None else get_obj_dir_qor_score(obj_dir_info))
                     for obj_dir, obj_dir_info in vlsi_group
             ]
             # Sort the object directories by their QoR score
@@ -334,7 +433,27 @@ def compile_results(
     """
     out_search_dpath: str = asic_dse.common.project_tree.search_subtrees(f"projects.{asic_dse.common.project_name}.outputs", is_hier_tag = True)[0].path
     if not top_lvl_modules:
-        top_lvl_modules = os.listdir(out_search_dpath)
+        top_lvl_modules = [ top_lvl_module for top_lvl_module in os.listdir(out_search_dpath) if top_lvl_module != OBJ_DIR_INDEX_FNAME ]
+    # Obj dir infos are indexed across runs so only obj dirs with new results are parsed again
+    with closing(open_obj_dir_index(os.path.join(out_search_dpath, OBJ_DIR_INDEX_FNAME))) as index_conn:
+        compile_top_lvl_results(asic_dse, out_search_dpath, top_lvl_modules, index_conn)
+
+
+def compile_top_lvl_results(
+    asic_dse: rg_ds.AsicDSE, 
+    out_search_dpath: str,
+    top_lvl_modules: list[str],
+    index_conn: sqlite3.Connection = None,
+) -> None:
+    """
+        Creates the detailed and summary reports of each of the `top_lvl_modules` in the project output directory `out_search_dpath`, see `compile_results`
+
+        Args:
+            asic_dse: The ASIC DSE object containing all the information about the design sweep
+            out_search_dpath: The project output directory containing a directory for each top level module
+            top_lvl_modules: The top level modules to compile results for
+            index_conn: Connection to the obj dir info index (see `open_obj_dir_index`), obj dirs are parsed without an index if not provided
+    """
     for top_lvl_module in top_lvl_modules:
         reports = []
         csv_lines = []
@@ -343,11 +462,11 @@ def compile_results(
         if os.path.isdir(top_lvl_mod_search_dpath):
             obj_dirs_dpath = os.path.join(top_lvl_mod_search_dpath, "obj_dirs")
             # for obj_dir_dpath in os.listdir(obj_dirs_dpath):
-            uniq_obj_dirs = get_condensed_obj_dirs(obj_dirs_dpath)
+            obj_dir_infos = get_indexed_obj_dir_infos(obj_dirs_dpath, index_conn)
+            uniq_obj_dirs = get_condensed_obj_dirs(obj_dirs_dpath, obj_dir_infos, index_conn)
             for obj_dir in uniq_obj_dirs:
                 reports.append(asic_hammer.gen_reports(asic_dse, asic_dse.design_sweep_info, top_lvl_module, os.path.join(obj_dirs_dpath, obj_dir)))
-                obj_dir_info = get_obj_dir_info(os.path.join(obj_dirs_dpath, obj_dir))
-                top_lvl_mod_infos.append(obj_dir_info)
+                top_lvl_mod_infos.append(obj_dir_infos[os.path.basename(obj_dir)])
         # Write out the top level module info to a csv
         top_lvl_report_dpath = os.path.join(top_lvl_mod_search_dpath, "reports")
         if top_lvl_mod_infos:
@@ -577,6 +696,87 @@ def design_sweep(asic_dse: rg_ds.AsicDSE) -> List[rg_ds.MetaDataclass]:
 
     return rg_sw_pt_drivers
 
+def run_sweep_point(rg_cmd: str, log_fpath: str, env: Dict[str, str], launch_lock: threading.Lock = None) -> Dict[str, Any]:
+    """
+        Runs the RAD-Gen command of a single design sweep point in its own process, writing its stdout / stderr to `log_fpath`.
+        If `launch_lock` is provided it's held for a short time after launching, so obj dirs uniquified with a timestamp are unique across sweep points.
+
+        Returns:
+            {"cmd": command, "log_fpath": log path, "returncode": exit code of the sweep point, "run_time": wall time of the sweep point in seconds}
+    """
+    start_time = time.time()
+    with open(log_fpath, "w") as log_fd:
+        if launch_lock:
+            with launch_lock:
+                sw_pt_proc = sp.Popen(rg_cmd, executable = "/bin/bash", shell = True, env = env, stdout = log_fd, stderr = sp.STDOUT)
+                time.sleep(0.01)
+        else:
+            sw_pt_proc = sp.Popen(rg_cmd, executable = "/bin/bash", shell = True, env = env, stdout = log_fd, stderr = sp.STDOUT)
+        returncode = sw_pt_proc.wait()
+    return {
+        "cmd": rg_cmd,
+        "log_fpath": log_fpath,
+        "returncode": returncode,
+        "run_time": time.time() - start_time,
+    }
+
+def run_sweep_points(
+    asic_dse: rg_ds.AsicDSE, 
+    rg_sw_pt_drivers: List[rg_ds.MetaDataclass], 
+    max_workers: int = None, 
+    stage_licenses: Dict[str, int] = None,
+    compile_sweep_results: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+        Runs the ASIC flow of each design sweep point returned by `design_sweep`, each point being run by RAD-Gen in its own process.
+        Points are queued and at most `max_workers` run at once, the stdout / stderr of each goes to its own log in the 'sweep_logs' dir of this runs obj dir.
+        The number of points running each flow stage (syn / par / timing / power) at once is limited to the number of tool licenses in `stage_licenses`,
+        see `asic_hammer.stage_license_token`. 
+        Results of the sweep are compiled after all points finish if `compile_sweep_results` is set.
+
+        Args:
+            asic_dse: The ASIC DSE object the sweep was generated from
+            rg_sw_pt_drivers: RadGenArgs of each sweep point
+            max_workers: max number of sweep points run at once, defaults to `flow_threads` of the sweep config
+            stage_licenses: flow stage -> number of licenses, defaults to `stage_licenses` of the sweep config
+
+        Returns:
+            List of `run_sweep_point` results for each sweep point, in the order of `rg_sw_pt_drivers`
+    """
+    if max_workers is None:
+        max_workers = asic_dse.design_sweep_info.flow_threads
+    if stage_licenses is None:
+        stage_licenses = asic_dse.design_sweep_info.stage_licenses or {}
+    sweep_logs_dpath = os.path.join(asic_dse.common.obj_dir, "sweep_logs")
+    license_tokens_dpath = os.path.join(sweep_logs_dpath, "license_tokens")
+    os.makedirs(license_tokens_dpath, exist_ok = True)
+    env = {
+        **os.environ,
+        asic_hammer.STAGE_LICENSES_ENV_VAR: json.dumps(stage_licenses),
+        asic_hammer.LICENSE_TOKENS_DPATH_ENV_VAR: license_tokens_dpath,
+    }
+    launch_lock = threading.Lock()
+    rg_utils.rad_gen_log(f"Running {len(rg_sw_pt_drivers)} sweep points, {max_workers} at a time with stage licenses {stage_licenses}, logs in {sweep_logs_dpath}", rad_gen_log_fd)
+    with ThreadPoolExecutor(max_workers = max_workers) as executor:
+        sw_pt_futures = [
+            executor.submit(
+                run_sweep_point,
+                rg_args.get_rad_gen_cli_cmd(asic_dse.common.rad_gen_home_path)[0],
+                os.path.join(sweep_logs_dpath, f"sweep_pt_{sweep_pt_idx}.log"),
+                env,
+                launch_lock,
+            ) for sweep_pt_idx, rg_args in enumerate(rg_sw_pt_drivers)
+        ]
+        sw_pt_results = [ sw_pt_future.result() for sw_pt_future in sw_pt_futures ]
+    for sweep_pt_idx, sw_pt_result in enumerate(sw_pt_results):
+        status = "PASSED" if sw_pt_result["returncode"] == 0 else f"FAILED (exit code {sw_pt_result['returncode']})"
+        rg_utils.rad_gen_log(f"Sweep point {sweep_pt_idx} {status} in {round(sw_pt_result['run_time'], 2)} s, see {sw_pt_result['log_fpath']}", rad_gen_log_fd)
+    if compile_sweep_results:
+        # SRAM sweeps span many top level modules so we compile everything in the project outputs
+        top_lvl_modules = [ asic_dse.design_sweep_info.top_lvl_module ] if asic_dse.design_sweep_info.type != "sram" else None
+        compile_results(asic_dse, top_lvl_modules)
+    return sw_pt_results
+
 def run_asic_flow(asic_dse: rg_ds.AsicDSE) -> Dict[str, Any]:
     if asic_dse.mode.vlsi.flow == "custom":
         if asic_dse.mode.vlsi.run == "serial":
@@ -629,6 +829,8 @@ def run_asic_dse(asic_dse_cli: rg_ds.AsicDseCLI) -> Tuple[float]:
     # If a design sweep config file is specified, modify the flow settings for each design in sweep
     elif asic_flow_dse_info.mode.sweep_gen:
         ret_info = design_sweep(asic_flow_dse_info)
+        if asic_flow_dse_info.mode.vlsi.run == "parallel":
+            run_sweep_points(asic_flow_dse_info, ret_info)
     elif asic_flow_dse_info.mode.vlsi.enable:
         ret_info = run_asic_flow(asic_flow_dse_info)
 
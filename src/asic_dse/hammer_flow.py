@@ -12,6 +12,11 @@ from pathlib import Path
 import json
 import copy
 import math
+import time
+import fcntl
+import hashlib
+import itertools
+from contextlib import contextmanager
 import pandas as pd
 
 #Import hammer modules
@@ -38,6 +43,43 @@ rad_gen_log_fd = "asic_dse.log"
 log_verbosity = 2
 cur_env = os.environ.copy()
 
+# Environment variables used by `asic_dse.run_sweep_points` to share per flow stage tool license limits with the processes of each sweep point
+STAGE_LICENSES_ENV_VAR = "RAD_GEN_STAGE_LICENSES" # json dict of flow stage -> number of licenses e.g. {"syn": 2, "par": 1}
+LICENSE_TOKENS_DPATH_ENV_VAR = "RAD_GEN_LICENSE_TOKENS_DPATH" # directory containing the lock files used as license tokens
+
+@contextmanager
+def stage_license_token(flow_stage: str, poll_s: float = 1.0):
+    """
+        Holds one of the tool license tokens of `flow_stage` while in context, waiting for one to free up if they are all held by other sweep points.
+        Token 'i' of a stage is an exclusive lock on the file '<flow_stage>.<i>.lock' in the tokens directory, so tokens are shared across processes 
+        and are released by the OS if a sweep point is killed.
+        If no license limit was set for `flow_stage` (see `STAGE_LICENSES_ENV_VAR`) this does nothing.
+    """
+    num_licenses: int = json.loads(os.environ.get(STAGE_LICENSES_ENV_VAR, "{}")).get(flow_stage)
+    tokens_dpath: str = os.environ.get(LICENSE_TOKENS_DPATH_ENV_VAR)
+    if not num_licenses or not tokens_dpath:
+        yield
+        return
+    waiting_logged: bool = False
+    while True:
+        for token_idx in range(num_licenses):
+            token_fd = open(os.path.join(tokens_dpath, f"{flow_stage}.{token_idx}.lock"), "a")
+            try:
+                fcntl.flock(token_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                token_fd.close()
+                continue
+            try:
+                yield
+            finally:
+                fcntl.flock(token_fd, fcntl.LOCK_UN)
+                token_fd.close()
+            return
+        if not waiting_logged:
+            rg_utils.rad_gen_log(f"Waiting for one of {num_licenses} {flow_stage} licenses to free up...", rad_gen_log_fd)
+            waiting_logged = True
+        time.sleep(poll_s)
+
 # ██████╗ ██████╗ ██╗███╗   ███╗███████╗████████╗██╗███╗   ███╗███████╗
 # ██╔══██╗██╔══██╗██║████╗ ████║██╔════╝╚══██╔══╝██║████╗ ████║██╔════╝
 # ██████╔╝██████╔╝██║██╔████╔██║█████╗     ██║   ██║██╔████╔██║█████╗  
@@ -332,6 +374,101 @@ def write_pt_timing_script(asic_dse: rg_ds.AsicDSE):
 # ██║  ██║██║  ██║██║ ╚═╝ ██║██║ ╚═╝ ██║███████╗██║  ██║    ╚██████╔╝   ██║   ██║███████╗███████║
 # ╚═╝  ╚═╝╚═╝  ╚═╝╚═╝     ╚═╝╚═╝     ╚═╝╚══════╝╚═╝  ╚═╝     ╚═════╝    ╚═╝   ╚═╝╚══════╝╚══════╝                                                                           
 
+# Parsed hammer configs keyed on config path, each entry is ((mtime_ns, size), parsed config dict)
+parsed_config_cache: Dict[str, Tuple[Tuple[int, int], dict]] = {}
+
+def load_hammer_config(config_fpath: str) -> dict:
+    """
+        Returns the hammer config dict parsed from `config_fpath`, reusing the dict from a previous call if the file is unchanged since (same mtime and size).
+        The returned dict is shared between callers and should not be modified.
+    """
+    config_fpath = os.path.realpath(config_fpath)
+    config_stat = os.stat(config_fpath)
+    file_key: Tuple[int, int] = (config_stat.st_mtime_ns, config_stat.st_size)
+    cached = parsed_config_cache.get(config_fpath)
+    if cached is not None and cached[0] == file_key:
+        return cached[1]
+    is_yaml = config_fpath.endswith(".yml") or config_fpath.endswith(".yaml")
+    config_str = Path(config_fpath).read_text()
+    config_dict: dict = hammer_config.load_config_from_string(config_str, is_yaml, str(Path(config_fpath).parent))
+    parsed_config_cache[config_fpath] = (file_key, config_dict)
+    return config_dict
+
+# Top level config namespaces of flow stages, a stage ignores settings in the namespaces of other stages when fingerprinting its inputs
+STAGE_CONFIG_NAMESPACES = {
+    "syn": "synthesis",
+    "par": "par",
+    "timing": "timing",
+    "power": "power",
+    "drc": "drc",
+    "lvs": "lvs",
+    "sim": "sim",
+    "formal": "formal",
+}
+
+def get_stage_fingerprint_fpath(stage_out_fpath: str) -> str:
+    """
+        Returns the path of the fingerprint file stored next to the output config (or output directory) of a flow stage
+        e.g. <obj_dir>/syn-rundir/syn-output.json -> <obj_dir>/syn-rundir/syn-output.fingerprint
+    """
+    return os.path.splitext(stage_out_fpath)[0] + ".fingerprint"
+
+def get_stage_fingerprint(asic_flow: rg_ds.HammerFlow, flow_stage: str, config_paths: List[str], extra_fpaths: List[str] = []) -> str:
+    """
+        Returns a sha256 hex digest of the inputs of `flow_stage`, made up of:
+        - The effective (merged) environment and project configs, excluding settings in the namespaces of other stages (see STAGE_CONFIG_NAMESPACES)
+        - The contents of the RTL files in "synthesis.inputs.input_files"
+        - The fingerprints of upstream stages whose output configs are in `config_paths`, so rerunning a stage invalidates the stages after it
+        - The contents of `extra_fpaths`, e.g. tool scripts written by RAD-Gen
+        For transitional stages (e.g. "syn-to-par") only the namespace of the destination stage is kept.
+    """
+    stage_namespace: str = STAGE_CONFIG_NAMESPACES.get(flow_stage.split("-to-")[-1])
+    other_namespaces: Set[str] = set(STAGE_CONFIG_NAMESPACES.values()) - {stage_namespace}
+    eff_config: Dict[str, Any] = {}
+    upstream_fingerprints: List[str] = []
+    for config in asic_flow.hammer_driver.options.environment_configs + config_paths:
+        if not os.path.exists(config):
+            continue
+        eff_config.update(load_hammer_config(config))
+        upstream_fingerprint_fpath = get_stage_fingerprint_fpath(config)
+        if os.path.exists(upstream_fingerprint_fpath):
+            upstream_fingerprints.append(Path(upstream_fingerprint_fpath).read_text().strip())
+    stage_config = {key: val for key, val in eff_config.items() if key.split(".")[0] not in other_namespaces}
+
+    hasher = hashlib.sha256()
+    hasher.update(flow_stage.encode())
+    hasher.update(json.dumps(stage_config, sort_keys = True, default = str).encode())
+    for upstream_fingerprint in upstream_fingerprints:
+        hasher.update(upstream_fingerprint.encode())
+    rtl_fpaths: List[str] = eff_config.get("synthesis.inputs.input_files") or []
+    for fpath in rtl_fpaths + extra_fpaths:
+        hasher.update(fpath.encode())
+        if os.path.isfile(fpath):
+            hasher.update(Path(fpath).read_bytes())
+    return hasher.hexdigest()
+
+def is_stage_up_to_date(fingerprint: str, fingerprint_fpath: str, stage_out_path: str) -> bool:
+    """
+        Returns True if the outputs of a stage exist and the fingerprint stored by its last run matches `fingerprint`
+    """
+    return (
+        os.path.exists(stage_out_path) 
+        and os.path.exists(fingerprint_fpath) 
+        and Path(fingerprint_fpath).read_text().strip() == fingerprint
+    )
+
+def get_report_mtimes(report_dir_path: str) -> Dict[str, int]:
+    """
+        Returns the modification time (ns) of each report file in `report_dir_path`, empty if the directory doesn't exist
+    """
+    rpt_mtimes = {}
+    if os.path.isdir(report_dir_path):
+        for fname in os.listdir(report_dir_path):
+            fpath = os.path.join(report_dir_path, fname)
+            if os.path.isfile(fpath):
+                rpt_mtimes[fname] = os.stat(fpath).st_mtime_ns
+    return rpt_mtimes
+
 def run_hammer_stage(asic_flow: rg_ds.HammerFlow, flow_stage: str, config_paths: List[str], update_db: bool = True, execute_stage: bool = True):
     """
         Invokes the hammer-vlsi tool with the specified config files and flow stage, returns hammer output config path, stdout & stderr
@@ -367,9 +504,26 @@ def run_hammer_stage(asic_flow: rg_ds.HammerFlow, flow_stage: str, config_paths:
             ret_config_path = os.path.join(asic_flow.hammer_driver.obj_dir,f"{flow_stage}-output.json")
         hammer_cmd = f'{hammer_cli} {env_path_args} {config_path_args} --obj_dir {asic_flow.hammer_driver.obj_dir} -o {ret_config_path} {flow_stage}'
 
+    # Skip the stage if its inputs are unchanged since the run which produced its output config, "build" is cheap and always runs
+    fingerprint: str = None
+    fingerprint_fpath: str = get_stage_fingerprint_fpath(ret_config_path)
+    if execute_stage and flow_stage != "build":
+        fingerprint = get_stage_fingerprint(asic_flow, flow_stage, config_paths)
+        if is_stage_up_to_date(fingerprint, fingerprint_fpath, ret_config_path):
+            rg_utils.rad_gen_log(f"Skipping {flow_stage} stage, inputs unchanged since last run (fingerprint {fingerprint[:12]})", rad_gen_log_fd)
+            execute_stage = False
+
     stdout, stderr = "", ""
     if execute_stage:
-        stdout, stderr = rg_utils.run_shell_cmd_no_logs(hammer_cmd)
+        prev_out_mtime: float = os.path.getmtime(ret_config_path) if os.path.exists(ret_config_path) else None
+        # Remove any stale fingerprint so an interrupted run is never treated as up to date
+        if os.path.exists(fingerprint_fpath):
+            os.remove(fingerprint_fpath)
+        with stage_license_token(flow_stage):
+            stdout, stderr = rg_utils.run_shell_cmd_no_logs(hammer_cmd)
+        # Only record the fingerprint if the stage wrote a new output config
+        if fingerprint and os.path.exists(ret_config_path) and os.path.getmtime(ret_config_path) != prev_out_mtime:
+            Path(fingerprint_fpath).write_text(fingerprint)
         # TODO get below working to allow debugging and more clarity
         # Had issue of genus object not being recognized as a child of Synthesis tool class (hammer stuff)
 
@@ -379,13 +533,12 @@ def run_hammer_stage(asic_flow: rg_ds.HammerFlow, flow_stage: str, config_paths:
     
     if update_db and os.path.exists(ret_config_path):
         # update the driver information with new config
+        # configs parsed for previous stages come from the cache, so usually only the new output config is loaded from disk
         proj_config_dicts = []
         for config in config_paths + [ret_config_path]:
-            is_yaml = config.endswith(".yml") or config.endswith(".yaml")
             if not os.path.exists(config):
                 rg_utils.rad_gen_log("Project config %s does not exist!" % (config),rad_gen_log_fd)
-            config_str = Path(config).read_text()
-            proj_config_dicts.append(hammer_config.load_config_from_string(config_str, is_yaml, str(Path(config).resolve().parent)))
+            proj_config_dicts.append(load_hammer_config(config))
         asic_flow.hammer_driver.update_project_configs(proj_config_dicts)
 
 
@@ -494,9 +647,7 @@ def modify_config_file(asic_dse: rg_ds.AsicDSE) -> str:
     config_paths = asic_dse.asic_flow_settings.hammer_driver.options.project_configs
     for config_path in config_paths:
         # Read all configs and figure out which one contains the top level module info
-        config_str = Path(config_path).read_text()
-        is_yaml = config_path.endswith(".yml") or config_path.endswith(".yaml")
-        config_dict = hammer_config.load_config_from_string(config_str, is_yaml, str(Path(config_path).resolve().parent))
+        config_dict = load_hammer_config(config_path)
         # This is checking to see if this is the "main" design config file containing top_lvl_module / hdl sources / etc 
         # That would be opposed to the "secondary" config files which would contain pdk / tool stuff
         # TODO remove hardcoding of "_pre_proc" and replace with a variable linked to data struct
@@ -524,11 +675,9 @@ def modify_config_file(asic_dse: rg_ds.AsicDSE) -> str:
     proj_config_dicts = []
     # Appending it to the end gives the highest precedence in hammer
     for config in config_paths: # + [modified_config_path]:
-        is_yaml = config.endswith(".yml") or config.endswith(".yaml")
         if not os.path.exists(config):
             rg_utils.rad_gen_log("Project config %s does not exist!" % (config),rad_gen_log_fd)
-        config_str = Path(config).read_text()
-        proj_config_dicts.append(hammer_config.load_config_from_string(config_str, is_yaml, str(Path(config).resolve().parent)))
+        proj_config_dicts.append(load_hammer_config(config))
     asic_dse.asic_flow_settings.hammer_driver.update_project_configs(proj_config_dicts)
 
     return modified_config_path
@@ -1289,121 +1438,175 @@ def get_macro_info(rad_gen: rg_ds.AsicDSE, obj_dir: str, sram_num_bits: int = No
 
     return report_dict
 
-def parse_report_c(asic_dse: rg_ds.AsicDSE, top_level_mod: str, report_path: str, rep_type: str, flow_stage: rg_ds.FlowStage, summarize: bool = False):
+# Compiled report parsing regexes, the power value regexes depend on the power units and are cached per set of units
+cadence_timing_path_start_re = re.compile(r"Path")
+cadence_timing_sep_re = re.compile(r"#-+")
+cadence_timing_setup_re = re.compile(r"Setup:-.*$")
+cadence_area_hdr_catagories = {
+    "syn": ["Instance","Module","Cell Count","Cell Area","Net Area","Total Area"],
+    "par": ["Hinst Name","Module Name","Inst Count","Total Area"],
+}
+# these regexes match text in the header line which shows result catagories
+cadence_area_hdr_res = {
+    "syn": re.compile(r'(\s+){0,1}'.join(cadence_area_hdr_catagories["syn"])),
+    "par": re.compile(r"^\s+Hinst\s+Name\s+Module\sName\s+Inst\sCount\s+Total\sArea"),
+}
+cadence_arrival_time_res = {
+    "syn": re.compile(r"Data\sPath:-.*$"),
+    "par": re.compile(r"Arrival:=.*$"),
+}
+synopsys_grab_pwr_val_res: Dict[Tuple[str], re.Pattern] = {}
+
+def get_synopsys_grab_pwr_val_re(power_units: Tuple[str]) -> re.Pattern:
+    """
+        Returns the regex grabbing a value and its power unit from a line of a synopsys power report, compiled once per set of `power_units`
+    """
+    if power_units not in synopsys_grab_pwr_val_res:
+        unit_re_str = "(" + "|".join([f"({unit})" for unit in power_units]) + ")"
+        synopsys_grab_pwr_val_res[power_units] = re.compile(rf"\d+\.{{0,1}}\d*.*?{unit_re_str}")
+    return synopsys_grab_pwr_val_res[power_units]
+
+def iter_cadence_area_report(asic_dse: rg_ds.AsicDSE, top_level_mod: str, report_path: str, flow_stage: rg_ds.FlowStage):
+    """
+        Streams a Genus (syn) or Innovus (par) area report, yields a dict per module row below the header, starting with the top level module.
+        Rows are recognized by their number of whitespace separated fields, the module name of the top level row is reported as "NA".
+    """
+    hdr_re: re.Pattern = cadence_area_hdr_res[flow_stage.tag]
+    hdr_catagories: List[str] = cadence_area_hdr_catagories[flow_stage.tag]
+    hdr_found: bool = False
+    with open(report_path, "r") as fd:
+        for line in fd:
+            line = line.rstrip("\n")
+            if not hdr_found:
+                # skip everything above the header
+                hdr_match = hdr_re.search(line)
+                if not hdr_match:
+                    continue
+                hdr_found = True
+                line = line[hdr_match.start():]
+            sep_line = asic_dse.common.res.wspace_re.split(line)
+            sep_line = list(filter(lambda x: x != "", sep_line))
+            if(len(sep_line) >= len(hdr_catagories)-1 and len(sep_line) <= len(hdr_catagories)):
+                report_dict = {}
+                sep_idx = 0
+                for i in range(len(hdr_catagories)):
+                    if("Module" in hdr_catagories[i] and top_level_mod in line):
+                        report_dict[hdr_catagories[i]] = "NA"
+                    else:
+                        report_dict[hdr_catagories[i]] = sep_line[sep_idx]
+                        sep_idx = sep_idx + 1
+                yield report_dict
+
+def iter_cadence_timing_report(asic_dse: rg_ds.AsicDSE, report_path: str, flow_stage: rg_ds.FlowStage):
+    """
+        Streams a Genus (syn) or Innovus (par) timing report, yields a dict per timing path in report order (worst path first).
+        A path starts at "Path" and ends at the third "#---" separator line (after the timing point table), any path cut off by the end of the file is dropped.
+    """
+    arrival_time_re: re.Pattern = cadence_arrival_time_res[flow_stage.tag]
+    timing_dict: dict = None
+    clock_start_stop: List[float] = None
+    num_seps: int = 0
+    with open(report_path, "r") as fd:
+        for line in fd:
+            line = line.rstrip("\n")
+            if timing_dict is None:
+                path_start_match = cadence_timing_path_start_re.search(line)
+                if not path_start_match:
+                    continue
+                timing_dict, clock_start_stop, num_seps = {}, None, 0
+                line = line[path_start_match.start():]
+            # Cut the line at the separator closing the path
+            path_done: bool = False
+            for sep_match in cadence_timing_sep_re.finditer(line):
+                num_seps += 1
+                if num_seps == 3:
+                    line = line[:sep_match.end()]
+                    path_done = True
+                    break
+            if cadence_timing_setup_re.search(line):
+                timing_dict["Setup"] = float(asic_dse.common.res.decimal_re.findall(line)[0])
+            elif arrival_time_re.search(line):
+                timing_dict["Arrival"] = float(asic_dse.common.res.decimal_re.findall(line)[0])
+            elif "Slack" in line:
+                timing_dict["Slack"] = float(asic_dse.common.res.signed_dec_re.findall(line)[0])
+            elif "Data Path" in line:
+                timing_dict["Data Path"] = float(asic_dse.common.res.decimal_re.findall(line)[0])
+            elif "Clock Edge" in line:
+                clock_start_stop = [float(clk_bnd) for clk_bnd in asic_dse.common.res.decimal_re.findall(line)]
+            # Ready to set the delay for innovus
+            if flow_stage.tag == "syn":
+                if all(key in timing_dict for key in ["Setup", "Arrival"]):
+                    timing_dict["Delay"] = timing_dict["Arrival"] + timing_dict["Setup"]
+            elif flow_stage.tag == "par":
+                if all(key in timing_dict for key in ["Setup","Arrival","Data Path"]) and clock_start_stop:
+                    # If the clock start and stop are both 0 then we can use Data Path for delay 
+                    if all(clk_bnd == 0 for clk_bnd in clock_start_stop):
+                        timing_dict["Delay"] = timing_dict["Data Path"]
+                    # But its more accurate to add arrival and setup time so if we can we will
+                    else:
+                        timing_dict["Delay"] = timing_dict["Arrival"] + timing_dict["Setup"]
+            if path_done:
+                yield timing_dict
+                timing_dict = None
+
+def iter_synopsys_timing_report(asic_dse: rg_ds.AsicDSE, report_path: str):
+    """
+        Streams a PrimeTime timing report, yields a single dict for the first (most critical) path and stops reading once it has been parsed
+        TODO change this to parse all the paths like the cadence parser
+    """
+    timing_dict = {}
+    start_flag = False
+    with open(report_path, "r") as fd:
+        for line in fd:
+            line = line.rstrip("\n")
+            if "Startpoint" in line:
+                start_flag = True
+            if not start_flag:
+                continue
+
+            if "library setup time" in line:
+                timing_dict["Setup"] = float(asic_dse.common.res.decimal_re.findall(line)[0])
+            elif "data arrival time" in line:
+                timing_dict["Arrival"] = float(asic_dse.common.res.decimal_re.findall(line)[0])
+            elif "slack" in line and asic_dse.common.res.decimal_re.search(line):
+                timing_dict["Slack"] = float(asic_dse.common.res.signed_dec_re.findall(line)[0])
+            elif "Setup" in timing_dict and "Arrival" in timing_dict:
+                timing_dict["Delay"] = timing_dict["Arrival"] + timing_dict["Setup"]
+            if all(key in timing_dict for key in ["Setup","Arrival", "Slack", "Delay"]):
+                break
+    # This indicates that all lines have been read in and we can yield the timing_dict
+    yield timing_dict
+
+def parse_report_c(asic_dse: rg_ds.AsicDSE, top_level_mod: str, report_path: str, rep_type: str, flow_stage: rg_ds.FlowStage, summarize: bool = False, worst_n: int = None):
     """
         This specifically parses reports and looks for keywords to grab the values and put them into a list of dicts 
         The list is indexed based on the number of values present in the report file.
         For Timing -> If there are a bunch of paths in the report, the list will be indexed by each specific timing path (index 0 contains worst case)
         For Area -> If there are a bunch of modules in the report, the list will be indexed by each specific module (index 0 contains total area)
+        Area and timing reports are streamed line by line, if `worst_n` is set only the first `worst_n` paths / modules are parsed 
+        and the rest of the report is never read, `summarize` is the same as `worst_n = 1`.
     """    
-    if flow_stage.tag == "syn":
-        cadence_hdr_catagories = ["Instance","Module","Cell Count","Cell Area","Net Area","Total Area"]
-        # this regex should match text in the header line which shows result catagories and below
-        cadence_area_hdr_re_str = r'(\s+){0,1}'.join(cadence_hdr_catagories) + r'.*'
-        cadence_area_hdr_re = re.compile(cadence_area_hdr_re_str, re.MULTILINE|re.DOTALL)
-        # cadence_area_hdr_re = re.compile("^\s+Instance\s+Module.*Cell\s+Count.*Cell\s+Area.*Total\s+Area.*", re.MULTILINE|re.DOTALL)
-        cadence_arrival_time_re = re.compile(r"Data\sPath:-.*$",re.MULTILINE)
-    elif flow_stage.tag == "par":
-        cadence_hdr_catagories = ["Hinst Name","Module Name","Inst Count","Total Area"]
-        cadence_area_hdr_re = re.compile(r"^\s+Hinst\s+Name\s+Module\sName\s+Inst\sCount\s+Total\sArea.*", re.MULTILINE|re.DOTALL)
-        cadence_arrival_time_re = re.compile(r"Arrival:=.*$",re.MULTILINE)
-
-    cadence_timing_grab_re = re.compile(r"Path(.*?#-+){3}",re.MULTILINE|re.DOTALL)
-    cadence_timing_setup_re = re.compile(r"Setup:-.*$",re.MULTILINE)
-    
-    unit_re_str = "(" + "|".join([f"({unit})" for unit in asic_dse.common.report.power_lookup.keys()]) + ")"                  
-    
-    grab_val_re_str = rf"\d+\.{{0,1}}\d*.*?{unit_re_str}"
-    synopsys_grab_pwr_val_re = re.compile(grab_val_re_str)
+    if summarize:
+        worst_n = 1
+    synopsys_grab_pwr_val_re = get_synopsys_grab_pwr_val_re(tuple(asic_dse.common.report.power_lookup.keys()))
     
     report_list = []
 
     # parse synopsys report
     if(rep_type == "area"):
-        area_rpt_text = open(report_path,"r").read()
-        # removes stuff above the header so we only have info we need
-        area_rpt_text = cadence_area_hdr_re.search(area_rpt_text).group(0)
-        for line in area_rpt_text.split("\n"):
-            report_dict = {}
-            # below conditional finds the header line
-            sep_line = asic_dse.common.res.wspace_re.split(line)
-            sep_line = list(filter(lambda x: x != "", sep_line))
-            if(len(sep_line) >= len(cadence_hdr_catagories)-1 and len(sep_line) <= len(cadence_hdr_catagories)):
-                sep_idx = 0
-                for i in range(len(cadence_hdr_catagories)):
-                    if("Module" in cadence_hdr_catagories[i] and top_level_mod in line):
-                        report_dict[cadence_hdr_catagories[i]] = "NA"
-                        sep_idx = sep_idx
-                    else:
-                        report_dict[cadence_hdr_catagories[i]] = sep_line[sep_idx]
-                        sep_idx = sep_idx + 1                       
-                report_list.append(report_dict)
-                if summarize:
-                    break
+        report_list = list(itertools.islice(iter_cadence_area_report(asic_dse, top_level_mod, report_path, flow_stage), worst_n))
     elif(rep_type == "timing"):
-        timing_rpt_text = open(report_path,"r").read()
         if flow_stage.tool == "cadence":
-            timing_path_text = timing_rpt_text
-            while cadence_timing_grab_re.search(timing_rpt_text):
-                timing_dict = {}
-                clock_start_stop = None
-                timing_path_text = cadence_timing_grab_re.search(timing_rpt_text).group(0)
-                for line in timing_path_text.split("\n"):
-                    if cadence_timing_setup_re.search(line):
-                        timing_dict["Setup"] = float(asic_dse.common.res.decimal_re.findall(line)[0])
-                    elif cadence_arrival_time_re.search(line):
-                        timing_dict["Arrival"] = float(asic_dse.common.res.decimal_re.findall(line)[0])
-                    elif "Slack" in line:
-                        timing_dict["Slack"] = float(asic_dse.common.res.signed_dec_re.findall(line)[0])
-                    elif "Data Path" in line:
-                        timing_dict["Data Path"] = float(asic_dse.common.res.decimal_re.findall(line)[0])
-                    elif "Clock Edge" in line:
-                        clock_start_stop = [float(clk_bnd) for clk_bnd in asic_dse.common.res.decimal_re.findall(line)]
-                    # Ready to set the delay for innovus
-                    if flow_stage.tag == "syn":
-                        if all(key in timing_dict for key in ["Setup", "Arrival"]):
-                            timing_dict["Delay"] = timing_dict["Arrival"] + timing_dict["Setup"]
-                    elif flow_stage.tag == "par":
-                        if all(key in timing_dict for key in ["Setup","Arrival","Data Path"]) and clock_start_stop:
-                            # If the clock start and stop are both 0 then we can use Data Path for delay 
-                            if all(clk_bnd == 0 for clk_bnd in clock_start_stop):
-                                timing_dict["Delay"] = timing_dict["Data Path"]
-                            # But its more accurate to add arrival and setup time so if we can we will
-                            else:
-                                timing_dict["Delay"] = timing_dict["Arrival"] + timing_dict["Setup"]
-                report_list.append(timing_dict)
-                if summarize:
-                    break
-                timing_rpt_text = timing_rpt_text.replace(timing_path_text,"")
+            report_list = list(itertools.islice(iter_cadence_timing_report(asic_dse, report_path, flow_stage), worst_n))
         elif flow_stage.tool == "synopsys":
-            timing_dict = {}
-            start_flag = False
-            for line in timing_rpt_text.split("\n"):
-                if "Startpoint" in line:
-                    start_flag = True
-                if not start_flag:
-                    continue
-
-                if "library setup time" in line:
-                    timing_dict["Setup"] = float(asic_dse.common.res.decimal_re.findall(line)[0])
-                elif "data arrival time" in line:
-                    timing_dict["Arrival"] = float(asic_dse.common.res.decimal_re.findall(line)[0])
-                elif "slack" in line and asic_dse.common.res.decimal_re.search(line):
-                    timing_dict["Slack"] = float(asic_dse.common.res.signed_dec_re.findall(line)[0])
-                elif "Setup" in timing_dict and "Arrival" in timing_dict:
-                    timing_dict["Delay"] = timing_dict["Arrival"] + timing_dict["Setup"]
-                # If there are multiple paths break at the top as it will be the most critical
-                # TODO change this to parse all the paths like cadence currently does
-                if all(key in timing_dict for key in ["Setup","Arrival", "Slack", "Delay"]):
-                    break
-                # This indicates taht all lines have been read in and we can append the timing_dict
-            report_list.append(timing_dict)
+            report_list = list(iter_synopsys_timing_report(asic_dse, report_path))
     elif(rep_type == "power"):
-        power_rpt_text = open(report_path,"r").read()
+        with open(report_path, "r") as fd:
+            power_rpt_lines = [line.rstrip("\n") for line in fd]
         # TODO should have a section for subtools being used in stages of flow as dc_shell can do timing analysis but doesnt output primetime format
         if flow_stage.tool == "synopsys_dc":
             power_dict = {}
-            for line in power_rpt_text.split("\n"):
+            for line in power_rpt_lines:
                 if "Total Dynamic Power" in line:
                     for unit in asic_dse.common.report.power_lookup.keys():
                         if f" {unit} " in line or f" {unit}" in line:
@@ -1451,7 +1654,7 @@ def parse_report_c(asic_dse: rg_ds.AsicDSE, top_level_mod: str, report_path: str
             #         # There is a "Power Group" and "Percentage" column on opposite of each sides
             #         power_type_headers = ["Power Group"] + asic_dse.common.res.wspace_re.split(line) + ["Percentage", "Attributes"]
             #         headers_captured = True
-            for line in power_rpt_text.split("\n"):
+            for line in power_rpt_lines:
                 if "Net Switching Power" in line:
                     vals = asic_dse.common.res.sci_not_dec_re.findall(line)
                     power_dict["Switching"] = float(vals[0])
@@ -1470,7 +1673,7 @@ def parse_report_c(asic_dse: rg_ds.AsicDSE, top_level_mod: str, report_path: str
         elif flow_stage.tool == "cadence":
             cadence_hdr_catagories = ["Leakage","Internal","Switching","Total","Row%"]
             power_dict = {}
-            for line in power_rpt_text.split("\n"):
+            for line in power_rpt_lines:
                 if "Power Unit" in line:
                     for unit in asic_dse.common.report.power_lookup.keys():
                         if unit in line:
@@ -1496,12 +1699,14 @@ def parse_report_c(asic_dse: rg_ds.AsicDSE, top_level_mod: str, report_path: str
     return report_list
 
 
-def get_report_results(asic_dse: rg_ds.AsicDSE, top_level_mod: str, report_dir_path: str, flow_stage: rg_ds.FlowStage) -> dict:
+def get_report_results(asic_dse: rg_ds.AsicDSE, top_level_mod: str, report_dir_path: str, flow_stage: rg_ds.FlowStage, timing_worst_n: int = None) -> dict:
     """
         This function will parse the specified report_dir_path which should contain .rpt report files for various stages of asic flow
         Functional for:
         - Cadence & Synopsys
         - Area, Timing, Power
+        If `timing_worst_n` is set only the `timing_worst_n` most critical timing paths are parsed, area reports are always fully parsed 
+        as per module areas are looked up by instance name.
     """
     results = {}
     if os.path.isdir(report_dir_path):
@@ -1512,7 +1717,7 @@ def get_report_results(asic_dse: rg_ds.AsicDSE, top_level_mod: str, report_dir_p
                 if("area" in file and "detailed" not in file):
                     results["area"] = parse_report_c(asic_dse, top_level_mod, os.path.join(report_dir_path, file), "area", flow_stage, summarize=False)
                 elif("time" in file or "timing" in file):
-                    results["timing"] = parse_report_c(asic_dse, top_level_mod, os.path.join(report_dir_path, file), "timing", flow_stage, summarize=False)
+                    results["timing"] = parse_report_c(asic_dse, top_level_mod, os.path.join(report_dir_path, file), "timing", flow_stage, worst_n=timing_worst_n)
                 elif("power" in file): 
                     results["power"] = parse_report_c(asic_dse, top_level_mod, os.path.join(report_dir_path, file), "power", flow_stage, summarize=False)
     else:
@@ -1533,18 +1738,22 @@ def parse_output(asic_dse: rg_ds.AsicDSE, top_level_mod: str, output_path: str):
     syn_results = get_report_results(
         asic_dse, top_level_mod, syn_report_path,
         asic_dse.common_asic_flow.flow_stages.syn,
+        timing_worst_n = 1,
     )
     par_results = get_report_results(
         asic_dse, top_level_mod, par_report_path, 
         asic_dse.common_asic_flow.flow_stages.par,
+        timing_worst_n = 1,
     )
     timing_results = get_report_results(
         asic_dse, top_level_mod, timing_report_path, 
         asic_dse.common_asic_flow.flow_stages.timing,
+        timing_worst_n = 1,
     )
     power_results = get_report_results(
         asic_dse, top_level_mod, power_report_path, 
         asic_dse.common_asic_flow.flow_stages.power,
+        timing_worst_n = 1,
     )
     return syn_results, par_results, timing_results, power_results
 
@@ -1994,7 +2203,8 @@ def run_hammer_flow(asic_dse: rg_ds.AsicDSE, config_paths: List[str]) -> Tuple[f
     if os.path.isdir(syn_reports_path):
         syn_report = get_report_results(
             asic_dse, asic_dse.common_asic_flow.top_lvl_module, syn_reports_path, 
-            asic_dse.common_asic_flow.flow_stages.syn
+            asic_dse.common_asic_flow.flow_stages.syn,
+            timing_worst_n = 1,
         )
         flow_report["syn"] = syn_report
     write_flow_stage_report("syn", flow_report, asic_dse.common.obj_dir)
@@ -2039,6 +2249,7 @@ def run_hammer_flow(asic_dse: rg_ds.AsicDSE, config_paths: List[str]) -> Tuple[f
         par_report = get_report_results(
             asic_dse, asic_dse.common_asic_flow.top_lvl_module, par_reports_path, 
             asic_dse.common_asic_flow.flow_stages.par,
+            timing_worst_n = 1,
         )
         flow_report["par"] = par_report
     write_flow_stage_report("par", flow_report, asic_dse.common.obj_dir)
@@ -2050,25 +2261,43 @@ def run_hammer_flow(asic_dse: rg_ds.AsicDSE, config_paths: List[str]) -> Tuple[f
     if os.path.exists(par_to_timing_config):
         config_paths.append(par_to_timing_config)
     
+    timing_rundir = os.path.join(asic_dse.asic_flow_settings.hammer_driver.obj_dir, "timing-rundir")
+    timing_reports_path = os.path.join(timing_rundir, "reports")
     if asic_dse.common_asic_flow.flow_stages.timing.run:
         write_pt_sdc(asic_dse.asic_flow_settings.hammer_driver, "timing")
         write_pt_timing_script(asic_dse)
-        os.chdir(os.path.join(asic_dse.asic_flow_settings.hammer_driver.obj_dir,"timing-rundir"))
-
-        # Run Timing
-        timing_stdout, timing_stderr = rg_utils.run_shell_cmd_no_logs("pt_shell -f pt_timing.tcl")
-        with open("timing_stdout.log","w") as fd:
-            fd.write(timing_stdout)
-        with open("timing_stderr.log","w") as fd:
-            fd.write(timing_stderr)
-        os.chdir(work_dir)
+        timing_fingerprint = get_stage_fingerprint(
+            asic_dse.asic_flow_settings, "timing", config_paths, 
+            [os.path.join(timing_rundir, "pt.sdc"), os.path.join(timing_rundir, "pt_timing.tcl")]
+        )
+        timing_fingerprint_fpath = get_stage_fingerprint_fpath(os.path.join(timing_rundir, "timing-output.json"))
+        if is_stage_up_to_date(timing_fingerprint, timing_fingerprint_fpath, timing_reports_path):
+            rg_utils.rad_gen_log(f"Skipping timing stage, inputs unchanged since last run (fingerprint {timing_fingerprint[:12]})", rad_gen_log_fd)
+        else:
+            if os.path.exists(timing_fingerprint_fpath):
+                os.remove(timing_fingerprint_fpath)
+            prev_rpt_mtimes = get_report_mtimes(timing_reports_path)
+            os.chdir(timing_rundir)
+
+            # Run Timing
+            with stage_license_token("timing"):
+                timing_stdout, timing_stderr = rg_utils.run_shell_cmd_no_logs("pt_shell -f pt_timing.tcl")
+            with open("timing_stdout.log","w") as fd:
+                fd.write(timing_stdout)
+            with open("timing_stderr.log","w") as fd:
+                fd.write(timing_stderr)
+            os.chdir(work_dir)
+            # Reports from a previous run survive a failed PrimeTime run, only record the fingerprint if this run wrote reports
+            rpt_mtimes = get_report_mtimes(timing_reports_path)
+            if any(prev_rpt_mtimes.get(fname) != mtime for fname, mtime in rpt_mtimes.items()):
+                Path(timing_fingerprint_fpath).write_text(timing_fingerprint)
 
     # Parse Timing
-    timing_reports_path = os.path.join(asic_dse.asic_flow_settings.hammer_driver.obj_dir, "timing-rundir", "reports")
     if os.path.isdir(timing_reports_path):
         timing_report = get_report_results(
             asic_dse, asic_dse.common_asic_flow.top_lvl_module, timing_reports_path, 
-            asic_dse.common_asic_flow.flow_stages.timing
+            asic_dse.common_asic_flow.flow_stages.timing,
+            timing_worst_n = 1,
         )
         flow_report["timing"] = timing_report
     write_flow_stage_report("timing", flow_report, asic_dse.common.obj_dir)
@@ -2077,25 +2306,43 @@ def run_hammer_flow(asic_dse: rg_ds.AsicDSE, config_paths: List[str]) -> Tuple[f
     if os.path.exists(par_to_power_config):
         config_paths.append(par_to_power_config)
 
+    power_rundir = os.path.join(asic_dse.asic_flow_settings.hammer_driver.obj_dir, "power-rundir")
+    power_reports_path = os.path.join(power_rundir, "reports")
     if asic_dse.common_asic_flow.flow_stages.power.run:
         write_pt_sdc(asic_dse.asic_flow_settings.hammer_driver, "power")
         write_pt_power_script(asic_dse)
-        os.chdir(os.path.join(asic_dse.asic_flow_settings.hammer_driver.obj_dir,"power-rundir"))
-
-        # Run Power
-        power_stdout, power_stderr = rg_utils.run_shell_cmd_no_logs("pt_shell -f pt_power.tcl")
-        with open("power_stdout.log","w") as fd:
-            fd.write(power_stdout)
-        with open("power_stderr.log","w") as fd:
-            fd.write(power_stderr)
-        os.chdir(work_dir)
+        power_fingerprint = get_stage_fingerprint(
+            asic_dse.asic_flow_settings, "power", config_paths, 
+            [os.path.join(power_rundir, "pt.sdc"), os.path.join(power_rundir, "pt_power.tcl")]
+        )
+        power_fingerprint_fpath = get_stage_fingerprint_fpath(os.path.join(power_rundir, "power-output.json"))
+        if is_stage_up_to_date(power_fingerprint, power_fingerprint_fpath, power_reports_path):
+            rg_utils.rad_gen_log(f"Skipping power stage, inputs unchanged since last run (fingerprint {power_fingerprint[:12]})", rad_gen_log_fd)
+        else:
+            if os.path.exists(power_fingerprint_fpath):
+                os.remove(power_fingerprint_fpath)
+            prev_rpt_mtimes = get_report_mtimes(power_reports_path)
+            os.chdir(power_rundir)
+
+            # Run Power
+            with stage_license_token("power"):
+                power_stdout, power_stderr = rg_utils.run_shell_cmd_no_logs("pt_shell -f pt_power.tcl")
+            with open("power_stdout.log","w") as fd:
+                fd.write(power_stdout)
+            with open("power_stderr.log","w") as fd:
+                fd.write(power_stderr)
+            os.chdir(work_dir)
+            # Reports from a previous run survive a failed PrimeTime run, only record the fingerprint if this run wrote reports
+            rpt_mtimes = get_report_mtimes(power_reports_path)
+            if any(prev_rpt_mtimes.get(fname) != mtime for fname, mtime in rpt_mtimes.items()):
+                Path(power_fingerprint_fpath).write_text(power_fingerprint)
         
     # Parse Power
-    power_reports_path = os.path.join(asic_dse.asic_flow_settings.hammer_driver.obj_dir, "power-rundir", "reports")
     if os.path.isdir(power_reports_path):
         timing_report = get_report_results(
             asic_dse, asic_dse.common_asic_flow.top_lvl_module, power_reports_path, 
-            asic_dse.common_asic_flow.flow_stages.power
+            asic_dse.common_asic_flow.flow_stages.power,
+            timing_worst_n = 1,
         )
         flow_report["power"] = timing_report
     write_flow_stage_report("power", flow_report, asic_dse.common.obj_dir)
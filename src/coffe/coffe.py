@@ -16,7 +16,8 @@ from collections import namedtuple
 from dataclasses import fields
 
 def run_coffe_flow(coffe_info: rg_ds.Coffe):
-    arch_folder = utils.create_output_dir(coffe_info.arch_name, coffe_info.common.obj_dir)
+    # When resuming, the sizing checkpoint in the arch folder's subdirectories must survive
+    arch_folder = utils.create_output_dir(coffe_info.arch_name, coffe_info.common.obj_dir, keep_contents = coffe_info.resume)
 
     is_size_transistors = not coffe_info.no_sizing
     size_hb_interfaces = coffe_info.size_hb_interfaces
@@ -40,7 +41,18 @@ def run_coffe_flow(coffe_info: rg_ds.Coffe):
     default_dir = os.getcwd()
 
     # Create an HSPICE interface
-    spice_interface = spice.SpiceInterface(args.spice_sim_type)
+    # The result cache is a file in the arch folder so it persists across runs (subdirectories are cleared on each non resumed run)
+    spice_interface = spice.SpiceInterface(
+        args.spice_sim_type, 
+        args.num_spice_workers,
+        cache_fpath = None if args.no_spice_cache else os.path.join(os.path.abspath(arch_folder), "spice_results_cache.db"),
+        cache_max_entries = args.spice_cache_max_entries,
+        scheduler = spice.SpiceScheduler(
+            max_licenses = args.spice_licenses,
+            max_retries = args.spice_max_retries,
+            backoff_s = args.spice_retry_backoff,
+        ),
+    )
 
     # Record start time
     total_start_time = time.time()
@@ -123,3 +135,10 @@ def run_coffe_flow(coffe_info: rg_ds.Coffe):
         arch_folder, 
         coffe_info.fpga_arch_conf["fpga_arch_params"]['enable_bram_module']
     )
+
+    # Write out where the run time went (per testbench, subcircuit and phase) and print a summary of it
+    spice_interface.timing_trace.write_json(os.path.join(arch_folder, "timing_trace.json"))
+    spice_interface.timing_trace.write_csv(os.path.join(arch_folder, "timing_trace.csv"))
+    report_file = open(report_file_path, 'a')
+    utils.print_timing_summary(report_file, spice_interface.timing_trace, time.time() - total_start_time)
+    report_file.close()
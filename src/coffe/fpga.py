@@ -11,9 +11,13 @@ import itertools
 import csv
 import traceback
 import copy
+import functools
+import contextlib
+import numpy as np
 
 from typing import List, Dict, Any, Tuple, Union, Type, NamedTuple, Set, Callable
 from collections import defaultdict
+from collections.abc import MutableMapping
 
 
 # Subcircuit Modules
@@ -156,6 +160,31 @@ def fpga_state_to_csv(fpga_inst: 'FPGA', tag: str, catagory: str, ckt: Type[c_ds
         writer.writerow(row_data)
 
 
+def traced(event: str, is_phase: bool = False) -> Callable:
+    """
+        Decorator recording the time spent in an FPGA method in the timing trace of the FPGA's spice interface (see `utils.TimingTrace`)
+
+        Args:
+            event (str): Name of the event (or phase) the method's time is recorded as
+            is_phase (bool): Record the method as a phase, so simulations it runs are attributed to it
+        
+        Returns:
+            The decorator
+    """
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self: 'FPGA', *args, **kwargs):
+            timing_trace = getattr(self.spice_interface, "timing_trace", None)
+            if timing_trace is None:
+                trace_ctx = contextlib.nullcontext()
+            else:
+                trace_ctx = timing_trace.phase(event) if is_phase else timing_trace.timed(event)
+            with trace_ctx:
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
 def sim_tbs( 
     tbs: List[Type[c_ds.SimTB]],
     sp_interface: spice.SpiceInterface,
@@ -163,86 +192,137 @@ def sim_tbs(
 ) -> Dict[
     Type[c_ds.SimTB], 
     Dict[str, 
-        List[float] | List[bool]
+        np.ndarray
     ]
 ]:
     """
         Runs HSPICE on all testbenches in the list with the corresponding parameter dict
         Returns a dict hashed by each testbench with its corresponding results (delay, power)
 
+        The testbenches are independent of one another so they are handed to the spice interface as a single batch,
+            which can simulate them in parallel (see `spice.SpiceInterface.run_batch`). 
+            Results are still post processed in the order of `tbs`.
+
         Args:
             tbs (List[Type[c_ds.SimTB]]): The list of testbenches to simulate
             sp_interface (spice.SpiceInterface): The interface to the HSPICE (or other SPICE) simulator(s)
             parameter_dict (Dict[str, List[str]]): The parameter dictionary to use for the simulation
         
         Returns:
-            A dict containing the simulation results hashed by testbench which got those values
+            A dict containing the simulation results hashed by testbench which got those values,
+                each result is an array with an element per sweep point ("valid" is a bool array, the rest are float arrays)
     """
-    
-    # Create a default dict of dicts of lists to store measurements for each tb sweep point
-    tb_meas: Dict[Type[c_ds.SimTB], Dict[str, float]] = defaultdict(lambda: defaultdict(list))
-    
-    for tb in tbs:
+    return sim_tb_groups({"tbs": tbs}, sp_interface, parameter_dict)["tbs"]
+
+def sim_tb_groups(
+    tb_groups: Dict[str, List[Type[c_ds.SimTB]]],
+    sp_interface: spice.SpiceInterface,
+    parameter_dict: Dict[str, List[str]],
+) -> Dict[
+    str,
+    Dict[
+        Type[c_ds.SimTB], 
+        Dict[str, 
+            np.ndarray
+        ]
+    ]
+]:
+    """
+        Same as `sim_tbs` for several independent groups of testbenches (ie one group per block type) simulated with the same parameter dict.
+
+        The testbenches of every group are handed to the spice interface as one batch, 
+            so all of them share its worker pool rather than waiting for the previous group to finish.
+            Results are post processed group by group in the order of `tb_groups`, so they are the same as calling `sim_tbs` on each group in turn.
+
+        Args:
+            tb_groups (Dict[str, List[Type[c_ds.SimTB]]]): Groups of testbenches to simulate hashed by a name for the group
+            sp_interface (spice.SpiceInterface): The interface to the HSPICE (or other SPICE) simulator(s)
+            parameter_dict (Dict[str, List[str]]): The parameter dictionary to use for the simulation
+        
+        Returns:
+            A dict hashed by the group names with the `sim_tbs` style results of each group
+    """
+    all_tbs: List[Type[c_ds.SimTB]] = [tb for tbs in tb_groups.values() for tb in tbs]
+    for tb in all_tbs:
         sp_name: str = tb.dut_ckt.sp_name if (hasattr(tb.dut_ckt, "sp_name") and tb.dut_ckt.sp_name) else tb.dut_ckt.name
         print(f"Updating delay for {sp_name} with TB {tb.tb_fname.replace('.sp','')}")
+    
+    all_tbs_spice_meas: List[np.ndarray] = []
+    if not consts.PASSTHROUGH_DEBUG_FLAG and all_tbs:
+        all_tbs_spice_meas = sp_interface.run_batch(
+            [tb.sp_fpath for tb in all_tbs], 
+            parameter_dict
+        )
+
+    group_meas: Dict[str, Dict[Type[c_ds.SimTB], Dict[str, np.ndarray]]] = {}
+    tb_offset: int = 0
+    for group_name, tbs in tb_groups.items():
+        group_meas[group_name] = process_tb_meas(
+            tbs,
+            all_tbs_spice_meas[tb_offset : tb_offset + len(tbs)],
+            parameter_dict,
+        )
+        tb_offset += len(tbs)
+    return group_meas
+
+def process_tb_meas(
+    tbs: List[Type[c_ds.SimTB]],
+    tbs_spice_meas: List[np.ndarray],
+    parameter_dict: Dict[str, List[str]],
+) -> Dict[
+    Type[c_ds.SimTB], 
+    Dict[str, 
+        np.ndarray
+    ]
+]:
+    """
+        Converts the raw measurement arrays of each testbench in 'tbs' (in the same order) into the `sim_tbs` results format
+    """
+    # Create a default dict of dicts to store measurement arrays for each tb
+    tb_meas: Dict[Type[c_ds.SimTB], Dict[str, np.ndarray]] = defaultdict(dict)
+    
+    for tb_idx, tb in enumerate(tbs):
         if not consts.PASSTHROUGH_DEBUG_FLAG:
-            spice_meas = sp_interface.run(tb.sp_fpath, parameter_dict)
+            spice_meas = tbs_spice_meas[tb_idx]
         else:
-            spice_meas = {
+            spice_meas = spice.meas_from_columns({
                 "trise": [1]*len(list(parameter_dict.values())[0]),
                 "tfall": [1]*len(list(parameter_dict.values())[0]),
                 "meas_avg_power": [1]*len(list(parameter_dict.values())[0]),
                 "meas_logic_low_voltage": [0]*len(list(parameter_dict.values())[0]),
                 "delay": [1]*len(list(parameter_dict.values())[0]),
-                "valid": True*len(list(parameter_dict.values())[0]),
                 # Add the inverter / other measurements
                 **{mp.value.name: [1]*len(list(parameter_dict.values())[0]) for mp in tb.meas_points}
-            }
+            })
         
-        valid_delays: List[bool] | None = None
+        valid_delays: np.ndarray | None = None
         # Account for additional measurements which are not explictly asked for
-        for key in spice_meas.keys():
-            # if key not in ["valid", "trise", "tfall", "power"]:
-            if key not in ["valid"]:
-                # Checks to see if the prefix used to define measure statement is in the key (ie its something we want to look for not random crap)
-                if tb.meas_val_prefix in key:
-                    # Our total trise / tfall delays will be checked for validity and set to 1 if invalid (high cost function value)
-                    if key in [f"{tb.meas_val_prefix}_total_trise", f"{tb.meas_val_prefix}_total_tfall"]:
-                        new_valid_delays: List[bool] = [ val != "failed" and float(val) > 0 for val in spice_meas[key] ]
-                        if valid_delays is not None:
-                            # Do element wise AND with prev valid delays and new ones to get updated delay validity
-                            valid_delays = [ 
-                                (prev_vd and new_vd) for prev_vd, new_vd in zip(
-                                    valid_delays,
-                                    new_valid_delays,
-                                ) 
-                            ]     
-                        else:
-                            valid_delays = new_valid_delays         
-                        trise_tfall_delays: List[float] = [ 
-                            float(val) if val != "failed" else 1 for val in spice_meas[key] 
-                        ]
-                        # Convert the tb specific tfall / trise keys into a standard used for all tb post processing
-                        if "tfall" in key:
-                            tb_meas[tb]['tfall'] = trise_tfall_delays
-                        elif "trise" in key:
-                            tb_meas[tb]['trise'] = trise_tfall_delays
-                        # Set valids, if they already exist 
-                    elif key == "meas_avg_power":
-                        tb_meas[tb]['power'] += [ float(val) for val in spice_meas[key] ]
-                    else:
-                        # if its an implicit key we will take all sweep measurement points and append them to the list for this key
-                        # TODO change to allow implicit meas statements to fail if they are not found 
-                        #   (valid delay may still be asserted if the measure statement is unneeded)
-                        tb_meas[tb][key] += [ float(sw_pt_val) for sw_pt_val in spice_meas[key] ]
+        for key in spice_meas.dtype.names:
+            # Checks to see if the prefix used to define measure statement is in the key (ie its something we want to look for not random crap)
+            if tb.meas_val_prefix in key:
+                # Our total trise / tfall delays will be checked for validity and set to 1 if invalid (high cost function value)
+                if key in [f"{tb.meas_val_prefix}_total_trise", f"{tb.meas_val_prefix}_total_tfall"]:
+                    failed_delays: np.ndarray = np.isnan(spice_meas[key])
+                    new_valid_delays: np.ndarray = ~failed_delays & (np.where(failed_delays, 0, spice_meas[key]) > 0)
+                    # Do element wise AND with prev valid delays and new ones to get updated delay validity
+                    valid_delays = new_valid_delays if valid_delays is None else (valid_delays & new_valid_delays)
+                    trise_tfall_delays: np.ndarray = np.where(failed_delays, 1, spice_meas[key])
+                    # Convert the tb specific tfall / trise keys into a standard used for all tb post processing
+                    if "tfall" in key:
+                        tb_meas[tb]['tfall'] = trise_tfall_delays
+                    elif "trise" in key:
+                        tb_meas[tb]['trise'] = trise_tfall_delays
+                elif key == "meas_avg_power":
+                    tb_meas[tb]['power'] = spice_meas[key].copy()
+                else:
+                    # if its an implicit key we will take all sweep measurement points for this key
+                    # TODO change to allow implicit meas statements to fail if they are not found 
+                    #   (valid delay may still be asserted if the measure statement is unneeded)
+                    #   for now failed implicit measurements are NaN
+                    tb_meas[tb][key] = spice_meas[key].copy()
         # After this point the trise / tfall delays will be set in tb_meas so we can calculate the max delay
-        tb_meas[tb]["valid"] += valid_delays
-        tb_meas[tb]["delay"] += [ 
-            max(tfall, trise) for (tfall, trise) in zip(
-                    tb_meas[tb]['tfall'],
-                    tb_meas[tb]['trise']
-                )
-        ]
+        tb_meas[tb]["valid"] = valid_delays if valid_delays is not None else np.ones(len(spice_meas), dtype=bool)
+        tb_meas[tb]["delay"] = np.maximum(tb_meas[tb]['tfall'], tb_meas[tb]['trise'])
     return tb_meas
 
 def merge_tb_meas(
@@ -250,72 +330,43 @@ def merge_tb_meas(
         Type[c_ds.SimTB],
         Dict[Type[c_ds.SimTB], 
             Dict[str, 
-                List[float] | List[bool]
+                np.ndarray
             ]
         ]
     ], 
-) -> Dict[ Type[c_ds.SizeableCircuit], Dict[str, List[float] | List[bool]]]:
+) -> Dict[ Type[c_ds.SizeableCircuit], Dict[str, np.ndarray]]:
     """
         Takes result dictionary which is hashed by testbenches (from `sim_tbs`),
             merges delays and power for each unique circuit to set them
             merge function is specific to a testbench / subckt combo
+
+        Measurements are merged across all sweep points at once, 
+            each merged measurement is the (evenly weighted) average of the testbench measurement arrays,
+            the merged valids are the AND of the testbench valids and the merged delay is the max of the merged tfall / trise.
     """
-    # Calculate the portion of the critical path this circuit should contribute
-    # repr_crit_path_delay: float = None
     # Find all unique circuits in testbenches
     unique_ckts: Set[Type[c_ds.SizeableCircuit]] = set([tb.dut_ckt for tb in in_tb_meas.keys()])
-    merged_meas: Dict[Type[c_ds.SizeableCircuit] , Dict[str, List[float] | List[bool]]] = {}
+    merged_meas: Dict[Type[c_ds.SizeableCircuit] , Dict[str, np.ndarray]] = {}
     # Iterate through results for these circuits across different TB environments and set the circuit delay + power
     for ckt in unique_ckts:
         # Get all the testbenches that have this circuit
-        tb_meas: Dict[Type[c_ds.SimTB], Dict[str, List[float] | List[bool]]] = {
+        tb_meas: Dict[Type[c_ds.SimTB], Dict[str, np.ndarray]] = {
             tb: meas for tb, meas in in_tb_meas.items() if tb.dut_ckt == ckt
         }
-        # Merge & Set the measurements for the circuit
-        # merge_fn(tb_meas) # The other unique ckts may or may not be needed depending on the merge fn
-        
-        # tfall: float = 0
-        # trise: float = 0
-        # delay: float = 0
-        # pwr: float = 0
-        float_measures: Dict[str, List[float]] = defaultdict(lambda: [])
-        valids: List[bool] = []
+        float_measures: Dict[str, np.ndarray] = {}
+        valids: np.ndarray | None = None
         # Iterate through tbs 
         for tb in tb_meas.keys():
-            # We use a delay weight factor (required from user) to weight the delay of the subckt in this particular tb environment
-            # tfall += tb_meas[tb]["tfall"] / len(tb_meas.keys()) # TODO initialize delay_weights somewhere rather than evenly weighting by dividing by len
-            # trise += tb_meas[tb]["trise"] / len(tb_meas.keys()) # TODO initialize delay_weights somewhere rather than evenly weighting by dividing by len
-            # pwr += tb_meas[tb]["power"] * tb.power_weight # This may be unecessary TODO figure out
             for key in tb_meas[tb].keys():
                 if key != "valid":
-                    # Iterate through sweep points (should assert that len(trise) == len(all other keys))
-                    for i in range(len(tb_meas[tb]["trise"])):
-                        weighted_sw_pt_val: float = tb_meas[tb][key][i] / len(tb_meas.keys()) # TODO initialize delay_weights somewhere rather than evenly weighting by dividing by len
-                        if len(float_measures[key]) > i: # from > 0
-                            float_measures[key][i] += weighted_sw_pt_val
-                        else:
-                            float_measures[key].append(weighted_sw_pt_val)
+                    # We use a delay weight factor to weight the delay of the subckt in this particular tb environment
+                    weighted_meas: np.ndarray = tb_meas[tb][key] / len(tb_meas.keys()) # TODO initialize delay_weights somewhere rather than evenly weighting by dividing by len
+                    float_measures[key] = float_measures[key] + weighted_meas if key in float_measures else weighted_meas
                 else:
                     # And the tb valids togther to get a single merged one
-                    if len(valids) > i: # from > 0
-                        valids = [ 
-                            valid and tb_meas[tb]["valid"][i] 
-                                for i, valid in enumerate(valids) 
-                        ]
-                    else:
-                        valids = tb_meas[tb]["valid"]
-
-                    # Already accounted for these keys manually
-                    # if key not in ["tfall", "trise", "power", "valid", "delay"]:
-                        # extra_measures[key] += tb_meas[tb][key] / len(tb_meas.keys())  # TODO initialize delay_weights somewhere rather than evenly weighting by dividing by len
-            
-            for i in range(len(float_measures["trise"])):
-                delay: float = max(float_measures["tfall"][i], float_measures["trise"][i])
-                if len(float_measures[key]) > 0:
-                    float_measures["delay"][i] = delay 
-                else:
-                    float_measures["delay"].append(delay)
-
+                    valids = tb_meas[tb]["valid"] if valids is None else (valids & tb_meas[tb]["valid"])
+        
+        float_measures["delay"] = np.maximum(float_measures["tfall"], float_measures["trise"])
 
         # delay = max(tfall, trise)
         # Set the measurements for the circuit
@@ -352,6 +403,81 @@ def merge_tb_meas(
         # repr_crit_path_delay += (delay * ckt.delay_weight / len(unique_ckts) )
     return merged_meas
 
+class TrackedDict(MutableMapping):
+    """
+        Write through view of a dict which records the keys read from it (with thier value when first read) and written to it.
+        Used to find which area_dict / width_dict / wire entries a subcircuit update depends on (see `FPGA._run_tracked_update`).
+        Accesses which can't be tracked by key (iterating, missing keys, deleting) set the 'untracked' flag.
+    """
+    def __init__(self, data: Dict[str, Any]):
+        self.data: Dict[str, Any] = data
+        self.reads: Dict[str, Any] = {}
+        self.writes: Dict[str, Any] = {}
+        self.untracked: bool = False
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.data:
+            self.untracked = True
+        val = self.data[key]
+        # Reading back a value written by the same update is not a dependency
+        if key not in self.writes and key not in self.reads:
+            self.reads[key] = val
+        return val
+
+    def __contains__(self, key: str) -> bool:
+        if key not in self.data:
+            self.untracked = True
+            return False
+        self[key]
+        return True
+
+    def __setitem__(self, key: str, val: Any):
+        self.data[key] = val
+        self.writes[key] = val
+
+    def __delitem__(self, key: str):
+        self.untracked = True
+        del self.data[key]
+
+    def __iter__(self):
+        self.untracked = True
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        self.untracked = True
+        return len(self.data)
+
+
+def get_state_snapshot(val: Any, depth: int = 1) -> Any:
+    """
+        Returns a snapshot of the state held by 'val', which compares equal (==) to a later snapshot only if that state was not changed in place.
+        Builtin containers are copied recursively, other objects are compared by identity along with thier attributes, down to 'depth' levels of objects.
+    """
+    if isinstance(val, (int, float, complex, str, bytes, type(None))):
+        return val
+    if isinstance(val, (set, frozenset)):
+        return type(val), frozenset(val)
+    if isinstance(val, dict):
+        return dict, [(key, get_state_snapshot(item, depth)) for key, item in val.items()]
+    if isinstance(val, (list, tuple)):
+        return type(val), [get_state_snapshot(item, depth) for item in val]
+    if depth > 0 and hasattr(val, "__dict__"):
+        return id(val), {attr: get_state_snapshot(item, depth - 1) for attr, item in vars(val).items()}
+    return id(val)
+
+
+@dataclass
+class TrackedUpdate:
+    """
+        Record of a call to a subcircuit update function (update_area, update_wires, etc) made through `FPGA._run_tracked_update`
+    """
+    obj: Any                            # Object the update function was called on
+    args: Tuple[tuple, dict]            # Non dict (args, kwargs) of the call
+    attr_writes: Dict[str, Any]         # Attributes of obj the call set to a new value (e.g. block_area of a Block)
+    reads: List[Dict[str, Any]]         # For each dict passed to the call, the {key: value} read from it before being written
+    writes: List[Dict[str, Any]]        # For each dict passed to the call, the final {key: value} written to it, in order of first write
+
+
 @dataclass
 class FPGA:
     """ 
@@ -404,6 +530,21 @@ class FPGA:
 
     update_area_cnt: int = 0
     update_wires_cnt: int = 0
+    # Records of the subcircuit area / wire updates last made by `update_area` and `update_wires`, hashed by (id(obj), update_fn_name)
+    # Transistor areas of the last update_area, hashed by transistor name, value is (tran_size, transistor_area_list tuple)
+    # Together these let updates skip everything that was not affected by the transistors changed since the last update
+    tracked_updates: Dict[Tuple[int, str], TrackedUpdate] = field(
+        default_factory = lambda: {}, repr = False
+    )
+    # If False every subcircuit update is rerun rather than replayed from tracked_updates
+    track_updates: bool = True
+    tran_area_cache: Dict[str, Tuple[float | int, Tuple[str, int, int, float, float, float]]] = field(
+        default_factory = lambda: {}, repr = False
+    )
+    # (wire length, wire layer) used for each wire in wire_rc_dict by the last update_wire_rc
+    wire_rc_inputs: Dict[str, Tuple[float, int]] = field(
+        default_factory = lambda: {}, repr = False
+    )
     compute_distance_cnt: int = 0
     update_delays_cnt: int = 0
 
@@ -1338,6 +1479,7 @@ class FPGA:
                         _SwitchBlockMUX(sb_mux_size_required, num_sb_mux_per_tile, self.specs.use_tgate, sb_mux_name, self.specs.wire_types[Fs_ele["src"]], self.specs.wire_types[Fs_ele["dst"]])
                     )
 
+    @traced("netlist_write")
     def generate(self, size_hb_interfaces: bool):
         """ This function generates all SPICE netlists and library files. """
     
@@ -2225,6 +2367,12 @@ class FPGA:
         # Initialize library of testbenches and sizeable ckts
         self.init_tb_subckt_libs()
 
+        # NGSPICE can't simulate the generated testbenches directly, translate them once here rather than on every simulation
+        if self.spice_interface.spice_sim_name == "ngspice":
+            self.spice_interface.translate_ngspice_tbs(
+                [tb.sp_fpath for tbs in self.tb_lib.values() for tb in tbs]
+            )
+
         # Calculate area, and wire data.
         print("Calculating area...")
         # Update area values
@@ -2237,18 +2385,22 @@ class FPGA:
         print("")
             
 
-    def update_area(self):
+    @traced("update_area")
+    def update_area(self, update_tran_areas: bool = True, comp_trans: Dict[str, List[Tuple]] = None):
         """ This function updates self.area_dict. It passes area_dict to member objects (like sb_mux)
-            to update their area. Then, with an up-to-date area_dict it, calculate total tile area. """
+            to update their area. Then, with an up-to-date area_dict it, calculate total tile area. 
+            If 'update_tran_areas' is False self.transistor_area_list is assumed to be up to date (see `eval_sizing_combos`). 
+            If 'comp_trans' is given only the basic components in it are updated in area_dict and width_dict (see `_update_area_and_width_dicts`). """
         
         # We use the self.transistor_sizes to compute area. This dictionary has the form 'name': 'size'
         # And it knows the transistor sizes of all transistors in the FPGA
         # We first need to calculate the area for each transistor.
         # This function stores the areas in the transistor_area_list
-        self._update_area_per_transistor()
+        if update_tran_areas:
+            self._update_area_per_transistor()
         # Now, we have to update area_dict and width_dict with the new transistor area values
         # for the basic subcircuits which are inverteres, ptran, tgate, restorers and transistors
-        self._update_area_and_width_dicts()
+        self._update_area_and_width_dicts(comp_trans)
         #I found that printing width_dict here and comparing against golden results was helpful
         #self.debug_print("width_dict")
 
@@ -2262,37 +2414,37 @@ class FPGA:
 
         # Call Area calculation functions for all FPGA circuit objects
         for sb_mux in self.sb_muxes:
-            sb_mux.update_area(self.area_dict, self.width_dict)
+            self._run_tracked_update(sb_mux, "update_area", [self.area_dict, self.width_dict])
         for cb_mux in self.cb_muxes:
-            cb_mux.update_area(self.area_dict, self.width_dict)
+            self._run_tracked_update(cb_mux, "update_area", [self.area_dict, self.width_dict])
 
         if self.specs.enable_carry_chain:
             for carry_chain_periph in self.carry_chain_periphs:
-                carry_chain_periph.update_area(self.area_dict, self.width_dict)
+                self._run_tracked_update(carry_chain_periph, "update_area", [self.area_dict, self.width_dict])
             for carry_chain_mux in self.carry_chain_muxes:
-                carry_chain_mux.update_area(self.area_dict, self.width_dict)
+                self._run_tracked_update(carry_chain_mux, "update_area", [self.area_dict, self.width_dict])
             for carry_chain_inter in self.carry_chain_inter_clusters:
-                carry_chain_inter.update_area(self.area_dict, self.width_dict)
+                self._run_tracked_update(carry_chain_inter, "update_area", [self.area_dict, self.width_dict])
             for carry_chain in self.carry_chains:
-                carry_chain.update_area(self.area_dict, self.width_dict)
+                self._run_tracked_update(carry_chain, "update_area", [self.area_dict, self.width_dict])
             if self.specs.carry_chain_type == "skip":
                 for carry_chain_skip_and in self.carry_chain_skip_ands:
-                    carry_chain_skip_and.update_area(self.area_dict, self.width_dict)
+                    self._run_tracked_update(carry_chain_skip_and, "update_area", [self.area_dict, self.width_dict])
                 for carry_chain_skip_mux in self.carry_chain_skip_muxes:
-                    carry_chain_skip_mux.update_area(self.area_dict, self.width_dict)
+                    self._run_tracked_update(carry_chain_skip_mux, "update_area", [self.area_dict, self.width_dict])
 
         # TODO bring the local mux update area out here and decouple with logic cluster
         # for local_mux in self.local_muxes:
         #     local_mux.update_area(self.area_dict)
         for logic_cluster in self.logic_clusters:
-            logic_cluster.update_area(self.area_dict, self.width_dict)
+            self._run_tracked_update(logic_cluster, "update_area", [self.area_dict, self.width_dict])
         
         hardblock: hb_lib._hard_block
         for hardblock in self.hardblocklist:
-            hardblock.update_area(self.area_dict, self.width_dict)
+            self._run_tracked_update(hardblock, "update_area", [self.area_dict, self.width_dict])
         
         if self.specs.enable_bram_block == 1:
-            self.RAM.update_area(self.area_dict, self.width_dict)
+            self._run_tracked_update(self.RAM, "update_area", [self.area_dict, self.width_dict])
 
         # SB Muxes
         # Calculate total area of switch block
@@ -2330,11 +2482,11 @@ class FPGA:
         # self.width_dict["cb_total"] = math.sqrt(connection_block_area)
 
         # Switch Block Muxes
-        self.sb_mux.set_block_tile_area(self.area_dict, self.width_dict)
+        self._run_tracked_update(self.sb_mux, "set_block_tile_area", [self.area_dict, self.width_dict])
         # Connection Block Muxes
-        self.cb_mux.set_block_tile_area(self.area_dict, self.width_dict)
+        self._run_tracked_update(self.cb_mux, "set_block_tile_area", [self.area_dict, self.width_dict])
         # Local Muxes
-        self.local_mux.set_block_tile_area(self.area_dict, self.width_dict)
+        self._run_tracked_update(self.local_mux, "set_block_tile_area", [self.area_dict, self.width_dict])
 
         # Total Lut area 
         # TODO update for multi ckt support
@@ -2588,6 +2740,7 @@ class FPGA:
         dist: float = s1_dist + tmp_dist + s2_dist
         return dist
 
+    @traced("compute_distance")
     def compute_distance(self):
         """ This function computes distances for different stripes for the floorplanner:
 
@@ -2784,6 +2937,7 @@ class FPGA:
         self.compute_distance_cnt += 1
 
 
+    @traced("update_wires")
     def update_wires(self):
         """ This function updates self.wire_lengths and self.wire_layers. It passes wire_lengths and wire_layers to member 
             objects (like sb_mux) to update their wire lengths and layers. """
@@ -2793,25 +2947,25 @@ class FPGA:
             # Iterate over parameterized ckts AND list of load circuits
             sb_mux: sb_mux_lib.SwitchBlockMux
             for sb_mux in self.sb_muxes:
-                sb_mux.update_wires(self.width_dict, self.wire_lengths, self.wire_layers, ratio = 1.0)
+                self._run_tracked_update(sb_mux, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers], ratio = 1.0)
             cb_mux: cb_mux_lib.ConnectionBlockMux
             for cb_mux in self.cb_muxes:
-                cb_mux.update_wires(self.width_dict, self.wire_lengths, self.wire_layers, ratio = 1.0)
+                self._run_tracked_update(cb_mux, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers], ratio = 1.0)
             init_num_cb_stripes: int = 2
             init_num_sb_stripes: int = 2
             # Routing Wire Loads
             gen_r_wire_load: gen_r_load_lib.RoutingWireLoad
             for gen_r_wire_load in self.gen_routing_wire_loads:
-                gen_r_wire_load.update_wires(self.width_dict, self.wire_lengths, self.wire_layers, init_num_cb_stripes, init_num_sb_stripes)
+                self._run_tracked_update(gen_r_wire_load, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers], init_num_cb_stripes, init_num_sb_stripes)
             gen_ble_output_load: gen_r_load_lib.GeneralBLEOutputLoad
             for gen_ble_output_load in self.gen_ble_output_loads:
-                gen_ble_output_load.update_wires(self.width_dict, self.wire_lengths, self.wire_layers)
+                self._run_tracked_update(gen_ble_output_load, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers])
             # Logic clusters
             for logic_cluster in self.logic_clusters:
-                logic_cluster.update_wires(
-                    self.width_dict, 
-                    self.wire_lengths, 
-                    self.wire_layers, 
+                self._run_tracked_update(
+                    logic_cluster,
+                    "update_wires",
+                    [self.width_dict, self.wire_lengths, self.wire_layers], 
                     ic_ratio = 1.0,
                     lut_ratio = 1.0
                 )
@@ -2840,23 +2994,23 @@ class FPGA:
             # Iterate over parameterized ckts AND list of load circuits
             sb_mux: sb_mux_lib.SwitchBlockMux
             for sb_mux in self.sb_muxes:
-                sb_mux.update_wires(self.width_dict, self.wire_lengths, self.wire_layers, sb_ratio)
+                self._run_tracked_update(sb_mux, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers], sb_ratio)
             cb_mux: cb_mux_lib.ConnectionBlockMux
             for cb_mux in self.cb_muxes:
-                cb_mux.update_wires(self.width_dict, self.wire_lengths, self.wire_layers, cb_ratio)
+                self._run_tracked_update(cb_mux, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers], cb_ratio)
             # Routing Wire Loads
             gen_r_wire_load: gen_r_load_lib.RoutingWireLoad
             for gen_r_wire_load in self.gen_routing_wire_loads:
-                gen_r_wire_load.update_wires(self.width_dict, self.wire_lengths, self.wire_layers, self.num_sb_stripes, self.num_cb_stripes, self.lb_height)
+                self._run_tracked_update(gen_r_wire_load, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers], self.num_sb_stripes, self.num_cb_stripes, self.lb_height)
             gen_ble_output_load: gen_r_load_lib.GeneralBLEOutputLoad
             for gen_ble_output_load in self.gen_ble_output_loads:
-                gen_ble_output_load.update_wires(self.width_dict, self.wire_lengths, self.wire_layers, self.d_ffble_to_sb, self.lb_height)
+                self._run_tracked_update(gen_ble_output_load, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers], self.d_ffble_to_sb, self.lb_height)
             # Logic clusters
             for logic_cluster in self.logic_clusters:
-                logic_cluster.update_wires(
-                    self.width_dict, 
-                    self.wire_lengths, 
-                    self.wire_layers, 
+                self._run_tracked_update(
+                    logic_cluster,
+                    "update_wires",
+                    [self.width_dict, self.wire_lengths, self.wire_layers], 
                     ic_ratio, 
                     lut_ratio,
                     self.d_ffble_to_ic,
@@ -2865,25 +3019,25 @@ class FPGA:
         
         if self.specs.enable_carry_chain == 1:
             for carry_chain in self.carry_chains:
-                carry_chain.update_wires(self.width_dict, self.wire_lengths, self.wire_layers)
+                self._run_tracked_update(carry_chain, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers])
             for carry_chain_periph in self.carry_chain_periphs:
-                carry_chain_periph.update_wires(self.width_dict, self.wire_lengths, self.wire_layers)
+                self._run_tracked_update(carry_chain_periph, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers])
             for carry_chain_mux in self.carry_chain_muxes:
-                carry_chain_mux.update_wires(self.width_dict, self.wire_lengths, self.wire_layers)
+                self._run_tracked_update(carry_chain_mux, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers])
             for carry_chain_inter in self.carry_chain_inter_clusters:
-                carry_chain_inter.update_wires(self.width_dict, self.wire_lengths, self.wire_layers)
+                self._run_tracked_update(carry_chain_inter, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers])
             if self.specs.carry_chain_type == "skip":
                 for carry_chain_and in self.carry_chain_skip_ands:
-                    carry_chain_and.update_wires(self.width_dict, self.wire_lengths, self.wire_layers)
+                    self._run_tracked_update(carry_chain_and, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers])
                 for carry_chain_skip_mux in self.carry_chain_skip_muxes:
-                    carry_chain_skip_mux.update_wires(self.width_dict, self.wire_lengths, self.wire_layers)
+                    self._run_tracked_update(carry_chain_skip_mux, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers])
 
         if self.specs.enable_bram_block == 1:
-            self.RAM.update_wires(self.width_dict, self.wire_lengths, self.wire_layers)
+            self._run_tracked_update(self.RAM, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers])
 
         for hardblock in self.hardblocklist:
-            hardblock.update_wires(self.width_dict, self.wire_lengths, self.wire_layers)  
-            hardblock.mux.update_wires(self.width_dict, self.wire_lengths, self.wire_layers)   
+            self._run_tracked_update(hardblock, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers])  
+            self._run_tracked_update(hardblock.mux, "update_wires", [self.width_dict, self.wire_lengths, self.wire_layers])   
 
         
         # Update Wires logging
@@ -2897,13 +3051,70 @@ class FPGA:
 
         self.update_wires_cnt += 1
 
+    def _run_tracked_update(self, obj: Any, update_fn_name: str, dicts: List[Dict[str, Any]], *args, **kwargs):
+        """
+            Calls obj.<update_fn_name>(*dicts, *args, **kwargs), e.g. sb_mux.update_area(self.area_dict, self.width_dict), 
+            recording which entries of 'dicts' it reads and writes.
+
+            If the same update was made before with the same args and none of the entries it read have changed since,
+            it would write the same values again, so its recorded writes are replayed into 'dicts' (and the attributes of obj it set) instead of calling it.
+            This way an update after changing a few transistor sizes only reruns the subcircuit updates which depend on those transistors 
+            (directly, or through area / width / wire entries written by earlier updates).
+
+            Besides 'dicts', args and the attributes of obj it sets itself, an update function may only read state which is fixed once 
+            the FPGA is generated (circuit structure, self.specs, etc), as attribute reads are not tracked. 
+            It may only change obj by setting its attributes to new values, changes made in place (to a dict or list held by obj, 
+            or to the attributes of another object) are not recorded or replayed. This is checked in debug mode (see `get_state_snapshot`).
+            Set self.track_updates to False to rerun every update.
+        """
+        if not self.track_updates:
+            getattr(obj, update_fn_name)(*dicts, *args, **kwargs)
+            return
+        update_key: Tuple[int, str] = (id(obj), update_fn_name)
+        prev_update: TrackedUpdate | None = self.tracked_updates.get(update_key)
+        if prev_update is not None and prev_update.obj is obj and prev_update.args == (args, kwargs) and all(
+            key in in_dict and in_dict[key] == val for in_dict, reads in zip(dicts, prev_update.reads) for key, val in reads.items()
+        ):
+            for out_dict, writes in zip(dicts, prev_update.writes):
+                out_dict.update(writes)
+            for attr, val in prev_update.attr_writes.items():
+                setattr(obj, attr, val)
+            return
+
+        tracked_dicts: List[TrackedDict] = [TrackedDict(in_dict) for in_dict in dicts]
+        prev_attrs: Dict[str, Any] = dict(vars(obj))
+        if consts.VERBOSITY == consts.DEBUG:
+            prev_state: Dict[str, Any] = {attr: get_state_snapshot(val) for attr, val in prev_attrs.items()}
+        getattr(obj, update_fn_name)(*tracked_dicts, *args, **kwargs)
+        attr_writes: Dict[str, Any] = {attr: val for attr, val in vars(obj).items() if attr not in prev_attrs or prev_attrs[attr] is not val}
+        if consts.VERBOSITY == consts.DEBUG:
+            changed_attrs: List[str] = [
+                attr for attr, state in prev_state.items() if attr not in attr_writes and get_state_snapshot(getattr(obj, attr, None)) != state
+            ]
+            assert not changed_attrs, f"{type(obj).__name__}.{update_fn_name} changed {changed_attrs} in place, tracked updates can't replay this"
+        if any(tracked_dict.untracked for tracked_dict in tracked_dicts):
+            # Dependencies are unknown so this update will always be rerun
+            self.tracked_updates.pop(update_key, None)
+        else:
+            self.tracked_updates[update_key] = TrackedUpdate(
+                obj = obj,
+                args = (args, kwargs),
+                attr_writes = attr_writes,
+                reads = [tracked_dict.reads for tracked_dict in tracked_dicts],
+                writes = [tracked_dict.writes for tracked_dict in tracked_dicts],
+            )
+
+    @traced("update_wire_rc")
     def update_wire_rc(self):
         """ This function updates self.wire_rc_dict based on the FPGA's self.wire_lengths and self.wire_layers."""
             
-        # Calculate R and C for each wire
+        # Calculate R and C for each wire, wires with the same length and layer as the last update are skipped
         for wire, length in self.wire_lengths.items():
             # Get wire layer
             layer: int = self.wire_layers[wire]
+            if wire in self.wire_rc_dict and self.wire_rc_inputs.get(wire) == (length, layer):
+                continue
+            self.wire_rc_inputs[wire] = (length, layer)
             # Get R and C per unit length for wire layer
             rc: Tuple[ float ] = self.metal_stack[layer]
             # Calculate total wire R and C
@@ -2959,6 +3170,7 @@ class FPGA:
         crit_path_delay = self.set_ckt_meas(ckt_meas, 0, *args, **kwargs)
         return crit_path_delay
 
+    @traced("update_delays", is_phase = True)
     def update_delays(self, spice_interface: spice.SpiceInterface):
         """ 
         Get the HSPICE delays for each subcircuit. 
@@ -2999,10 +3211,37 @@ class FPGA:
         # were "failed". If that is the case, we set the delay of that subcircuit to 1
         # second and set our valid_delay flag to False.
 
+        # None of the block types depend on each others delays within a pass and all use the same parameter_dict,
+        # so the testbenches of every block type are simulated together (see `sim_tb_groups`) before their results are used below in the usual order
+        tb_groups: Dict[str, List[Type[c_ds.SimTB]]] = {
+            "sb_mux": self.sb_mux_tbs,
+            "cb_mux": self.cb_mux_tbs,
+            "local_mux": self.local_mux_tbs,
+            "local_ble_output": self.local_ble_output_tbs,
+            "general_ble_output": self.general_ble_output_tbs,
+            "flut_mux": self.flut_mux_tbs,
+            "lut": self.lut_tbs,
+        }
+        for lut_in_key in sorted(list(self.lut_input_tbs.keys())):
+            tb_groups[f"lut_input_{lut_in_key}"] = self.lut_input_tbs[lut_in_key]
+            tb_groups[f"lut_input_driver_{lut_in_key}"] = self.lut_in_driver_tbs[lut_in_key]
+            tb_groups[f"lut_input_not_driver_{lut_in_key}"] = self.lut_in_not_driver_tbs[lut_in_key]
+        if self.specs.enable_carry_chain:
+            tb_groups["carry_chain"] = self.carry_chain_tbs
+            tb_groups["carry_chain_per"] = self.carry_chain_per_tbs
+            tb_groups["carry_chain_mux"] = self.carry_chain_mux_tbs
+            tb_groups["carry_chain_inter"] = self.carry_chain_inter_tbs
+            if self.specs.carry_chain_type == "skip":
+                tb_groups["carry_chain_skip_and"] = self.carry_chain_skip_and_tbs
+                tb_groups["carry_chain_skip_mux"] = self.carry_chain_skip_mux_tbs
+        tb_groups_meas: Dict[
+            str, Dict[Type[c_ds.SimTB], Dict[str, np.ndarray]]
+        ] = sim_tb_groups(tb_groups, spice_interface, parameter_dict)
+
         # SB MUX
         sb_mux_meas: Dict[
             sb_mux_lib.SwitchBlockMuxTB, Dict[str, List[float] | List[bool]]
-        ] = sim_tbs(self.sb_mux_tbs, spice_interface, parameter_dict)
+        ] = tb_groups_meas["sb_mux"]
 
         # Sets delays + power in ckt objects 
         crit_path_delay += self.merge_and_set_meas_sw_pt(sb_mux_meas)
@@ -3010,28 +3249,28 @@ class FPGA:
         # CB MUX
         cb_mux_meas: Dict[
             cb_mux_lib.ConnectionBlockMuxTB, Dict[str, List[float] | List[bool]]
-        ] = sim_tbs(self.cb_mux_tbs, spice_interface, parameter_dict)
+        ] = tb_groups_meas["cb_mux"]
         # Sets delays + power in ckt objects 
         crit_path_delay += self.merge_and_set_meas_sw_pt(cb_mux_meas)
 
         # LOCAL MUX
         local_mux_meas: Dict[
             lb_lib.LocalMuxTB, Dict[str, List[float] | List[bool]]
-        ] = sim_tbs(self.local_mux_tbs, spice_interface, parameter_dict)
+        ] = tb_groups_meas["local_mux"]
         # Sets delays + power in ckt objects 
         crit_path_delay += self.merge_and_set_meas_sw_pt(local_mux_meas)
 
         # Local BLE Output
         local_ble_output_meas: Dict[
            ble_lib.LocalBLEOutputTB, Dict[str, List[float] | List[bool]]
-        ] = sim_tbs(self.local_ble_output_tbs, spice_interface, parameter_dict)
+        ] = tb_groups_meas["local_ble_output"]
         # Sets delays + power in ckt objects 
         crit_path_delay += self.merge_and_set_meas_sw_pt(local_ble_output_meas)
 
         # General BLE Output
         gen_ble_output_meas: Dict[
             ble_lib.GeneralBLEOutputTB, Dict[str, List[float] | List[bool]]
-        ] = sim_tbs(self.general_ble_output_tbs, spice_interface, parameter_dict)
+        ] = tb_groups_meas["general_ble_output"]
         # Sets delays + power in ckt objects 
         crit_path_delay += self.merge_and_set_meas_sw_pt(gen_ble_output_meas)
         
@@ -3039,7 +3278,7 @@ class FPGA:
         # TODO make sure even if tbs are empty this is fine
         flut_mux_meas: Dict[
             ble_lib.FlutMuxTB, Dict[str, List[float] | List[bool]]
-        ] = sim_tbs(self.flut_mux_tbs, spice_interface, parameter_dict)
+        ] = tb_groups_meas["flut_mux"]
         # Sets delays + power in ckt objects
         flut_mux_merged_meas = merge_tb_meas(flut_mux_meas)
         self.set_ckt_meas(flut_mux_merged_meas, sw_idx = 0)
@@ -3047,7 +3286,7 @@ class FPGA:
         # LUT
         lut_meas: Dict[
             lut_lib.LUTTB, Dict[str, List[float] | List[bool]]
-        ] = sim_tbs(self.lut_tbs, spice_interface, parameter_dict)
+        ] = tb_groups_meas["lut"]
         # Sets delays + power in ckt objects 
         lut_merged_meas = merge_tb_meas(lut_meas)
         self.set_ckt_meas(lut_merged_meas, sw_idx = 0)
@@ -3076,7 +3315,7 @@ class FPGA:
             # LUT Input Driver with LUT loading
             lut_input_meas: Dict[
                 lut_lib.LUTInputTB, Dict[str, List[float] | List[bool]]
-            ] = sim_tbs(self.lut_input_tbs[lut_in_key], spice_interface, parameter_dict)
+            ] = tb_groups_meas[f"lut_input_{lut_in_key}"]
             lut_input_measures[lut_in_key] = lut_input_meas
 
             # TODO make this cleaner, we are kinda doing a workaround way of setting values in the LUTInput obj
@@ -3098,7 +3337,7 @@ class FPGA:
                 if self.specs.use_fluts:
                     for del_key in ["tfall", "trise"]:
                         in_meas[del_key][ckt_idx] += list(flut_mux_merged_meas.values())[ckt_idx][del_key][sw_idx]
-                    in_meas["delay"] = max(in_meas["tfall"], in_meas["trise"])
+                    in_meas["delay"] = np.maximum(in_meas["tfall"], in_meas["trise"])
                 lut_input.tfall = in_meas["tfall"][sw_idx]
                 lut_input.trise = in_meas["trise"][sw_idx]
                 lut_input.delay = in_meas["delay"][sw_idx]
@@ -3107,7 +3346,7 @@ class FPGA:
             # LUT Input drivers
             lut_input_driver_meas: Dict[
                 lut_lib.LUTInputDriverTB, Dict[str, List[float] | List[bool]]
-            ] = sim_tbs(self.lut_in_driver_tbs[lut_in_key], spice_interface, parameter_dict)
+            ] = tb_groups_meas[f"lut_input_driver_{lut_in_key}"]
             lut_in_drv_merged_meas = merge_tb_meas(lut_input_driver_meas)
             self.set_ckt_meas(lut_in_drv_merged_meas, sw_idx = 0)            
 
@@ -3115,7 +3354,7 @@ class FPGA:
             # LUT Input Not drivers
             lut_input_not_driver_meas: Dict[
                 lut_lib.LUTInputDriverTB, Dict[str, List[float] | List[bool]]
-            ] = sim_tbs(self.lut_in_not_driver_tbs[lut_in_key], spice_interface, parameter_dict)
+            ] = tb_groups_meas[f"lut_input_not_driver_{lut_in_key}"]
             lut_in_not_drv_merged_meas = merge_tb_meas(lut_input_not_driver_meas)
             self.set_ckt_meas(lut_in_not_drv_merged_meas, sw_idx = 0)
 
@@ -3147,28 +3386,28 @@ class FPGA:
             # Carry Chain
             cc_meas: Dict[
                 cc_lib.CarryChainTB, Dict[str, List[float] | List[bool]]
-            ] = sim_tbs(self.carry_chain_tbs, spice_interface, parameter_dict)
+            ] = tb_groups_meas["carry_chain"]
             # Sets delays + power in ckt objects
             crit_path_delay += self.merge_and_set_meas_sw_pt(cc_meas)
                         
             # Carry Chain Peripherial
             cc_periph_meas: Dict[
                 cc_lib.CarryChainPerTB, Dict[str, List[float] | List[bool]]
-            ] = sim_tbs(self.carry_chain_per_tbs, spice_interface, parameter_dict)
+            ] = tb_groups_meas["carry_chain_per"]
             # Sets delays + power in ckt objects
             crit_path_delay += self.merge_and_set_meas_sw_pt(cc_periph_meas)
 
             # Carry Chain Mux
             cc_mux_meas: Dict[
                 cc_lib.CarryChainMuxTB, Dict[str, List[float] | List[bool]]
-            ] = sim_tbs(self.carry_chain_mux_tbs, spice_interface, parameter_dict)
+            ] = tb_groups_meas["carry_chain_mux"]
             # Sets delays + power in ckt objects
             crit_path_delay += self.merge_and_set_meas_sw_pt(cc_mux_meas)
             
             # Carry Chain Inter Cluster
             cc_inter_meas: Dict[
                 cc_lib.CarryChainInterClusterTB, Dict[str, List[float] | List[bool]]
-            ] = sim_tbs(self.carry_chain_inter_tbs, spice_interface, parameter_dict)
+            ] = tb_groups_meas["carry_chain_inter"]
             # Sets delays + power in ckt objects
             crit_path_delay += self.merge_and_set_meas_sw_pt(cc_inter_meas)
 
@@ -3177,14 +3416,14 @@ class FPGA:
                 # TODO make sure even if tbs are empty this is fine
                 cc_skip_and_meas: Dict[
                     cc_lib.CarryChainSkipAndTB, Dict[str, List[float] | List[bool]]
-                ] = sim_tbs(self.carry_chain_skip_and_tbs, spice_interface, parameter_dict)
+                ] = tb_groups_meas["carry_chain_skip_and"]
                 # Sets delays + power in ckt objects
                 crit_path_delay += self.merge_and_set_meas_sw_pt(cc_skip_and_meas)
 
                 # Carry Chain Skip Mux
                 cc_skip_mux_meas: Dict[
                     cc_lib.CarryChainSkipMuxTB, Dict[str, List[float] | List[bool]]
-                ] = sim_tbs(self.carry_chain_skip_mux_tbs, spice_interface, parameter_dict)
+                ] = tb_groups_meas["carry_chain_skip_mux"]
                 # Sets delays + power in ckt objects
                 crit_path_delay += self.merge_and_set_meas_sw_pt(cc_skip_mux_meas)
 
@@ -3403,12 +3642,11 @@ class FPGA:
         sweep_data_file.close()
         
 
-    def _update_transistor_sizes(self, element_names: List[str], combo: Tuple[float | int], use_finfet: bool, inv_ratios: Dict[str, Any] = None):
-        """ This function is used to update self.transistor_sizes for a particular transistor sizing combination.
+    def _get_new_transistor_sizes(self, element_names: List[str], combo: Tuple[float | int], use_finfet: bool, inv_ratios: Dict[str, Any] = None) -> Dict[str, float | int]:
+        """ This function returns the transistor sizes {tran_name: size} set by a particular transistor sizing combination.
             'element_names' is a list of elements (ptran, inv, etc.) that need their sizes updated.
             'combo' is a particular transistor sizing combination for the transistors in 'element_names'
-            'inv_ratios' are the inverter P/N ratios for this transistor sizing combination.
-            'combo' will typically describe only a small group of transistors. Other transistors retain their current size."""
+            'inv_ratios' are the inverter P/N ratios for this transistor sizing combination."""
         
         # We start by making a dictionary of the transistor sizes we need to update
         new_sizes = {}
@@ -3449,44 +3687,206 @@ class FPGA:
                             new_sizes[element_name + "_pmos"] = round(combo[i]*inv_ratios[element_name])
                             # new_sizes[element_name + "_pmos"] = combo[i]
 
-        # Now, update self.transistor_sizes with these new sizes
-        self.transistor_sizes.update(new_sizes)
+        return new_sizes
 
+    def _update_transistor_sizes(self, element_names: List[str], combo: Tuple[float | int], use_finfet: bool, inv_ratios: Dict[str, Any] = None):
+        """ This function is used to update self.transistor_sizes for a particular transistor sizing combination.
+            'element_names' is a list of elements (ptran, inv, etc.) that need their sizes updated.
+            'combo' is a particular transistor sizing combination for the transistors in 'element_names'
+            'inv_ratios' are the inverter P/N ratios for this transistor sizing combination.
+            'combo' will typically describe only a small group of transistors. Other transistors retain their current size."""
+        
+        # Update self.transistor_sizes with the sizes set by this combo
+        self.transistor_sizes.update(
+            self._get_new_transistor_sizes(element_names, combo, use_finfet, inv_ratios)
+        )
 
-    def _area_model(self, tran_name: str, tran_size: int) -> float:
-        """ 
-            Transistor area model. 'tran_size' is the transistor drive strength in min. width transistor drive strengths. 
-            Transistor area is calculated bsed on 'tran_size' and transistor type, which is determined by tags in 'tran_name'.
-            Return valus is the transistor area in minimum width transistor areas. 
+    def _area_model_coeffs(self, tran_name: str) -> Tuple[float, float, float]:
+        """
+            Returns the coefficients (a, b, c) of the transistor area model area = a + b*tran_size + c*sqrt(tran_size)
+            for the transistor type determined by tags in 'tran_name'.
         """
-    
         # If inverter or transmission gate, use larger area to account for N-well spacing
         # If pass-transistor, use regular area because they don't need N-wells.
         if "inv_" in tran_name or "tgate_" in tran_name:
             if not self.specs.use_finfet:
                 # Bulk Model
-                area = 0.518 + 0.127*tran_size + 0.428*math.sqrt(tran_size)
+                return (0.518, 0.127, 0.428)
             # This is the finfet Tx model we used in ASAP7, not sure why it should be different than other finfet Tx models
             elif (self.specs.min_tran_width == 7): 
                 # 7nm Finfet Model
-                area = 0.3694 + 0.0978*tran_size + 0.5368*math.sqrt(tran_size)
+                return (0.3694, 0.0978, 0.5368)
             else:
                 # Legacy FinFET model TODO figure out where this came from and attach comment
-                area = 0.034 + 0.414*tran_size + 0.735*math.sqrt(tran_size)
+                return (0.034, 0.414, 0.735)
         else:
             # Regular transistor, i.e. transistors which don't have P & N types adjacent to one another (I'm guessing)
             if not self.specs.use_finfet :
                 # Bulk Model
-                area = 0.447 + 0.128*tran_size + 0.391*math.sqrt(tran_size)
+                return (0.447, 0.128, 0.391)
             elif (self.specs.min_tran_width == 7):
                 # 7nm Finfet Model
-                area = 0.3694 + 0.0978*tran_size + 0.5368*math.sqrt(tran_size)
+                return (0.3694, 0.0978, 0.5368)
             else:
                 # Legacy FinFET model TODO figure out where this came from and attach comment
-                area = -0.013 + 0.414*tran_size + 0.665*math.sqrt(tran_size)
+                return (-0.013, 0.414, 0.665)
+
+    def _area_model(self, tran_name: str, tran_size: int) -> float:
+        """ 
+            Transistor area model. 'tran_size' is the transistor drive strength in min. width transistor drive strengths. 
+            Transistor area is calculated bsed on 'tran_size' and transistor type, which is determined by tags in 'tran_name'.
+            Return valus is the transistor area in minimum width transistor areas. 
+        """
+        a, b, c = self._area_model_coeffs(tran_name)
+        area = a + b*tran_size + c*math.sqrt(tran_size)
     
         return area  
 
+    def _area_model_array(self, tran_names: List[str], tran_sizes: np.ndarray) -> np.ndarray:
+        """
+            Array version of `_area_model`, 'tran_sizes' is an (N_combos x N_transistors) matrix with a column for each transistor in 'tran_names'.
+            Returns the matching matrix of transistor areas in minimum width transistor areas.
+        """
+        a, b, c = np.array([self._area_model_coeffs(tran_name) for tran_name in tran_names]).T
+        return a + b*tran_sizes + c*np.sqrt(tran_sizes)
+
+    def eval_sizing_combos(
+        self,
+        element_names: List[str],
+        sizing_combos: List[Tuple[float | int]],
+        inv_ratios: Dict[str, Any] = None,
+        eval_area_fn: Callable[[FPGA], float] = None,
+        combo_fn: Callable[[int], None] = None,
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+            Evaluates the area and wire RC of every transistor sizing combination in 'sizing_combos' 
+            (same format as `_update_transistor_sizes`) in a single batch.
+
+            The transistor sizes of all combos are put in an (N_combos x N_transistors) matrix 
+            and the area model is evaluated for all of them at once, as are the wire RCs from the wire lengths of each combo. 
+            Subcircuit areas and wire lengths are still updated per combo from the precomputed transistor areas, 
+            after the first combo only the transistors and basic components changed from the previous combo are updated.
+            Each combo gets the wire RC of its own wire lengths.
+
+            Args:
+                eval_area_fn: Returns the area for a combo from the FPGA state once it has been updated to that combo, 
+                    the tile area is used if not given
+                combo_fn: Called with the combo index once area and wire lengths are updated to that combo
+            
+            Returns:
+                The array of areas (N_combos) and a dict of (N_combos x 2) arrays of (resistance, capacitance) hashed by wire name. 
+                The FPGA is left updated to the last combo, as if each combo had been set one after another.
+        """
+        new_sizes_list: List[Dict[str, float | int]] = [
+            self._get_new_transistor_sizes(element_names, combo, self.specs.use_finfet, inv_ratios) for combo in sizing_combos
+        ]
+        tran_names: List[str] = list(dict.fromkeys(
+            list(self.transistor_sizes.keys()) + [tran_name for new_sizes in new_sizes_list for tran_name in new_sizes.keys()]
+        ))
+        tran_idxs: Dict[str, int] = {tran_name: idx for idx, tran_name in enumerate(tran_names)}
+        num_combos: int = len(sizing_combos)
+
+        # Each row starts as the sizes of the previous row, transistors which are not in a combo retain their current size
+        cur_sizes: np.ndarray = np.array([self.transistor_sizes.get(tran_name, 0) for tran_name in tran_names], dtype=np.float64)
+        tran_sizes: np.ndarray = np.tile(cur_sizes, (num_combos, 1))
+        # Only the columns of transistors set by a combo change between rows. 
+        # Each combo writes its row of these columns, the rows are then forward filled from the last combo which set each transistor.
+        combo_cols: List[np.ndarray] = [np.array([tran_idxs[tran_name] for tran_name in new_sizes], dtype=int) for new_sizes in new_sizes_list]
+        set_cols: np.ndarray = np.unique(np.concatenate(combo_cols)) if combo_cols else np.empty(0, dtype=int)
+        set_sizes: np.ndarray = np.full((num_combos + 1, len(set_cols)), np.nan)
+        set_sizes[0] = cur_sizes[set_cols]
+        for combo_idx, (cols, new_sizes) in enumerate(zip(combo_cols, new_sizes_list)):
+            set_sizes[combo_idx + 1, np.searchsorted(set_cols, cols)] = list(new_sizes.values())
+        set_rows: np.ndarray = np.where(np.isnan(set_sizes), 0, np.arange(num_combos + 1)[:, None])
+        np.maximum.accumulate(set_rows, axis = 0, out = set_rows)
+        set_sizes = np.take_along_axis(set_sizes, set_rows, axis = 0)
+        tran_sizes[:, set_cols] = set_sizes[1:]
+        # Transistors whose size differs from the previous combo (the first combo is compared against the current sizes)
+        changed_cols: List[np.ndarray] = [set_cols[np.flatnonzero(row_diff)] for row_diff in set_sizes[1:] != set_sizes[:-1]]
+
+        # Area model for all combos and transistors at once
+        tran_areas: np.ndarray = self._area_model_array(tran_names, tran_sizes)
+        tran_areas_nm: np.ndarray = tran_areas * self.specs.min_width_tran_area
+        tran_widths: np.ndarray = np.sqrt(tran_areas_nm)
+
+        areas: np.ndarray = np.empty(num_combos)
+        wire_names: List[str] = []
+        wire_lengths: List[List[float]] = []
+        wire_layers: List[List[int]] = []
+        # Position of each transistor in self.transistor_area_list and of the transistors of each basic component (inverter, tgate, etc.)
+        tran_list_idxs: Dict[str, int] = {}
+        comp_list_idxs: Dict[str, List[int]] = {}
+        for combo_idx, new_sizes in enumerate(new_sizes_list):
+            self.transistor_sizes.update(new_sizes)
+            if len(tran_list_idxs) == len(self.transistor_sizes):
+                # Only the transistors changed by this combo and the components they are part of need their areas updated
+                comp_names: Set[str] = set()
+                for tran_idx in changed_cols[combo_idx].tolist():
+                    tran_name: str = tran_names[tran_idx]
+                    self.transistor_area_list[tran_list_idxs[tran_name]] = (
+                        tran_name,
+                        self.transistor_sizes[tran_name],
+                        self.transistor_sizes[tran_name],
+                        float(tran_areas[combo_idx, tran_idx]),
+                        float(tran_areas_nm[combo_idx, tran_idx]),
+                        float(tran_widths[combo_idx, tran_idx]),
+                    )
+                    comp_name: str = tran_name.replace("_nmos", "").replace("_pmos", "")
+                    if comp_name in comp_list_idxs:
+                        comp_names.add(comp_name)
+                self.update_area(
+                    update_tran_areas = False,
+                    comp_trans = {
+                        comp_name: [self.transistor_area_list[list_idx] for list_idx in comp_list_idxs[comp_name]] for comp_name in comp_names
+                    },
+                )
+            else:
+                # First combo (or one adding transistors), set the areas of all transistors
+                self.transistor_area_list = [
+                    (
+                        tran_name,
+                        self.transistor_sizes[tran_name],
+                        self.transistor_sizes[tran_name],
+                        tran_area,
+                        tran_area_nm,
+                        tran_width,
+                    ) for tran_name, tran_area, tran_area_nm, tran_width in zip(
+                        tran_names, tran_areas[combo_idx].tolist(), tran_areas_nm[combo_idx].tolist(), tran_widths[combo_idx].tolist()
+                    ) if tran_name in self.transistor_sizes
+                ]
+                tran_list_idxs = {tran[0]: list_idx for list_idx, tran in enumerate(self.transistor_area_list)}
+                comp_list_idxs = {}
+                for comp_name, _, _ in self._get_comp_area_list(self.transistor_area_list):
+                    comp_list_idxs[comp_name] = []
+                for list_idx, tran in enumerate(self.transistor_area_list):
+                    comp_name: str = tran[0].replace("_nmos", "").replace("_pmos", "")
+                    if comp_name in comp_list_idxs:
+                        comp_list_idxs[comp_name].append(list_idx)
+                self.update_area(update_tran_areas = False)
+            areas[combo_idx] = eval_area_fn(self) if eval_area_fn else self.area_dict["tile"]
+            self.update_wires()
+            if not wire_names:
+                wire_names = list(self.wire_lengths.keys())
+            wire_lengths.append([self.wire_lengths[wire] for wire in wire_names])
+            wire_layers.append([self.wire_layers[wire] for wire in wire_names])
+            if combo_fn:
+                combo_fn(combo_idx)
+
+        # Wire RC for all combos and wires at once
+        layers: np.ndarray = np.array(wire_layers, dtype=int).reshape(num_combos, len(wire_names))
+        lengths: np.ndarray = np.array(wire_lengths, dtype=np.float64).reshape(num_combos, len(wire_names))
+        metal_stack: np.ndarray = np.array(self.metal_stack, dtype=np.float64)
+        resistances: np.ndarray = metal_stack[layers, 0] * lengths
+        capacitances: np.ndarray = metal_stack[layers, 1] * lengths / 2
+        wire_rc: Dict[str, np.ndarray] = {
+            wire: np.stack([resistances[:, wire_idx], capacitances[:, wire_idx]], axis = 1) for wire_idx, wire in enumerate(wire_names)
+        }
+        
+        # Leave the wire RC of the FPGA as it would have been after updating to the last combo
+        self.update_wire_rc()
+
+        return areas, wire_rc
+
     def _update_area_per_transistor(self):
         """ 
             We use self.transistor_sizes to calculate area
@@ -3500,9 +3900,13 @@ class FPGA:
         tran_area_list = []
         
         # For each transistor, calculate area
+        # Only transistors whose size changed since the last update are recalculated, the rest come from self.tran_area_cache
         tran_name: str
         tran_size: int
         for tran_name, tran_size in self.transistor_sizes.items():
+                if tran_name in self.tran_area_cache and self.tran_area_cache[tran_name][0] == tran_size:
+                    tran_area_list.append(self.tran_area_cache[tran_name][1])
+                    continue
                 # Get transistor drive strength (drive strength is = xMin width)
                 tran_drive: int = tran_size
                 # Get tran area in min transistor widths
@@ -3523,14 +3927,46 @@ class FPGA:
                         tran_width
                     )
                 )    
+                self.tran_area_cache[tran_name] = (tran_size, tran_area_list[-1])
                                                                                 
         # Assign list to FPGA object
         self.transistor_area_list: List[ Tuple[str, int, int, float, float, float] ] = tran_area_list
 
-    def _update_area_and_width_dicts(self):
+    def _update_area_and_width_dicts(self, comp_trans: Dict[str, List[Tuple]] = None):
         """ 
             Calculate area for basic subcircuits like inverters, pass transistor, 
             transmission gates, etc. Update area_dict and width_dict with this data.
+
+            'comp_trans' are the transistor_area_list tuples of components (hashed by component name) whose transistors changed. 
+            If given, only these components are updated and the rest of area_dict and width_dict is assumed to be up to date.
+        """
+        if comp_trans is not None:
+            for comp_name, comp_area, comp_width in self._get_comp_area_list([tran for trans in comp_trans.values() for tran in trans]):
+                self.area_dict[comp_name] = comp_area
+                self.width_dict[comp_name] = comp_width
+            return
+
+        comp_area_list: List[ Tuple[str, float, float] ] = self._get_comp_area_list(self.transistor_area_list)
+
+        # Convert comp_area_list to area_dict and width_dict
+        area_dict: Dict[str, float] = {}
+        width_dict: Dict[str, float] = {}
+        for component in comp_area_list:
+            area_dict[component[0]] = component[1]
+            width_dict[component[0]] = component[2]
+        
+        # Set the FPGA object area and width dict
+        self.area_dict = area_dict
+        self.width_dict = width_dict
+
+        return
+
+    @staticmethod
+    def _get_comp_area_list(transistor_area_list: List[ Tuple[str, int, int, float, float, float] ]) -> List[ Tuple[str, float, float] ]:
+        """
+            Returns the (component name, component area, component width) of the basic components made up of 
+            the transistors in 'transistor_area_list' (same format as self.transistor_area_list). 
+            A component is listed again each time one of its transistors completes it, the last entry is its final area.
         """
         # Important info:
         #   The keys which determine if a transistor will be put into the area / width dicts are:
@@ -3559,7 +3995,7 @@ class FPGA:
         # [4] tran_area_nm
         # [5] tran_width_nm
         tran: Tuple[str, int, int, float, float, float]
-        for tran in self.transistor_area_list:
+        for tran in transistor_area_list:
             # those components should have an nmos and a pmos transistors in them
             if "inv_" in tran[0] or "tgate_" in tran[0]:
                 # Get the component name; transistors full name example: inv_lut_out_buffer_2_nmos.
@@ -3597,20 +4033,10 @@ class FPGA:
                 comp_name: str = tran[0].replace("_nmos", "")
                 comp_name: str = comp_name.replace("_pmos", "")               
                 # Add this to comp_area_list directly
-                comp_area_list.append((comp_name, tran[4], tran[5]))            
-        
-        # Convert comp_area_list to area_dict and width_dict
-        area_dict: Dict[str, float] = {}
-        width_dict: Dict[str, float] = {}
-        for component in comp_area_list:
-            area_dict[component[0]] = component[1]
-            width_dict[component[0]] = component[2]
-        
-        # Set the FPGA object area and width dict
-        self.area_dict = area_dict
-        self.width_dict = width_dict
+                comp_area_list.append((comp_name, tran[4], tran[5]))
+
+        return comp_area_list
 
-        return
 
 
     
@@ -4039,6 +4465,7 @@ class FPGA:
         return valid_delay
 
 
+    @traced("update_power", is_phase = True)
     def update_power(self, spice_interface: spice.SpiceInterface):
         """This funciton measures RAM core power once sizing has finished.
         It also sums up power consumed by the peripheral circuitry and converts it to energy per bit"""
@@ -4,7 +4,14 @@
 import os
 import subprocess
 import re
-from typing import Dict, List, Tuple
+import json
+import time
+import hashlib
+import sqlite3
+import random
+import multiprocessing as mp
+from typing import Dict, List, Tuple, Any
+import numpy as np
 import src.coffe.utils as utils
 
 # All .sp files should be created to use sweep_data.l to set parameters.
@@ -13,21 +20,324 @@ HSPICE_DATA_SWEEP_PATH = "sweep_data.l"
 # The contents of 
 DATA_SWEEP_PATH = "data.txt"
 
+# NGSPICE has no .DATA sweeps, each sweep point is simulated in its own subdirectory of the testbench dir
+NGSPICE_SWEEP_DIR = "ngspice_sweep"
+# Parameters of a single sweep point, included directly by the NGSPICE deck in that sweep point's directory
+NGSPICE_SWEEP_PT_DATA_PATH = "sweep_pt_data.l"
+# Suffix of the NGSPICE syntax versions of spice files, written beside the originals
+NGSPICE_TRANSLATION_SUFFIX = "_ngspice"
+
+# Value written by the simulators for a measurement they could not make, stored as NaN in measurement arrays
+SPICE_FAILED_MEAS = "failed"
+
+# Upper bound on the number of threads (-mt) given to a single HSPICE job, the sizing testbenches gain nothing past this
+HSPICE_MAX_THREADS = 8
+
+# Types of failed simulations, found by looking through the simulator output (.lis) of the failed run
+SPICE_LICENSE_FAILURE = "license"
+SPICE_CONVERGENCE_FAILURE = "convergence"
+SPICE_UNKNOWN_FAILURE = "unknown"
+
+# Messages printed by HSPICE (and the FlexNet license manager it uses) when it could not check out a license,
+# these are transient so the simulation is run again after a backoff
+HSPICE_LICENSE_ERROR_PATTERNS = [
+    r"licen[sc]e.*(checkout|check out|checked out|not available|server|denied|failed|expired|error)",
+    r"(cannot|could not|unable to|failed to).*licen[sc]e",
+    r"no licen[sc]e",
+    r"licensed number of users",
+    r"flexlm|flexnet|lmgrd",
+]
+# Messages printed by HSPICE when the circuit itself could not be simulated, running it again would fail the same way
+HSPICE_CONVERGENCE_ERROR_PATTERNS = [
+    r"timestep too small",
+    r"time step too small",
+    r"no convergence",
+    r"(fail|failed|unable) to converge",
+    r"convergence (failure|failed|problem)",
+]
+
+
+def get_sweep_dpath(sp_path: str) -> str:
+    """
+        Returns the directory containing the sweep_data.l file used by the testbench at 'sp_path'.
+        Testbenches live in thier own subdirectory of the architecture folder and include "../includes.l",
+        which in turn includes the sweep_data.l file next to it.
+    """
+    return os.path.dirname(os.path.abspath(os.path.dirname(sp_path) or os.curdir))
+
+
+def get_tb_name(sp_path: str) -> str:
+    """
+        Returns the name testbench 'sp_path' is recorded under in timing traces, its filename without the .sp extension.
+    """
+    return os.path.splitext(os.path.basename(sp_path))[0]
+
+
+def meas_to_float_array(vals: List[Any]) -> np.ndarray:
+    """
+        Converts a list of measurement values (strings or numbers) of a single measurement to a float64 array,
+        values which are "failed" become NaN.
+    """
+    vals = np.asarray(vals)
+    if vals.dtype.kind in "US":
+        vals = np.where(vals == SPICE_FAILED_MEAS, "nan", vals)
+    return vals.astype(np.float64)
+
+
+def meas_from_columns(columns: Dict[str, List[Any]]) -> np.ndarray:
+    """
+        Returns the measurement array for the measurements in 'columns', which has the format
+            columns = {meas_name1: [value1, value2, value3, etc...], 
+                       meas_name2: [value1, value2, value3, etc...],
+                       etc...}
+        
+        Measurement arrays are NumPy structured arrays with a float64 field for each measurement and 
+        a row for each sweep point, so spice_meas[meas_name] is an array of that measurement across the sweep 
+        and spice_meas.dtype.names are the measurement names. Failed measurements are NaN.
+    """
+    num_sweep_pts: int = len(next(iter(columns.values()))) if columns else 0
+    spice_meas = np.empty(num_sweep_pts, dtype=[(meas_name, np.float64) for meas_name in columns.keys()])
+    for meas_name, vals in columns.items():
+        spice_meas[meas_name] = meas_to_float_array(vals)
+    return spice_meas
+
+
+def meas_array_to_str_dict(spice_meas: np.ndarray) -> Dict[str, List[str]]:
+    """
+        Converts a measurement array (see `meas_from_columns`) into the {meas_name: [value1, value2, etc...]} dict of strings 
+        returned by the simulators before measurement arrays were used, with NaN values written as "failed".
+    """
+    return {
+        meas_name: [SPICE_FAILED_MEAS if np.isnan(val) else repr(float(val)) for val in spice_meas[meas_name]]
+            for meas_name in spice_meas.dtype.names
+    }
+
+
+# Version of the format of measurements stored in the result cache, part of every cache key so entries in an older format are never hit
+SPICE_CACHE_FORMAT_VERSION = "2"
+
+# Spice libraries (in the sweep dir) which, along with the top level .sp file, determine the result of a simulation
+SPICE_CACHE_LIB_FNAMES = ["includes.l", "process_data.l", "basic_subcircuits.l", "subcircuits.l"]
+
+# .lib "<path>" <section> / .include "<path>" statements pulling another file (e.g. the device models) into a spice file, 
+# group 2 (.lib) or 4 (.include) is the included path
+SPICE_INCLUDE_RE = re.compile(
+    rb"""^[ \t]*\.(?:lib[ \t]+(['"]?)([^\s'"]+)\1[ \t]+\w+|inc(?:lude)?[ \t]+(['"]?)([^\s'"]+)\3)""",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+class SpiceResultCache(object):
+    """
+    Persistent on-disk cache of SPICE measurements for single sweep points, stored in an SQLite database.
+
+    Entries are keyed on a hash of the simulated netlist (see `SpiceInterface._get_netlist_digest`) and 
+    the parameter values of a single sweep point, so the same point is never simulated twice even if it is
+    part of a different sweep. Once there are more than 'max_entries' entries the least recently used ones are evicted.
+
+    A new connection is opened for each access so objects of this class can be pickled and sent to other processes.
+    """
+    def __init__(self, db_fpath: str, max_entries: int):
+        self.db_fpath = db_fpath
+        self.max_entries = max_entries
+        with sqlite3.connect(self.db_fpath) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, meas TEXT NOT NULL, last_used INTEGER NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        conn.close()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns a dict of the cached measurements {key: {meas_name: value, ...}} for each key in 'keys' that is in the cache.
+        Found entries are marked as most recently used.
+        """
+        found = {}
+        with sqlite3.connect(self.db_fpath) as conn:
+            for key in set(keys):
+                row = conn.execute("SELECT meas FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    found[key] = json.loads(row[0])
+            conn.executemany(
+                "UPDATE results SET last_used = ? WHERE key = ?", 
+                [(time.time_ns(), key) for key in found.keys()]
+            )
+        conn.close()
+        return found
+
+    def put_many(self, entries: Dict[str, Dict[str, Any]]):
+        """
+        Stores each {key: {meas_name: value, ...}} entry in the cache, then evicts the least recently used 
+        entries if the cache has grown past `self.max_entries`.
+        """
+        with sqlite3.connect(self.db_fpath) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO results (key, meas, last_used) VALUES (?, ?, ?)",
+                [(key, json.dumps(meas), time.time_ns()) for key, meas in entries.items()]
+            )
+            num_entries = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            if num_entries > self.max_entries:
+                conn.execute(
+                    "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used ASC LIMIT ?)",
+                    (num_entries - self.max_entries,)
+                )
+        conn.close()
+
+
+def get_num_available_cores() -> int:
+    """
+        Returns the number of cores this process is allowed to run on.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def classify_spice_failure(lis_fpath: str) -> str:
+    """
+        Looks through the simulator output at 'lis_fpath' of a run which produced no measurements and returns why it failed,
+        one of SPICE_LICENSE_FAILURE, SPICE_CONVERGENCE_FAILURE or SPICE_UNKNOWN_FAILURE.
+        Convergence errors take priority as a simulation which got far enough to print one has a license.
+    """
+    if not os.path.isfile(lis_fpath):
+        return SPICE_UNKNOWN_FAILURE
+    license_re = re.compile("|".join(HSPICE_LICENSE_ERROR_PATTERNS), re.IGNORECASE)
+    convergence_re = re.compile("|".join(HSPICE_CONVERGENCE_ERROR_PATTERNS), re.IGNORECASE)
+    found_license_err = False
+    with open(lis_fpath, "r", errors="replace") as lis_file:
+        for line in lis_file:
+            if convergence_re.search(line):
+                return SPICE_CONVERGENCE_FAILURE
+            if license_re.search(line):
+                found_license_err = True
+    return SPICE_LICENSE_FAILURE if found_license_err else SPICE_UNKNOWN_FAILURE
+
+
+class SpiceSimError(Exception):
+    """
+    Raised when a SPICE simulation could not produce any measurements, either because the circuit failed to converge
+    or because it kept failing (e.g. no license could be checked out) after all retries were used.
+    """
+    def __init__(self, sp_path: str, failure_type: str, num_attempts: int):
+        # Arguments are passed up so the exception can be pickled back from pool worker processes
+        super().__init__(sp_path, failure_type, num_attempts)
+        self.sp_path = sp_path
+        self.failure_type = failure_type
+        self.num_attempts = num_attempts
+
+    def __str__(self):
+        lis_fpath = os.path.splitext(self.sp_path)[0] + ".lis"
+        return f"SPICE simulation of {self.sp_path} failed ({self.failure_type}) after {self.num_attempts} attempt(s), see {lis_fpath}"
+
+
+class SpiceScheduler(object):
+    """
+    Decides how simulator processes are launched by a `SpiceInterface`:
+    - At most 'max_licenses' simulations run at the same time (the number of simulator licenses / tokens available), 
+      None or 0 means only the number of workers of the interface limits it.
+    - The number of threads of each HSPICE job (-mt) is chosen so the concurrent jobs share the 'num_cores' available cores.
+    - Runs which fail for license (or unknown) reasons are retried up to 'max_retries' times, waiting an exponentially 
+      increasing (and jittered) time starting at 'backoff_s' seconds and capped at 'max_backoff_s' seconds between attempts.
+      Convergence failures are not retried.
+    Only settings are stored so objects of this class can be sent to pool worker processes.
+    """
+    def __init__(self, max_licenses: int = None, num_cores: int = None, max_retries: int = 10, backoff_s: float = 1.0, max_backoff_s: float = 60.0):
+        self.max_licenses = max_licenses if max_licenses else None
+        self.num_cores = max(1, num_cores if num_cores else get_num_available_cores())
+        self.max_retries = max(0, max_retries)
+        self.backoff_s = max(0.0, backoff_s)
+        self.max_backoff_s = max(self.backoff_s, max_backoff_s)
+        return
+
+    def get_max_concurrent_sims(self, num_workers: int) -> int:
+        """
+        Returns the number of simulations which may run at the same time with 'num_workers' workers.
+        """
+        num_workers = max(1, num_workers)
+        return min(num_workers, self.max_licenses) if self.max_licenses else num_workers
+
+    def get_num_threads(self, num_concurrent_sims: int) -> int:
+        """
+        Returns the number of threads each of 'num_concurrent_sims' HSPICE jobs running at the same time should use.
+        """
+        return max(1, min(HSPICE_MAX_THREADS, self.num_cores // max(1, num_concurrent_sims)))
+
+    def get_backoff_s(self, attempt: int) -> float:
+        """
+        Returns the time to wait before retrying after failed attempt number 'attempt' (starting at 0).
+        Jobs which failed together are spread out by scaling the wait by a random factor in [0.5, 1].
+        """
+        return min(self.max_backoff_s, self.backoff_s * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+    def run_hspice_job(self, sp_path: str, num_threads: int) -> Tuple[str, Dict[str, int]]:
+        """
+        Runs HSPICE on the .sp file at 'sp_path' in its own directory with 'num_threads' threads until it writes a .mt0 file.
+        
+        Returns the path to the .mt0 file and the number of failed attempts before it of each failure type.
+        Raises a `SpiceSimError` if the simulation failed to converge or still failed after `self.max_retries` retries.
+        """
+        sp_dir = os.path.dirname(sp_path)
+        sp_filename = os.path.basename(sp_path)
+        lis_fpath = os.path.join(sp_dir, os.path.splitext(sp_filename)[0] + ".lis")
+        # HSPICE should print the measurements in a file having the same name as the output file with .mt0 ending
+        mt0_fpath = os.path.join(sp_dir, os.path.splitext(sp_filename)[0] + ".mt0")
+
+        failed_attempts: Dict[str, int] = {}
+        for attempt in range(self.max_retries + 1):
+            # The output file is rewritten each attempt so only the errors of the last run are classified
+            with open(lis_fpath, "w") as output_file:
+                subprocess.call(["hspice", "-mt", str(num_threads), "-i", sp_filename], stdout=output_file, stderr=output_file, cwd=sp_dir or None)
+            if os.path.isfile(mt0_fpath):
+                return mt0_fpath, failed_attempts
+            failure_type = classify_spice_failure(lis_fpath)
+            failed_attempts[failure_type] = failed_attempts.get(failure_type, 0) + 1
+            if failure_type == SPICE_CONVERGENCE_FAILURE or attempt == self.max_retries:
+                raise SpiceSimError(sp_path, failure_type, attempt + 1)
+            time.sleep(self.get_backoff_s(attempt))
+
 
 class SpiceInterface(object):
     """
     Defines an SPICE interface class. 
     An object of this class can be used to run SPICE jobs with your choice of simulator and parse the output of those jobs.
     """
-    def __init__(self, spice_sim_name : str):
+    def __init__(self, spice_sim_name : str, num_workers: int = 1, cache_fpath: str = None, cache_max_entries: int = 200000, scheduler: SpiceScheduler = None, timing_trace: utils.TimingTrace = None):
         self.spice_sim_name = spice_sim_name
 
+        # Max number of testbenches which can be simulated at the same time by `run_batch`, 1 runs them serially
+        self.num_workers = max(1, num_workers if num_workers else 1)
+
+        # Limits concurrent simulations to the available licenses, picks HSPICE threads and retries failed runs
+        self.scheduler = scheduler if scheduler else SpiceScheduler()
+        # Number of simulator runs which failed and were retried, hashed by failure type
+        self.sim_retry_counter: Dict[str, int] = {}
+
+        # Time spent writing sweep data, simulating and parsing each testbench, see `utils.TimingTrace`
+        self.timing_trace = timing_trace if timing_trace else utils.TimingTrace()
+
         # This simulation counter keeps track of number of HSPICE sims performed.
         self.simulation_counter = 0
 
+        # Result cache, if no path is given every sweep point is simulated
+        self.cache = SpiceResultCache(cache_fpath, cache_max_entries) if cache_fpath else None
+        # Number of sweep points which were (hit) or were not (miss) found in the result cache
+        self.cache_hit_counter = 0
+        self.cache_miss_counter = 0
+        # Digest and included files of each file read for cache keys, hashed by path and only recomputed if the file is modified
+        self._file_digests: Dict[str, Tuple[Tuple[int, int], str, List[str]]] = {}
+        # NGSPICE translated spice files (header, contents) hashed by path, see `_translate_ngspice_file`
+        self._ngspice_translations: Dict[str, Tuple[str, str]] = {}
+
         return
 
 
+    def __getstate__(self):
+        # Worker processes only launch simulations, so the (potentially large) digest and translation caches are not sent to them
+        state = self.__dict__.copy()
+        state["_file_digests"] = {}
+        state["_ngspice_translations"] = {}
+        state["timing_trace"] = utils.TimingTrace()
+        return state
+
+
     def get_num_simulations_performed(self):
         """
         Returns the total number of HSPICE sims performed by this SpiceInterface object.
@@ -36,11 +346,85 @@ class SpiceInterface(object):
         return self.simulation_counter
 
 
-    def _setup_data_sweep_file(self, parameter_dict):
+    def get_cache_stats(self) -> Tuple[int, int]:
+        """
+        Returns the number of (hits, misses) of sweep points in the result cache by this SpiceInterface object.
+        """
+
+        return self.cache_hit_counter, self.cache_miss_counter
+
+
+    def get_retry_stats(self) -> Dict[str, int]:
+        """
+        Returns the number of simulator runs which failed and were retried by this SpiceInterface object, hashed by failure type.
+        """
+
+        return dict(self.sim_retry_counter)
+
+
+    def _add_retries(self, failed_attempts: Dict[str, int]):
+        for failure_type, num_failed in failed_attempts.items():
+            self.sim_retry_counter[failure_type] = self.sim_retry_counter.get(failure_type, 0) + num_failed
+
+
+    def _get_file_digest(self, fpath: str) -> str:
+        """
+        Returns the sha256 of the contents of 'fpath', reusing the previous digest if the file was not modified since.
+        """
+        if not os.path.isfile(fpath):
+            return "missing"
+        fstat = os.stat(fpath)
+        fstamp = (fstat.st_mtime_ns, fstat.st_size)
+        if fpath not in self._file_digests or self._file_digests[fpath][0] != fstamp:
+            with open(fpath, "rb") as fd:
+                contents = fd.read()
+            # Included paths are relative to the file including them
+            include_fpaths = [
+                os.path.abspath(os.path.join(os.path.dirname(fpath), (lib_path or inc_path).decode(errors = "replace")))
+                    for _, lib_path, _, inc_path in SPICE_INCLUDE_RE.findall(contents)
+            ]
+            self._file_digests[fpath] = (fstamp, hashlib.sha256(contents).hexdigest(), include_fpaths)
+        return self._file_digests[fpath][1]
+
+
+    def _get_netlist_digest(self, sp_path: str) -> str:
+        """
+        Returns a hash of everything which determines the result of simulating 'sp_path' other than the sweep parameters:
+        the simulator, the top level .sp file, the spice libraries in the sweep dir and every file they (or the .sp file) 
+        include through .lib / .include statements, such as the device model file.
+        The sweep data file is left out as the parameters of each sweep point are part of its cache key (see `_get_sweep_pt_key`).
+        """
+        sweep_dpath = get_sweep_dpath(sp_path)
+        hasher = hashlib.sha256((SPICE_CACHE_FORMAT_VERSION + self.spice_sim_name).encode())
+        fpaths = [os.path.abspath(fpath) for fpath in [sp_path] + [os.path.join(sweep_dpath, fname) for fname in SPICE_CACHE_LIB_FNAMES]]
+        hashed_fpaths = set(fpaths) | {os.path.join(sweep_dpath, HSPICE_DATA_SWEEP_PATH)}
+        for fpath in fpaths:
+            hasher.update(self._get_file_digest(fpath).encode())
+            # Files which are pulled in by the ones hashed so far are hashed after them
+            for include_fpath in self._file_digests[fpath][2] if fpath in self._file_digests else []:
+                if include_fpath not in hashed_fpaths:
+                    hashed_fpaths.add(include_fpath)
+                    fpaths.append(include_fpath)
+        return hasher.hexdigest()
+
+
+    @staticmethod
+    def _get_sweep_pt_key(netlist_digest: str, parameter_dict: Dict[str, List[str]], idx: int) -> str:
+        """
+        Returns the cache key for the sweep point at index 'idx' in 'parameter_dict' of a netlist
+        """
+        sweep_pt = sorted((param, str(vals[idx])) for param, vals in parameter_dict.items())
+        return hashlib.sha256((netlist_digest + repr(sweep_pt)).encode()).hexdigest()
+
+
+    def _setup_data_sweep_file(self, parameter_dict, sweep_dpath: str = ""):
         """
         Create an HSPICE .DATA statement with the data from parameter_dict.
         The .DATA file is hard to read. So, we also write out the parameters to a text file
         in an easy to read format. This makes it easier to debug.
+
+        Both files are written to 'sweep_dpath', which should be the directory containing the 
+        includes.l file of the testbenches being simulated.
         """
         
         max_items_per_line = 4
@@ -49,7 +433,7 @@ class SpiceInterface(object):
         param_list = list(parameter_dict.keys())
 
         # Write out parameters to a "easy to read format" file (this just helps for debug) 
-        data_file = open(DATA_SWEEP_PATH, 'w')
+        data_file = open(os.path.join(sweep_dpath, DATA_SWEEP_PATH), 'w')
         data_file.write("param".ljust(40) + "value".ljust(20) + "\n")
         dashes = "-"*60
         data_file.write(dashes+ "\n")
@@ -62,7 +446,7 @@ class SpiceInterface(object):
         data_file.close()
 
         # Write the .DATA HPSICE file. This first part writes out the header.
-        hspice_data_file = open(HSPICE_DATA_SWEEP_PATH, 'w')
+        hspice_data_file = open(os.path.join(sweep_dpath, HSPICE_DATA_SWEEP_PATH), 'w')
         hspice_data_file.write(".DATA sweep_data")
         item_counter = 0
         for param_name in param_list:
@@ -94,6 +478,49 @@ class SpiceInterface(object):
     
         return
 
+    def _hspice_sim(self, sp_path: str, num_threads: int = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Runs a single HSPICE job on the .sp file at 'sp_path' using whatever is currently in the 
+        sweep_data.l file, and returns the parsed .mt0 measurements along with info about the run:
+        {"failed_attempts": number of failed attempts of each failure type which were retried (see `SpiceScheduler.run_hspice_job`),
+         "sim_s": seconds spent in the simulator including retries, "parse_s": seconds spent parsing the .mt0}
+
+        The simulator is launched with the testbench directory as its working directory rather than
+        changing the cwd of this process, so several of these can safely run at the same time 
+        (see `run_batch`). Nothing on this object is modified, so retries and times are returned to be recorded by the caller.
+
+        HSPICE simulations might fail for some reasons:
+        1- The input file is incorrect, which would be a bug within COFFE, or the circuit does not converge.
+        2- HSPICE fails to check out the license, assuming the license exists, it is likely due
+           to many instances checking out the license at the same time or license going down temporarly.
+        The second case is retried with a backoff, a `SpiceSimError` is raised if the job cannot be completed.
+        """
+        if num_threads is None:
+            num_threads = self.scheduler.get_num_threads(1)
+
+        start_time = time.perf_counter()
+        mt0_path, failed_attempts = self.scheduler.run_hspice_job(sp_path, num_threads)
+        parse_start_time = time.perf_counter()
+        # store the measurments in a dictionary
+        spice_measurements = self.parse_mt0(mt0_path)
+        # delete results file to avoid confusion in future runs
+        os.remove(mt0_path)
+        sim_info = {
+            "failed_attempts": failed_attempts,
+            "sim_s": parse_start_time - start_time,
+            "parse_s": time.perf_counter() - parse_start_time,
+        }
+
+        return spice_measurements, sim_info
+
+    def _record_hspice_sim(self, sp_path: str, num_sims: int, sim_info: Dict[str, Any]):
+        """
+        Records the retries and times of an HSPICE job of 'num_sims' sweep points returned by `_hspice_sim`.
+        """
+        self._add_retries(sim_info["failed_attempts"])
+        self.timing_trace.add("sim", sim_info["sim_s"], get_tb_name(sp_path), num_sims)
+        self.timing_trace.add("parse", sim_info["parse_s"], get_tb_name(sp_path))
+
     def run_hspice(self, sp_path: str, parameter_dict: Dict[str, List[str]]):
         """
         This function runs HSPICE on the .sp file at 'sp_path' and returns a dictionary that 
@@ -132,75 +559,27 @@ class SpiceInterface(object):
         the wire RC is for a particular transistor sizing combination outside this function 
         though. Here, we'll only set the paramters to the appropriate values. 
 
-        Finally, what we'll return is a dictionary similar to 'parameter_dict' but containing
-        all of the of the SPICE measurements. The return value will have this format: 
+        Finally, what we'll return is a measurement array (see `meas_from_columns`) similar to 'parameter_dict' 
+        but containing all of the of the SPICE measurements, so that:
 
-        measurements = {meas_name1: [value1, value2, value3, etc...], 
-                        meas_name2: [value1, value2, value3, etc...],
-                        etc...}
+        measurements[meas_name1] = [value1, value2, value3, etc...] 
+        measurements[meas_name2] = [value1, value2, value3, etc...]
+        etc...
         """
 
-        sp_dir = os.path.dirname(sp_path)
-        sp_filename = os.path.basename(sp_path)
-  
+        num_sims = len(next(iter(parameter_dict.values())))
+
         # Setup the .DATA sweep file with parameters in 'parameter_dict' 
-        self._setup_data_sweep_file(parameter_dict)
- 
-        # Change working dir so that SPICE output files are created in circuit subdirectory
-        saved_cwd = os.getcwd()
-        os.chdir(sp_dir)
-         
-        # Creat an output file having the ending .lis
-        # Run the SPICE simulation and capture output
-        output_filename = sp_filename.rstrip(".sp") + ".lis"
-        output_file = open(output_filename, "w")
+        with self.timing_trace.timed("netlist_write", get_tb_name(sp_path)):
+            self._setup_data_sweep_file(parameter_dict, get_sweep_dpath(sp_path))
 
-        hspice_success = False
-        hspice_runs = 0
-
-        # HSPICE simulations might fail for some reasons:
-        # 1- The input file is incorrect, which would be a bug within COFFE.
-        # 2- HSPICE fails to checheck out the license, assuming the license exists, it is likely due
-        #    to many instances checking out the license at the same time or license going down temporarly. 
-        #    In this case, we check if the ".mt0" exists, if not, we run hspice again. 
-        while (not hspice_success) :
-            # last I checked the license is available during the night, so we can try to run hspice uncomment below if this is untrue
-            #utils.check_for_time()
-            subprocess.call(["hspice", '-mt', '8', '-i', sp_filename], stdout=output_file, stderr=output_file)
-
-            # how come this file is closed here, it should be closed only if there is a success
-            # since else the call process will write in a closed file
-            ##output_file.close()
-             
-            # HSPICE should print the measurements in a file having the same
-            # name as the output file with .mt0 ending
-            mt0_path = output_filename.replace(".lis", ".mt0")
-
-            # check that the ".mt0" file is there
-            if os.path.isfile(mt0_path) :
-                # store the measurments in a dictionary
-                spice_measurements = self.parse_mt0(mt0_path)
-                # delete results file to avoid confusion in future runs
-                os.remove(mt0_path)
-                hspice_success = True
-                output_file.close()
-            # HSPICE failed to run
-            else :
-                hspice_runs = hspice_runs + 1
-                if hspice_runs > 10 :
-                    print("----------------------------------------------------------")
-                    print("                  HSPICE failed to run                    ")
-                    print("----------------------------------------------------------")
-                    print("")
-                    exit(2)
+        spice_measurements, sim_info = self._hspice_sim(sp_path)
+        self._record_hspice_sim(sp_path, num_sims, sim_info)
   
         # Update simulation counter with the number of simulations done by 
         # adding the length of the list of parameter values inside the dictionary
         self.simulation_counter += len(next(iter(parameter_dict.values())))
 
-        # Return to saved cwd
-        os.chdir(saved_cwd)
-           
         return spice_measurements
     
     def measure_node_replacement(self, main_file: str, lib_files: List[str]) -> List[Tuple[str, str]]:
@@ -373,14 +752,167 @@ class SpiceInterface(object):
         return result
 
     def parse_ngspice_measurements(self, file_path : str, measurements : Dict):
-        file = open(file_path, "r")
-        file_content = file.read()
-        file.close()
-        for match in re.finditer(r"^\s*(meas_\w+)\s*=\s*([+-]?(\d*\.\d+|\d+\.\d*)([eE][\+-]?\d+)?|\d+[eE][\+-]?\d)", file_content, flags=re.I|re.M):
-            if match.group(1) in measurements:
-                measurements[match.group(1)].append((match.group(2)))
-            else:
-                measurements[match.group(1)] = [(match.group(2))]
+        # The .lis file is streamed line by line as it can be large for long transients
+        meas_re = re.compile(r"^\s*(meas_\w+)\s*=\s*([+-]?(\d*\.\d+|\d+\.\d*)([eE][\+-]?\d+)?|\d+[eE][\+-]?\d)", flags=re.I)
+        with open(file_path, "r") as file:
+            for line in file:
+                match = meas_re.match(line)
+                if match is None:
+                    continue
+                if match.group(1) in measurements:
+                    measurements[match.group(1)].append((match.group(2)))
+                else:
+                    measurements[match.group(1)] = [(match.group(2))]
+
+    def _translate_ngspice_file(self, out_fpath: str, src_fpaths: List[str], translate_fn) -> Tuple[str, str]:
+        """
+        Writes the NGSPICE translation of a spice file to 'out_fpath', unless it already holds a translation of the current 
+        contents of 'src_fpaths' (all files the translation depends on). 'translate_fn' is called with no arguments to 
+        get the translated contents. The first line of the output records a digest of the sources it was made from.
+
+        Returns the path and contents of the translated file.
+        """
+        hasher = hashlib.sha256()
+        for fpath in src_fpaths:
+            hasher.update(self._get_file_digest(fpath).encode())
+        header = f"* NGSPICE translation of {os.path.basename(src_fpaths[0])}, source digest {hasher.hexdigest()}\n"
+
+        cached = self._ngspice_translations.get(out_fpath)
+        if cached is not None and cached[0] == header and os.path.isfile(out_fpath):
+            return out_fpath, cached[1]
+        if os.path.isfile(out_fpath):
+            with open(out_fpath, "r") as out_file:
+                out_content = out_file.read()
+            if out_content.startswith(header):
+                self._ngspice_translations[out_fpath] = (header, out_content)
+                return out_fpath, out_content
+
+        out_content = header + translate_fn()
+        with open(out_fpath, "w") as out_file:
+            out_file.write(out_content)
+        self._ngspice_translations[out_fpath] = (header, out_content)
+        return out_fpath, out_content
+
+    def _get_ngspice_includes(self, sweep_dpath: str) -> str:
+        """
+        Returns the path of the NGSPICE version of the includes.l file in 'sweep_dpath', translating it (and basic_subcircuits.l) if needed.
+        Both are written next to the originals, which are left untouched so HSPICE can still use them.
+        """
+        basic_subcircuit_path = os.path.join(sweep_dpath, "basic_subcircuits.l")
+        def translate_basic_subcircuits():
+            with open(basic_subcircuit_path, "r") as basic_subcircuit_file:
+                basic_subcircuit_content = basic_subcircuit_file.read()
+            # Rw and Cw become {Rw} and {Cw}
+            return re.sub(r"\b([RC]w)$", r"{\1}", basic_subcircuit_content, flags=re.M|re.I)
+        ngspice_basic_subcircuit_path = self._translate_ngspice_file(
+            os.path.join(sweep_dpath, "basic_subcircuits" + NGSPICE_TRANSLATION_SUFFIX + ".l"),
+            [basic_subcircuit_path],
+            translate_basic_subcircuits,
+        )[0]
+
+        includes_path = os.path.join(sweep_dpath, "includes.l")
+        def translate_includes():
+            with open(includes_path, "r") as includes_file:
+                includes_content = includes_file.read()
+            def absolute_lib(match):
+                lib_fpath = ngspice_basic_subcircuit_path if match.group(2) == "basic_subcircuits.l" else os.path.join(sweep_dpath, match.group(2))
+                return f"{match.group(1)}{lib_fpath}{match.group(3)}"
+            includes_content = re.sub(r"^(\.lib\s+\")(.*?)(\")", absolute_lib, includes_content, flags=re.M|re.I)
+            # Parameters are included directly by each sweep point deck rather than through the shared sweep file
+            return re.sub(rf"^\.include\s+\"{re.escape(HSPICE_DATA_SWEEP_PATH)}\".*$", "", includes_content, flags=re.M|re.I)
+        return self._translate_ngspice_file(
+            os.path.join(sweep_dpath, "includes" + NGSPICE_TRANSLATION_SUFFIX + ".l"),
+            [includes_path, basic_subcircuit_path],
+            translate_includes,
+        )[0]
+
+    def get_ngspice_deck(self, sp_path: str) -> Tuple[str, str]:
+        """
+        Returns the path and contents of the NGSPICE syntax version of the testbench at 'sp_path'.
+        The translated deck is stored beside the original as <name>_ngspice.sp and is reused until 
+        the testbench or the libraries it depends on change. See `run_ngspice` for the modifications made.
+        """
+        sp_dir = os.path.dirname(sp_path)
+        sp_filename = os.path.basename(sp_path)
+        sweep_dpath = get_sweep_dpath(sp_path)
+        includes_fpath = self._get_ngspice_includes(sweep_dpath)
+
+        def translate_deck():
+            sp_file = open(sp_path, "r")
+            sp_content = sp_file.read()
+            sp_file.close()
+            # functions used by regex subsititution
+            def insert_include(match):
+                return f"{match.group(0)}\n.INCLUDE \"{NGSPICE_SWEEP_PT_DATA_PATH}\"\n"
+            def absolute_lib(match):
+                return f"{match.group(1)}{includes_fpath}{match.group(3)}"
+            def add_quotation(match):
+                s = "pulse ("
+                if not match.group(1)[0].isdigit():
+                    s = s + f"'{match.group(1)}' "
+                else:
+                    s = s + f"{match.group(1)} "
+                if not match.group(2)[0].isdigit():
+                    s = s + f"'{match.group(2)}'"
+                else:
+                    s = s + f"{match.group(2)}"
+                return s
+            def fix_vgnd(match):
+                return f"Vgnd gnd1 gnd 0\n{match.group(1)}v(gnd1){match.group(3)}"
+            # parameter file must be included in the circuit.sp file for NGSPICE
+            # it is included relative to the deck so each sweep point can use its own copy
+            sp_content_modified = re.sub(r".TITLE.*$", insert_include, sp_content, count=1, flags=re.M|re.I)
+            # control block in NGSPICE to run and quit the simulation
+            sp_content_modified = re.sub(r"$", "\n.CONTROL\nset temp = 25\nrun\nquit\n.ENDC\n", sp_content_modified, count = 1)
+            # use the absolute path of the NGSPICE version of includes.l for .LIB section
+            sp_content_modified = re.sub(r"(.lib\s+\")(.*)(\")", absolute_lib, sp_content_modified, flags=re.M|re.I)
+            # Remove the SWEEP in .tran section, NGSPICE does not have a SWEEP command
+            # SWEEP effect is simulated by calling NGSPICE once per sweep point
+            sp_content_modified = re.sub(r"(\.tran(\s+\w+){2}).*$", r"\1", sp_content_modified, flags=re.M|re.I)
+            # INTEGRAL keyword has to be INTEG in NGSPICE
+            sp_content_modified = re.sub(r"\bintegral\b", "INTEG", sp_content_modified, flags=re.M|re.I)
+            # parameter to PULSE function has to have "'" around variables
+            sp_content_modified = re.sub(r"pulse\s*\(\s*(\w+)\s+(\w+)", add_quotation, sp_content_modified, flags=re.M|re.I)
+            # fix v(gnd): ngspice cannot measure node named gnd
+            sp_content_modified = re.sub(r"^(.*)\bv\((gnd)\)(.*)$", fix_vgnd, sp_content_modified, flags=re.M|re.I)
+            # replace reference to node with highest level internal node that is equivalent
+            measure_replacements = self.measure_node_replacement(
+                os.path.join(sp_dir, sp_filename), 
+                [os.path.join(sweep_dpath, "subcircuits.l"), os.path.join(sweep_dpath, "basic_subcircuits.l")],
+            )
+        
+            for m in measure_replacements:
+                sp_content_modified = re.sub(re.escape(m[0]), m[1], sp_content_modified, flags=re.M|re.I)
+            return sp_content_modified
+
+        return self._translate_ngspice_file(
+            os.path.join(sp_dir, os.path.splitext(sp_filename)[0] + NGSPICE_TRANSLATION_SUFFIX + ".sp"),
+            [sp_path, os.path.join(sweep_dpath, "subcircuits.l"), os.path.join(sweep_dpath, "basic_subcircuits.l"), includes_fpath],
+            translate_deck,
+        )
+
+    def translate_ngspice_tbs(self, sp_paths: List[str]):
+        """
+        Translates all testbenches in 'sp_paths' to NGSPICE syntax up front, called once spice files are generated.
+        """
+        for sp_path in sp_paths:
+            self.get_ngspice_deck(sp_path)
+
+    def _ngspice_sim(self, sweep_pt_dpath: str, sp_filename: str) -> Dict[str, str]:
+        """
+        Runs NGSPICE on a single sweep point deck 'sp_filename' in its scratch directory 'sweep_pt_dpath' 
+        and returns the parsed measurements {meas_name: value, ...}. 
+        Nothing outside of the scratch directory is written so several of these can run at the same time.
+        """
+        # Creat an output file having the ending .lis
+        # Run the SPICE simulation and capture output
+        output_filename = os.path.join(sweep_pt_dpath, sp_filename.rstrip(".sp") + ".lis")
+        output_file = open(output_filename, "w")
+        subprocess.call(["ngspice", sp_filename], stdout=output_file, stderr=output_file, cwd=sweep_pt_dpath)
+        output_file.close()
+        measurements = {}
+        self.parse_ngspice_measurements(output_filename, measurements)
+        return {meas_name: vals[-1] for meas_name, vals in measurements.items()}
 
     def run_ngspice(self, sp_path: str, parameter_dict: Dict[str, List[str]]):
         """
@@ -420,26 +952,30 @@ class SpiceInterface(object):
         the wire RC is for a particular transistor sizing combination outside this function 
         though. Here, we'll only set the paramters to the appropriate values. 
 
-        Finally, what we'll return is a dictionary similar to 'parameter_dict' but containing
-        all of the of the SPICE measurements. The return value will have this format: 
+        Finally, what we'll return is a measurement array (see `meas_from_columns`) similar to 'parameter_dict' 
+        but containing all of the of the SPICE measurements, so that:
         
         Unlike HPSICE, NGSPICE is launch as many times as the length of grid point search hence
         the length of a meas_names# list. HSPICE on the other hand is launched once, and the
         grid point's control flow is internal to HSPICE.
 
-        measurements = {meas_name1: [value1, value2, value3, etc...], 
-                        meas_name2: [value1, value2, value3, etc...],
-                        etc...}
+        measurements[meas_name1] = [value1, value2, value3, etc...] 
+        measurements[meas_name2] = [value1, value2, value3, etc...]
+        etc...
         
         A number of modifications are required on the .sp and its included library files for ngspice
         to simulate succesfully. The described changes is valid since ngspice version 34. You have to
         add the option "set ngbehavior=hs" in file "~/.spiceinit". 
+        The modified files are written once beside the originals with an "_ngspice" suffix (see `get_ngspice_deck`)
+        and reused until the files they were translated from change, the originals are never modified.
         1. In the wire basic subcircuit, the variable Rw and Cw must be wrapped in {}
         2. The parameter file must be included directly in the .sp file instead of chained includes. 
         3. NGSPICE has the concept of control block, in it one controls the start and end of simulation.
             In this block, temperature is set, then run and quit. Run will start the simulation. Quit will
             leave the ngspice interative interface. 
         4. There is no SWEEP in ngspice, multiple launches of ngspice is used instead. 
+            Each sweep point is simulated in its own scratch directory (<sp_dir>/ngspice_sweep/pt_<i>) containing a copy of
+            the deck and a parameter include file, up to `self.num_workers` of them at the same time. 
         5. The INTEGRAL key word is INTEG in ngspice. 
         6. Variables in PULSE function must be wrapped in ''
         7. GND is a keyword in ngspice and is always the node 0 (when measureing only node 0 exist not the variable GND). 
@@ -453,113 +989,56 @@ class SpiceInterface(object):
 
         numOfValues = len(next(iter(parameter_dict.values())))
 
-        # modify the wire subcircuit so the syntax is NGSPICE compatible
-        basic_subcircuit_path = "basic_subcircuits.l"
-        basic_subcircuit_file = open(basic_subcircuit_path, "r+")
-        basic_subcircuit_content = basic_subcircuit_file.read()
-        # Rw and Cw become {Rw} and {Cw}
-        basic_subcircuit_content_modified = re.sub(r"\b([RC]w)$", r"{\1}", basic_subcircuit_content, flags=re.M|re.I)
-        basic_subcircuit_file.seek(0)
-        basic_subcircuit_file.write(basic_subcircuit_content_modified)
-        basic_subcircuit_file.truncate()
-        basic_subcircuit_file.close()
-
-        sp_file = open(os.path.join(sp_dir, sp_filename), "r+")
-        sp_content = sp_file.read()
-        # functions used by regex subsititution
-        def insert_include(match):
-            return f"{match.group(0)}\n.INCLUDE \"{os.path.join(os.getcwd(), HSPICE_DATA_SWEEP_PATH)}\"\n"
-        def absolute_lib(match):
-            return f"{match.group(1)}{os.path.abspath("includes.l")}{match.group(3)}"
-        def add_quotation(match):
-            s = "pulse ("
-            if not match.group(1)[0].isdigit():
-                s = s + f"'{match.group(1)}' "
-            else:
-                s = s + f"{match.group(1)} "
-            if not match.group(2)[0].isdigit():
-                s = s + f"'{match.group(2)}'"
-            else:
-                s = s + f"{match.group(2)}"
-            return s
-        def fix_vgnd(match):
-            return f"Vgnd gnd1 gnd 0\n{match.group(1)}v(gnd1){match.group(3)}"
-        # parameter file must be included in the circuit.sp file for NGSPICE
-        sp_content_modified = re.sub(r".TITLE.*$", insert_include, sp_content, count=1, flags=re.M|re.I)
-        # control block in NGSPICE to run and quit the simulation
-        sp_content_modified = re.sub(r"$", "\n.CONTROL\nset temp = 25\nrun\nquit\n.ENDC\n", sp_content_modified, count = 1)
-        # use absolute path for .LIB section
-        sp_content_modified = re.sub(r"(.lib\s+\")(.*)(\")", absolute_lib, sp_content_modified, flags=re.M|re.I)
-        # Remove the SWEEP in .tran section, NGSPICE does not have a SWEEP command
-        # SWEEP effect is simulated by calling NGSPICE multiple times
-        sp_content_modified = re.sub(r"(\.tran(\s+\w+){2}).*$", r"\1", sp_content_modified, flags=re.M|re.I)
-        # INTEGRAL keyword has to be INTEG in NGSPICE
-        sp_content_modified = re.sub(r"\bintegral\b", "INTEG", sp_content_modified, flags=re.M|re.I)
-        # parameter to PULSE function has to have "'" around variables
-        sp_content_modified = re.sub(r"pulse\s*\(\s*(\w+)\s+(\w+)", add_quotation, sp_content_modified, flags=re.M|re.I)
-        # fix v(gnd): ngspice cannot measure node named gnd
-        sp_content_modified = re.sub(r"^(.*)\bv\((gnd)\)(.*)$", fix_vgnd, sp_content_modified, flags=re.M|re.I)
-        # replace reference to node with highest level internal node that is equivalent
-        measure_replacements = self.measure_node_replacement(os.path.join(sp_dir, sp_filename), ["subcircuits.l", "basic_subcircuits.l"])
-        
-        for m in measure_replacements:
-            sp_content_modified = re.sub(re.escape(m[0]), m[1], sp_content_modified, flags=re.M|re.I)
-        sp_file.seek(0)
-        sp_file.write(sp_content_modified)
-        sp_file.truncate()
-        sp_file.close()
-        
-        # Change working dir so that SPICE output files are created in circuit subdirectory
-        saved_cwd = os.getcwd()
-        os.chdir(sp_dir)
-        measurements = {}
-        hspice_data_file = open(os.path.join("..", HSPICE_DATA_SWEEP_PATH), 'r')
-        hspice_data_content = hspice_data_file.read()
-        hspice_data_file.close()
+        # NGSPICE syntax version of the testbench, only retranslated if the testbench or its libraries changed
+        sp_content_modified = self.get_ngspice_deck(sp_path)[1]
+
+        # Each sweep point gets its own scratch directory with a copy of the deck, its parameters and its outputs
+        sweep_pt_dpaths = []
         for iteration in range(numOfValues): 
+            sweep_pt_dpath = os.path.join(sp_dir, NGSPICE_SWEEP_DIR, f"pt_{iteration}")
+            os.makedirs(sweep_pt_dpath, exist_ok=True)
+            with open(os.path.join(sweep_pt_dpath, sp_filename), "w") as sp_file:
+                sp_file.write(sp_content_modified)
             # write all the vali to a parameter file
-            hspice_data_file = open(os.path.join("..", HSPICE_DATA_SWEEP_PATH), 'w')
-            for param in parameter_dict:
-                hspice_data_file.write(".param " + param + "=" + str(parameter_dict[param][iteration])+ "\n")
-            hspice_data_file.close()
-         
-            # Creat an output file having the ending .lis
-            # Run the SPICE simulation and capture output
-            output_filename = sp_filename.rstrip(".sp") + ".lis"
-            output_file = open(output_filename, "w")
-            subprocess.call(["ngspice", sp_filename], stdout=output_file, stderr=output_file)
-            output_file.close()
-            self.parse_ngspice_measurements(output_filename, measurements)
+            with open(os.path.join(sweep_pt_dpath, NGSPICE_SWEEP_PT_DATA_PATH), "w") as sweep_pt_data_file:
+                for param in parameter_dict:
+                    sweep_pt_data_file.write(".param " + param + "=" + str(parameter_dict[param][iteration])+ "\n")
+            sweep_pt_dpaths.append(sweep_pt_dpath)
 
-        measurements["temper"] = [25] * numOfValues
+        sim_args = [(sweep_pt_dpath, sp_filename) for sweep_pt_dpath in sweep_pt_dpaths]
+        num_concurrent_sims = min(self.scheduler.get_max_concurrent_sims(self.num_workers), numOfValues)
+        if num_concurrent_sims > 1:
+            with mp.Pool(num_concurrent_sims) as pool:
+                sweep_pt_meas = pool.starmap(self._ngspice_sim, sim_args)
+        else:
+            sweep_pt_meas = [self._ngspice_sim(*args) for args in sim_args]
 
+        # Merge the sweep point measurements in sweep index order, a measurement missing from a point's output failed
+        meas_names = []
+        for pt_meas in sweep_pt_meas:
+            meas_names += [meas_name for meas_name in pt_meas.keys() if meas_name not in meas_names]
         measurements = {
+            meas_name: [pt_meas.get(meas_name, SPICE_FAILED_MEAS) for pt_meas in sweep_pt_meas] for meas_name in meas_names
+        }
+
+        measurements["temper"] = [25] * numOfValues
+
+        measurements = meas_from_columns({
             **measurements,
             **parameter_dict,
-        }     
+        })
 
         # Update simulation counter with the number of simulations done by 
         # adding the length of the list of parameter values inside the dictionary
         self.simulation_counter += len(next(iter(parameter_dict.values())))   
 
-        # Return to saved cwd
-        os.chdir(saved_cwd)
-
-        basic_subcircuit_file = open(basic_subcircuit_path, "w")
-        basic_subcircuit_file.write(basic_subcircuit_content)
-        basic_subcircuit_file.close()
-        sp_file = open(os.path.join(sp_dir, sp_filename), "w")
-        sp_file.write(sp_content)
-        sp_file.close()
-        hspice_data_file = open(os.path.join("..", HSPICE_DATA_SWEEP_PATH), 'w')
-        hspice_data_file.write(hspice_data_content)
-        hspice_data_file.close()
-
         return measurements
 
-    def run(self, sp_path: str, parameter_dict: Dict[str, List[str]]):
+    def _run_sim(self, sp_path: str, parameter_dict: Dict[str, List[str]]):
         if self.spice_sim_name == "ngspice":
-            return self.run_ngspice(sp_path, parameter_dict)
+            # Writing the sweep point decks and parsing are recorded as part of the simulation for NGSPICE
+            with self.timing_trace.timed("sim", get_tb_name(sp_path), len(next(iter(parameter_dict.values())))):
+                return self.run_ngspice(sp_path, parameter_dict)
         elif self.spice_sim_name == "hspice":
             return self.run_hspice(sp_path, parameter_dict)
         else:
@@ -567,123 +1046,188 @@ class SpiceInterface(object):
             print("              Unknown Spice Simulator Name                ")
             print("----------------------------------------------------------")
             exit(2)
+
+    def _run_batch_sims(self, sp_paths: List[str], parameter_dict: Dict[str, List[str]]) -> List[np.ndarray]:
+        """
+        Simulates every .sp file in 'sp_paths' with the same 'parameter_dict' and returns thier measurement arrays 
+        in the same order as 'sp_paths' (one per testbench, same format as `run_batch`).
+
+        If this interface was created with more than one worker the HSPICE jobs are run at the same time on a 
+        process pool of up to `self.num_workers` processes, or fewer if the scheduler has less licenses, each job
+        getting an equal share of the available cores as threads. This is safe because the sweep_data.l file is written 
+        once for all testbenches before any of them are launched, and each job runs in its own testbench directory.
+        NGSPICE testbenches are run one after another as each one already runs its sweep points in parallel (see `run_ngspice`).
+        """
+        num_sims = len(next(iter(parameter_dict.values())))
+        num_concurrent_sims = min(self.scheduler.get_max_concurrent_sims(self.num_workers), len(sp_paths))
+        if num_concurrent_sims <= 1 or self.spice_sim_name != "hspice":
+            with self.timing_trace.timed("sim_wall", num_sims = num_sims * len(sp_paths)):
+                return [self._run_sim(sp_path, parameter_dict) for sp_path in sp_paths]
+
+        # Write the sweep data file once per (unique) architecture dir before launching any jobs
+        with self.timing_trace.timed("netlist_write"):
+            for sweep_dpath in set(get_sweep_dpath(sp_path) for sp_path in sp_paths):
+                self._setup_data_sweep_file(parameter_dict, sweep_dpath)
+
+        num_threads = self.scheduler.get_num_threads(num_concurrent_sims)
+        with self.timing_trace.timed("sim_wall", num_sims = num_sims * len(sp_paths)):
+            with mp.Pool(num_concurrent_sims) as pool:
+                sim_results = pool.starmap(self._hspice_sim, [(sp_path, num_threads) for sp_path in sp_paths])
+        spice_meas_list = [spice_meas for spice_meas, _ in sim_results]
+
+        # Counters are only updated here as the worker processes have thier own copy of this object
+        self.simulation_counter += num_sims * len(sp_paths)
+        for sp_path, (_, sim_info) in zip(sp_paths, sim_results):
+            self._record_hspice_sim(sp_path, num_sims, sim_info)
+
+        return spice_meas_list
+
+    def run(self, sp_path: str, parameter_dict: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """
+        Runs the spice simulator chosen for this interface on the .sp file at 'sp_path', see `run_hspice` for the format 
+        of 'parameter_dict'. Sweep points found in the result cache are not simulated.
+
+        Returns the measurements as a dict of strings {meas_name: [value1, value2, etc...]} with failed measurements 
+        set to "failed", as expected by the RAM and legacy sizing code. Use `run_batch` to get a measurement array.
+        """
+        return meas_array_to_str_dict(self.run_batch([sp_path], parameter_dict)[0])
+
+    def run_batch(self, sp_paths: List[str], parameter_dict: Dict[str, List[str]]) -> List[np.ndarray]:
+        """
+        Runs every .sp file in 'sp_paths' with the same 'parameter_dict' and returns thier measurement arrays 
+        (see `meas_from_columns`) in the same order as 'sp_paths'.
+
+        If the result cache is enabled, each (testbench, sweep point) pair is looked up in the cache first. 
+        Only the testbenches with missing points are simulated, and only over the missing points, 
+        after which the new results are stored and the measurements are put back together in sweep order.
+        """
+        if self.cache is None:
+            return self._run_batch_sims(sp_paths, parameter_dict)
+
+        num_sweep_pts: int = len(next(iter(parameter_dict.values())))
+        # Cache keys for each testbench and sweep point, indexed as [tb_idx][sweep_pt_idx]
+        tb_keys: List[List[str]] = []
+        with self.timing_trace.timed("cache_lookup"):
+            for sp_path in sp_paths:
+                netlist_digest: str = self._get_netlist_digest(sp_path)
+                tb_keys.append([self._get_sweep_pt_key(netlist_digest, parameter_dict, i) for i in range(num_sweep_pts)])
+            cached_meas: Dict[str, Dict[str, Any]] = self.cache.get_many([key for keys in tb_keys for key in keys])
+        
+        # Simulate the union of sweep points which were missed by any testbench, for the testbenches which missed any
+        miss_idxs: List[int] = sorted(set(i for keys in tb_keys for i, key in enumerate(keys) if key not in cached_meas))
+        miss_tb_idxs: List[int] = [tb_idx for tb_idx, keys in enumerate(tb_keys) if any(key not in cached_meas for key in keys)]
+        num_hits: int = sum(key in cached_meas for keys in tb_keys for key in keys)
+        self.cache_hit_counter += num_hits
+        self.cache_miss_counter += num_sweep_pts * len(sp_paths) - num_hits
+
+        sim_meas: Dict[int, np.ndarray] = {}
+        if miss_idxs:
+            miss_parameter_dict: Dict[str, List[str]] = {
+                param: [vals[i] for i in miss_idxs] for param, vals in parameter_dict.items()
+            }
+            sim_meas_list = self._run_batch_sims([sp_paths[tb_idx] for tb_idx in miss_tb_idxs], miss_parameter_dict)
+            new_entries: Dict[str, Dict[str, Any]] = {}
+            for tb_idx, meas in zip(miss_tb_idxs, sim_meas_list):
+                sim_meas[tb_idx] = meas
+                # Only results with a value for every simulated point can be split up by sweep point
+                if len(meas) == len(miss_idxs):
+                    for j, i in enumerate(miss_idxs):
+                        new_entries[tb_keys[tb_idx][i]] = {meas_name: float(meas[meas_name][j]) for meas_name in meas.dtype.names}
+            with self.timing_trace.timed("cache_store"):
+                self.cache.put_many(new_entries)
+            cached_meas.update(new_entries)
+
+        spice_meas_list: List[np.ndarray] = []
+        for tb_idx, keys in enumerate(tb_keys):
+            # Result was not cacheable so return what the simulator gave us, resimulating all points if only some were simulated
+            if any(key not in cached_meas for key in keys):
+                if len(miss_idxs) == num_sweep_pts:
+                    spice_meas_list.append(sim_meas[tb_idx])
+                else:
+                    with self.timing_trace.timed("sim_wall", num_sims = num_sweep_pts):
+                        spice_meas_list.append(self._run_sim(sp_paths[tb_idx], parameter_dict))
+                continue
+            meas_names: List[str] = list(dict.fromkeys(meas_name for key in keys for meas_name in cached_meas[key].keys()))
+            spice_meas_list.append(
+                meas_from_columns({
+                    meas_name: [cached_meas[key].get(meas_name, np.nan) for key in keys] for meas_name in meas_names
+                })
+            )
+        return spice_meas_list
        
-    def parse_mt0(self, filepath):
+    def parse_mt0(self, filepath) -> np.ndarray:
         """
         Parse a HSPICE .mt0 file to collect measurements. 
         This function works on .mt0 files generated from single HSPICE runs,
         .sweep runs or .data runs. 
         
-        Returns a dictionary that maps measurement names to a list of values.
-        If this was a single HSPICE run, the list will only have one element.
-        But, if this was a HSPICE sweep, the list will have multiple elements,
+        Returns a measurement array (see `meas_from_columns`) with a field for each measurement.
+        If this was a single HSPICE run, the array will only have one element.
+        But, if this was a HSPICE sweep, the array will have multiple elements,
         one for each sweep setting. The same goes for .data sweeps.
     
-        measurements = {meas_name1: [value1, value2, value3, etc...], 
-                        meas_name2: [value1, value2, value3, etc...],
-                        etc...}
-        """
-    
-        # The measurements data structure is what we will be building.
-        # It's a dictionary that maps measurement names to a list of values. 
-        # If this was a simple HSPICE run, the list will only have one element. 
-        # But, if this was a HSPICE sweep, the list will have multiple elements,
-        # one for each sweep setting.
-        # measurements = {meas_name1: [value1, value2, value3, etc...], 
-        #                 meas_name2: [value1, value2, value3, etc...],
-        #                 etc...}
-        measurements = {}
-        meas_names = []
+        measurements[meas_name1] = [value1, value2, value3, etc...] 
+        measurements[meas_name2] = [value1, value2, value3, etc...]
+        etc...
 
-        #parse should be changed for ram block
-        meaz1_names = []
-        meaz2_names = []
-        meaz1counter = 0
-        meaz2counter = 0
-
-        #I'll need an aittional 4 to test carry chains:
-        meaz3_names = []
-        meaz4_names = []
-        meaz5_names = []
-        meaz6_names = []
-        meaz3counter = 0
-        meaz4counter = 0
-        meaz5counter = 0
-        meaz6counter = 0
-    
-        # Open the file for reading
-        mt0_file = open(filepath, 'r')
+        The file is streamed line by line and the values are converted to floats in a single pass once it has been read,
+        measurements which HSPICE reports as "failed" are NaN.
+        """
+        meas_names: List[str] = []
+        meas_vals: List[str] = []
     
         # The first thing we expect to find is the measurement names.
         # We use the 'parsing_names' flag to show that we are parsing the names.
         # Once we find 'alter#' we are done parsing the measurement names. 
         # Then, we start parsing the values themselves.
         parsing_names = True
-        for line in mt0_file:
-            # Ignore these lines
-            if line.startswith("$"):
-                continue
-            if line.startswith("."):
-                continue
-    
-            if parsing_names:
-                words = line.split()
-                for meas_name in words:
-                    meas_names.append(meas_name)
-                    measurements[meas_name] = []
-                    if "meaz1" in meas_name:
-                        meaz1counter += 1
-                        meaz1_names.append(meas_name)
-                    if "meaz2" in meas_name:
-                        meaz2counter += 1
-                        meaz2_names.append(meas_name)
-                    if "meaz3" in meas_name:
-                        meaz3counter += 1
-                        meaz3_names.append(meas_name)
-                    if "meaz4" in meas_name:
-                        meaz4counter += 1
-                        meaz4_names.append(meas_name)
-                    if "meaz5" in meas_name:
-                        meaz5counter += 1
-                        meaz5_names.append(meas_name)
-                    if "meaz6" in meas_name:
-                        meaz6counter += 1
-                        meaz6_names.append(meas_name)
-                    # When we find 'alter#' we are done parsing measurement names.
-                    if meas_name.startswith("alter#"):
-                        num_measurements = len(meas_names)
-                        current_meas = 0
-                        parsing_names = False
-            else:
-                line = line.replace("\n", "")
+        with open(filepath, 'r') as mt0_file:
+            for line in mt0_file:
+                # Ignore these lines
+                if line.startswith("$") or line.startswith("."):
+                    continue
                 words = line.split()
-                for meas in words:
-                    # Append each measurement value to the right list.
-                    # We use current_meas and meas_names to keep track of where we 
-                    # need to add the measurement value.
-                    measurements[meas_names[current_meas]].append(meas)
-                    current_meas += 1
-                    if current_meas == num_measurements:
-                        current_meas = 0
+                if parsing_names:
+                    for meas_name in words:
+                        meas_names.append(meas_name)
+                        # When we find 'alter#' we are done parsing measurement names.
+                        if meas_name.startswith("alter#"):
+                            parsing_names = False
+                else:
+                    # Values are written row by row (one row per sweep point) in the order of 'meas_names'
+                    meas_vals += words
 
+        if len(meas_names) == 0:
+            return meas_from_columns({})
 
-        
-        mt0_file.close()
+        # A row cut short by HSPICE is padded with failed measurements
+        num_meas: int = len(meas_names)
+        meas_vals += [SPICE_FAILED_MEAS] * (-len(meas_vals) % num_meas)
+        meas_rows: np.ndarray = meas_to_float_array(meas_vals).reshape(-1, num_meas)
+        measurements: Dict[str, np.ndarray] = {
+            meas_name: meas_rows[:, meas_idx] for meas_idx, meas_name in enumerate(meas_names)
+        }
 
         # This part is added to support having tow different fanins (e.g. ram rowdecoder)
         # If this happens to any other circuit, you should name the delays with mez1 and meaz2
-        # the rest is simply the same.
-        if meaz3counter != 0:
+        # (or meaz1, meaz2 and meaz3 for three, e.g. carry chains) the rest is simply the same.
+        # The merged measurement of each sweep point is the max of its fanin measurements, and failed if any of them failed.
+        meaz1_names = [meas_name for meas_name in meas_names if "meaz1" in meas_name]
+        meaz2_names = [meas_name for meas_name in meas_names if "meaz2" in meas_name]
+        meaz3_names = [meas_name for meas_name in meas_names if "meaz3" in meas_name]
+        if len(meaz3_names) != 0:
             for x in range(0,len(meaz1_names)):
                 newname = meaz3_names[x].replace("meaz3_", "meas_")
-                measurements[newname] = max(measurements[meaz1_names[x]],measurements[meaz2_names[x]],measurements[meaz3_names[x]])
-            return measurements             
-        if len(meaz1_names) !=0 and len(meaz2_names) != 0:
+                measurements[newname] = np.maximum.reduce(
+                    [measurements[meaz1_names[x]], measurements[meaz2_names[x]], measurements[meaz3_names[x]]]
+                )
+        elif len(meaz1_names) !=0 and len(meaz2_names) != 0:
             if len(meaz1_names) != len(meaz2_names):
-                    sys.exit(-1)
+                print("ERROR: Number of meaz1 and meaz2 measurements in " + filepath + " do not match")
+                exit(2)
             for x in range(0,len(meaz1_names)):
                 newname = meaz1_names[x].replace("meaz1_", "meas_")
-                measurements[newname] = max(measurements[meaz1_names[x]],measurements[meaz2_names[x]])
+                measurements[newname] = np.maximum(measurements[meaz1_names[x]], measurements[meaz2_names[x]])
         elif len(meaz1_names) !=0:
             for x in range(0,len(meaz1_names)):
                 newname = meaz1_names[x].replace("meaz1_", "meas_")
@@ -693,4 +1237,4 @@ class SpiceInterface(object):
                 newname = meaz2_names[x].replace("meaz2_", "meas_")
                 measurements[newname] = measurements[meaz2_names[x]]
 
-        return measurements         
+        return meas_from_columns(measurements)
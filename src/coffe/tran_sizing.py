@@ -12,6 +12,8 @@ import math
 import time
 # from src.coffe.spice import spice
 import csv
+import json
+import numpy as np
 
 from itertools import product
 from collections import defaultdict
@@ -51,6 +53,16 @@ ERF_MONITOR_VERBOSE = True
 ERF_ERROR_TOLERANCE = 0.1
 # Maximum number of times the algorithm will try to meet ERF_ERROR_TOLERANCE before quitting.
 ERF_MAX_ITERATIONS = 4
+# Number of P/N ratios each inverter is swept over in a batched ERF sweep.
+ERF_BATCH_NUM_RATIOS = 9
+# The first batched ERF sweep covers P/N ratios from 1/ERF_BATCH_MAX_RATIO to ERF_BATCH_MAX_RATIO.
+ERF_BATCH_MAX_RATIO = 4
+
+# Checkpoint written by size_fpga_transistors after each sized subcircuit and each sizing iteration, read back with --resume.
+SIZING_CHECKPOINT_FPATH = os.path.join("sizing_results", "sizing_checkpoint.json")
+
+# Number of fit -> predict -> simulate rounds the surrogate optimizer spends its simulation budget over after the initial sample.
+SURROGATE_REFINE_ROUNDS = 2
 
 
 # def log_fpga_telemetry(fpga_inst: fpga.FPGA, *args):
@@ -151,6 +163,21 @@ def update_fpga_telemetry_csv(fpga_inst, outer_iter: int, sizing_subckt: str, in
 
 
 
+def _expand_range_values(sizing_range: Tuple[int | float]) -> List[int | float]:
+    """ Expands a single (start_value, stop_value, increment) range into the list of values it describes """
+    # Initialization
+    start_value = sizing_range[0]
+    end_value = sizing_range[1]
+    increment = sizing_range[2]
+    current_value = start_value
+    value_list = []
+    # Loop till current values is larger than end value
+    while current_value <= end_value:
+        value_list.append(current_value)
+        current_value = current_value + increment
+    return value_list
+
+
 def expand_ranges(sizing_ranges):
     """ The input to this function is a dictionary that describes the SPICE sweep
         ranges. dict = {"name": (start_value, stop_value, increment)}
@@ -164,18 +191,8 @@ def expand_ranges(sizing_ranges):
     
     # Expand the ranges into full list of values    
     for key, values in list(sizing_ranges_copy.items()):
-        # Initialization
-        start_value = values[0]
-        end_value = values[1]
-        increment = values[2]
-        current_value = start_value
-        value_list = []
-        # Loop till current values is larger than end value
-        while current_value <= end_value:
-            value_list.append(current_value)
-            current_value = current_value + increment
         # Replace the range with a list
-        sizing_ranges_copy[key] = value_list
+        sizing_ranges_copy[key] = _expand_range_values(values)
                                      
     # Now we want to make a list of all possible combinations
     sizing_combinations = [] 
@@ -190,6 +207,31 @@ def expand_ranges(sizing_ranges):
     return parameter_names, sizing_combinations
 
 
+def sample_ranges(sizing_ranges, max_combos: int, seed: int = 0) -> Tuple[List[str], List[tuple]]:
+    """ Same as expand_ranges but caps the number of returned sizing combinations at 'max_combos'.
+        If the full cartesian product of the ranges is larger than 'max_combos' a uniform random 
+        sample of distinct combinations is returned instead, without ever building the full product.
+        The sample is seeded so reruns of the same ranges give the same combinations.
+    """
+    parameter_names = sorted(sizing_ranges.keys())
+    value_lists = [_expand_range_values(sizing_ranges[name]) for name in parameter_names]
+    num_combos = math.prod(len(values) for values in value_lists)
+    if num_combos <= max_combos:
+        return expand_ranges(sizing_ranges)
+
+    rng = np.random.default_rng(seed)
+    sampled_combos = set()
+    while len(sampled_combos) < max_combos:
+        value_idxs = [rng.integers(len(values), size = max_combos) for values in value_lists]
+        for combo_idx in range(max_combos):
+            sampled_combos.add(tuple(values[idxs[combo_idx]] for values, idxs in zip(value_lists, value_idxs)))
+            if len(sampled_combos) == max_combos:
+                break
+    
+    # Sort so the combos are in the same order expand_ranges would have produced them
+    return parameter_names, sorted(sampled_combos)
+
+
 def get_middle_value_config(param_names: List[str], spice_ranges: Dict[str, Tuple[int | float]]) -> Tuple[int | float]:
     """ """
     
@@ -1268,33 +1310,186 @@ def erf(
     return erf_ratios
                   
 
+def erf_batched(
+        tbs: List[c_ds.SimTB], 
+        element_names: List[str], 
+        element_sizes: Tuple[int | float], 
+        fpga_inst: fpga.FPGA, 
+        spice_interface: spice.SpiceInterface,
+) -> Dict[str, float]:
+    """ 
+    Batched alternative to 'erf', equalizes rise and fall times of all inverters listed in 
+    'element_names' for the transistor sizes in 'element_sizes'.
+
+    Rather than searching the P/N ratio of each inverter with its own HSPICE runs, a single data
+    sweep moves every inverter through ERF_BATCH_NUM_RATIOS candidate P/N ratios at once. The 
+    balance point of each inverter is interpolated from its tfall - trise curve and checked with
+    one more run. Only the inverters that miss ERF_ERROR_TOLERANCE are swept again, over a 
+    narrower range around their current ratio.
+
+    Returns the inverter ratios that give equal rise and fall. 
+    """
+    # Index for which sweep to access in hspice results
+    sw_idx: int = 0
+
+    inv_sizes: Dict[str, int | float] = {
+        name: size for name, size in zip(element_names, element_sizes) if name.startswith("inv_")
+    }
+    if not inv_sizes:
+        return {}
+
+    # Generate the parameter dict needed by the spice_interface. 
+    # The parameter dict contains the sizes of all transistors and RC of all wires.
+    # For bulk, sizes are in nanometers, for FinFETs sizes are a number of fins
+    size_scale: float = 1 if fpga_inst.specs.use_finfet else 1e-9
+    size_unit: float = 1 if fpga_inst.specs.use_finfet else fpga_inst.specs.min_tran_width
+    parameter_dict = {}
+    for tran_name, tran_size in fpga_inst.transistor_sizes.items():
+        parameter_dict[tran_name] = [size_scale*tran_size*size_unit]
+    for wire_name, rc_data in fpga_inst.wire_rc_dict.items():
+        parameter_dict[wire_name + "_res"] = [rc_data[0]]
+        parameter_dict[wire_name + "_cap"] = [rc_data[1]*1e-15]
+
+    def inv_tran_sizes(inv_name: str, ratio: float) -> Tuple[int | float, int | float]:
+        """ (NMOS, PMOS) sizes for 'inv_name' with P/N 'ratio', the larger transistor is rounded to a whole nm / fin """
+        inv_size = inv_sizes[inv_name]*size_unit
+        target_size = max(inv_size, round(inv_size*max(ratio, 1/ratio)))
+        return (inv_size, target_size) if ratio >= 1 else (target_size, inv_size)
+
+    def sim_ratios(ratios_per_point: List[Dict[str, float]]) -> Dict[str, np.ndarray]:
+        """ Runs one HSPICE sweep with a point per dict of inverter P/N ratios in 'ratios_per_point' """
+        sweep_parameter_dict = {name: values*len(ratios_per_point) for name, values in parameter_dict.items()}
+        for pt_idx, inv_ratios in enumerate(ratios_per_point):
+            for inv_name, ratio in inv_ratios.items():
+                nmos_size, pmos_size = inv_tran_sizes(inv_name, ratio)
+                sweep_parameter_dict[inv_name + "_nmos"][pt_idx] = size_scale*nmos_size
+                sweep_parameter_dict[inv_name + "_pmos"][pt_idx] = size_scale*pmos_size
+        return ckt_get_meas(tbs, spice_interface, sweep_parameter_dict)
+
+    def balance_ratio(inv_name: str, ratios: np.ndarray, ckt_meas: Dict[str, np.ndarray]) -> float | None:
+        """ Interpolates the P/N ratio where tfall == trise for 'inv_name' from a sweep over 'ratios' """
+        diffs = np.asarray(ckt_meas["meas_" + inv_name + "_tfall"] - ckt_meas["meas_" + inv_name + "_trise"], dtype = float)
+        measured = ~np.isnan(diffs)
+        if not np.any(measured):
+            return None
+        ratios, diffs = ratios[measured], diffs[measured]
+        log_ratios = np.log(ratios)
+        # Increasing the P/N ratio speeds up the rise and slows down the fall, so tfall - trise crosses zero going up
+        crossings = np.nonzero((diffs[:-1] < 0) & (diffs[1:] >= 0))[0]
+        if len(crossings):
+            i = crossings[0]
+            return float(np.exp(log_ratios[i] - diffs[i]*(log_ratios[i+1] - log_ratios[i])/(diffs[i+1] - diffs[i])))
+        # No balance point in the range (ex. the inverter is self-loading), use the most balanced ratio we saw
+        return float(ratios[np.argmin(np.abs(diffs))])
+
+    # Multiplicative offsets applied to the current ratio of each unbalanced inverter, one per sweep point
+    ratio_offsets = np.exp(np.linspace(-1, 1, ERF_BATCH_NUM_RATIOS)*math.log(ERF_BATCH_MAX_RATIO))
+    erf_ratios = {inv_name: 1.0 for inv_name in inv_sizes}
+    unbalanced_invs = list(inv_sizes.keys())
+    erf_iteration = 1
+    while True:
+        # Sweep the unbalanced inverters, balanced inverters stay at their current ratios
+        ckt_meas = sim_ratios([
+            {**erf_ratios, **{inv_name: erf_ratios[inv_name]*offset for inv_name in unbalanced_invs}} for offset in ratio_offsets
+        ])
+        for inv_name in unbalanced_invs:
+            ratio = balance_ratio(inv_name, erf_ratios[inv_name]*ratio_offsets, ckt_meas)
+            if ratio is not None:
+                erf_ratios[inv_name] = ratio
+
+        # Check the interpolated ratios
+        ckt_meas = sim_ratios([erf_ratios])
+
+        # Check if the HSPICE measurement failed. If it did, this might mean that the level
+        # restorers are too strong which messes up one of the transitions. Making the gate
+        # length for the level restorers larger could solve this problem.
+        if not ckt_meas["valid"][sw_idx]:
+            print("ERROR: HSPICE measurement failed.")
+            print("Consider increasing level-restorers gate length by increasing the 'rest_length_factor' parameter in the input file.")
+            exit(1)
+
+        if ERF_MONITOR_VERBOSE:
+            print("ERF SUMMARY (batched iteration " + str(erf_iteration) + "):")
+
+        unbalanced_invs = []
+        for inv_name in inv_sizes:
+            tfall = float(ckt_meas["meas_" + inv_name + "_tfall"][sw_idx])
+            trise = float(ckt_meas["meas_" + inv_name + "_trise"][sw_idx])
+            erf_error = abs((tfall - trise)/tfall)
+            if erf_error > ERF_ERROR_TOLERANCE:
+                unbalanced_invs.append(inv_name)
+            if ERF_MONITOR_VERBOSE:
+                nmos_size, pmos_size = inv_tran_sizes(inv_name, erf_ratios[inv_name])
+                print((inv_name + " (N=" + str(int(nmos_size)) + " P=" + 
+                       str(int(pmos_size)) + ", tfall=" + str(tfall) + ", trise=" + 
+                       str(trise) + ", erf_err=" + str(100*round(erf_error,3)) + "%)"))
+
+        if not unbalanced_invs:
+            if ERF_MONITOR_VERBOSE:
+                print("All inverters met ERF tolerance")
+                print()
+            break
+        
+        if ERF_MONITOR_VERBOSE:
+            print("One or more inverter(s) failed to meet ERF tolerance")
+
+        # Stop ERFing even if tolerance not met if max number of ERF iterations performed.
+        if erf_iteration >= ERF_MAX_ITERATIONS:
+            if ERF_MONITOR_VERBOSE:
+                print("Stopping ERF because max iterations reached")
+                print()
+            break
+
+        # The next sweep spans one step of the previous sweep on either side of the current ratio
+        ratio_offsets = ratio_offsets**(2/(ERF_BATCH_NUM_RATIOS - 1))
+        erf_iteration += 1
+
+        if ERF_MONITOR_VERBOSE:
+            print("")
+
+    # Update fpga_inst transistor sizes with the ERFed NMOS & PMOS sizes and get the ratios they give
+    for inv_name in inv_sizes:
+        nmos_size, pmos_size = inv_tran_sizes(inv_name, erf_ratios[inv_name])
+        fpga_inst.transistor_sizes[inv_name + "_nmos"] = nmos_size/size_unit
+        fpga_inst.transistor_sizes[inv_name + "_pmos"] = pmos_size/size_unit
+        erf_ratios[inv_name] = float(pmos_size)/nmos_size
+
+    sys.stdout.flush()
+
+    return erf_ratios
+
+
 def erf_combo(
         fpga_inst: fpga.FPGA, 
         tbs: List[c_ds.SimTB],
         element_names: List[str], 
         combo: Tuple[int | float],
         spice_interface: spice.SpiceInterface,
+        erf_mode: str = "iterative",
 ):
     """ Equalize the rise and fall of all inverters in a transistor sizing combination.
+        'erf_mode' selects between the per inverter search ("iterative") or a single sweep for all inverters ("batched").
         Returns the inverter ratios that give equal rise and fall for this combo. """
    
-    # We want to ERF a transistor sizing combination
-    # Update transistor sizes
-    fpga_inst._update_transistor_sizes(element_names, combo, fpga_inst.specs.use_finfet)
-    # Calculate area of everything
-    fpga_inst.update_area()
-    # Re-calculate wire lengths
-    fpga_inst.update_wires()
-    # Update wire resistance and capacitance
-    fpga_inst.update_wire_rc()
-    # Find ERF ratios
-    erf_ratios = erf(
-        tbs, 
-        element_names, 
-        combo, 
-        fpga_inst, 
-        spice_interface
-    )
+    with spice_interface.timing_trace.phase("erf"):
+        # We want to ERF a transistor sizing combination
+        # Update transistor sizes
+        fpga_inst._update_transistor_sizes(element_names, combo, fpga_inst.specs.use_finfet)
+        # Calculate area of everything
+        fpga_inst.update_area()
+        # Re-calculate wire lengths
+        fpga_inst.update_wires()
+        # Update wire resistance and capacitance
+        fpga_inst.update_wire_rc()
+        # Find ERF ratios
+        erf_fn = erf_batched if erf_mode == "batched" else erf
+        erf_ratios = erf_fn(
+            tbs, 
+            element_names, 
+            combo, 
+            fpga_inst, 
+            spice_interface
+        )
     
     return erf_ratios
     
@@ -1419,6 +1614,233 @@ def write_out_sweep_file(parameter_dict: Dict[str, List[float]], sweep_out_fpath
 
 
     
+def _sim_sizing_combos(
+        fpga_inst: fpga.FPGA,
+        sizable_circuit: c_ds.SizeableCircuit,
+        opt_type: str,
+        element_names: List[str],
+        sizing_combos: List[tuple],
+        erf_ratios: Dict[str, float],
+        wire_rc_arrays: Dict[str, np.ndarray],
+        ckt_tbs: List[Type[c_ds.SimTB]],
+        spice_interface: spice.SpiceInterface,
+        is_ram_component: int,
+        is_cc_component: int,
+) -> Tuple[List[float], List[Tuple[float, float]], np.ndarray]:
+    """
+        Simulates 'sizing_combos' in a single spice data sweep, 'wire_rc_arrays' holds the (res, cap) rows of each 
+        wire for the same combos (as returned by fpga.FPGA.eval_sizing_combos).
+        Returns the evaluation delay, (tfall, trise) and the valid flag of each combo.
+    """
+    # We have to make a parameter dict for HSPICE
+    current_tran_sizes = {}
+    if not fpga_inst.specs.use_finfet :
+        for tran_name, tran_size in fpga_inst.transistor_sizes.items():
+            current_tran_sizes[tran_name] = 1e-9*tran_size*fpga_inst.specs.min_tran_width
+    else :
+        for tran_name, tran_size in fpga_inst.transistor_sizes.items():
+            current_tran_sizes[tran_name] = tran_size
+
+    # Initialize the parameter dict to all empty lists
+    parameter_dict = {}
+    for tran_name in list(current_tran_sizes.keys()):
+        parameter_dict[tran_name] = []
+    for wire_name, rc_data in wire_rc_arrays.items():
+        parameter_dict[wire_name + "_res"] = rc_data[:, 0].tolist()
+        parameter_dict[wire_name + "_cap"] = (rc_data[:, 1]*1e-15).tolist()
+
+    # This loop populates the parameter_dict with transistor sizes which are being swept over for this iteration of search_ranges()
+    # Swept and non-swept params will be lists of N elements corresponding to the "tran_name" key in the dict
+    # Non-swept parameters will have the same value for each element
+    for i in range(len(sizing_combos)):
+        for tran_name, tran_size in current_tran_sizes.items():
+            # We need this temp value to compare agains 'element_names'
+            tmp_tran_name = tran_name.replace("_nmos", "")
+            tmp_tran_name = tmp_tran_name.replace("_pmos", "")
+        
+            # If this transistor is one of the transistor sizes that we are sweeping,
+            # we have to properly compute the size, if we aren't sweeping it, just add
+            # the current size to the list.
+            if tmp_tran_name in element_names:
+                # We need this id to pick the right data from sizing combo
+                element_id = element_names.index(tmp_tran_name)
+
+                # Let's calculate the size of this transistor
+                if not fpga_inst.specs.use_finfet :
+                    tran_size = 1e-9*(sizing_combos[i][element_id]*fpga_inst.specs.min_tran_width)
+                else :
+                    tran_size = (sizing_combos[i][element_id])
+
+                # If transistor is an inverter, we need to do some stuff to calc sizes for
+                # both the NMOS and PMOS, if it is anything else (eg. ptran), we can just add 
+                # it directly.
+                if tran_name.startswith("inv_"):
+                    if tran_name.endswith("_nmos"):
+                        # If the NMOS is bigger than the PMOS
+                        if erf_ratios[tmp_tran_name] < 1:
+                            nmos_size = tran_size/erf_ratios[tmp_tran_name]
+                        # If the PMOS is bigger than the NMOS
+                        else:
+                            nmos_size = tran_size
+                        parameter_dict[tran_name].append(nmos_size)
+                    else:
+                        # If the NMOS is bigger than the PMOS
+                        if erf_ratios[tmp_tran_name] < 1:
+                            pmos_size = tran_size
+                        # If the PMOS is bigger than the NMOS
+                        else:
+                            pmos_size = tran_size*erf_ratios[tmp_tran_name]
+                        parameter_dict[tran_name].append(pmos_size)
+
+                else: 
+                    parameter_dict[tran_name].append(tran_size) 
+            else:
+                parameter_dict[tran_name].append(tran_size)
+
+    # Run HSPICE data sweep
+    print(("Running HSPICE for " + str(len(sizing_combos)) + 
+        " transistor sizing combinations..."))
+    # spice_meas = spice_interface.run(sizable_circuit.top_spice_path, parameter_dict)
+    ckt_meas = ckt_get_meas(ckt_tbs, spice_interface, parameter_dict)
+
+    # Now we need to create a list of tfall_trise to be compatible with old code
+    # Failed measurements (NaN) are set to 1, the failed tfall / trise were already set to 1 by `fpga.sim_tbs`
+    meas_logic_low_voltage = np.where(
+        np.isnan(ckt_meas["meas_logic_low_voltage"]), 1, ckt_meas["meas_logic_low_voltage"]
+    ).tolist()
+    tfall_trise_list = list(zip(
+        np.where(np.isnan(ckt_meas["tfall"]), 1, ckt_meas["tfall"]).tolist(),
+        np.where(np.isnan(ckt_meas["trise"]), 1, ckt_meas["trise"]).tolist(),
+    ))
+
+    # Get delay metric used for evaluation for each transistor sizing combo as well as 
+    # ERF error
+    eval_delay_list = []
+    for i in range(len(tfall_trise_list)):    
+        # Calculate evaluation delay
+        tfall_trise = tfall_trise_list[i]
+        delay = get_eval_delay(fpga_inst, opt_type, sizable_circuit, tfall_trise[0], tfall_trise[1], meas_logic_low_voltage[i], is_ram_component, is_cc_component)
+        eval_delay_list.append(delay)
+
+    return eval_delay_list, tfall_trise_list, ckt_meas["valid"]
+
+
+def _surrogate_features(points: np.ndarray, max_terms: int) -> np.ndarray:
+    """
+        Polynomial features of the (normalized) sizing combos in 'points' for the surrogate delay model.
+        Uses a full quadratic (constant, linear, squared and pairwise terms) if it has at most 'max_terms' terms,
+        otherwise drops the pairwise terms, and falls back to a linear model if even that is too many.
+    """
+    num_points, num_dims = points.shape
+    linear = np.hstack([np.ones((num_points, 1)), points])
+    if 1 + 2*num_dims > max_terms:
+        return linear
+    if 1 + num_dims + num_dims*(num_dims + 1)//2 > max_terms:
+        return np.hstack([linear, points**2])
+    row_idxs, col_idxs = np.triu_indices(num_dims)
+    return np.hstack([linear, points[:, row_idxs] * points[:, col_idxs]])
+
+
+def _space_filling_sample(points: np.ndarray, num_samples: int) -> List[int]:
+    """
+        Greedy maximin selection of 'num_samples' rows of 'points', starting from the row closest to the centre.
+        Each subsequent row picked is the one furthest away from all rows picked so far.
+    """
+    sample_idxs = [int(np.argmin(np.sum((points - points.mean(axis = 0))**2, axis = 1)))]
+    min_dists = np.sum((points - points[sample_idxs[0]])**2, axis = 1)
+    while len(sample_idxs) < min(num_samples, len(points)):
+        next_idx = int(np.argmax(min_dists))
+        sample_idxs.append(next_idx)
+        min_dists = np.minimum(min_dists, np.sum((points - points[next_idx])**2, axis = 1))
+    return sample_idxs
+
+
+def _surrogate_search_combos(
+        fpga_inst: fpga.FPGA,
+        sizable_circuit: c_ds.SizeableCircuit,
+        run_options: NamedTuple,
+        opt_type: str,
+        element_names: List[str],
+        sizing_combos: List[tuple],
+        erf_ratios: Dict[str, float],
+        wire_rc_arrays: Dict[str, np.ndarray],
+        area_list: List[float],
+        area_opt_weight: float,
+        delay_opt_weight: float,
+        ckt_tbs: List[Type[c_ds.SimTB]],
+        spice_interface: spice.SpiceInterface,
+        is_ram_component: int,
+        is_cc_component: int,
+) -> Tuple[List[int], List[float], List[Tuple[float, float]]]:
+    """
+        Surrogate model guided alternative to simulating every combo in 'sizing_combos'.
+        Half of the simulation budget goes to a space-filling sample of the combos, a quadratic model of log(delay) 
+        is fit to the sample and, as area is known exactly for every combo, gives a predicted cost for every combo. 
+        The rest of the budget is spent over SURROGATE_REFINE_ROUNDS rounds on the combos with the best predicted cost,
+        refitting the model after each round.
+        Returns the indices of the simulated combos with their evaluation delays and (tfall, trise) in the same order.
+    """
+    sim_budget = min(run_options.surrogate_sim_budget, len(sizing_combos))
+
+    # Normalize the swept elements to [-1, 1], elements with a fixed size (ex. level restorers) are dropped
+    points = np.array(sizing_combos, dtype = float)
+    min_sizes, max_sizes = points.min(axis = 0), points.max(axis = 0)
+    swept = max_sizes > min_sizes
+    points = 2*(points[:, swept] - min_sizes[swept])/(max_sizes[swept] - min_sizes[swept]) - 1
+
+    areas = np.array(area_list, dtype = float)
+    sim_idxs: List[int] = []
+    eval_delay_list: List[float] = []
+    tfall_trise_list: List[Tuple[float, float]] = []
+    valids: List[bool] = []
+    
+    def sim_combos(combo_idxs: List[int]):
+        with spice_interface.timing_trace.phase("sweep"):
+            combo_delays, combo_tfall_trise, combo_valids = _sim_sizing_combos(
+                fpga_inst, 
+                sizable_circuit, 
+                opt_type, 
+                element_names, 
+                [sizing_combos[i] for i in combo_idxs], 
+                erf_ratios, 
+                {wire_name: rc_data[combo_idxs] for wire_name, rc_data in wire_rc_arrays.items()}, 
+                ckt_tbs, 
+                spice_interface, 
+                is_ram_component, 
+                is_cc_component,
+            )
+        sim_idxs.extend(combo_idxs)
+        eval_delay_list.extend(combo_delays)
+        tfall_trise_list.extend(combo_tfall_trise)
+        valids.extend(np.asarray(combo_valids, dtype = bool).tolist())
+
+    print("Simulating a space-filling sample of transistor sizing combinations for the surrogate model...")
+    sim_combos(_space_filling_sample(points, max(1, sim_budget//2)))
+
+    refine_batch_size = max(1, math.ceil((sim_budget - len(sim_idxs))/SURROGATE_REFINE_ROUNDS))
+    while len(sim_idxs) < sim_budget:
+        delays = np.array(eval_delay_list)
+        fit_mask = np.array(valids) & (delays > 0)
+        if not np.any(fit_mask):
+            print("WARNING: No valid measurements to fit the surrogate model to, skipping refinement")
+            break
+        # Fit log(delay) as delay varies over orders of magnitude across the ranges
+        fit_idxs = np.array(sim_idxs)[fit_mask]
+        max_terms = len(fit_idxs)
+        coeffs = np.linalg.lstsq(_surrogate_features(points[fit_idxs], max_terms), np.log(delays[fit_mask]), rcond = None)[0]
+        with np.errstate(over = "ignore"):
+            pred_delays = np.exp(_surrogate_features(points, max_terms) @ coeffs)
+        pred_costs = cost_lib.cost_function(areas, pred_delays, area_opt_weight, delay_opt_weight)
+        pred_costs[sim_idxs] = np.inf
+        num_next = min(refine_batch_size, sim_budget - len(sim_idxs))
+        print("Simulating the " + str(num_next) + " transistor sizing combinations with the best predicted cost...")
+        sim_combos(np.argsort(pred_costs, kind = "stable")[:num_next].tolist())
+
+    print("Surrogate model simulated " + str(len(sim_idxs)) + " of " + str(len(sizing_combos)) + " transistor sizing combinations\n")
+
+    return sim_idxs, eval_delay_list, tfall_trise_list
+
+
 def search_ranges(
         sizing_ranges, 
         fpga_inst: fpga.FPGA, 
@@ -1516,7 +1938,12 @@ def search_ranges(
         export_transistor_sizes(tran_sizes_filename, fpga_inst.transistor_sizes)
 
         # Expand ranges to get a list of all possible sizing combinations from ranges
-        element_names, sizing_combos = expand_ranges(sizing_ranges)
+        # The surrogate optimizer only simulates a few of the combos so a bounded sample of the ranges is enough,
+        # the sample is seeded so the same ranges always give the same candidates
+        if run_options.sizing_optimizer == "surrogate":
+            element_names, sizing_combos = sample_ranges(sizing_ranges, run_options.surrogate_max_candidates)
+        else:
+            element_names, sizing_combos = expand_ranges(sizing_ranges)
 
         # Find the combo that is near the middle of all ranges
         middle_combo = get_middle_value_config(element_names, sizing_ranges)
@@ -1531,40 +1958,33 @@ def search_ranges(
             ckt_tbs, 
             element_names, 
             middle_combo,
-            spice_interface
+            spice_interface,
+            erf_mode = run_options.erf_mode,
         )
         
         # For each transistor sizing combination, we want to calculate area, wire sizes, 
         # and wire R and C
         print("Calculating area and wire data for all transistor sizing combinations...")
-        
-        area_list = []
-        wire_rc_list = []
-        eval_delay_list = []
 
 
         # Key describing where in iterations we currently are in
         iteration_key: str = f"subckt_{sp_name}_o_{outer_iter}_i_{inner_iter}_b_{bunch_num}"
 
-        # It appears to me that this loop calculates the area and wire_rc data for each transistor sizing combo and saves them to "area_list" and "wire_rc_list"
-        # But it looks like the fpga_inst will be updated with the last transistor sizing combo in the list, which im not sure about
-        for combo in sizing_combos:
-            # Update FPGA transistor sizes
-            fpga_inst._update_transistor_sizes(element_names, combo, fpga_inst.specs.use_finfet, erf_ratios)
-            # Calculate area of everything
-            fpga_inst.update_area()
-            # Get evaluation area
-            area_list.append(cost_lib.get_eval_area(fpga_inst, opt_type, sizable_circuit, is_ram_component, is_cc_component))
-            # Re-calculate wire lengths
-            fpga_inst.update_wires()
-            # Update wire resistance and capacitance
+        def write_debug_sweep_data(combo_idx: int):
+            os.makedirs(os.path.join("debug", "hspice_sweeps"), exist_ok=True)
             fpga_inst.update_wire_rc()
-            wire_rc = fpga_inst.wire_rc_dict
-            wire_rc_list.append(wire_rc)
-            # Debug statement
-            if consts.VERBOSITY == consts.DEBUG:
-                os.makedirs(os.path.join("debug", "hspice_sweeps"), exist_ok=True)
-                write_sp_sweep_data_from_fpga(fpga_inst, os.path.join("debug", "hspice_sweeps", f"{iteration_key}_sweep_data.l"))
+            write_sp_sweep_data_from_fpga(fpga_inst, os.path.join("debug", "hspice_sweeps", f"{iteration_key}_sweep_data.l"))
+
+        # Calculate the area and wire_rc data for every transistor sizing combo in a single batch, 
+        # the fpga_inst is left updated with the last transistor sizing combo in the list
+        area_list, wire_rc_arrays = fpga_inst.eval_sizing_combos(
+            element_names, 
+            sizing_combos, 
+            erf_ratios, 
+            eval_area_fn = lambda fpga_inst: cost_lib.get_eval_area(fpga_inst, opt_type, sizable_circuit, is_ram_component, is_cc_component),
+            combo_fn = write_debug_sweep_data if consts.VERBOSITY == consts.DEBUG else None,
+        )
+        area_list = area_list.tolist()
 
         sz_it_info: Dict[str, int] = {
             "sizing_subckt": sp_name,
@@ -1580,110 +2000,42 @@ def search_ranges(
         if consts.VERBOSITY == consts.DEBUG:
             rg_utils.write_single_dict_to_csv(it_row_data, os.path.join("debug", "iter_info.csv"), "a")
 
-        # We have to make a parameter dict for HSPICE
-        current_tran_sizes = {}
-        if not fpga_inst.specs.use_finfet :
-            for tran_name, tran_size in fpga_inst.transistor_sizes.items():
-                current_tran_sizes[tran_name] = 1e-9*tran_size*fpga_inst.specs.min_tran_width
-        else :
-            for tran_name, tran_size in fpga_inst.transistor_sizes.items():
-                current_tran_sizes[tran_name] = tran_size
-
-        # Initialize the parameter dict to all empty lists
-        parameter_dict = {}
-        for tran_name in list(current_tran_sizes.keys()):
-            parameter_dict[tran_name] = []
-        for wire_name in list(wire_rc_list[0].keys()):
-            parameter_dict[wire_name + "_res"] = []
-            parameter_dict[wire_name + "_cap"] = []
-
-        # This loop populates the parameter_dict with transistor sizes which are being swept over for this iteration of search_ranges()
-        # Swept and non-swept params will be lists of N elements corresponding to the "tran_name" key in the dict
-        # Non-swept parameters will have the same value for each element
-        for i in range(len(sizing_combos)):
-            for tran_name, tran_size in current_tran_sizes.items():
-                # We need this temp value to compare agains 'element_names'
-                tmp_tran_name = tran_name.replace("_nmos", "")
-                tmp_tran_name = tmp_tran_name.replace("_pmos", "")
-            
-                # If this transistor is one of the transistor sizes that we are sweeping,
-                # we have to properly compute the size, if we aren't sweeping it, just add
-                # the current size to the list.
-                if tmp_tran_name in element_names:
-                    # We need this id to pick the right data from sizing combo
-                    element_id = element_names.index(tmp_tran_name)
-
-                    # Let's calculate the size of this transistor
-                    if not fpga_inst.specs.use_finfet :
-                        tran_size = 1e-9*(sizing_combos[i][element_id]*fpga_inst.specs.min_tran_width)
-                    else :
-                        tran_size = (sizing_combos[i][element_id])
-
-                    # If transistor is an inverter, we need to do some stuff to calc sizes for
-                    # both the NMOS and PMOS, if it is anything else (eg. ptran), we can just add 
-                    # it directly.
-                    if tran_name.startswith("inv_"):
-                        if tran_name.endswith("_nmos"):
-                            # If the NMOS is bigger than the PMOS
-                            if erf_ratios[tmp_tran_name] < 1:
-                                nmos_size = tran_size/erf_ratios[tmp_tran_name]
-                            # If the PMOS is bigger than the NMOS
-                            else:
-                                nmos_size = tran_size
-                            parameter_dict[tran_name].append(nmos_size)
-                        else:
-                            # If the NMOS is bigger than the PMOS
-                            if erf_ratios[tmp_tran_name] < 1:
-                                pmos_size = tran_size
-                            # If the PMOS is bigger than the NMOS
-                            else:
-                                pmos_size = tran_size*erf_ratios[tmp_tran_name]
-                            parameter_dict[tran_name].append(pmos_size)
-
-                    else: 
-                        parameter_dict[tran_name].append(tran_size) 
-                else:
-                    parameter_dict[tran_name].append(tran_size)
-        
-            # Now add the wire information for this wire
-            for wire_name, rc_data in wire_rc_list[i].items():
-                parameter_dict[wire_name + "_res"].append(rc_data[0])
-                parameter_dict[wire_name + "_cap"].append(rc_data[1]*1e-15)
-    
-        # Run HSPICE data sweep
-        print(("Running HSPICE for " + str(len(sizing_combos)) + 
-            " transistor sizing combinations..."))
-        # spice_meas = spice_interface.run(sizable_circuit.top_spice_path, parameter_dict)
-        ckt_meas = ckt_get_meas(ckt_tbs, spice_interface, parameter_dict)
-
-        # Now we need to create a list of tfall_trise to be compatible with old code
-        tfall_trise_list = []
-        meas_logic_low_voltage = []
-        for i in range(len(sizing_combos)):
-            tfall_str = ckt_meas["tfall"][i]
-            trise_str = ckt_meas["trise"][i]
-            if ckt_meas["meas_logic_low_voltage"][i] == "failed" :
-                meas_logic_low_voltage.append(1)
-            else:
-                meas_logic_low_voltage.append(float(ckt_meas["meas_logic_low_voltage"][i]))
-
-            if tfall_str == "failed":
-                tfall = 1
-            else:
-                tfall = float(tfall_str)
-            if trise_str == "failed":
-                trise = 1
-            else:
-                trise = float(trise_str)
-            tfall_trise_list.append((tfall, trise))
-    
-        # Get delay metric used for evaluation for each transistor sizing combo as well as 
-        # ERF error
-        for i in range(len(tfall_trise_list)):    
-            # Calculate evaluation delay
-            tfall_trise = tfall_trise_list[i]
-            delay = get_eval_delay(fpga_inst, opt_type, sizable_circuit, tfall_trise[0], tfall_trise[1], meas_logic_low_voltage[i], is_ram_component, is_cc_component)
-            eval_delay_list.append(delay)
+        if run_options.sizing_optimizer == "surrogate":
+            sim_idxs, eval_delay_list, tfall_trise_list = _surrogate_search_combos(
+                fpga_inst, 
+                sizable_circuit, 
+                run_options, 
+                opt_type, 
+                element_names, 
+                sizing_combos, 
+                erf_ratios, 
+                wire_rc_arrays, 
+                area_list, 
+                area_opt_weight, 
+                delay_opt_weight, 
+                ckt_tbs, 
+                spice_interface, 
+                is_ram_component, 
+                is_cc_component,
+            )
+            # Only the simulated combos are ranked from here on
+            sizing_combos = [sizing_combos[i] for i in sim_idxs]
+            area_list = [area_list[i] for i in sim_idxs]
+        else:
+            with spice_interface.timing_trace.phase("sweep"):
+                eval_delay_list, tfall_trise_list, _ = _sim_sizing_combos(
+                    fpga_inst, 
+                    sizable_circuit, 
+                    opt_type, 
+                    element_names, 
+                    sizing_combos, 
+                    erf_ratios, 
+                    wire_rc_arrays, 
+                    ckt_tbs, 
+                    spice_interface, 
+                    is_ram_component, 
+                    is_cc_component,
+                )
             
         # len(area_list) should be equal to len(delay_list), make sure...
         assert len(area_list) == len(eval_delay_list)
@@ -1752,15 +2104,17 @@ def search_ranges(
                                 ckt_tbs, 
                                 element_names, 
                                 sizing_combos[cost_list[i][1]], 
-                                spice_interface)
+                                spice_interface,
+                                erf_mode = run_options.erf_mode)
 
             # Measure delay for combo
-            trise, tfall = run_combo(fpga_inst, 
-                                    ckt_tbs, 
-                                    element_names, 
-                                    sizing_combos[cost_list[i][1]], 
-                                    erf_ratios,
-                                    spice_interface)
+            with spice_interface.timing_trace.phase("sweep"):
+                trise, tfall = run_combo(fpga_inst, 
+                                        ckt_tbs, 
+                                        element_names, 
+                                        sizing_combos[cost_list[i][1]], 
+                                        erf_ratios,
+                                        spice_interface)
 
             # Get final delay (we use final because ERFing is done for each combo)
             delay = get_final_delay(fpga_inst, opt_type, sizable_circuit, tfall, trise, is_ram_component, is_cc_component)
@@ -1944,10 +2298,11 @@ def print_sizing_results(subcircuit_name, sizing_results_list):
     print("")
 
     
-def _divide_problem_into_sets(transistor_names: List[str]) -> List[List[str]]:
+def _divide_problem_into_sets(transistor_names: List[str], set_size: int = 5, max_set_size: int = 6) -> List[List[str]]:
     """ If there are too many elements to size, the number of different combinations to try will quickly blow up on us.
         However, we want to size transistors together in as large groups as possible as this produces a more thorough search. 
-        In general, groups of 5-6 transistors yields a good balance between these two competing factors.  
+        In general, groups of 5-6 transistors yields a good balance between these two competing factors for the grid search,
+        the surrogate search simulates a fixed number of combos so it can size larger groups ('set_size' / 'max_set_size').
         This function looks at the 'transistor_names' argument and figures out how to divide the transistors to size in 
         more manageable groups (if indeed they do need to be divided up).
     """
@@ -1964,13 +2319,13 @@ def _divide_problem_into_sets(transistor_names: List[str]) -> List[List[str]]:
         
     # Create the transistor groups
     tran_names_set_list = []
-    if count > 6:
+    if count > max_set_size:
         print("Too many elements to size at once...")
-        # Let's divide this into sets of 5, the last set might have less than 5 elements.       
+        # Let's divide this into sets of 'set_size', the last set might have less than 'set_size' elements.       
         tran_counter = 0
         tran_names_set = []
         for tran_name in transistor_names:
-            if tran_counter >= 5:
+            if tran_counter >= set_size:
                 tran_names_set_list.append(tran_names_set)
                 tran_names_set = []
                 tran_names_set.append(tran_name)
@@ -2196,7 +2551,14 @@ def size_subcircuit_transistors(
     tran_names: List[str] = format_transistor_names_to_basic_subcircuits(subcircuit.transistor_names)
     
     # Create groups of transistors to size to keep number of HSPICE sims manageable
-    tran_names_set_list: List[List[str]] = _divide_problem_into_sets(tran_names)
+    if run_options.sizing_optimizer == "surrogate":
+        tran_names_set_list: List[List[str]] = _divide_problem_into_sets(
+            tran_names, 
+            set_size = run_options.surrogate_group_size, 
+            max_set_size = run_options.surrogate_group_size,
+        )
+    else:
+        tran_names_set_list: List[List[str]] = _divide_problem_into_sets(tran_names)
     
     sizing_ranges_set_list: List[dict] = []
     sizing_ranges_complete: dict = {}
@@ -2231,7 +2593,8 @@ def size_subcircuit_transistors(
             ckt_tbs,
             element_names, 
             middle_combo, 
-            spice_interface
+            spice_interface,
+            erf_mode = run_options.erf_mode,
         )
 
     # Perform transistor sizing on each set of transistors
@@ -2508,6 +2871,66 @@ def check_if_done(sizing_results_list, area_results_list, delay_results_list, ar
     return False, 0
 
     
+def _sizing_checkpoint_ckts(fpga_inst: fpga.FPGA) -> Dict[str, Any]:
+    """ Circuits holding the trise / tfall / delay / power measurements set by fpga.FPGA.update_delays, keyed by name """
+    ckts: List[Any] = list(fpga_inst.tb_lib.keys())
+    for lut_inputs in fpga_inst.lut_inputs.values():
+        ckts += lut_inputs
+    if fpga_inst.specs.enable_bram_block:
+        ckts += [ckt for ckt in vars(fpga_inst.RAM).values() if hasattr(ckt, "delay")]
+    return {ckt.sp_name if getattr(ckt, "sp_name", None) else ckt.name: ckt for ckt in ckts}
+
+
+def save_sizing_checkpoint(fpga_inst: fpga.FPGA, sizing_state: Dict[str, Any], ckpt_fpath: str = SIZING_CHECKPOINT_FPATH):
+    """
+        Writes 'sizing_state' (the progress and results lists of size_fpga_transistors) to 'ckpt_fpath' along with the 
+        FPGA state it was reached with. The file is replaced atomically so a run killed mid write keeps the previous checkpoint.
+    """
+    ckpt: Dict[str, Any] = {
+        **sizing_state,
+        "transistor_sizes": fpga_inst.transistor_sizes,
+        "lb_height": fpga_inst.lb_height,
+        "area_dict": fpga_inst.area_dict,
+        "delay_dict": fpga_inst.delay_dict,
+        "ckt_meas": {
+            name: {key: getattr(ckt, key) for key in ["trise", "tfall", "delay", "power"] if getattr(ckt, key, None) is not None}
+                for name, ckt in _sizing_checkpoint_ckts(fpga_inst).items()
+        },
+    }
+    tmp_fpath: str = ckpt_fpath + ".tmp"
+    with open(tmp_fpath, "w") as fd:
+        # default converts any numpy scalars that json can't serialize
+        json.dump(ckpt, fd, default = float)
+    os.replace(tmp_fpath, ckpt_fpath)
+
+
+def load_sizing_checkpoint(fpga_inst: fpga.FPGA, ckpt_fpath: str = SIZING_CHECKPOINT_FPATH) -> Dict[str, Any] | None:
+    """
+        Restores the FPGA state saved by save_sizing_checkpoint into 'fpga_inst' and returns the saved sizing state.
+        Returns None if there is no checkpoint at 'ckpt_fpath'.
+    """
+    if not os.path.isfile(ckpt_fpath):
+        return None
+    with open(ckpt_fpath, "r") as fd:
+        ckpt: Dict[str, Any] = json.load(fd)
+
+    fpga_inst.transistor_sizes.update(ckpt.pop("transistor_sizes"))
+    fpga_inst.lb_height = ckpt.pop("lb_height")
+    # Areas, floorplan distances, wire lengths and wire RC all follow from the transistor sizes and logic block height
+    fpga_inst.update_area()
+    fpga_inst.update_wires()
+    fpga_inst.update_wire_rc()
+    fpga_inst.area_dict.update(ckpt.pop("area_dict"))
+    # Delays come from spice, restore them rather than re-simulating
+    fpga_inst.delay_dict.update(ckpt.pop("delay_dict"))
+    ckts: Dict[str, Any] = _sizing_checkpoint_ckts(fpga_inst)
+    for name, meas in ckpt.pop("ckt_meas").items():
+        for key, val in meas.items():
+            setattr(ckts[name], key, val)
+
+    return ckpt
+
+
 def size_subckt_grp(
         fpga_inst: fpga.FPGA,
         sizing_subckts: List[Type[c_ds.SizeableCircuit]], # subciruits to be sized
@@ -2527,6 +2950,7 @@ def size_subckt_grp(
         current_cost: float,
         is_cc: int = 0, # TODO change to bool
         is_ram: int = 0, # TODO change to bool
+        sizing_state: Dict[str, Any] = None, # Checkpointed after each subcircuit if provided
 ):
     """
         Performs sizing for a list of subcircuits (eg. all types of SB muxes)
@@ -2534,6 +2958,9 @@ def size_subckt_grp(
     for subckt in sizing_subckts:
         time_before_sizing = time.time()
         sp_name: str = subckt.sp_name if hasattr(subckt, "sp_name") and subckt.sp_name else subckt.name
+        # Already sized in this iteration by the run we resumed from
+        if sizing_state is not None and sp_name in sizing_state["sized_subckts"]:
+            continue
         # If this is the first iteration, use the 'initial_transistor_sizes' as the 
         #     starting sizes. If it's not the first iteration, we use the transistor sizes 
         #     of the previous iteration as the starting sizes.
@@ -2549,20 +2976,21 @@ def size_subckt_grp(
         # Size the transistors of this subcircuit
         # So every time we size we are in quick mode?
         if quick_mode_dict[sp_name] == 1:
-            sizing_results_dict[sp_name], sizing_results_detailed_dict[sp_name] = size_subcircuit_transistors(
-                fpga_inst = fpga_inst, 
-                subcircuit = subckt, 
-                run_options = run_options,
-                opt_type = opt_type, 
-                re_erf = re_erf, 
-                area_opt_weight = area_opt_weight, 
-                delay_opt_weight = delay_opt_weight, 
-                outer_iter = iteration, 
-                initial_transistor_sizes = starting_transistor_sizes, 
-                spice_interface = sp_interface, 
-                is_ram_component = is_ram,
-                is_cc_component = is_cc,
-            )
+            with sp_interface.timing_trace.phase("sizing", subckt = sp_name):
+                sizing_results_dict[sp_name], sizing_results_detailed_dict[sp_name] = size_subcircuit_transistors(
+                    fpga_inst = fpga_inst, 
+                    subcircuit = subckt, 
+                    run_options = run_options,
+                    opt_type = opt_type, 
+                    re_erf = re_erf, 
+                    area_opt_weight = area_opt_weight, 
+                    delay_opt_weight = delay_opt_weight, 
+                    outer_iter = iteration, 
+                    initial_transistor_sizes = starting_transistor_sizes, 
+                    spice_interface = sp_interface, 
+                    is_ram_component = is_ram,
+                    is_cc_component = is_cc,
+                )
         else:
             sizing_results_dict[sp_name] = sizing_results_list[-1][sp_name]
             sizing_results_detailed_dict[sp_name] = sizing_results_detailed_list[-1][sp_name]
@@ -2582,6 +3010,11 @@ def size_subckt_grp(
 
             print("Duration: " + str(time_after_sizing - time_before_sizing))
             print("Current Cost: " + str(current_cost))
+
+        if sizing_state is not None:
+            sizing_state["sized_subckts"].append(sp_name)
+            sizing_state["current_cost"] = current_cost
+            save_sizing_checkpoint(fpga_inst, sizing_state)
         
     return current_cost
 
@@ -2626,19 +3059,20 @@ def size_bram_ckt(
     
     # Size the transistors of this subcircuit
     if quick_mode_dict[quick_mode_key] == 1:
-        sizing_results_dict[name], sizing_results_detailed_dict[name] = legacy_tx_sizing.size_subcircuit_transistors(
-            fpga_inst = fpga_inst,
-            subcircuit = subckt, 
-            opt_type = opt_type,
-            re_erf = re_erf, 
-            area_opt_weight = area_opt_weight, 
-            delay_opt_weight = delay_opt_weight,
-            outer_iter = iteration, 
-            initial_transistor_sizes = starting_transistor_sizes,
-            spice_interface = spice_interface, 
-            is_ram_component = 1, 
-            is_cc_component = 0,
-        )
+        with spice_interface.timing_trace.phase("sizing", subckt = name):
+            sizing_results_dict[name], sizing_results_detailed_dict[name] = legacy_tx_sizing.size_subcircuit_transistors(
+                fpga_inst = fpga_inst,
+                subcircuit = subckt, 
+                opt_type = opt_type,
+                re_erf = re_erf, 
+                area_opt_weight = area_opt_weight, 
+                delay_opt_weight = delay_opt_weight,
+                outer_iter = iteration, 
+                initial_transistor_sizes = starting_transistor_sizes,
+                spice_interface = spice_interface, 
+                is_ram_component = 1, 
+                is_cc_component = 0,
+            )
     else:
         sizing_results_dict[name]= sizing_results_list[len(sizing_results_list)-1][name]
         sizing_results_detailed_dict[name] = sizing_results_detailed_list[len(sizing_results_list)-1][name]   
@@ -2677,6 +3111,7 @@ def size_bram_ckts(
         delay_opt_weight: int | float, 
         spice_interface: spice.SpiceInterface,
         current_cost: float,
+        sizing_state: Dict[str, Any] = None, # Checkpointed after each subcircuit if provided
     ):
     # Size SRAM bitline precharge or MTJ bitline discharge
     if fpga_inst.RAM.memory_technology == "SRAM":
@@ -2753,6 +3188,10 @@ def size_bram_ckts(
         else:
             time_before_sizing = time_before_sizing
 
+        # Already sized in this iteration by the run we resumed from
+        if sizing_state is not None and subckt.name in sizing_state["sized_subckts"]:
+            continue
+
         size_bram_ckt(
             subckt_key = subckt_key,
             quick_mode_key = quick_mode_key,
@@ -2774,6 +3213,69 @@ def size_bram_ckts(
             current_cost = current_cost,
         )
 
+        if sizing_state is not None:
+            sizing_state["sized_subckts"].append(subckt.name)
+            save_sizing_checkpoint(fpga_inst, sizing_state)
+
+
+def _start_sizing_iteration(
+        fpga_inst: fpga.FPGA, 
+        spice_interface: spice.SpiceInterface, 
+        area_opt_weight: int | float, 
+        delay_opt_weight: int | float,
+) -> float:
+    """
+        Determines the floorplan and subcircuit delays an FPGA sizing iteration starts from.
+        Returns the cost of the FPGA before sizing.
+    """
+    print("determining a floorplan for this sizing iteration")
+    
+    
+    fpga_inst.update_area()
+    # Initialization of the floorplan (if lb_height == 0 means uninitialized)
+    if fpga_inst.lb_height is None:
+        fpga_inst.lb_height = math.sqrt(fpga_inst.area_dict["tile"])
+        fpga_inst.update_area()
+
+    fpga_inst.update_wires()
+    fpga_inst.update_wire_rc()
+    #fpga_inst.determine_height()
+    fpga_inst.update_area()
+    fpga_inst.compute_distance()
+    fpga_inst.update_wires()
+    fpga_inst.update_wire_rc()
+    fpga_inst.update_delays(spice_interface)
+    
+    # Logging
+    # log_fpga_telemetry(fpga_inst, iteration)
+    # update_fpga_telemetry_csv(fpga_inst, outer_iter= iteration, sub)
+    
+    # HSPICE runtime testing to determine hspice runtime speedup from multithreading
+    """
+    if consts.HSPICE_TESTGEN:
+        sw_out_dpath: str = os.path.join("debug","hspice_sweeps")
+        os.makedirs(sw_out_dpath, exist_ok=True)
+        for num_sweeps in consts.HSPICE_SWEEPS:
+            write_sp_sweep_data_from_fpga(fpga_inst, os.path.join(sw_out_dpath, f"sweep_data_{num_sweeps}.l"))
+    """
+
+    print("Sizing will begin now.")
+    # Useful for debugging
+    # tmp_area = cost_lib.get_eval_area(fpga_inst, "global", fpga_inst.sb_mux, 0, 0)
+    # tmp_delay = get_current_delay(fpga_inst, 0)
+    # print(tmp_area,tmp_delay)
+
+    ckt_idx = 0
+    current_cost = cost_lib.cost_function(
+        cost_lib.get_eval_area(fpga_inst, "global", fpga_inst.sb_muxes[ckt_idx]), # Area Cost
+        get_current_delay(fpga_inst, 0), # Delay Cost
+        area_opt_weight,
+        delay_opt_weight
+    )
+    print("Current Cost: " + str(current_cost))
+
+    return current_cost
+
 
 def size_fpga_transistors(fpga_inst: fpga.FPGA, run_options: NamedTuple, spice_interface: spice.SpiceInterface):
     """ Size FPGA transistors. 
@@ -2818,11 +3320,6 @@ def size_fpga_transistors(fpga_inst: fpga.FPGA, run_options: NamedTuple, spice_i
     if not os.path.exists("sizing_results"):
         os.makedirs("sizing_results")
     
-    # Initialize FPGA subcircuit delays
-    fpga_inst.update_delays(spice_interface)
-    
-    print("Starting transistor sizing...\n")
-    
     # These lists store transistor sizing, area and delay results for each FPGA sizing
     # iteration. Each entry in the list represents an FPGA sizing iteration.
     # For example, area_results_list[0] has area results for the first FPGA sizing iteration.
@@ -2837,6 +3334,31 @@ def size_fpga_transistors(fpga_inst: fpga.FPGA, run_options: NamedTuple, spice_i
     # 2 - The max number of iterations of this while loop have been performed (max_iterations)
     is_done = False
     iteration = 1
+
+    # If resuming, restore the FPGA state and results from the last completed subcircuit or sizing iteration
+    resumed_state: Dict[str, Any] | None = load_sizing_checkpoint(fpga_inst) if run_options.resume else None
+    if resumed_state is None:
+        if run_options.resume:
+            print("No transistor sizing checkpoint found at " + SIZING_CHECKPOINT_FPATH + ", starting from the first iteration\n")
+        # Initialize FPGA subcircuit delays
+        fpga_inst.update_delays(spice_interface)
+    else:
+        sizing_results_list = resumed_state["sizing_results_list"]
+        sizing_results_detailed_list = resumed_state["sizing_results_detailed_list"]
+        area_results_list = resumed_state["area_results_list"]
+        delay_results_list = resumed_state["delay_results_list"]
+        quick_mode_dict = resumed_state["quick_mode_dict"]
+        is_done = resumed_state["is_done"]
+        final_result_index = resumed_state["final_result_index"]
+        iteration = resumed_state["iteration"]
+        if resumed_state["iteration_complete"]:
+            iteration += 1
+            resumed_state = None
+        else:
+            print("Resuming FPGA sizing iteration #" + str(iteration) + " after " + str(len(resumed_state["sized_subckts"])) + " sized subcircuits\n")
+
+    print("Starting transistor sizing...\n")
+    
     while not is_done:
     
         if iteration > max_iterations:
@@ -2846,8 +3368,36 @@ def size_fpga_transistors(fpga_inst: fpga.FPGA, run_options: NamedTuple, spice_i
     
         print("FPGA TRANSISTOR SIZING ITERATION #" + str(iteration) + "\n")
 
-        sizing_results_dict: dict = {}
-        sizing_results_detailed_dict: dict = {}
+        if resumed_state is not None:
+            # Continue the interrupted iteration, the floorplan and delays it started with were restored from the checkpoint
+            sizing_results_dict: dict = resumed_state["sizing_results_dict"]
+            sizing_results_detailed_dict: dict = resumed_state["sizing_results_detailed_dict"]
+            sized_subckts: List[str] = resumed_state["sized_subckts"]
+            current_cost = resumed_state["current_cost"]
+            resumed_state = None
+        else:
+            sizing_results_dict: dict = {}
+            sizing_results_detailed_dict: dict = {}
+            sized_subckts: List[str] = []
+            current_cost = _start_sizing_iteration(fpga_inst, spice_interface, area_opt_weight, delay_opt_weight)
+        time_before_sizing = time.time()
+
+        # Progress of this iteration, checkpointed after each subcircuit and at the end of the iteration
+        sizing_state: Dict[str, Any] = {
+            "iteration": iteration,
+            "iteration_complete": False,
+            "is_done": False,
+            "final_result_index": 0,
+            "sized_subckts": sized_subckts,
+            "current_cost": current_cost,
+            "quick_mode_dict": quick_mode_dict,
+            "sizing_results_dict": sizing_results_dict,
+            "sizing_results_detailed_dict": sizing_results_detailed_dict,
+            "sizing_results_list": sizing_results_list,
+            "sizing_results_detailed_list": sizing_results_detailed_list,
+            "area_results_list": area_results_list,
+            "delay_results_list": delay_results_list,
+        }
 
         # Now we are going to size the transistors of each subcircuit.
         # The order we do this has an importance due to rise-fall balancing. 
@@ -2856,53 +3406,6 @@ def size_fpga_transistors(fpga_inst: fpga.FPGA, run_options: NamedTuple, spice_i
         # cluster, finally emerging back into the general routing when we reach the cluster 
         # outputs. This code is all basically the same, just repeated for each subcircuit.
 
-        print("determining a floorplan for this sizing iteration")
-        
-        
-        fpga_inst.update_area()
-        # Initialization of the floorplan (if lb_height == 0 means uninitialized)
-        if fpga_inst.lb_height is None:
-            fpga_inst.lb_height = math.sqrt(fpga_inst.area_dict["tile"])
-            fpga_inst.update_area()
-
-        fpga_inst.update_wires()
-        fpga_inst.update_wire_rc()
-        #fpga_inst.determine_height()
-        fpga_inst.update_area()
-        fpga_inst.compute_distance()
-        fpga_inst.update_wires()
-        fpga_inst.update_wire_rc()
-        fpga_inst.update_delays(spice_interface)
-        
-        # Logging
-        # log_fpga_telemetry(fpga_inst, iteration)
-        # update_fpga_telemetry_csv(fpga_inst, outer_iter= iteration, sub)
-        
-        # HSPICE runtime testing to determine hspice runtime speedup from multithreading
-        """
-        if consts.HSPICE_TESTGEN:
-            sw_out_dpath: str = os.path.join("debug","hspice_sweeps")
-            os.makedirs(sw_out_dpath, exist_ok=True)
-            for num_sweeps in consts.HSPICE_SWEEPS:
-                write_sp_sweep_data_from_fpga(fpga_inst, os.path.join(sw_out_dpath, f"sweep_data_{num_sweeps}.l"))
-        """
-
-        print("Sizing will begin now.")
-        # Useful for debugging
-        # tmp_area = cost_lib.get_eval_area(fpga_inst, "global", fpga_inst.sb_mux, 0, 0)
-        # tmp_delay = get_current_delay(fpga_inst, 0)
-        # print(tmp_area,tmp_delay)
-
-        ckt_idx = 0
-        current_cost = cost_lib.cost_function(
-            cost_lib.get_eval_area(fpga_inst, "global", fpga_inst.sb_muxes[ckt_idx]), # Area Cost
-            get_current_delay(fpga_inst, 0), # Delay Cost
-            area_opt_weight,
-            delay_opt_weight
-        )
-        print("Current Cost: " + str(current_cost))
-        time_before_sizing = time.time()
-
         # For quick mode:
         # In the first iteration, I assume everything is useful and should be sized in the future iterations.
         # I check if it resulted in an improvement equal to or greater than the specified threshold.
@@ -3026,6 +3529,7 @@ def size_fpga_transistors(fpga_inst: fpga.FPGA, run_options: NamedTuple, spice_i
                         current_cost = current_cost,
                         is_cc = is_cc,
                         is_ram = is_ram,
+                        sizing_state = sizing_state,
                     ) 
 
             if fpga_inst.specs.enable_bram_block == 1:
@@ -3043,7 +3547,8 @@ def size_fpga_transistors(fpga_inst: fpga.FPGA, run_options: NamedTuple, spice_i
                     area_opt_weight = area_opt_weight,
                     delay_opt_weight = delay_opt_weight,
                     spice_interface = spice_interface,
-                    current_cost = current_cost
+                    current_cost = current_cost,
+                    sizing_state = sizing_state,
                 )
 
             ############################################
@@ -3089,6 +3594,13 @@ def size_fpga_transistors(fpga_inst: fpga.FPGA, run_options: NamedTuple, spice_i
         final_report_file = open("sizing_results/sizes_iteration_" + str(iteration) + ".txt", 'w')
         print_final_transistor_size(fpga_inst, final_report_file)
         final_report_file.close()
+
+        sizing_state.update({
+            "iteration_complete": True,
+            "is_done": is_done,
+            "final_result_index": final_result_index,
+        })
+        save_sizing_checkpoint(fpga_inst, sizing_state)
         iteration += 1
 
 
@@ -3,9 +3,13 @@ import os
 import shutil
 import time 
 import datetime
+import csv
+import json
+import contextlib
 
 import re
 import yaml
+from typing import List, Dict, Tuple, Any
 
 # Constants used for formatting the subcircuit area/delay/power table. 
 # These denote the widths of various columns - first (FIRS), last (LAST) and the rest (MIDL).
@@ -899,6 +903,11 @@ def print_run_options(args, report_file_path):
     
     
     print_and_write(report_file, "  Number of top combos to re-ERF: " + str(args.re_erf))
+    print_and_write(report_file, "  ERF mode: " + str(args.erf_mode))
+    if args.sizing_optimizer == "surrogate":
+        print_and_write(report_file, "  Sizing optimizer: surrogate (" + str(args.surrogate_sim_budget) + " sims per range, groups of " + str(args.surrogate_group_size) + ", " + str(args.surrogate_max_candidates) + " candidates per range)")
+    else:
+        print_and_write(report_file, "  Sizing optimizer: grid")
     print_and_write(report_file, "  Area optimization weight: " + str(args.area_opt_weight))
     print_and_write(report_file, "  Delay optimization weight: " + str(args.delay_opt_weight))
     print_and_write(report_file, "  Maximum number of sizing iterations: " + str(args.max_iterations))
@@ -1055,11 +1064,150 @@ def print_and_write(file, string):
     file.write(string + "\n")
 
 
-def create_output_dir(arch_file_name, arch_out_folder):
+# Columns of each record in a `TimingTrace`, in the order they are written to the CSV trace
+TIMING_TRACE_FIELDS = ["start_s", "phase", "subckt", "testbench", "event", "duration_s", "num_sims"]
+
+class TimingTrace(object):
+    """
+    Records where the time of a COFFE run goes. Each record is a timed event (e.g. "netlist_write", "sim", "parse",
+    "update_area") tagged with the phases it happened in (e.g. "sizing/erf"), the subcircuit being sized and the 
+    testbench it belongs to, if any. Phases are entered with `phase`, which also records thier total time as a 
+    "phase_total" event, so time not covered by any other event of a phase is Python overhead.
+
+    Simulator times of testbenches run at the same time (see `SpiceInterface.run_batch`) overlap, 
+    the wall time of the whole batch is recorded as a "sim_wall" event.
+    """
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+        self.start_time: float = time.perf_counter()
+        self._phases: List[str] = []
+        self._subckts: List[str] = []
+
+    def add(self, event: str, duration_s: float, testbench: str = "", num_sims: int = 0):
+        """
+        Records an 'event' which took 'duration_s' seconds and ended now, in the current phase and subcircuit.
+        """
+        self.records.append({
+            "start_s": round(time.perf_counter() - self.start_time - duration_s, 6),
+            "phase": "/".join(self._phases),
+            "subckt": self._subckts[-1] if self._subckts else "",
+            "testbench": testbench,
+            "event": event,
+            "duration_s": round(duration_s, 6),
+            "num_sims": num_sims,
+        })
+
+    @contextlib.contextmanager
+    def timed(self, event: str, testbench: str = "", num_sims: int = 0):
+        """
+        Context manager recording the time spent in its body as an 'event'.
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(event, time.perf_counter() - start_time, testbench, num_sims)
+
+    @contextlib.contextmanager
+    def phase(self, name: str, subckt: str = None):
+        """
+        Context manager tagging everything recorded in its body with phase 'name' (nested in the current phases) 
+        and with 'subckt' if given, its total time is recorded as a "phase_total" event of the phase.
+        """
+        self._phases.append(name)
+        if subckt is not None:
+            self._subckts.append(subckt)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add("phase_total", time.perf_counter() - start_time)
+            self._phases.pop()
+            if subckt is not None:
+                self._subckts.pop()
+
+    def write_json(self, fpath: str):
+        with open(fpath, "w") as trace_file:
+            json.dump({"fields": TIMING_TRACE_FIELDS, "records": self.records}, trace_file, indent = 1)
+
+    def write_csv(self, fpath: str):
+        with open(fpath, "w", newline = "") as trace_file:
+            writer = csv.DictWriter(trace_file, fieldnames = TIMING_TRACE_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.records)
+
+    def get_totals(self, key_fields: List[str], events: List[str] = None) -> List[Tuple[tuple, float, int, int]]:
+        """
+        Returns the [(key, total_duration_s, num_records, num_sims), ...] of records grouped by the values of 'key_fields',
+        only including records of 'events' if given, sorted by decreasing total duration.
+        """
+        totals: Dict[tuple, List[float]] = {}
+        for record in self.records:
+            if events is not None and record["event"] not in events:
+                continue
+            key = tuple(record[field] for field in key_fields)
+            total = totals.setdefault(key, [0.0, 0, 0])
+            total[0] += record["duration_s"]
+            total[1] += 1
+            total[2] += record["num_sims"]
+        return sorted(((key, dur, cnt, sims) for key, (dur, cnt, sims) in totals.items()), key = lambda row: -row[1])
+
+
+def print_timing_summary(report_file, timing_trace: TimingTrace, total_time_s: float, max_rows: int = 15):
+    """
+    Prints tables of where the run time went from 'timing_trace' to the terminal and 'report_file':
+    time per event, simulator time per phase and the testbenches with the most simulator time.
+    """
+    def print_table(title: str, col_names: List[str], rows: List[List[str]]):
+        print_and_write(report_file, "  " + title)
+        print_and_write(report_file, "  " + col_names[0].ljust(FIRS_COL_WIDTH + 20) + "".join(col.ljust(MIDL_COL_WIDTH) for col in col_names[1:]))
+        for row in rows:
+            print_and_write(report_file, "  " + row[0].ljust(FIRS_COL_WIDTH + 20) + "".join(col.ljust(MIDL_COL_WIDTH) for col in row[1:]))
+        print_and_write(report_file, "")
+
+    def pct(duration_s: float) -> str:
+        return f"{100 * duration_s / total_time_s:.1f}" if total_time_s > 0 else "-"
+
+    print_and_write(report_file, "|--------------------------------------------------------------------------------------------------|")
+    print_and_write(report_file, "|    Run Time Breakdown                                                                            |")
+    print_and_write(report_file, "|--------------------------------------------------------------------------------------------------|")
+    print_and_write(report_file, "")
+
+    event_rows = [
+        [event, f"{dur:.2f}", pct(dur), str(cnt), str(sims)] 
+        for (event,), dur, cnt, sims in timing_trace.get_totals(["event"]) if event != "phase_total"
+    ]
+    print_table("Time per event (sim times of concurrent testbenches overlap, see sim_wall)", ["Event", "Time (s)", "% of run", "Count", "Sims"], event_rows)
+    sim_wall = sum(dur for _, dur, _, _ in timing_trace.get_totals(["event"], ["sim_wall"]))
+    print_and_write(report_file, f"  Time outside of simulator batches (Python, area / wire updates, cache): {total_time_s - sim_wall:.2f} s ({pct(total_time_s - sim_wall)} % of run)")
+    print_and_write(report_file, "")
+
+    phase_rows = []
+    for (phase,), phase_dur, _, _ in timing_trace.get_totals(["phase"], ["phase_total"]):
+        # Simulator wall time of the phase includes its nested phases
+        phase_sim_records = [
+            record for record in timing_trace.records 
+            if record["event"] == "sim_wall" and (record["phase"] == phase or record["phase"].startswith(phase + "/"))
+        ]
+        sim_wall = sum(record["duration_s"] for record in phase_sim_records)
+        num_sims = sum(record["num_sims"] for record in phase_sim_records)
+        phase_rows.append([phase, f"{phase_dur:.2f}", pct(phase_dur), f"{sim_wall:.2f}", str(num_sims)])
+    print_table("Time per phase", ["Phase", "Time (s)", "% of run", "Sim time (s)", "Sims"], phase_rows[:max_rows])
+
+    tb_rows = [
+        [testbench, f"{dur:.2f}", pct(dur), str(cnt), str(sims)] 
+        for (testbench,), dur, cnt, sims in timing_trace.get_totals(["testbench"], ["sim"]) if testbench
+    ]
+    print_table(f"Testbenches with the most simulator time (top {max_rows})", ["Testbench", "Sim time (s)", "% of run", "Runs", "Sims"], tb_rows[:max_rows])
+
+
+def create_output_dir(arch_file_name, arch_out_folder, keep_contents = False):
     """
     This function creates the architecture folder and returns its name.
     It also deletes the content of the folder in case it's already created
     to avoid any errors in case of multiple runs on the same architecture file.
+    If keep_contents is set (resuming an interrupted run) nothing is deleted,
+    the sizing checkpoint and results of the interrupted run are kept.
     If arch_out_folder is specified in the input params file, then that is
     used as the architecture folder, otherwise the folder containing the arch
     params file is used.
@@ -1073,7 +1221,7 @@ def create_output_dir(arch_file_name, arch_out_folder):
 
     if not os.path.exists(arch_folder):
         os.makedirs(arch_folder)
-    else:
+    elif not keep_contents:
         # Delete contents of sub-directories
         # COFFE generates several 'intermediate results' files during sizing
         # so we delete them to avoid from having them pile up if we run COFFE
@@ -1133,6 +1281,12 @@ def print_summary(arch_folder, fpga_inst, start_time):
     total_seconds_elapsed = int(total_time_elapsed - 3600*total_hours_elapsed - 60*total_minutes_elapsed)
     
     print_and_write(report_file, "Number of HSPICE simulations performed: " + str(fpga_inst.spice_interface.get_num_simulations_performed()))
+    if fpga_inst.spice_interface.cache is not None:
+        cache_hits, cache_misses = fpga_inst.spice_interface.get_cache_stats()
+        print_and_write(report_file, "Spice result cache hits / misses: " + str(cache_hits) + " / " + str(cache_misses))
+    sim_retries = fpga_inst.spice_interface.get_retry_stats()
+    if sim_retries:
+        print_and_write(report_file, "Spice simulations retried: " + ", ".join(f"{num_retries} ({failure_type})" for failure_type, num_retries in sorted(sim_retries.items())))
     print_and_write(report_file, "Total time elapsed: " + str(total_hours_elapsed) + " hours " + str(total_minutes_elapsed) + " minutes " + str(total_seconds_elapsed) + " seconds\n") 
     
     report_file.write("\n")
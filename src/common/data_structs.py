@@ -27,6 +27,7 @@ import plotly.graph_objects as go
 import plotly.subplots as subplots
 import plotly.express as px
 import math
+import numpy as np
 from itertools import combinations
 
 import src.common.constants as consts
@@ -1065,7 +1066,7 @@ class AsicDseCLI(ParentCLI):
         GeneralCLI(key = "result_search_path", datatype = str, help_msg = "Path to output tree to search for results"),
 
         # RUN MODE
-        GeneralCLI(key = "mode.vlsi.run", shortcut = "-r", datatype = str, choices = ["serial", "parallel", "gen_scripts"], default_val = "serial", help_msg = "Specify if flow is run in serial or parallel for sweeps"),
+        GeneralCLI(key = "mode.vlsi.run", shortcut = "-r", datatype = str, choices = ["serial", "parallel", "gen_scripts"], default_val = "serial", help_msg = "Specify if flow is run in serial or parallel for sweeps, sweeps run in parallel execute their generated sweep points (flow_threads at a time) rather than only writing out scripts"),
         # FLOW MODE
         GeneralCLI(key = "mode.vlsi.flow", shortcut = "-m", datatype = str, choices = ["hammer", "custom"], default_val = "hammer", help_msg = "Mode in which asic flow is run hammer or custom modes"),
 
@@ -1351,6 +1352,7 @@ class DesignSweepInfo:
             hdl_dpath: path to directory containing hdl files for design
             type: options are "sram", "rtl" or "vlsi" TODO this could be instead determined by searching through parameters acceptable to hammer IR
             flow_threads: number of vlsi runs which will be executed via output script in parallel (in terms of sweep parameters)
+            stage_licenses: max number of sweep points running each flow stage at once when sweeps are run by RAD-Gen, e.g. {"syn": 2, "par": 1} 
             vlsi_params: # VLSI parameters to sweep
             sram_params: # Parameters to generate SRAM RTL + configs
             rtl_params: RTLSweepParams object
@@ -1363,6 +1365,7 @@ class DesignSweepInfo:
     hdl_dpath: str = None # path to directory containing hdl files for design
     type: str = None # options are "sram", "rtl_params" or "vlsi_params" TODO this could be instead determined by searching through parameters acceptable to hammer IR
     flow_threads: int = 1 # number of vlsi runs which will be executed in parallel (in terms of sweep parameters)
+    stage_licenses: Dict[str, int] = None # flow stage (syn / par / timing / power) -> number of tool licenses available to sweep points
     vlsi_params: VLSISweepParams = None # VLSI parameters to generate sweep configs, and scripts for
     sram_params: SRAMSweepParams = None # Parameters to generate SRAM RTL, configs, and scripts for
     rtl_params: RTLSweepParams = None # RTL parameters to sweep configs, and scripts for
@@ -1760,6 +1763,11 @@ class CoffeCLI(ParentCLI):
         GeneralCLI(key = "opt_type", shortcut = "-ot", datatype = str, choices = ["global", "local"], default_val = "global", help_msg = "optimization type, options are \"global\" or \"local\""),
         GeneralCLI(key = "initial_sizes", shortcut = "-is", datatype = str, help_msg = "path to initial transistor sizes"),
         GeneralCLI(key = "re_erf", shortcut = "-re", datatype = int, default_val = 1, help_msg = "how many sizing combos to re-erf"),
+        GeneralCLI(key = "erf_mode", shortcut = "-em", datatype = str, choices = ["iterative", "batched"], default_val = "iterative", help_msg = "how inverter rise / fall times are equalized, \"iterative\" searches each inverter's P/N ratio in turn, \"batched\" sweeps the P/N ratios of all inverters at once and interpolates their balance points"),
+        GeneralCLI(key = "sizing_optimizer", shortcut = "-so", datatype = str, choices = ["grid", "surrogate"], default_val = "grid", help_msg = "transistor sizing search, \"grid\" simulates every sizing combo in the ranges, \"surrogate\" fits a quadratic delay model to a sample of combos and only simulates the ones it predicts to be best"),
+        GeneralCLI(key = "surrogate_sim_budget", shortcut = "-ssb", datatype = int, default_val = 48, help_msg = "max number of sizing combos simulated per sizing range when using the surrogate sizing optimizer"),
+        GeneralCLI(key = "surrogate_group_size", shortcut = "-sgs", datatype = int, default_val = 10, help_msg = "max number of elements sized jointly in a group when using the surrogate sizing optimizer"),
+        GeneralCLI(key = "surrogate_max_candidates", shortcut = "-smc", datatype = int, default_val = 4000, help_msg = "max number of sizing combos per sizing range the surrogate sizing optimizer evaluates the area of, larger ranges are sampled with a fixed seed"),
         GeneralCLI(key = "area_opt_weight", shortcut = "-aw", datatype = int, default_val = 1, help_msg = "area optimization weight"),
         GeneralCLI(key = "delay_opt_weight", shortcut = "-dw", datatype = int, default_val = 1, help_msg = "delay optimization weight"),
         GeneralCLI(key = "max_iterations", shortcut = "-mi", datatype = int, default_val = 6, help_msg = "max FPGA sizing iterations"),
@@ -1770,6 +1778,13 @@ class CoffeCLI(ParentCLI):
         GeneralCLI(key = "rrg_data_dpath", shortcut = "-rrg", datatype = str, help_msg = "Path to directory containing parsed RRG output csvs"),
         GeneralCLI(key = "pass_through", shortcut = "-pass", datatype = bool, action = "store_true", help_msg = "Flag which enables pass-through mode for COFFE, this does NOT run spice simulations but allows the tool to be run to the end for debugging purposes" ),
         GeneralCLI(key = "spice_sim_type", shortcut = "-sst", datatype = str, choices = ["hspice", "ngspice"], default_val = "hspice", help_msg = "Choose the spice simulator COFFE uses, hspice is the default" ),
+        GeneralCLI(key = "num_spice_workers", shortcut = "-nsw", datatype = int, default_val = 1, help_msg = "Max number of independent spice testbenches COFFE simulates in parallel, 1 runs them serially" ),
+        GeneralCLI(key = "no_spice_cache", shortcut = "-nsc", datatype = bool, action = "store_true", help_msg = "Disables the on-disk cache of spice results, every sweep point will be simulated even if it was simulated in a previous run" ),
+        GeneralCLI(key = "spice_cache_max_entries", shortcut = "-sce", datatype = int, default_val = 200000, help_msg = "Max number of sweep point results kept in the spice result cache, least recently used results are evicted first" ),
+        GeneralCLI(key = "spice_licenses", shortcut = "-sl", datatype = int, default_val = 0, help_msg = "Max number of spice simulator processes run at the same time (number of simulator licenses / tokens available), 0 for no limit other than num_spice_workers. HSPICE threads (-mt) are chosen so the concurrent jobs share the available cores" ),
+        GeneralCLI(key = "spice_max_retries", shortcut = "-smr", datatype = int, default_val = 10, help_msg = "Max number of times a spice simulation which failed for license (or unknown) reasons is retried before COFFE gives up, convergence failures are never retried" ),
+        GeneralCLI(key = "spice_retry_backoff", shortcut = "-srb", datatype = float, default_val = 1.0, help_msg = "Seconds waited before the first retry of a failed spice simulation, doubled on each further retry (up to 60 s)" ),
+        GeneralCLI(key = "resume", shortcut = "-rs", datatype = bool, action = "store_true", help_msg = "Resume transistor sizing from the checkpoint written after the last sized subcircuit / sizing iteration (sizing_results/sizing_checkpoint.json in the arch output directory)" ),
         GeneralCLI(
             key = "checkpoint_dpaths", shortcut = "-ckpt", datatype = str, nargs = "*", 
             help_msg = "Paths to spice subckt sizing grid search iterations from previous COFFE runs. This allows the current run to skip the found iterations and run spice simulations for missing iterations"
@@ -1937,10 +1952,21 @@ class Coffe:
         Attributes:
             common: common settings for RAD Gen
             spice_sim_type: choice of spice simulator, options are "hspice" or "ngspice"
+            num_spice_workers: max number of independent spice testbenches simulated in parallel
+            no_spice_cache: disables the on-disk cache of spice results
+            spice_cache_max_entries: max number of sweep point results kept in the spice result cache
+            spice_licenses: max number of spice simulator processes run at the same time, 0 for no limit
+            spice_max_retries: max number of retries of a spice simulation which failed for license (or unknown) reasons
+            spice_retry_backoff: seconds waited before the first retry of a failed spice simulation, doubled on each retry
             no_sizing: don't perform transistor sizing
             opt_type: optimization type, options are "global" or "local"
             initial_sizes: where to get initial transistor sizes options are "default" ... TODO find all valid options
             re_erf: how many sizing combos to re-erf
+            erf_mode: how inverter rise / fall times are equalized, options are "iterative" or "batched"
+            sizing_optimizer: transistor sizing search, options are "grid" or "surrogate"
+            surrogate_sim_budget: max number of sizing combos simulated per sizing range by the surrogate optimizer
+            surrogate_group_size: max number of elements sized jointly in a group by the surrogate optimizer
+            surrogate_max_candidates: max number of sizing combos per sizing range the surrogate optimizer evaluates the area of
             area_opt_weight: area optimization weight
             delay_opt_weight: delay optimization weight
             max_iterations: max FPGA sizing iterations
@@ -1950,6 +1976,7 @@ class Coffe:
             ctrl_comp_telemetry_fpath: path to control compare telemetry file 
             rrg_data_dpath: Path to directory containing parsed RRG output csvs
             pass_through: Flag which enables pass-through mode for COFFE, this does NOT run spice simulations but allows the tool to be run to the end for debugging purposes
+            resume: Resume transistor sizing from the checkpoint written after the last sized subcircuit / sizing iteration
             checkpoint_dpaths: Paths to spice subckt sizing grid search iterations from previous COFFE runs. This allows the current run to skip the found iterations and run spice simulations for missing iterations
             arch_name: name of FPGA architecture
             hardblocks: Hard block flows configuration dictionary
@@ -1958,10 +1985,21 @@ class Coffe:
     # args: CoffeArgs = None
     # TODO put coffe CLI in here
     spice_sim_type: str # choice of spice simulator, options are "hspice" or "ngspice"
+    num_spice_workers: int # max number of independent spice testbenches simulated in parallel
+    no_spice_cache: bool # disables the on-disk cache of spice results
+    spice_cache_max_entries: int # max number of sweep point results kept in the spice result cache
+    spice_licenses: int # max number of spice simulator processes run at the same time, 0 for no limit
+    spice_max_retries: int # max number of retries of a spice simulation which failed for license (or unknown) reasons
+    spice_retry_backoff: float # seconds waited before the first retry of a failed spice simulation, doubled on each retry
     no_sizing: bool # don't perform sizing
     opt_type: str # optimization type, options are "global" or "local"
     initial_sizes: str # where to get initial transistor sizes options are "default" ... TODO find all valid options
     re_erf: int # how many sizing combos to re-erf
+    erf_mode: str # how inverter rise / fall times are equalized, options are "iterative" or "batched"
+    sizing_optimizer: str # transistor sizing search, options are "grid" or "surrogate"
+    surrogate_sim_budget: int # max number of sizing combos simulated per sizing range by the surrogate optimizer
+    surrogate_group_size: int # max number of elements sized jointly in a group by the surrogate optimizer
+    surrogate_max_candidates: int # max number of sizing combos per sizing range the surrogate optimizer evaluates the area of
     area_opt_weight: int # area optimization weight
     delay_opt_weight: int # delay optimization weight
     max_iterations: int # max FPGA sizing iterations
@@ -1972,6 +2010,7 @@ class Coffe:
     # Args for COFFE updates FPL'24
     rrg_data_dpath: str # Path to directory containing parsed RRG output csvs
     pass_through: bool # Flag which enables pass-through mode for COFFE, this does NOT run spice simulations but allows the tool to be run to the end for debugging purposes
+    resume: bool # Resume transistor sizing from the checkpoint written after the last sized subcircuit / sizing iteration
     checkpoint_dpaths: List[str] # Paths to spice subckt sizing grid search iterations from previous COFFE runs. This allows the current run to skip the found iterations and run spice simulations for missing iterations
     # NON cli args are below:
     arch_name: str # name of FPGA architecture
@@ -2783,35 +2822,26 @@ class GridPlacement:
                 * `self.grid`
                 * `self.bb_poly`
         """
-        self.grid = [[None]*self.dims[1] for _ in range(self.dims[0])]
-        for col in range(self.dims[0]):
-            for row in range(self.dims[1]):
-                self.grid[col][row] = RectBB(
-                    p1 = GridCoord(
-                        x = self.start_coord.x + col*(self.s_h),
-                        y = self.start_coord.y + row*(self.s_v),
-                    ),
-                    p2 = GridCoord(
-                        x = self.start_coord.x + col*(self.s_h) + self.h,
-                        y = self.start_coord.y + row*(self.s_v) + self.v,
-                    ),
-                    bb = sh.box(
-                        xmin = self.start_coord.x + col*(self.s_h),
-                        ymin = self.start_coord.y + row*(self.s_v),
-                        xmax = self.start_coord.x + col*(self.s_h) + self.h,
-                        ymax = self.start_coord.y + row*(self.s_v) + self.v,
-                    ),
+        # Corners of every cell computed at once, indexed by [col][row]
+        cols, rows = np.meshgrid(np.arange(self.dims[0]), np.arange(self.dims[1]), indexing = "ij")
+        xmins = self.start_coord.x + cols*(self.s_h)
+        ymins = self.start_coord.y + rows*(self.s_v)
+        xmaxs = xmins + self.h
+        ymaxs = ymins + self.v
+        bbs = sh.box(xmins, ymins, xmaxs, ymaxs)
+        self.grid = [
+            [
+                RectBB(
+                    p1 = GridCoord(x = xmin, y = ymin),
+                    p2 = GridCoord(x = xmax, y = ymax),
+                    bb = bb,
                     label = None,
                 )
-        poly_bbs = [ rect.bb for rows in self.grid for rect in rows ]
-        self.bb_poly = sh.Polygon(
-            [
-                (min(x for x,_,_,_ in [poly.bounds for poly in poly_bbs]), min(y for _,y,_,_ in [poly.bounds for poly in poly_bbs])), # BL pos (xmin, ymin)
-                (min(x for x,_,_,_ in [poly.bounds for poly in poly_bbs]), max(y for _,_,_,y in [poly.bounds for poly in poly_bbs])), # TL pos (xmin, ymax)
-                (max(x for _,_,x,_ in [poly.bounds for poly in poly_bbs]), max(y for _,_,_,y in [poly.bounds for poly in poly_bbs])), # TR pos (xmax, ymax)
-                (max(x for _,_,x,_ in [poly.bounds for poly in poly_bbs]), max(y for _,y,_,_ in [poly.bounds for poly in poly_bbs])) # BR pos (xmax, ymin)
+                for xmin, ymin, xmax, ymax, bb in zip(*col_vals)
             ]
-        )
+            for col_vals in zip(xmins.tolist(), ymins.tolist(), xmaxs.tolist(), ymaxs.tolist(), bbs.tolist())
+        ]
+        self.bb_poly = get_bb_poly(bbs.ravel())
     def gen_fig(self, 
         fig: go.Figure, 
         fill_color: str, 
@@ -3196,7 +3226,7 @@ class FPGAInfo:
 
 def get_total_poly_area(boxes: List[sh.Polygon]) -> float:
     """ 
-        Get total area of polygons, subtracts overlap area bw two bboxes (if any)
+        Get total area covered by polygons, overlapping areas are only counted once
 
         Args:
             boxes: List of shapely Polygon objects representing the boxes
@@ -3204,26 +3234,36 @@ def get_total_poly_area(boxes: List[sh.Polygon]) -> float:
         Returns:
             total_coverage_area: Total area of the boxes in the list
     """
-    # Create polygons for each rectangle
-    polygons = [sh.Polygon(box.exterior.coords) for box in boxes]
-    # Compute the total area of all polygons
-    total_area = sum(poly.area for poly in polygons)
-    # Compute the area of intersection between each pair of rectangles,
-    # skipping pairs that have already been checked
-    intersection_area = 0
-    checked_pairs = set()
-    for box1, box2 in combinations(range(len(boxes)), 2):
-        if (box1, box2) in checked_pairs or (box2, box1) in checked_pairs:
-            continue
-        if polygons[box1].intersects(polygons[box2]):
-            intersection_area += polygons[box1].intersection(polygons[box2]).area
-        checked_pairs.add((box1, box2))
-    # Subtract the area of intersection to get the total area covered by boxes
-    total_coverage_area = total_area - intersection_area
-    # print(f"total area: {total_area}, intersection area: {intersection_area}, total coverage area: {total_coverage_area}")
+    polygons = np.asarray(boxes, dtype = object)
+    # Find the polygons that intersect any other polygon with a spatial index rather than checking every pair
+    tree = sh.STRtree(polygons)
+    poly_idxs, other_idxs = tree.query(polygons, predicate = "intersects")
+    overlap_mask = np.zeros(len(polygons), dtype = bool)
+    overlap_mask[poly_idxs[poly_idxs != other_idxs]] = True
+    # Polygons which don't touch any others contribute their full area, overlapping ones contribute the area of their union
+    total_coverage_area = float(np.sum(sh.area(polygons[~overlap_mask])))
+    if overlap_mask.any():
+        total_coverage_area += sh.unary_union(polygons[overlap_mask]).area
     return total_coverage_area
 
 
+def get_bb_poly(polys: List[sh.Polygon]) -> sh.Polygon:
+    """
+        Get the bounding box Polygon of a list of polygons, from their bounds computed in a single pass
+    """
+    bounds = sh.bounds(np.asarray(polys, dtype = object))
+    xmin, ymin = bounds[:, 0].min(), bounds[:, 1].min()
+    xmax, ymax = bounds[:, 2].max(), bounds[:, 3].max()
+    return sh.Polygon(
+        [
+            (xmin, ymin), # BL pos (xmin, ymin)
+            (xmin, ymax), # TL pos (xmin, ymax)
+            (xmax, ymax), # TR pos (xmax, ymax)
+            (xmax, ymin), # BR pos (xmax, ymin)
+        ]
+    )
+
+
 @dataclass
 class DesignPDN:
     """
@@ -3287,14 +3327,7 @@ class DesignPDN:
             area = get_total_poly_area(polys)
         else:
             area = sum(poly.area for poly in polys)
-        bb_poly = sh.Polygon(
-            [
-                (min(x for x,_,_,_ in [poly.bounds for poly in polys]), min(y for _,y,_,_ in [poly.bounds for poly in polys])), # BL pos (xmin, ymin)
-                (min(x for x,_,_,_ in [poly.bounds for poly in polys]), max(y for _,_,_,y in [poly.bounds for poly in polys])), # TL pos (xmin, ymax)
-                (max(x for _,_,x,_ in [poly.bounds for poly in polys]), max(y for _,_,_,y in [poly.bounds for poly in polys])), # TR pos (xmax, ymax)
-                (max(x for _,_,x,_ in [poly.bounds for poly in polys]), max(y for _,y,_,_ in [poly.bounds for poly in polys])) # BR pos (xmax, ymin)
-            ]
-        )
+        bb_poly = get_bb_poly(polys)
         # make sure the inputted placement is all of the same tag
         assert all(grid_pl.tag == grid_pls[0].tag for grid_pl in grid_pls)
         
@@ -3656,6 +3689,11 @@ class Ic3dCLI(ParentCLI):
         GeneralCLI(key = "pdn_modeling", shortcut = "-pm", datatype = bool, action = "store_true", help_msg = "runs the PDN modeling flow"),
         GeneralCLI(key = "buffer_dse", shortcut = "-bd", datatype = bool, action = "store_true", help_msg = "runs the buffer DSE flow"),
         GeneralCLI(key = "buffer_sens_study", shortcut = "-bs", datatype = bool, action = "store_true", help_msg = "runs the buffer sensitivity study flow (sweeps parameters for buffer chain wire load, plots results)"),
+        GeneralCLI(key = "buffer_dse_workers", shortcut = "-bdw", datatype = int, default_val = 1, help_msg = "max number of buffer DSE sweep points simulated in parallel, 1 runs them serially"),
+        GeneralCLI(key = "no_buffer_dse_cache", shortcut = "-nbc", datatype = bool, action = "store_true", help_msg = "disables the on-disk cache of buffer DSE simulation results, every sweep point will be simulated even if it was simulated in a previous run"),
+        GeneralCLI(key = "buffer_max_freq", shortcut = "-bfmax", datatype = float, default_val = 1000.0, help_msg = "highest target frequency (MHz) buffer DSE sims are run at, the max frequency each sweep point passes at is searched below it"),
+        GeneralCLI(key = "buffer_min_freq", shortcut = "-bfmin", datatype = float, default_val = 1.0, help_msg = "lowest target frequency (MHz) searched by buffer DSE before a sweep point is considered failed"),
+        GeneralCLI(key = "buffer_freq_tol", shortcut = "-bftol", datatype = float, default_val = 10.0, help_msg = "tolerance (MHz) to which the max frequency of buffer DSE sweep points is bisected"),
     ])
 
 # Use factory to create Args dataclass
@@ -1,7 +1,10 @@
 
 import os, sys
 import time
-import xmltodict 
+import array
+import json
+import shutil
+import hashlib
 import pprint
 import dataclasses
 from typing import Dict, Any, List, Tuple
@@ -21,8 +24,19 @@ import argparse
 
 import multiprocessing as mp
 
+try:
+    from lxml import etree
+except ImportError:
+    # lxml is quite a bit faster on large graphs but the stdlib parser has the same iterparse interface
+    import xml.etree.ElementTree as etree
+
 import src.common.utils as rg_utils
 
+# Bump whenever the layout of the files in the rr_graph cache changes so stale caches are rebuilt
+RR_GRAPH_CACHE_FORMAT_VERSION = "1"
+# Suffix of the cache directory written next to an rr_graph XML when no cache directory is given
+RR_GRAPH_CACHE_SUFFIX = ".rr_cache"
+RR_GRAPH_CACHE_META_FNAME = "meta.json"
 
 @dataclasses.dataclass
 class Switch:
@@ -39,40 +53,314 @@ class Segment:
     timing: dict
 
 @dataclasses.dataclass
-class Node:
-    id: int
-    direction: str
-    type: str
-    capacity: int
-    loc: dict
-    timing: dict
-    segment: dict
+class RRGraph:
+    """
+        Compact array backed representation of a VPR rr_graph
+
+        Node arrays are indexed by node id, edge arrays are in the order the edges appear in the rr_graph file.
+        Edges are also grouped by sink node (fanin) and src node (fanout) in CSR form, within a group the edges keep file order.
+
+        Attributes:
+            switches: switch id -> Switch
+            segments: segment id -> Segment
+            node_type_names: node type strings, indexed by the codes in node_type
+            node_ids: ids of nodes in the order they appear in the rr_graph file
+            node_type: node type code, -1 for ids which are not in the rr_graph
+            node_xlow, node_xhigh, node_ylow, node_yhigh: node loc coordinates
+            node_ptc: node loc ptc
+            node_segment_id: segment id of the node, -1 if it has none
+            edge_src, edge_sink, edge_switch: src node, sink node and switch id of each edge
+            fanin_ptr, fanin_edges: CSR offsets / edge indices of edges grouped by sink node
+            fanout_ptr, fanout_edges: CSR offsets / edge indices of edges grouped by src node
+    """
+    switches: Dict[int, Switch]
+    segments: Dict[int, Segment]
+    node_type_names: List[str]
+    node_ids: np.ndarray
+    node_type: np.ndarray
+    node_xlow: np.ndarray
+    node_xhigh: np.ndarray
+    node_ylow: np.ndarray
+    node_yhigh: np.ndarray
+    node_ptc: np.ndarray
+    node_segment_id: np.ndarray
+    edge_src: np.ndarray
+    edge_sink: np.ndarray
+    edge_switch: np.ndarray
+    fanin_ptr: np.ndarray = None
+    fanin_edges: np.ndarray = None
+    fanout_ptr: np.ndarray = None
+    fanout_edges: np.ndarray = None
+
+    def __post_init__(self):
+        num_ids: int = len(self.node_type)
+        # Groupings are only built if not already provided ie loaded from the rr_graph cache
+        if self.fanin_ptr is None or self.fanin_edges is None:
+            self.fanin_ptr, self.fanin_edges = group_edges_csr(self.edge_sink, num_ids)
+        if self.fanout_ptr is None or self.fanout_edges is None:
+            self.fanout_ptr, self.fanout_edges = group_edges_csr(self.edge_src, num_ids)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    def type_code(self, type_name: str) -> int:
+        return self.node_type_names.index(type_name) if type_name in self.node_type_names else -1
+
+    def node_fanin_edges(self, node_id: int) -> np.ndarray:
+        return self.fanin_edges[self.fanin_ptr[node_id]:self.fanin_ptr[node_id + 1]]
+
+    def node_fanout_edges(self, node_id: int) -> np.ndarray:
+        return self.fanout_edges[self.fanout_ptr[node_id]:self.fanout_ptr[node_id + 1]]
+
+
+def group_edges_csr(edge_keys: np.ndarray, num_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+        Groups edge indices by the node in edge_keys, returns (row offsets, edge indices)
+        A stable sort is used so edges of the same node stay in file order
+    """
+    edge_idxs: np.ndarray = np.argsort(edge_keys, kind="stable")
+    row_ptr: np.ndarray = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edge_keys, minlength=num_rows), out=row_ptr[1:])
+    return row_ptr, edge_idxs
 
-@dataclasses.dataclass
-class Edge:
-    sink_node: int
-    src_node: int
-    switch_id: int
 
+def count_keys_per_group(group_ids: np.ndarray, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+        Counts how often each (non negative) key occurs in each group in a single grouped pass.
+        Returns (group ids, keys, counts) with one row per distinct (group, key) pair, 
+        ordered by group and then by first occurrence of the key within the group.
+    """
+    num_keys: int = int(keys.max()) + 1 if keys.size else 1
+    pair_keys: np.ndarray = group_ids.astype(np.int64) * num_keys + keys
+    uniq_pairs, first_idxs, counts = np.unique(pair_keys, return_index=True, return_counts=True)
+    uniq_groups: np.ndarray = uniq_pairs // num_keys
+    order: np.ndarray = np.lexsort((first_idxs, uniq_groups))
+    return uniq_groups[order], uniq_pairs[order] % num_keys, counts[order]
 
-def parse_xml_to_dict(xml_file: str, tags: List[str]):
-    from lxml import etree
-    result: Dict[str, Dict[str, Any]] = defaultdict(dict)
 
-    # Create an iterator for streaming parsing
-    context = etree.iterparse(xml_file, events=('start', 'end'))
+def xml_elem_to_dict(elem) -> Any:
+    """
+        Converts a small XML element (ie a switch or segment) to the same nested dict layout xmltodict would produce
+        with the '@' attribute prefixes already removed. Elements with neither attributes nor children map to their text or None.
+    """
+    out_dict: Dict[str, Any] = dict(elem.attrib)
+    for child in elem:
+        child_val = xml_elem_to_dict(child)
+        if child.tag in out_dict:
+            if not isinstance(out_dict[child.tag], list):
+                out_dict[child.tag] = [out_dict[child.tag]]
+            out_dict[child.tag].append(child_val)
+        else:
+            out_dict[child.tag] = child_val
+    text: str = elem.text.strip() if elem.text else ""
+    if text:
+        if not out_dict:
+            return text
+        out_dict["#text"] = text
+    return out_dict if out_dict else None
+
+
+def parse_rr_graph(rr_xml_fpath: str) -> RRGraph:
+    """
+        Streams a VPR rr_graph XML file into an RRGraph.
 
-    # Iterate over the XML elements
-    for event, elem in context:
-        if event == 'end' and elem.tag in tags:
-            # Convert the element to a dictionary
-            element_dict = {}
-            element_dict.update(elem.attrib)  # Add attributes
-            # element_dict['text'] = elem.text  # Add text content
-            result[elem.tag] = element_dict
-            elem.clear()  # Clear the element from memory
+        Elements are cleared as soon as they are consumed so memory is dominated by the node / edge arrays.
+        Switches and segments are few so they are still typecasted to dataclasses.
+    """
+    switches: Dict[int, Switch] = {}
+    segments: Dict[int, Segment] = {}
+    node_type_codes: Dict[str, int] = {}
+    node_cols: Dict[str, array.array] = {
+        key: array.array("q") for key in ["id", "type", "xlow", "xhigh", "ylow", "yhigh", "ptc", "segment_id"]
+    }
+    edge_cols: Dict[str, array.array] = {
+        key: array.array("q") for key in ["src_node", "sink_node", "switch_id"]
+    }
 
-    return result
+    # depth 1: <rr_graph>, depth 2: sections ie <rr_nodes>, depth 3: section items ie <node>
+    depth: int = 0
+    root = None
+    section = None
+    for event, elem in etree.iterparse(rr_xml_fpath, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if depth == 1:
+                root = elem
+            elif depth == 2:
+                section = elem
+            continue
+        depth -= 1
+        if depth == 2:
+            if section.tag == "switches" and elem.tag == "switch":
+                conv_switch = xml_elem_to_dict(elem)
+                switches[int(conv_switch['id'])] = typecast_input_to_dataclass(conv_switch, Switch)
+            elif section.tag == "segments" and elem.tag == "segment":
+                conv_segment = xml_elem_to_dict(elem)
+                segments[int(conv_segment['id'])] = typecast_input_to_dataclass(conv_segment, Segment)
+            elif section.tag == "rr_nodes" and elem.tag == "node":
+                loc = elem.find("loc")
+                seg = elem.find("segment")
+                node_cols["id"].append(int(elem.get("id")))
+                node_cols["type"].append(node_type_codes.setdefault(elem.get("type"), len(node_type_codes)))
+                for loc_key in ["xlow", "xhigh", "ylow", "yhigh"]:
+                    node_cols[loc_key].append(int(loc.get(loc_key)))
+                node_cols["ptc"].append(int(loc.get("ptc", -1)))
+                node_cols["segment_id"].append(
+                    int(seg.get("segment_id")) if seg is not None and seg.get("segment_id") is not None else -1
+                )
+            elif section.tag == "rr_edges" and elem.tag == "edge":
+                for edge_key in ["src_node", "sink_node", "switch_id"]:
+                    edge_cols[edge_key].append(int(elem.get(edge_key)))
+            # Drop the consumed item from its section
+            section.clear()
+        elif depth == 1:
+            # Drop the consumed section (ie <grid>, <block_types>, <rr_nodes>) from the root
+            root.clear()
+
+    node_ids: np.ndarray = np.frombuffer(node_cols["id"], dtype=np.int64)
+    edge_src: np.ndarray = np.frombuffer(edge_cols["src_node"], dtype=np.int64).astype(np.int32)
+    edge_sink: np.ndarray = np.frombuffer(edge_cols["sink_node"], dtype=np.int64).astype(np.int32)
+    num_ids: int = int(max([ids.max() for ids in [node_ids, edge_src, edge_sink] if ids.size], default=-1)) + 1
+
+    # Scatter the per node columns into arrays indexed by node id
+    def scatter(col_key: str, dtype: type, fill: int) -> np.ndarray:
+        out_arr: np.ndarray = np.full(num_ids, fill, dtype=dtype)
+        out_arr[node_ids] = np.frombuffer(node_cols[col_key], dtype=np.int64)
+        return out_arr
+
+    return RRGraph(
+        switches = switches,
+        segments = segments,
+        node_type_names = list(node_type_codes.keys()),
+        node_ids = node_ids.astype(np.int32),
+        node_type = scatter("type", np.int8, -1),
+        node_xlow = scatter("xlow", np.int32, -1),
+        node_xhigh = scatter("xhigh", np.int32, -1),
+        node_ylow = scatter("ylow", np.int32, -1),
+        node_yhigh = scatter("yhigh", np.int32, -1),
+        node_ptc = scatter("ptc", np.int32, -1),
+        node_segment_id = scatter("segment_id", np.int32, -1),
+        edge_src = edge_src,
+        edge_sink = edge_sink,
+        edge_switch = np.frombuffer(edge_cols["switch_id"], dtype=np.int64).astype(np.int32),
+    )
+
+
+
+def get_file_sha256(fpath: str, chunk_size: int = 1 << 24) -> str:
+    """
+        Returns the sha256 of the contents of 'fpath', read in chunks as rr_graphs can be several GB
+    """
+    hasher = hashlib.sha256()
+    with open(fpath, "rb") as fd:
+        for chunk in iter(lambda: fd.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def get_rr_graph_cache_dpath(rr_xml_fpath: str, cache_dpath: str | None = None) -> str:
+    """
+        Returns the directory the parsed form of 'rr_xml_fpath' is cached in,
+        a sidecar next to the XML unless a parent 'cache_dpath' is given
+    """
+    cache_dname: str = f"{os.path.basename(rr_xml_fpath)}{RR_GRAPH_CACHE_SUFFIX}"
+    return os.path.join(cache_dpath if cache_dpath else os.path.dirname(os.path.abspath(rr_xml_fpath)), cache_dname)
+
+
+def save_rr_graph_cache(rrg: RRGraph, rr_xml_fpath: str, cache_dpath: str, xml_sha256: str | None = None) -> None:
+    """
+        Writes the arrays of 'rrg' as .npy files (so they can be memory mapped on load) into 'cache_dpath',
+        along with a meta file holding the switches, segments and the size / mtime / sha256 of 'rr_xml_fpath' the cache is valid for.
+        The cache is written to a temporary directory and moved into place so an interrupted write is never loaded.
+    """
+    xml_stat = os.stat(rr_xml_fpath)
+    meta: Dict[str, Any] = {
+        "format_version": RR_GRAPH_CACHE_FORMAT_VERSION,
+        "size": xml_stat.st_size,
+        "mtime_ns": xml_stat.st_mtime_ns,
+        "sha256": xml_sha256 if xml_sha256 else get_file_sha256(rr_xml_fpath),
+        "switches": [dataclasses.asdict(sw) for sw in rrg.switches.values()],
+        "segments": [dataclasses.asdict(seg) for seg in rrg.segments.values()],
+        "node_type_names": rrg.node_type_names,
+    }
+    tmp_dpath: str = f"{cache_dpath}.tmp{os.getpid()}"
+    os.makedirs(tmp_dpath, exist_ok=True)
+    for field in dataclasses.fields(RRGraph):
+        field_val = getattr(rrg, field.name)
+        if isinstance(field_val, np.ndarray):
+            np.save(os.path.join(tmp_dpath, f"{field.name}.npy"), field_val)
+    with open(os.path.join(tmp_dpath, RR_GRAPH_CACHE_META_FNAME), "w") as fd:
+        json.dump(meta, fd)
+    if os.path.isdir(cache_dpath):
+        shutil.rmtree(cache_dpath)
+    os.replace(tmp_dpath, cache_dpath)
+
+
+def load_rr_graph_cache(rr_xml_fpath: str, cache_dpath: str) -> Tuple[RRGraph | None, str | None]:
+    """
+        Loads the RRGraph cached in 'cache_dpath' with its arrays memory mapped read only.
+
+        The cache is used directly if the size and mtime of 'rr_xml_fpath' match those it was written for,
+        if only the mtime differs (ie the XML was copied) the sha256 of the XML is checked instead.
+
+        Returns:
+            The cached RRGraph or None if there is no valid cache, 
+            and the sha256 of the XML if it had to be computed (so it can be reused when rewriting the cache)
+    """
+    meta_fpath: str = os.path.join(cache_dpath, RR_GRAPH_CACHE_META_FNAME)
+    if not os.path.isfile(meta_fpath):
+        return None, None
+    with open(meta_fpath, "r") as fd:
+        meta: Dict[str, Any] = json.load(fd)
+    xml_stat = os.stat(rr_xml_fpath)
+    if meta.get("format_version") != RR_GRAPH_CACHE_FORMAT_VERSION or meta.get("size") != xml_stat.st_size:
+        return None, None
+    xml_sha256: str | None = None
+    if meta.get("mtime_ns") != xml_stat.st_mtime_ns:
+        xml_sha256 = get_file_sha256(rr_xml_fpath)
+        if xml_sha256 != meta.get("sha256"):
+            return None, xml_sha256
+        # Same contents, record the new mtime so later loads don't have to rehash the XML
+        meta["mtime_ns"] = xml_stat.st_mtime_ns
+        try:
+            with open(meta_fpath, "w") as fd:
+                json.dump(meta, fd)
+        except OSError:
+            pass
+    arrays: Dict[str, np.ndarray] = {
+        field.name: np.load(os.path.join(cache_dpath, f"{field.name}.npy"), mmap_mode="r")
+            for field in dataclasses.fields(RRGraph) if field.name not in ["switches", "segments", "node_type_names"]
+    }
+    rrg = RRGraph(
+        switches = {sw["id"]: Switch(**sw) for sw in meta["switches"]},
+        segments = {seg["id"]: Segment(**seg) for seg in meta["segments"]},
+        node_type_names = meta["node_type_names"],
+        **arrays,
+    )
+    return rrg, xml_sha256
+
+
+def load_rr_graph(rr_xml_fpath: str, cache_dpath: str | None = None, use_cache: bool = True) -> RRGraph:
+    """
+        Returns the RRGraph of 'rr_xml_fpath', from its cache if a valid one exists, 
+        otherwise the XML is parsed and (if 'use_cache') the cache is written for later runs.
+    """
+    if not use_cache:
+        return parse_rr_graph(rr_xml_fpath)
+    rrg_cache_dpath: str = get_rr_graph_cache_dpath(rr_xml_fpath, cache_dpath)
+    rrg, xml_sha256 = load_rr_graph_cache(rr_xml_fpath, rrg_cache_dpath)
+    if rrg is not None:
+        print(f"Loaded parsed rr_graph from cache {rrg_cache_dpath}")
+        return rrg
+    rrg = parse_rr_graph(rr_xml_fpath)
+    try:
+        save_rr_graph_cache(rrg, rr_xml_fpath, rrg_cache_dpath, xml_sha256)
+        print(f"Wrote parsed rr_graph cache to {rrg_cache_dpath}")
+    except OSError as e:
+        # ie the XML lives in a read only directory, the cache is only an optimization so just carry on
+        print(f"WARNING: Could not write rr_graph cache to {rrg_cache_dpath}: {e}")
+    return rrg
 
 
 def typecast_input_to_dataclass(input_value: dict, dataclass_type: Any) -> Any:
@@ -126,6 +414,8 @@ def parse_cli_args(argv: List[str] = []) -> argparse.Namespace:
     parser.add_argument("-rrg","--rr_xml_fpath", type=str, help="Path to the input rr_graph.xml file", required=True)
     parser.add_argument("-o", "--out_dpath", type=str, help="Path to the output directory", default=os.getcwd())
     parser.add_argument("-p", "--generate_plots", action='store_true', help="Generate RRG Plots", default = True)
+    parser.add_argument("-c", "--cache_dpath", type=str, help="Directory to cache the parsed rr_graph in, defaults to a sidecar directory next to the rr_graph.xml", default=None)
+    parser.add_argument("-nc", "--no_cache", action='store_true', help="Always parse the rr_graph.xml rather than loading / writing the parsed rr_graph cache", default=False)
 
     in_args = argv if argv else sys.argv[1:]
 
@@ -138,30 +428,21 @@ def main(argv: List[str] = [], kwargs: Dict[str, str] = {}) -> Dict[str, Dict[st
     input_rr_xml_fpath: str = args.rr_xml_fpath
     out_dpath: str = args.out_dpath
     gen_plots: bool = args.generate_plots
+    cache_dpath: str | None = args.cache_dpath
+    use_cache: bool = not args.no_cache
 
     # Parse the RRG from XML
 
     rrg_str = input_rr_xml_fpath.split("/")[-1].split(".")[0]
-    with open(input_rr_xml_fpath, "r") as f:
-        input_rr_xml_text = f.read()
 
     global_start = timer()
     timer_start = timer()
-    print( f"Starting to parse {input_rr_xml_fpath} with xmltodict")
-    rr_dict = xmltodict.parse(input_rr_xml_text)
-    print( f"Finished parsing {input_rr_xml_fpath} with xmltodict in {timer() - timer_start} seconds")
-    
-    # LXML parsing information
-    # print( f"Starting to parse {input_rr_xml_fpath} with lxml")
-    # timer_start = timer()
-    # out_tags = ["switches", "segments", "rr_nodes", "rr_edges"]
-    # rr_dict = parse_xml_to_dict(input_rr_xml_fpath, out_tags)
-    # print( f"Finished parsing {input_rr_xml_fpath} with lxml in {timer() - timer_start} seconds")
-    
-    switches: Dict[int, Switch] = {}
-    segments: Dict[int, Segment] = {}
-    nodes: Dict[int, Node] = {}
-    edges: List[Edge] = []
+    print( f"Starting to load {input_rr_xml_fpath}")
+    rrg: RRGraph = load_rr_graph(input_rr_xml_fpath, cache_dpath, use_cache)
+    print( f"Finished loading {input_rr_xml_fpath} in {timer() - timer_start} seconds")
+
+    switches: Dict[int, Switch] = rrg.switches
+    segments: Dict[int, Segment] = rrg.segments
     # Required Information
     # For each type of SB mux (type of wire being driven i suppose)
     #   Number of these muxes per SB per direction
@@ -170,379 +451,137 @@ def main(argv: List[str] = [], kwargs: Dict[str, str] = {}) -> Dict[str, Dict[st
     # For each segment type
     #   How many Muxes (and which type) are loading the segment -> mux fanout w/specifics
 
-
-
     # Number of edges w common src should be equal to number of muxes attached to the src node, ie mux load on a wire (fanout) 
-    common_src_edges: Dict[int, List[Edge]] = defaultdict(list)
+    num_fanout_edges: np.ndarray = np.diff(rrg.fanout_ptr)
     # Number of edges w common sink should all be in the same SB and go into the same Mux (ie mux fanin)
-    common_sink_edges: Dict[int, List[Edge]] = defaultdict(list)
-    # Common edges with also common sw_ids to determine fanouts of particular wires, indexed with src_node 
-    # common_src_sw_id_edges: Dict[int, 
-
-    for k, v in rr_dict["rr_graph"].items():
-        # Switch Type info
-        if k == "switches":
-            for switch in v["switch"]:
-                conv_switch = rec_clean_dict_keys(switch)
-                switches[int(conv_switch['id'])] = typecast_input_to_dataclass(conv_switch, Switch)
-        # Segment Type info
-        elif k == "segments":
-            for segment in v["segment"]:
-                conv_segment = rec_clean_dict_keys(segment)
-                segments[int(conv_segment['id'])] = typecast_input_to_dataclass(conv_segment, Segment)
-
-        elif k == "rr_nodes":
-            for node in v["node"]:
-                conv_node = rec_clean_dict_keys(node)
-                # hash nodes by node id
-                # out_node: Node = typecast_input_to_dataclass(conv_node, Node)
-                # print(out_node.segment)
-                # if out_node.segment is not None:
-                #     out_node.segment.segment_id = int(out_node.segment.get("segment_id")) 
-                nodes[int(conv_node['id'])] = typecast_input_to_dataclass(conv_node, Node)
-
-            
-        # Check if this describes a wire inst
-        elif k == "rr_edges":
-            for edge in v["edge"]:
-                conv_edge = rec_clean_dict_keys(edge)
-                edge_obj: Edge = typecast_input_to_dataclass(conv_edge, Edge)
-                edges.append(
-                    edge_obj
-                )
-                # Hash with node value
-                # Add edge to common_src_edges
-                common_src_edges[edge_obj.src_node].append(
-                    typecast_input_to_dataclass(conv_edge, Edge)
-                )
-                # Add edge to common_sink_edges
-                common_sink_edges[edge_obj.sink_node].append(
-                    typecast_input_to_dataclass(conv_edge, Edge)
-                )
-
-    # Verifying that we read in the correct number of switches, segments, nodes, and edges
-
-    # print("Switches")
-    # print(switches[0:10], switches[-10:] )
-    # print("Segments")
-    # print(segments[0:10], segments[-10:])
-    # print("Nodes")
-    # print(nodes[0:10], nodes[-10:])
-    # print("Edges")
-    # print(edges[0:10], edges[-10:])
-
-    # Device bounds
-    # xmax = max([node.loc['xhigh'] for node in nodes.values()])
-    # ymax = max([node.loc['yhigh'] for node in nodes.values()])
-    # xmin = min([node.loc['xlow'] for node in nodes.values()])
-    # ymin = min([node.loc['ylow'] for node in nodes.values()])
-
-
-    # node_coord_keys = ['xlow', 'xhigh', 'ylow', 'yhigh']
-    # # Remove edges of the device
-    # # Iterating through the src edges but if we find an edge with src or sink on boundary of device we remove it from both lists
-    # for k in list(common_src_edges.keys()):
-    #     edges: List[Edge] = common_src_edges[k]
-    #     node: Node = nodes[edges[0].src_node]
-    #     if node.type == "CHANX" or node.type == "CHANY":
-    #         # Check if its on the boundary
-    #         if any([node.loc[node_coord_key] == xmin or node.loc[node_coord_key] == xmax or node.loc[node_coord_key] == ymin or node.loc[node_coord_key] == ymax for node_coord_key in node_coord_keys]):
-    #             # Prune any node in edge list which has a coordinate on the boundary
-    #             del common_src_edges[k]
-    #             continue
-    #     # # Check if wire destination or source is on boundary
-    #     # wire_len = segments[node.segment['segment_id']].length
-    # for k in list(common_sink_edges.keys()):
-    #     edges: List[Edge] = common_sink_edges[k]
-    #     node: Node = nodes[edges[0].sink_node]
-    #     if node.type == "CHANX" or node.type == "CHANY":
-    #         # Check if its on the boundary
-    #         if any([node.loc[node_coord_key] == xmin or node.loc[node_coord_key] == xmax or node.loc[node_coord_key] == ymin or node.loc[node_coord_key] == ymax for node_coord_key in node_coord_keys]):
-    #             # Prune any node in edge list which has a coordinate on the boundary
-    #             del common_sink_edges[k]
-    #             continue
-
-    # remove any common_src which doesnt have a key in common_sinks
-    # for k in list(common_src_edges.keys()):
-    #     if k not in common_sink_edges.keys():
-    #         del common_src_edges[k]
-    # # remove any common_sink which doesnt have a key in common_src
-    # for k in list(common_sink_edges.keys()):
-    #     if k not in common_src_edges.keys():
-    #         del common_sink_edges[k]
-
-
+    num_fanin_edges: np.ndarray = np.diff(rrg.fanin_ptr)
+    node_segment_ids: np.ndarray = rrg.node_segment_id
 
     # Create a dict of switch 
     switch_lookups = {
         sw_id: (switch.name.upper() if switch.name != "__vpr_delayless_switch__" else "LB_OPIN") for sw_id, switch in switches.items()      
     }
 
+    # Switch id of the first edge driving each node, -1 for nodes without fanin
+    has_fanin: np.ndarray = num_fanin_edges > 0
+    fanin_sinks: np.ndarray = rrg.edge_sink[rrg.fanin_edges]
+    fanin_sw_ids: np.ndarray = rrg.edge_switch[rrg.fanin_edges]
+    node_drv_sw_ids: np.ndarray = np.full(len(num_fanin_edges), -1, dtype=np.int64)
+    node_drv_sw_ids[has_fanin] = fanin_sw_ids[rrg.fanin_ptr[:-1][has_fanin]]
+    # Nodes driven by edges of more than one switch id
+    node_sw_mismatch: np.ndarray = np.bincount(
+        fanin_sinks, weights = (fanin_sw_ids != node_drv_sw_ids[fanin_sinks]), minlength = len(num_fanin_edges)
+    ) > 0
+
     # Create lookups to find a switch ID from a segment ID
-    # To do this I think we have to iterate over all nodes and find thier corresponding segment ids (if they have them)
-    # Then we can iterate over all sink edges with that segment id and find thier switch id, then we can make a dict of segment id to switch id
-    seg_2_sw_ids_lookup = {
-        seg_id: set([edge.switch_id for edge in common_sink_edges[node_id] if edge.switch_id != 0])
-            for node_id, node in nodes.items() if node.segment
-                for seg_id in set(segment.id for segment in segments.values()) if int(node.segment.get("segment_id")) == seg_id
-    }
+    # For each segment id we take the last node (in file order) of that segment and the switch ids of the edges driving it
+    file_order_seg_ids: np.ndarray = node_segment_ids[rrg.node_ids]
+    rev_seg_ids, rev_first_idxs = np.unique(file_order_seg_ids[::-1], return_index=True)
+    seg_2_sw_ids_lookup = {}
+    for seg_id, rev_idx in zip(rev_seg_ids.tolist(), rev_first_idxs.tolist()):
+        if seg_id in segments:
+            seg_node_id: int = int(rrg.node_ids[len(file_order_seg_ids) - 1 - rev_idx])
+            seg_2_sw_ids_lookup[seg_id] = set([
+                sw_id for sw_id in rrg.edge_switch[rrg.node_fanin_edges(seg_node_id)].tolist() if sw_id != 0
+            ])
     # now get int -> int mapping
     seg_2_sw_ids_lookup = {
         seg_id: sw_ids.pop() for seg_id, sw_ids in seg_2_sw_ids_lookup.items()
     }
 
-    # Create a list of nodes which are ignored PRE pruning because of thier strangeness
-    error_nodes: Dict[int, Node] = {}
-    error_no_fanin_edges: Dict[int, Edge] = {}
-    error_no_fanout_edges: Dict[int, Edge] = {}
-
-
-    # Routing wire driving switches
-    # gen_r_wire_sw_ids = set([node. for node in nodes.values() if node.type in ["CHANX", "CHANY"] and node.segment]
-    # gen_r_drv_switches = {
-    #     sw_id: switch for sw_id, switch in switches.items() if switch.name != "__vpr_delayless_switch__" and switch.type == "mux"
-    # }
-
     # Stdout log formatting
     stdout_col_width = 30
     long_stdout_col_width = 40
 
-    # Sort the common sources by also having the same switch id
-    mux_infos: Dict[str, dict] = defaultdict(dict)
-    freq_info: Dict[str, dict] = defaultdict(dict)
-    for k, v in common_sink_edges.items():
-        # If one of its sources has switch id of 2 or 3 then its a SB mux driven edge
-        edges: List[Edge] = v
-        node_id: int = k 
-
-        # Some nodes have no fanin or fanout, because of them being difficult to deal with we're gonna skip them for now TODO print these to another file to debug
-        if not edges:
-            continue
-
-        # Make sure that all edges are driving a node with type L4 or L16 
-        # all([edge.switch_id in [L4_SW_ID, L16_SW_ID] for edge in edges])
-
-        # Make sure that all edges are driving a node with a type in our segment types (representing general programmable routing)
-        # AND Make sure that there exists a common src for the same sink -> Basically is this a non terminal SINK node
-        # wire_segment_id: int = int(nodes[edges[0].sink_node].segment.get("segment_id")) if nodes[edges[0].sink_node].segment else None
-        wire_segment_id: int = int(nodes[node_id].segment.get("segment_id")) if nodes[node_id].segment else None
-        if (wire_segment_id in list(segments.keys()) ) and node_id in common_src_edges.keys():
-
-            # Make sure that all edges have the same switch id
-            # In unidirectional routing, all edges which have the same sink should have the same Switch id in most cases
-            # There could be edge cases for connection block ipins where this may be wrong
-            assert all([edges[0].switch_id == edge.switch_id for edge in edges]), f"Switch ID Mismatch: {edges}"
-
-            # Init to empty dict
-            mux_infos[node_id]['fanin'] = {}
-            # Once its been initialized put fanin for each switch id and total
-            for edge in edges:
-                # Find the the switch type of each src going into our common sink
-                # print(f"Edge: {edge}")
-                # print(f"Common Sink Edges: {common_sink_edges[edge.src_node]}")
-                
-                # This condition is happening with a fanin 1 wire, seems weird but is edge case so we will skip for now 
-                if not common_sink_edges.get(edge.src_node):
-                    # If we can't find the src node driving the edge, we can fall back on assuming that there is a single driver per wire type
-                    src_sw_id = seg_2_sw_ids_lookup[int(nodes[edge.sink_node].segment.get("segment_id"))]
-                else:
-                    src_sw_id = common_sink_edges[edge.src_node][0].switch_id
-                    # Make sure that all nodes in the common_sink_edges[edge.src_node] have the same switch id, again meaning they all are inputs to the same SB mux 
-                    assert all(common_sink_edges[edge.src_node][0].switch_id == sw_edge.switch_id for sw_edge in common_sink_edges[edge.src_node]), f"Switch ID Mismatch: {common_sink_edges[edge.src_node]}"
-                
-                # Just making sure above is correct
-                # assert all(common_sink_edges[edge.src_node][0].switch_id == edge.switch_id for edge in common_sink_edges[edge.src_node]), f"Switch ID Mismatch: {common_sink_edges[edge.src_node]}" 
-                
-                # Initialize with 0 if not already in dict, if it is we increment by 1
-                mux_infos[node_id]['fanin'][src_sw_id] = mux_infos[node_id]['fanin'].get(src_sw_id, 0) + 1
-
-            # Set total fanin from all edges
-            mux_infos[node_id]['fanin']['total'] = len(edges)
-            # Set the wire type for this node
-            mux_infos[node_id]['wire_type'] = segments[wire_segment_id].name
-            
-            # Assert that the sum of all fanin values is equal to the total fanin
-            assert len(edges) == sum(mux_infos[node_id]['fanin'][sw_id] for sw_id in mux_infos[node_id]['fanin'] if sw_id != 'total'), f"Fanin Mismatch: \nEdges ({len(edges)}):{edges}\nmux_infos: {mux_infos[node_id]['fanin']}"
-        else:
-            # Must be a node with no fanin
-            # Assert that this is Starting SOURCE node is of type SOURCE ie Not an IPIN / OPIN / CHANX / CHANY
-            # assert nodes[edges[0].sink_node].type in ["SOURCE", "OPIN"], f"Node: {nodes[edges[0].sink_node]} Edge: {edges[0]} is not a SOURCE / OPIN node"
-            
-            # Assert that this type is NOT in our segment types
-            try:
-                assert wire_segment_id not in list(segments.keys()), f"Node: {nodes[node_id]} Edge: {edges[0]} is in Segment types with NO Fanout"
-            except AssertionError:
-                error_nodes[node_id] = (nodes[node_id])
-                error_no_fanout_edges[node_id] = edges\
-                # print(f"Node: {nodes[edges[0].sink_node]} Edge: {edges[0]} is in Segment types and has NO fanout")
-
-
-    # switch_lookups = {
-    #     0: "LB_OPIN_WIRE",
-    #     1: "CB_IPIN_WIRE",
-    #     2: "L4_WIRE",
-    #     3: "L16_WIRE"
-    # }
-
-    for k, v in common_src_edges.items():
-        edges: List[Edge] = v
-        node_id: int = k
-        # any([edge.switch_id in [L4_SW_ID, L16_SW_ID, ] for edge in edges])
-
-        # print(f"Node: {nodes[node_id]}")
-        # print(f"Edges: {edges}")
-
-        # Make sure that all src edges are a node with a type in our segment types (representing general programmable routing)
-        # wire_segment_id: int = int(nodes[edges[0].src_node].segment.get("segment_id")) if nodes[edges[0].src_node].segment else None
-        
-        wire_segment_id: int = int(nodes[node_id].segment.get("segment_id")) if nodes[node_id].segment else None
-        # Make sure that our source nodes correspond to a SB mux (filtered in fanins)
-        if (wire_segment_id in list(segments.keys()) ) and node_id in common_sink_edges.keys():
-            # Init to empty dict
-            mux_infos[node_id]['fanout'] = {}
-            # Once its been initialized put fanin for each switch id and total
-            for edge in edges:
-                # Initialize with 0 if not already in dict, if it is we increment by 1
-                mux_infos[node_id]['fanout'][edge.switch_id] = mux_infos[node_id]['fanout'].get(edge.switch_id, 0) + 1
-            # Set total fanout from all edges
-            mux_infos[node_id]['fanout']['total'] = len(v)
-
-            # Assert that the sum of all fanout values is equal to the total fanout
-            assert len(edges) == sum(mux_infos[node_id]['fanout'][sw_id] for sw_id in mux_infos[node_id]['fanout'] if sw_id != 'total'), f"Fanout Mismatch: {edges}"
-            
-            # If we can't find the src node in common sinks then it has no fanin and we use our segment 2 switch lookup to find the right value
-            if not common_sink_edges.get(node_id):
-                mux_infos[node_id]['drv_mux_type'] = switch_lookups[seg_2_sw_ids_lookup[wire_segment_id]]
-            else:
-                # Make sure that these common src edges have the same sw id, and the same wire type if not there's a bug in vpr
-                mux_infos[node_id]['drv_mux_type'] = switch_lookups[common_sink_edges[node_id][0].switch_id]
-            
-            # assert all(edge.switch_id == edges[0].switch_id for edge in edges)
-        else: 
-            # Must be a node edge with no fanout
-            # Assert that this Terminal SINK node is of type SINK ie Not an IPIN / OPIN / CHANX / CHANY
-            # assert nodes[edges[0].sink_node].type == "SINK", f"Node: {nodes[edges[0].sink_node]} Edge: {edges[0]} is not a SINK node"
-
-            # This assertion is failing with some nets not sure why
-            try:
-                 # Assert that this type is NOT in our segment types
-                assert wire_segment_id not in list(segments.keys()), f"Node: {nodes[node_id]} Edge: {edges[0]} is in Segment types"
-            except AssertionError:
-                error_nodes[node_id] = (nodes[node_id])
-                error_no_fanin_edges[node_id] = edges
-                # print(f"Node: {nodes[edges[0].src_node]} Edge: {edges[0]} is in Segment types and has NO fanin")
-
-
-    # Uncommented below as filtering switch_ids should take care of this
-    # Remove any nets which don't have a fanout or fanin. These are SINK or SOURCE nodes which used for Logical Equivalence.
-    for k in sorted(mux_infos):
-        fanout = mux_infos[k].get('fanout')
-        fanin = mux_infos[k].get('fanin')
-        # Condition which probably means this is an I/O or something thats not represented as either a SRC or SINK 
-        if not fanout or not fanin:
-            del mux_infos[k]
-
-
-        
-        # If Mux is Driving general programmable routing
-        # if nodes[node_id].segment:
-        #     # Get the segment id for the node
-        #     # seg_id = int(nodes[node_id].segment.get("segment_id"))
-        #     # # Get the switch id for the node
-        #     # sw_id = seg_2_sw_ids_lookup[seg_id]
-        #     # sw_type = switch_lookups[sw_id]
-        #     # Sanity Assertion
-        #     # assert sw_type == switch_lookups[common_sink_edges[nodes[node_id]].switch_id]
-
-        # # If its not we should only look for connection block ipins 
-        # elif common_sink_edges.get(nodes[node_id]) and switch_lookups[ common_sink_edges[nodes[node_id]].switch_id] == "ipin_cblock":
-        #     mux_freq_info["ipin_cblock"]
-            
-
-
     # Get list of gen wire segment ids
     seg_ids = list(segments.keys())
+    gen_wire_nodes: np.ndarray = np.isin(node_segment_ids, seg_ids)
+
+    # Muxes are the nodes of a general routing segment type which have both fanin and fanout
+    mux_nodes: np.ndarray = gen_wire_nodes & has_fanin & (num_fanout_edges > 0)
+    mux_fanin_edges: np.ndarray = mux_nodes[fanin_sinks]
+    mux_fanin_sinks: np.ndarray = fanin_sinks[mux_fanin_edges]
+    mux_fanin_srcs: np.ndarray = rrg.edge_src[rrg.fanin_edges[mux_fanin_edges]]
+
+    # Make sure that all edges have the same switch id
+    # In unidirectional routing, all edges which have the same sink should have the same Switch id in most cases
+    # There could be edge cases for connection block ipins where this may be wrong
+    assert not np.any(node_sw_mismatch[mux_nodes]), f"Switch ID Mismatch: nodes {np.flatnonzero(node_sw_mismatch & mux_nodes)} driven by multiple switches"
+    # Make sure that all edges into the srcs have the same switch id, again meaning they all are inputs to the same SB mux 
+    assert not np.any(node_sw_mismatch[mux_fanin_srcs]), f"Switch ID Mismatch: nodes {np.unique(mux_fanin_srcs[node_sw_mismatch[mux_fanin_srcs]])} driven by multiple switches"
+
+    # Find the the switch type of each src going into our common sink
+    # If the src node has no fanin, we can fall back on assuming that there is a single driver per wire type
+    seg_drv_sw_ids: np.ndarray = np.full(max(seg_ids) + 1, -1, dtype=np.int64)
+    for seg_id, sw_id in seg_2_sw_ids_lookup.items():
+        seg_drv_sw_ids[seg_id] = sw_id
+    mux_fanin_src_sw_ids: np.ndarray = np.where(
+        has_fanin[mux_fanin_srcs], node_drv_sw_ids[mux_fanin_srcs], seg_drv_sw_ids[node_segment_ids[mux_fanin_sinks]]
+    )
+    assert np.all(mux_fanin_src_sw_ids >= 0), f"No driving switch found for segments of nodes {np.unique(mux_fanin_sinks[mux_fanin_src_sw_ids < 0])}"
+
+    # Mux fanout edges, the fanout CSR keeps each mux's edges in file order
+    fanout_srcs: np.ndarray = rrg.edge_src[rrg.fanout_edges]
+    mux_fanout_edges: np.ndarray = mux_nodes[fanout_srcs]
+
+    # Visited in order of first appearance as an edge sink to keep the ordering of the switch types in output
+    mux_node_ids: np.ndarray = np.flatnonzero(mux_nodes)
+    mux_node_ids = mux_node_ids[np.argsort(rrg.fanin_edges[rrg.fanin_ptr[mux_node_ids]], kind="stable")]
+    mux_infos: Dict[int, dict] = {
+        node_id: {
+            'fanin': {},
+            'wire_type': segments[seg_id].name,
+            'fanout': {},
+            'drv_mux_type': switch_lookups[sw_id],
+        } for node_id, seg_id, sw_id in zip(
+            mux_node_ids.tolist(), node_segment_ids[mux_node_ids].tolist(), node_drv_sw_ids[mux_node_ids].tolist()
+        )
+    }
+    # Fanin / fanout counts of each switch id, keys in order the switch id is first seen in the node's edges
+    for param_key, group_ids, sw_ids, totals in [
+        ('fanin', mux_fanin_sinks, mux_fanin_src_sw_ids, num_fanin_edges),
+        ('fanout', fanout_srcs[mux_fanout_edges], rrg.edge_switch[rrg.fanout_edges[mux_fanout_edges]], num_fanout_edges),
+    ]:
+        for node_id, sw_id, sw_count in zip(*[arr.tolist() for arr in count_keys_per_group(group_ids, sw_ids)]):
+            mux_infos[node_id][param_key][sw_id] = sw_count
+        # Set total fanin / fanout from all edges
+        for node_id, total in zip(mux_node_ids.tolist(), totals[mux_node_ids].tolist()):
+            mux_infos[node_id][param_key]['total'] = total
+
+    chanx_nodes: np.ndarray = gen_wire_nodes & (rrg.node_type == rrg.type_code("CHANX"))
+    chany_nodes: np.ndarray = gen_wire_nodes & (rrg.node_type == rrg.type_code("CHANY"))
 
     # Device bounds
-    xmax = max(
-        [
-            int(nodes[node_id].loc[range_key]) for node_id in list(nodes.keys()) 
-                for range_key in ['xhigh','xlow']
-                if nodes[node_id].type in ["CHANX"] and int(nodes[node_id].segment["segment_id"]) in seg_ids
-        ]
-    )
-    ymax = max(
-        [
-            int(nodes[node_id].loc[range_key]) for node_id in list(nodes.keys())
-                for range_key in ['yhigh','ylow']
-                if nodes[node_id].type in ["CHANY"] and int(nodes[node_id].segment["segment_id"]) in seg_ids
-        ]
-    )
-    xmin = min(
-        [
-            int(nodes[node_id].loc[range_key]) for node_id in list(nodes.keys())
-                for range_key in ['xhigh','xlow']
-                if nodes[node_id].type in ["CHANX"] and int(nodes[node_id].segment["segment_id"]) in seg_ids
-        ]
-    )
-    ymin = min(
-        [
-            int(nodes[node_id].loc[range_key]) for node_id in list(nodes.keys())
-                for range_key in ['yhigh','ylow']
-                if nodes[node_id].type in ["CHANY"] and int(nodes[node_id].segment["segment_id"]) in seg_ids
-        ]
-    )
+    xmax = int(max(rrg.node_xhigh[chanx_nodes].max(), rrg.node_xlow[chanx_nodes].max()))
+    ymax = int(max(rrg.node_yhigh[chany_nodes].max(), rrg.node_ylow[chany_nodes].max()))
+    xmin = int(min(rrg.node_xhigh[chanx_nodes].min(), rrg.node_xlow[chanx_nodes].min()))
+    ymin = int(min(rrg.node_yhigh[chany_nodes].min(), rrg.node_ylow[chany_nodes].min()))
 
     # Delete any mux infos from list that are on or have input / output on the boundary
-    node_coord_xkeys = ['xlow', 'xhigh']
-    node_coord_ykeys = ['ylow', 'yhigh']
-    for k in sorted(mux_infos):
-        node: Node = nodes[k]
-        if node.type == "CHANX" or node.type == "CHANY":
-            # Check if its on the boundary
-            chans_on_bounds = [
-                int(node.loc[xkey]) <= xmin or int(node.loc[xkey]) >= xmax or \
-                    int(node.loc[ykey]) <= ymin or int(node.loc[ykey]) >= ymax 
-                    for xkey, ykey in zip(node_coord_xkeys, node_coord_ykeys)
-            ]
-            if any(chans_on_bounds):
-                    # Prune any node in edge list which has a coordinate on the boundary
-                    del mux_infos[k]
-                    continue
+    chan_nodes: np.ndarray = np.isin(rrg.node_type, [code for code in [rrg.type_code("CHANX"), rrg.type_code("CHANY")] if code >= 0])
+    chans_on_bounds: np.ndarray = chan_nodes & np.any(
+        [
+            (x <= xmin) | (x >= xmax) | (y <= ymin) | (y >= ymax)
+                for x, y in [(rrg.node_xlow, rrg.node_ylow), (rrg.node_xhigh, rrg.node_yhigh)]
+        ], axis = 0
+    )
+    mux_infos = {node_id: mux_info for node_id, mux_info in mux_infos.items() if not chans_on_bounds[node_id]}
     
     device_num_tiles_no_bounds = ((xmax-1) - (xmin + 1)) * ((ymax - 1) - (ymin + 1) )
 
     mux_freq_info = defaultdict(dict)
-    # Use the common sink edges to find the number of muxes of each type (filtered with bounds)
-    for node_id in mux_infos.keys():
-        # Get the switch type for the node
-        sw_type = switch_lookups[common_sink_edges[node_id][0].switch_id]
-        # Count the number of Muxes of this  
-        mux_freq_info[sw_type]["FREQ"] = mux_freq_info[sw_type].get("FREQ", 0) + 1
+    # Count the number of muxes of each switch type (filtered with bounds), switch types in order of first appearance
+    bounded_mux_node_ids: np.ndarray = np.fromiter(mux_infos.keys(), dtype=np.int64, count=len(mux_infos))
+    drv_sw_ids, drv_sw_first_idxs, drv_sw_counts = np.unique(node_drv_sw_ids[bounded_mux_node_ids], return_index=True, return_counts=True)
+    for sw_idx in np.argsort(drv_sw_first_idxs).tolist():
+        sw_type = switch_lookups[int(drv_sw_ids[sw_idx])]
+        mux_freq_info[sw_type]["FREQ"] = mux_freq_info[sw_type].get("FREQ", 0) + int(drv_sw_counts[sw_idx])
 
     # This calculates the frequency of Switches per tile but does not account for Hardblocks ie 
     #   Assumes that the same number of switches exist in a hard block + a regular tile (could over estimate)
     for sw_type in mux_freq_info.keys():
         mux_freq_info[sw_type]["FREQ_PER_TILE"] = mux_freq_info[sw_type]["FREQ"] / device_num_tiles_no_bounds
 
-
-    # Getting fanout fanin freq information
-    for k in mux_infos.keys():
-        for param_key in ['fanout', 'fanin']:
-            # if not mux_infos[k].get(param_key):
-            #     continue
-            if not freq_info.get(param_key):
-                freq_info[param_key] = {} 
-            # If fanout / fanin val not in freq_info[param_key] then add it and set to 0
-            # freq_info ["fanin/fanout"] [SWITCH_ID]
-            # iterate over sw_ids in the parameter keys
-            for sw_id in mux_infos[k][param_key].keys():
-                if freq_info[param_key].get(sw_id) is None:
-                    freq_info[param_key][sw_id] = {}
-                # freq_info [fanin/fanout] [SWITCH_ID] [FANIN/FANOUT_VAL] = freq_info [fanin/fanout] [SWITCH_ID] [FANIN/FANOUT_VAL] + 1
-                param_val = mux_infos[k][param_key][sw_id]
-                freq_info[param_key][sw_id][param_val] = freq_info[param_key][sw_id].get(param_val, 0) + 1
-
     # fanout_col_str = f"{'WIRE_FANOUT_TOTAL':<{stdout_col_width}}{'WIRE_FANOUT_L4_MUX':<{stdout_col_width}}{'WIRE_FANOUT_L16_MUX':<{stdout_col_width}}{'WIRE_FANOUT_CB_IPIN':<{stdout_col_width}}"
     # fanin_col_str = f"{'WIRE_FANIN_TOTAL':<{stdout_col_width}}{'WIRE_FANIN_L4_MUX':<{stdout_col_width}}{'WIRE_FANIN_L16_MUX':<{stdout_col_width}}{'WIRE_FANIN_CB_IPIN':<{stdout_col_width}}"
 
@@ -830,7 +869,7 @@ def main(argv: List[str] = [], kwargs: Dict[str, str] = {}) -> Dict[str, Dict[st
             
     print("FPGA TILE BOUNDS")
     print(f"XMIN: {xmin}, XMAX: {xmax}, YMIN: {ymin}, YMAX: {ymax}")
-    print(f"NUM RR_NODES: {len(nodes)}")
+    print(f"NUM RR_NODES: {rrg.num_nodes}")
 
     stats_header_cols = ["WIRE_TYPE", "DRV_TYPE", "COL_TYPE", "MEAN", "STD_DEV", "MIN", "MAX", "PRUNED_MEAN", "PRUNED_STD_DEV", "PRUNE_CHANGE_%"]
     stats_header = ''.join([ f"{col:<{stdout_col_width}}" for col in stats_header_cols ])
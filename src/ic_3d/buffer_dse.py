@@ -1,5 +1,5 @@
 # General imports
-from typing import List, Dict, Tuple, Set, Union, Any, Type
+from typing import List, Dict, Tuple, Set, Union, Any, Type, Callable
 import os, sys
 from dataclasses import dataclass, asdict
 import datetime
@@ -12,6 +12,7 @@ import copy
 import math
 import pandas as pd
 import io
+import hashlib
 from functools import reduce
 
 import plotly.graph_objects as go
@@ -841,11 +842,11 @@ def run_spice(ic_3d_info: rg_ds.Ic3d = None, sp_work_dir: str = None, sim_sp_fil
             sp.call(["hspice",os.path.join(ic_3d_info.spice_info.sp_dir,sp_work_dir,sp_file)], stdout=out_fd, stderr=out_fd)   
             out_fd.close()
     else:
-        os.chdir(sp_process.sp_dir)
+        # Simulator is launched in the working dir of the process rather than changing ours, so several can run at once
         outfile = f"{sp_process.sp_outfile}"
         out_fd = open(outfile,"w")
         print(f"Running {sp_process.sp_file}")
-        sp.call(["hspice",sp_process.sp_file], stdout=out_fd, stderr=out_fd)
+        sp.call(["hspice",sp_process.sp_file], stdout=out_fd, stderr=out_fd, cwd=sp_process.sp_dir)
         out_fd.close()     
     os.chdir(cwd)
     return outfile
@@ -1044,17 +1045,7 @@ def write_sp_buffer_updated(ic_3d_info: rg_ds.Ic3d, sweep_params: Dict[str, Any]
         if obj_dir_path != None:
             sp_title = os.path.basename(obj_dir_path)
 
-
-    sp_sim_lines = [
-        f".TITLE {sp_title}",
-        *get_subckt_hdr_lines("Include libraries, parameters and other"),
-        f'.LIB "{ic_3d_info.spice_info.include_sp_file}" INCLUDES',
-        *get_subckt_hdr_lines("Setup and input"),
-        *get_sim_setup_lines_updated(ic_3d_info, sp_testing_model),
-        *get_meas_lines_new(ic_3d_info, sp_testing_model),
-        *[get_inst_line(inst) for inst in sp_testing_model.insts],
-        '.END',
-    ]
+    sp_sim_lines = get_sp_buffer_lines(ic_3d_info, sp_testing_model, sp_title)
 
     # Make workding dir if it doesnt exist
     work_dir = os.path.join(ic_3d_info.spice_info.sp_dir, sp_title)
@@ -1071,6 +1062,163 @@ def write_sp_buffer_updated(ic_3d_info: rg_ds.Ic3d, sweep_params: Dict[str, Any]
     return sp_out_process
 
 
+def get_sp_buffer_lines(ic_3d_info: rg_ds.Ic3d, sp_testing_model: rg_ds.SpTestingModel, sp_title: str) -> List[str]:
+    """
+        Returns the lines of the spice file simulating 'sp_testing_model' (see `buffer_sim_setup_updated`) titled 'sp_title'
+    """
+    return [
+        f".TITLE {sp_title}",
+        *get_subckt_hdr_lines("Include libraries, parameters and other"),
+        f'.LIB "{ic_3d_info.spice_info.include_sp_file}" INCLUDES',
+        *get_subckt_hdr_lines("Setup and input"),
+        *get_sim_setup_lines_updated(ic_3d_info, sp_testing_model),
+        *get_meas_lines_new(ic_3d_info, sp_testing_model),
+        *[get_inst_line(inst) for inst in sp_testing_model.insts],
+        '.END',
+    ]
+
+
+# Results of buffer simulations are kept on disk (one json file per simulated deck) so sweeps can be rerun / extended
+# while only simulating the decks which were not simulated before.
+
+# Name of the directory (in the spice dir) holding the buffer simulation results
+BUFFER_SIM_CACHE_DNAME = "buffer_sim_cache"
+
+
+def get_file_digest(fpath: str) -> str:
+    """
+        Returns the sha256 of the contents of 'fpath', or "missing" if it does not exist
+    """
+    if not os.path.isfile(fpath):
+        return "missing"
+    file_hash = hashlib.sha256()
+    with open(fpath, "rb") as fd:
+        for chunk in iter(lambda: fd.read(1 << 20), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def get_sp_libs_digest(spice_info: rg_ds.SpInfo) -> str:
+    """
+        Returns a digest of the libraries included by the buffer simulations (includes, process data, sweep data, subcircuits and device models),
+        these must be written out (see `spice_simulation_setup`) before calling this.
+    """
+    lib_fpaths = [
+        spice_info.include_sp_file, 
+        spice_info.process_data_file, 
+        spice_info.sweep_data_file, 
+        spice_info.basic_subckts_file, 
+        spice_info.subckts_file, 
+        spice_info.model_file,
+    ]
+    return hashlib.sha256("\n".join(get_file_digest(fpath) for fpath in lib_fpaths).encode()).hexdigest()
+
+
+def get_buffer_sim_key(ic_3d_info: rg_ds.Ic3d, sweep_params: Dict[str, Any], inv_sizes: List[Dict[str, float]], libs_digest: str) -> str:
+    """
+        Returns the key of a buffer simulation in the cache, a digest of everything that goes into its spice deck:
+        the sweep parameters (process, ubump, wire length, stages, stage ratio, target frequency), the inverter sizes, 
+        the sizing / simulation settings and the included libraries ('libs_digest', see `get_sp_libs_digest`).
+    """
+    sp_testing_model = buffer_sim_setup_updated(ic_3d_info, sweep_params, inv_sizes)
+    # Title and library path depend on when and where the deck is written rather than what is simulated
+    sp_deck = "\n".join(
+        line for line in get_sp_buffer_lines(ic_3d_info, sp_testing_model, sp_title = "") 
+        if not line.startswith((".TITLE", ".LIB"))
+    )
+    return hashlib.sha256(f"{libs_digest}\n{sp_deck}".encode()).hexdigest()
+
+
+def load_buffer_sim_result(cache_dpath: str, key: str) -> Dict[str, Any] | None:
+    """
+        Returns the cached {"measurements": [...], "opt_params": [...]} of buffer simulation 'key', None if it was not simulated before
+    """
+    cache_fpath = os.path.join(cache_dpath, f"{key}.json")
+    if not os.path.isfile(cache_fpath):
+        return None
+    try:
+        with open(cache_fpath, "r") as fd:
+            return json.load(fd)
+    except (OSError, json.JSONDecodeError):
+        # A corrupted result is simulated again and overwritten
+        return None
+
+
+def save_buffer_sim_result(cache_dpath: str, key: str, result: Dict[str, Any]) -> None:
+    """
+        Stores 'result' of buffer simulation 'key', written to a temporary file first so readers never see a partial result
+    """
+    os.makedirs(cache_dpath, exist_ok = True)
+    cache_fpath = os.path.join(cache_dpath, f"{key}.json")
+    tmp_fpath = f"{cache_fpath}.{os.getpid()}.tmp"
+    with open(tmp_fpath, "w") as fd:
+        json.dump(result, fd)
+    os.replace(tmp_fpath, cache_fpath)
+
+
+def run_buffer_sim(
+    ic_3d_info: rg_ds.Ic3d, 
+    sweep_params: Dict[str, Any], 
+    title: str, 
+    inv_sizes: List[Dict[str, float]] = None, 
+    cache_dpath: str = None, 
+    libs_digest: str = None,
+) -> Tuple[pd.DataFrame | None, List[Dict[str, str]], List[Dict[str, str]], bool]:
+    """
+        Writes out and runs a buffer simulation (see `write_sp_buffer_updated`) then parses its results.
+        If 'cache_dpath' is given, the results of a deck which was already simulated are read from the cache instead.
+
+        Outputs:
+            - plot_df: dataframe of the plotting data (None if the results came from the cache)
+            - measurements: list of dicts containing the measurement statement names & values
+            - opt_params: list of dicts containing the optimized parameter names & values
+            - simulated: True if the simulation was run, False if the results came from the cache
+    """
+    key = None
+    if cache_dpath is not None:
+        key = get_buffer_sim_key(ic_3d_info, sweep_params, inv_sizes, libs_digest)
+        cached_result = load_buffer_sim_result(cache_dpath, key)
+        if cached_result is not None:
+            return None, cached_result["measurements"], cached_result["opt_params"], False
+
+    sp_process = write_sp_buffer_updated(ic_3d_info, sweep_params, title, inv_sizes)
+    run_spice(sp_process = sp_process)
+    plot_df, measurements, opt_params, _ = parse_spice(ic_3d_info.res, sp_process = sp_process)
+    if key is not None:
+        save_buffer_sim_result(cache_dpath, key, {"measurements": measurements, "opt_params": opt_params})
+    return plot_df, measurements, opt_params, True
+
+
+def search_max_freq(is_passing: Callable[[float], bool], min_freq: float, max_freq: float, tol: float) -> float | None:
+    """
+        Finds the highest frequency in ['min_freq', 'max_freq'] for which 'is_passing' (e.g. a buffer sim capturing all of its measurements)
+        is True to within 'tol', assuming every frequency below a passing one passes as well.
+
+        'max_freq' is tried first as it usually passes, otherwise the pass / fail boundary is bisected between the highest passing
+        and lowest failing frequencies found so far, which takes about log2(('max_freq' - 'min_freq') / 'tol') calls to 'is_passing'.
+        
+        Returns:
+            The highest passing frequency found, or None if even 'min_freq' fails
+    """
+    if tol <= 0 or min_freq <= 0 or min_freq > max_freq:
+        raise ValueError(f"Invalid frequency search range [{min_freq}, {max_freq}] with tolerance {tol}")
+    if is_passing(max_freq):
+        return max_freq
+    pass_freq = None
+    fail_freq = max_freq
+    # Lower end of the bracket, assumed to pass until it is checked
+    low_freq = min_freq
+    while fail_freq - low_freq > tol:
+        mid_freq = (low_freq + fail_freq) / 2
+        if is_passing(mid_freq):
+            pass_freq = low_freq = mid_freq
+        else:
+            fail_freq = mid_freq
+    if pass_freq is None:
+        return min_freq if is_passing(min_freq) else None
+    return pass_freq
+
+
 def buffer_sim_setup_updated(ic_3d_info: rg_ds.Ic3d, sweep_params: Dict[str, Any], inv_sizes: List[Dict[str, float]] = None) -> rg_ds.SpTestingModel:
     # inv_sizes is a list of dicts in the following format
     # [ 
@@ -14,6 +14,7 @@ import math
 import pandas as pd
 import csv
 import random
+import multiprocessing as mp
 
 
 import plotly.subplots as subplots
@@ -176,40 +177,25 @@ def run_buffer_dse_updated(ic_3d_info: rg_ds.Ic3d):
     sp.run(["mkdir", "-p", f"{ic_3d_info.spice_info.subckt_lib_dir}"])
     sp.run(["mkdir", "-p", f"{ic_3d_info.spice_info.includes_dir}"])
 
-    csv_headers_written = False
-    for process_info in ic_3d_info.process_infos:
-        ####################### INIT DATA STRUCTS #######################
-        ic_3d_info.design_info.process_info = process_info
-        ####################### BUFFER DOMAIN SPACE EXPLORATION #######################
-        # Written from the tech_info struct out to spice files
-        # Maybe we can get rid of tech_info ? Lets try
-        for ubump_info in ic_3d_info.ubump_infos:
-            
-            ic_3d_info.design_info.package_info = rg_ds.PackageInfo( 
-                ubump_info=ubump_info,
-                esd_rc_params=ic_3d_info.esd_rc_params,
-            )
-
-            # This function initializes subcircuits / libraries and writes out to spice files
-            ic_3d_info.design_info = buff_dse.spice_simulation_setup(ic_3d_info)
-
-            # Initial guess of target frequency for the inverter chain
-            init_tfreq = 1000
-            # final_report_rows = []
-            # final_fig = subplots.make_subplots(cols = len(ic_3d_info.stage_range), rows=1)
-            # cur_best_cost = sys.float_info.max 
-            # best_sp_run = None
-
+    # Buffer sims run on a pool of worker processes, each in its own spice working directory
+    num_workers = max(1, ic_3d_info.args.buffer_dse_workers if ic_3d_info.args.buffer_dse_workers else 1)
+    # Results of previously simulated decks are read from the cache rather than simulated again
+    cache_dpath = None if ic_3d_info.args.no_buffer_dse_cache else os.path.join(ic_3d_info.spice_info.sp_dir, buff_dse.BUFFER_SIM_CACHE_DNAME)
+
+    # Highest target frequency (MHz) tried for the inverter chain, the max frequency of each point is searched below it
+    init_tfreq = ic_3d_info.args.buffer_max_freq
+
+    # Flatten the sweep into independent jobs, the spice libraries of each process / ubump are written out up front
+    jobs: List[Tuple[rg_ds.Ic3d, Dict[str, Any], str, str, str]] = []
+    for process_idx, process_info in enumerate(ic_3d_info.process_infos):
+        for ubump_idx, ubump_info in enumerate(ic_3d_info.ubump_infos):
+            group_tag = f"{process_idx}-{process_info.name}-ubump{ubump_idx}"
+            group_info = get_buffer_dse_group_info(ic_3d_info, process_info, ubump_info, group_tag)
+            libs_digest = buff_dse.get_sp_libs_digest(group_info.spice_info)
             # TODO instead of looping over specific values, look for all values specified bty users and sweep over those
             for add_wlen in ic_3d_info.add_wlens:
                 for n_stages in ic_3d_info.stage_range:
-                    ic_3d_info.design_info.dut_buffer_nstages = n_stages
-                    # Init the parameters for this size of buffer chain
-                    ic_3d_info.design_info.total_nstages = ic_3d_info.design_info.shape_nstages + ic_3d_info.design_info.dut_buffer_nstages + ic_3d_info.design_info.sink_die_nstages
-
-                    # fanout_sweep_fig = go.Figure()
                     for buff_fanout in ic_3d_info.fanout_range:
-                        # final_report_row = {}
                         sweep_params = {
                             # sim params
                             "target_freq": init_tfreq,
@@ -222,191 +208,296 @@ def run_buffer_dse_updated(ic_3d_info: rg_ds.Ic3d):
                             # process params
                             "process_info" : process_info,
                         }
-                        ### OPT PN SIZES BEFORE RUNNING SIM ###
-                        cur_tfreq = init_tfreq
-                        sim_iters = 0
-                        inv_sizes = []
-                        while True:
-                            # print(f"Running sim for {n_stages} stages, {buff_fanout} fanout, {cur_tfreq} target freq")
-                            pn_opt_process = buff_dse.write_sp_buffer_updated(ic_3d_info, sweep_params, "pn-opt")
-                            buff_dse.run_spice(sp_process = pn_opt_process)
-                            # Measurements inputted in spice file are also our determination of simulation success, there should be no failed measurements
-                            plot_df, measurements, opt_params, _ = buff_dse.parse_spice(ic_3d_info.res, sp_process = pn_opt_process)
-                            # We probably don't want to plot the voltage waveforms for every run but if we did one would do it here
-                            # Check to make sure all measurements are captured AND they all have non "failed" values
-                            if any( [m["val"] == "failed" for m in measurements] ):
-                                # IF we get failed measurements, it may have been due to clock frequency being too fast for this load RC, so we try it again with half the clk freq
-                                cur_tfreq /= 2
-                                sweep_params["target_freq"] = cur_tfreq
-                                print(f"Delay measure statements not captured, trying again with reduced target frequency {cur_tfreq}")
-                            else:
-                                if all( tx in ic_3d_info.tx_sizing.opt_mode for tx in ["N", "P"]):
-                                    # filter out opt_params to condense the
-                                    wn_opt_params = [ opt_param for opt_param in opt_params if "wn" in opt_param["name"] ]
-                                    wp_opt_params = [ opt_param for opt_param in opt_params if "wp" in opt_param["name"] ]
-                                    # This may assume that the order of the opt_params is the same for wn and wp, but it should be TODO fix
-                                    for wn_opt_param, wp_opt_param in zip(wn_opt_params, wp_opt_params):
-                                        inv_size = {
-                                            "wn": int(float(wn_opt_param["val"])),
-                                            "wp": int(float(wp_opt_param["val"])),
-                                        }
-                                        inv_sizes.append(inv_size)
-                                else:
-                                    # Lets capture the optimized pn sizes and other information from measurements
-                                    for opt_param in opt_params:
-                                        inv_size = {}
-                                        name = opt_param["name"]
-                                        # convert to int as we are using finfets
-                                        val = int(float(opt_param["val"]))
-                                        # Make sure the result is actually an int in the first place
-                                        assert int(float(opt_param["val"])) == float(opt_param["val"]), f"Finfet Width {name} is not an integer, got {opt_param['val']}, check your HSpice optimization settings"
-                                        # we assume that wn & wp are somewhere in the optimization params
-                                        if "wn" in name:
-                                            inv_size["wn"] = val
-                                        elif "wp" in name:
-                                            inv_size["wp"] = val
-                                        else:
-                                            raise ValueError(f"Optimization parameter {name} not recognized")
-                                        # if the user defined a particular inv to be static we will use that value 
-                                        if "wn" not in inv_size.keys() and "N" not in ic_3d_info.tx_sizing.opt_mode:
-                                            inv_size["wn"] = ic_3d_info.tx_sizing.nmos_sz
-                                        if "wp" not in inv_size.keys() and "P" not in ic_3d_info.tx_sizing.opt_mode:
-                                            inv_size["wn"] = ic_3d_info.tx_sizing.pmos_sz
-                                        # assert ("wn" in inv_size.keys() and "wp" in inv_size.keys() and len(inv_size.keys()) == 2), f"inv_size dict keys are malformed, got {inv_size.keys()}, {inv_size}"
-                                        inv_sizes.append(inv_size)
-                                # if all measurements are there we can break out of loop
-                                break 
+                        point_tag = f"{group_tag}-wlen{add_wlen}-stages{n_stages}-fanout{buff_fanout}"
+                        jobs.append((group_info, sweep_params, point_tag, cache_dpath, libs_digest))
+
+    num_sims = 0
+    num_cached_sims = 0
+    if num_workers > 1 and len(jobs) > 1:
+        pool = mp.Pool(min(num_workers, len(jobs)))
+        point_results = pool.imap(run_buffer_dse_point_job, jobs)
+    else:
+        pool = None
+        point_results = map(run_buffer_dse_point_job, jobs)
+    try:
+        # Results come back in sweep order, so the reports are written in the same order as a serial sweep
+        for job_idx, ((group_info, sweep_params, _, _, _), point_result) in enumerate(zip(jobs, point_results)):
+            num_sims += point_result["num_sims"]
+            num_cached_sims += point_result["num_cached_sims"]
+            set_buffer_dse_nstages(group_info, sweep_params["n_stages"])
+            # Report the frequency the point was simulated at
+            sweep_params = {**sweep_params, "target_freq": point_result["target_freq"]}
+            report_buffer_dse_point(group_info, sweep_params, point_result["inv_sizes"], point_result["measurements"], point_result["target_freq"], write_csv_headers = (job_idx == 0))
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    print(f"Buffer DSE ran {num_sims} spice simulations, {num_cached_sims} results were found in the cache")
+
+
+def get_buffer_dse_group_info(ic_3d_info: rg_ds.Ic3d, process_info: rg_ds.ProcessInfo, ubump_info: rg_ds.SolderBumpInfo, group_tag: str) -> rg_ds.Ic3d:
+    """
+        Returns a copy of 'ic_3d_info' set up to simulate buffers with 'process_info' and 'ubump_info', after writing out thier spice libraries.
+        The libraries of each group are written to thier own subdirectory 'group_tag' of the subckt / include dirs, 
+        so buffer sims of different groups can run at the same time.
+    """
+    group_info = copy.copy(ic_3d_info)
+    group_info.design_info = copy.deepcopy(ic_3d_info.design_info)
+    group_info.process_data = copy.deepcopy(ic_3d_info.process_data)
+    group_info.design_info.process_info = process_info
+    group_info.design_info.package_info = rg_ds.PackageInfo( 
+        ubump_info=ubump_info,
+        esd_rc_params=ic_3d_info.esd_rc_params,
+    )
+
+    spice_info = copy.copy(ic_3d_info.spice_info)
+    spice_info.subckt_lib_dir = os.path.join(ic_3d_info.spice_info.subckt_lib_dir, group_tag)
+    spice_info.basic_subckts_file = os.path.join(spice_info.subckt_lib_dir, os.path.basename(ic_3d_info.spice_info.basic_subckts_file))
+    spice_info.subckts_file = os.path.join(spice_info.subckt_lib_dir, os.path.basename(ic_3d_info.spice_info.subckts_file))
+    spice_info.includes_dir = os.path.join(ic_3d_info.spice_info.includes_dir, group_tag)
+    spice_info.include_sp_file = os.path.join(spice_info.includes_dir, os.path.basename(ic_3d_info.spice_info.include_sp_file))
+    spice_info.process_data_file = os.path.join(spice_info.includes_dir, os.path.basename(ic_3d_info.spice_info.process_data_file))
+    spice_info.sweep_data_file = os.path.join(spice_info.includes_dir, os.path.basename(ic_3d_info.spice_info.sweep_data_file))
+    os.makedirs(spice_info.subckt_lib_dir, exist_ok = True)
+    os.makedirs(spice_info.includes_dir, exist_ok = True)
+    group_info.spice_info = spice_info
+
+    # This function initializes subcircuits / libraries and writes out to spice files
+    group_info.design_info = buff_dse.spice_simulation_setup(group_info)
+    return group_info
+
+
+def set_buffer_dse_nstages(ic_3d_info: rg_ds.Ic3d, n_stages: int) -> None:
+    """
+        Init the parameters for a buffer chain of 'n_stages' stages
+    """
+    ic_3d_info.design_info.dut_buffer_nstages = n_stages
+    ic_3d_info.design_info.total_nstages = ic_3d_info.design_info.shape_nstages + ic_3d_info.design_info.dut_buffer_nstages + ic_3d_info.design_info.sink_die_nstages
 
-                            if sim_iters > 15:
-                                print(f"Failed to get delay measure statements after {sim_iters} iterations")
-                                print(f"Opening Voltage vs Time plot for debugging...")
-                                buff_dse.plot_time_vs_voltage(ic_3d_info.sp_sim_settings, plot_df)
-                                for l in rg_utils.get_df_output_lines(pd.DataFrame(measurements)):
-                                    print(l)
-                                print("Exiting...")
-                                sys.exit(1)
-
-                            sim_iters += 1                                    
-
-                        # TODO come back to this to get delay plots working again
-                        # buff_dse.plot_sp_run(ic_3d_info, show_flags, sp_run_info, sp_run_df)
-
-                        # Write the simulation with the optimized pn sizes found above, this is just to prevent weirdness between hspice opt commands and our results
-                        sized_buffer_process = buff_dse.write_sp_buffer_updated(ic_3d_info, sweep_params, "sized", inv_sizes)
-                        buff_dse.run_spice(sp_process = sized_buffer_process)
-                        plot_df, measurements, _, _ = buff_dse.parse_spice(ic_3d_info.res, sp_process = sized_buffer_process)
-                        
-                        ####################### CREATE CIRCUIT ITERATION INFO #######################
-                        # Store all measurements not found in key substrs into a dict
-                        circuit_info = {}
-                        # Create invs info list, this is a list of attributes for each inverter in the chain
-                        inv_infos = [{} for _ in range(ic_3d_info.design_info.total_nstages)]
-                        # Go through measurements dict and populate invs_info with relevant keys
-                        # TODO remove hardcoding of these strings
-                        neg_circuit_info_key_substrs = ["best_ratio", "falling_prop_delay", "rising_prop_delay", "tpd", "diff"]
-                        inv_info_key_substrs = ["rising_prop_delay", "falling_prop_delay", "max_prop_delay", "t_rise", "t_fall"]
-                        inv_idx = 0
-                        for meas in measurements:
-                            if any(f"{key_substr}_{inv_idx}" == meas["name"] for key_substr in inv_info_key_substrs):
-                                # Assumes not more than 1 key substr in a measurement name
-                                key = [key_substr for key_substr in inv_info_key_substrs if key_substr in meas["name"]][0]
-                                inv_infos[inv_idx][key] = float(meas["val"])                                
-                                # increment inverter we are saving data into once we get a copy of each key
-                                if len(inv_infos[inv_idx].keys()) == len(inv_info_key_substrs):
-                                    inv_idx += 1
-                            else:
-                                # TODO remove this hardcoding
-                                # This is just to not include the best ratios in circuit info, they should really be in inv_infos but dont want to break plotting
-                                if not any(key_substr in meas["name"] for key_substr in neg_circuit_info_key_substrs):
-                                    circuit_info[meas["name"]] = float(meas["val"])
-                        
-                        #    _   ___ ___   _      ___   _   _    ___ 
-                        #   /_\ | _ \ __| /_\    / __| /_\ | |  / __|
-                        #  / _ \|   / _| / _ \  | (__ / _ \| |_| (__ 
-                        # /_/ \_\_|_\___/_/ \_\  \___/_/ \_\____\___|
-                        inv_areas = []
-                        for i, inv_size in enumerate(inv_sizes):
-                            # Calculate the multiplier for the stage ratio of each stage, we reset the stage ratio back to 1 after the last stage of driver buffer, these are the sizes for inverters on the sink die
-                            inv_mult_factor = sweep_params["stage_ratio"] ** i if i < ic_3d_info.design_info.total_nstages - ic_3d_info.design_info.sink_die_nstages else buff_fanout ** (i - (ic_3d_info.design_info.total_nstages - ic_3d_info.design_info.sink_die_nstages) )
-                            # multiply the fanout factor by the width of the n/pmos tx 
-                            nfet_numfins = int(float(inv_size["wn"]) * inv_mult_factor)
-                            pfet_numfins = int(float(inv_size["wp"]) * inv_mult_factor)
-                            # area of a specific inverter uses f(nfet) + f(pfet) * min_tx_area
-                            # min_width_tx_area is in nm^2 so we need to convert to um^2 -> 1e-6 
-                            # TODO <TAG> <CONVERT CLEANUP>
-                            inv_area = (buff_dse.finfet_tx_area_model(nfet_numfins) + buff_dse.finfet_tx_area_model(pfet_numfins))*(ic_3d_info.design_info.process_info.tx_geom_info.min_width_tx_area*1e-6)
-                            inv_areas.append(inv_area)
-                            # update inv_infos w/ area info
-                            inv_infos[i]["area"] = round(inv_area, 6)
-                             # update inv_infos w/ P/N sizes and inv_idx
-                            inv_infos[i]["Wp"] = inv_size['wp']
-                            inv_infos[i]["Wn"] = inv_size['wn']
-                            inv_infos[i]["inv_idx"] = i
-                            # Add buffer chain related info (duplication of whats in circuit_info) useful for sorting later
-                            inv_infos[i]["n_stages"] = sweep_params["n_stages"]
-                            inv_infos[i]["stage_ratio"] = sweep_params["stage_ratio"]
-                            inv_infos[i]["add_wlen"] = sweep_params["add_wlen"]
-                            inv_infos[i]["ubump_pitch"] = sweep_params["ubump_info"].pitch
-                            inv_infos[i]["process"] = sweep_params["process_info"].name
 
-                        
-                        # Select only the inverters which we want to evaluate results for (i.e. not the shape inverters) as we include sink inverters in model
-                        meas_invs = inv_infos[ic_3d_info.design_info.shape_nstages:len(inv_infos)]
-                        circuit_info["area"] = round(sum( [ inv["area"] for inv in meas_invs] ), 6)                        
-                        circuit_info["cost"] = round(buff_dse.calc_cost_updated(ic_3d_info.design_info, ic_3d_info.cost_fx_exps, circuit_info), 6)         
-                        # convert circuit_info to a report format
-                        # circuit_report = {}
-                        # for key, val in circuit_info.items():
-                        #     if 
-                        # Create a df for printout of the sweep parameters used in this run
-                        sweep_param_report = {}
-                        for key, val in sweep_params.items():
-                            ret_key, ret_val = rg_utils.key_val_2_report(key, val)
-                            sweep_param_report[ret_key] = ret_val 
-
-                        # vertically concat dfs for reporting
-                        sw_iter_report_df = pd.concat([ 
-                            pd.DataFrame(sweep_param_report, index=[0]),
-                            pd.DataFrame(circuit_info, index=[0]),    
-                        ], axis=1)
-
-                        invs_df = pd.DataFrame(inv_infos)
-                        
-                        # buff_dse.unit_conversion(ic_3d_info.sp_sim_settings.unit_lookup_factors["time"], x, ic_3d_info.sp_sim_settings.abs_unit_lookups, sig_figs = 5)
-                        sw_iter_report_lines = rg_utils.get_df_output_lines(sw_iter_report_df)
-                        for lines in rg_utils.create_bordered_str("Circuit Sweep Iteration Information") + sw_iter_report_lines:
-                            print(lines)
-                        
-                        inv_report_lines = rg_utils.get_df_output_lines(invs_df)
-                        for lines in rg_utils.create_bordered_str("Buffer Chain Inverter Information") + inv_report_lines:
-                            print(lines)
-
-                        # Output to csv
-                        report_output = "ic_3d_reports"
-                        os.makedirs(report_output, exist_ok=True)
-                        if not csv_headers_written:
-                            with open(f"{report_output}/buffer_summary_report.csv", "w", newline="") as csvfile:
-                                writer = csv.DictWriter(csvfile, fieldnames=sw_iter_report_df.columns)
-                                writer.writeheader()
-                            with open(f"{report_output}/buffer_inv_report.csv", "w", newline="") as csvfile:
-                                writer = csv.DictWriter(csvfile, fieldnames=invs_df.columns)
-                                writer.writeheader()
-                            csv_headers_written = True
-                        
-                        sw_iter_report_df.to_csv(os.path.join(report_output, f"buffer_summary_report.csv"), mode = "a", header=False, index=False)
-                        invs_df.to_csv(os.path.join(report_output, f"buffer_inv_report.csv"), mode = "a", header=False, index=False)
-                        
+def get_opt_inv_sizes(ic_3d_info: rg_ds.Ic3d, opt_params: List[Dict[str, str]]) -> List[Dict[str, int]]:
+    """
+        Returns the inverter P/N sizes [{"wn": int, "wp": int}, ...] of a buffer chain from the optimized parameters of a pn-opt sim
+    """
+    inv_sizes = []
+    if all( tx in ic_3d_info.tx_sizing.opt_mode for tx in ["N", "P"]):
+        # filter out opt_params to condense the
+        wn_opt_params = [ opt_param for opt_param in opt_params if "wn" in opt_param["name"] ]
+        wp_opt_params = [ opt_param for opt_param in opt_params if "wp" in opt_param["name"] ]
+        # This may assume that the order of the opt_params is the same for wn and wp, but it should be TODO fix
+        for wn_opt_param, wp_opt_param in zip(wn_opt_params, wp_opt_params):
+            inv_size = {
+                "wn": int(float(wn_opt_param["val"])),
+                "wp": int(float(wp_opt_param["val"])),
+            }
+            inv_sizes.append(inv_size)
+    else:
+        # Lets capture the optimized pn sizes and other information from measurements
+        for opt_param in opt_params:
+            inv_size = {}
+            name = opt_param["name"]
+            # convert to int as we are using finfets
+            val = int(float(opt_param["val"]))
+            # Make sure the result is actually an int in the first place
+            assert int(float(opt_param["val"])) == float(opt_param["val"]), f"Finfet Width {name} is not an integer, got {opt_param['val']}, check your HSpice optimization settings"
+            # we assume that wn & wp are somewhere in the optimization params
+            if "wn" in name:
+                inv_size["wn"] = val
+            elif "wp" in name:
+                inv_size["wp"] = val
+            else:
+                raise ValueError(f"Optimization parameter {name} not recognized")
+            # if the user defined a particular inv to be static we will use that value 
+            if "wn" not in inv_size.keys() and "N" not in ic_3d_info.tx_sizing.opt_mode:
+                inv_size["wn"] = ic_3d_info.tx_sizing.nmos_sz
+            if "wp" not in inv_size.keys() and "P" not in ic_3d_info.tx_sizing.opt_mode:
+                inv_size["wn"] = ic_3d_info.tx_sizing.pmos_sz
+            # assert ("wn" in inv_size.keys() and "wp" in inv_size.keys() and len(inv_size.keys()) == 2), f"inv_size dict keys are malformed, got {inv_size.keys()}, {inv_size}"
+            inv_sizes.append(inv_size)
+    return inv_sizes
+
+
+def run_buffer_dse_point(ic_3d_info: rg_ds.Ic3d, sweep_params: Dict[str, Any], point_tag: str, cache_dpath: str = None, libs_digest: str = None) -> Dict[str, Any]:
+    """
+        Optimizes the P/N sizes of the buffer chain of a single sweep point at the highest target frequency it passes at 
+        (searched between `ic_3d_info.args.buffer_min_freq` and the target frequency in 'sweep_params', see `buff_dse.search_max_freq`),
+        then simulates the sized chain at that frequency.
+        Sims are written to working directories titled by 'point_tag' so several points can be run at the same time, 
+        and read from the cache at 'cache_dpath' if it is given (see `buff_dse.run_buffer_sim`).
+
+        Returns:
+            {"inv_sizes": optimized P/N sizes, "measurements": measurements of the sized chain, "target_freq": max frequency it passed at,
+             "num_sims": number of spice simulations run, "num_cached_sims": number of results read from the cache}
+    """
+    set_buffer_dse_nstages(ic_3d_info, sweep_params["n_stages"])
+    sweep_params = {**sweep_params}
+    num_sims = 0
+    num_cached_sims = 0
+
+    ### OPT PN SIZES BEFORE RUNNING SIM ###
+    # Measurements inputted in spice file are also our determination of simulation success, there should be no failed measurements.
+    # Failed measurements may be due to the clock frequency being too fast for this load RC, so we search for the 
+    # highest target frequency (up to the one in 'sweep_params') at which the P/N sizing sim captures all measurements.
+    pn_opt_results: Dict[float, Tuple[pd.DataFrame, List[Dict[str, str]], List[Dict[str, str]]]] = {}
+    def is_passing(target_freq: float) -> bool:
+        nonlocal num_sims, num_cached_sims
+        # print(f"Running sim for {n_stages} stages, {buff_fanout} fanout, {target_freq} target freq")
+        plot_df, measurements, opt_params, simulated = buff_dse.run_buffer_sim(
+            ic_3d_info, {**sweep_params, "target_freq": target_freq}, f"pn-opt-{point_tag}", cache_dpath = cache_dpath, libs_digest = libs_digest
+        )
+        num_sims += int(simulated)
+        num_cached_sims += int(not simulated)
+        pn_opt_results[target_freq] = (plot_df, measurements, opt_params)
+        # We probably don't want to plot the voltage waveforms for every run but if we did one would do it here
+        # Check to make sure all measurements are captured AND they all have non "failed" values
+        passed = not any( [m["val"] == "failed" for m in measurements] )
+        if not passed:
+            print(f"Delay measure statements not captured at target frequency {target_freq}")
+        return passed
+
+    max_freq = buff_dse.search_max_freq(is_passing, ic_3d_info.args.buffer_min_freq, sweep_params["target_freq"], ic_3d_info.args.buffer_freq_tol)
+    if max_freq is None:
+        plot_df, measurements, _ = pn_opt_results[ic_3d_info.args.buffer_min_freq]
+        print(f"Failed to get delay measure statements after {len(pn_opt_results)} iterations")
+        if plot_df is not None:
+            print(f"Opening Voltage vs Time plot for debugging...")
+            buff_dse.plot_time_vs_voltage(ic_3d_info.sp_sim_settings, plot_df)
+        for l in rg_utils.get_df_output_lines(pd.DataFrame(measurements)):
+            print(l)
+        # Raised rather than exiting as this may be running in a worker process
+        raise RuntimeError(f"Failed to get delay measure statements for buffer sweep point {point_tag} down to target frequency {ic_3d_info.args.buffer_min_freq}")
+    sweep_params["target_freq"] = max_freq
+    inv_sizes = get_opt_inv_sizes(ic_3d_info, pn_opt_results[max_freq][2])
+
+    # TODO come back to this to get delay plots working again
+    # buff_dse.plot_sp_run(ic_3d_info, show_flags, sp_run_info, sp_run_df)
+
+    # Write the simulation with the optimized pn sizes found above, this is just to prevent weirdness between hspice opt commands and our results
+    _, measurements, _, simulated = buff_dse.run_buffer_sim(ic_3d_info, sweep_params, f"sized-{point_tag}", inv_sizes, cache_dpath = cache_dpath, libs_digest = libs_digest)
+    num_sims += int(simulated)
+    num_cached_sims += int(not simulated)
+
+    return {
+        "inv_sizes": inv_sizes,
+        "measurements": measurements,
+        "target_freq": sweep_params["target_freq"],
+        "num_sims": num_sims,
+        "num_cached_sims": num_cached_sims,
+    }
 
-                        
-                        
 
+def run_buffer_dse_point_job(job: Tuple[rg_ds.Ic3d, Dict[str, Any], str, str, str]) -> Dict[str, Any]:
+    """
+        Runs a (ic_3d_info, sweep_params, point_tag, cache_dpath, libs_digest) job of `run_buffer_dse_updated`, see `run_buffer_dse_point`
+    """
+    return run_buffer_dse_point(*job)
 
-                        
-                    
-                
 
-                            
-                            
+def report_buffer_dse_point(ic_3d_info: rg_ds.Ic3d, sweep_params: Dict[str, Any], inv_sizes: List[Dict[str, int]], measurements: List[Dict[str, str]], max_freq: float, write_csv_headers: bool = False) -> None:
+    """
+        Computes the area / cost of a simulated buffer DSE sweep point, prints it out along with the max frequency 'max_freq' it passed at 
+        and appends it to the buffer DSE csv reports (which are created if 'write_csv_headers' is set).
+    """
+    ####################### CREATE CIRCUIT ITERATION INFO #######################
+    # Store all measurements not found in key substrs into a dict
+    circuit_info = {}
+    # Create invs info list, this is a list of attributes for each inverter in the chain
+    inv_infos = [{} for _ in range(ic_3d_info.design_info.total_nstages)]
+    # Go through measurements dict and populate invs_info with relevant keys
+    # TODO remove hardcoding of these strings
+    neg_circuit_info_key_substrs = ["best_ratio", "falling_prop_delay", "rising_prop_delay", "tpd", "diff"]
+    inv_info_key_substrs = ["rising_prop_delay", "falling_prop_delay", "max_prop_delay", "t_rise", "t_fall"]
+    inv_idx = 0
+    for meas in measurements:
+        if any(f"{key_substr}_{inv_idx}" == meas["name"] for key_substr in inv_info_key_substrs):
+            # Assumes not more than 1 key substr in a measurement name
+            key = [key_substr for key_substr in inv_info_key_substrs if key_substr in meas["name"]][0]
+            inv_infos[inv_idx][key] = float(meas["val"])                                
+            # increment inverter we are saving data into once we get a copy of each key
+            if len(inv_infos[inv_idx].keys()) == len(inv_info_key_substrs):
+                inv_idx += 1
+        else:
+            # TODO remove this hardcoding
+            # This is just to not include the best ratios in circuit info, they should really be in inv_infos but dont want to break plotting
+            if not any(key_substr in meas["name"] for key_substr in neg_circuit_info_key_substrs):
+                circuit_info[meas["name"]] = float(meas["val"])
+
+    #    _   ___ ___   _      ___   _   _    ___ 
+    #   /_\ | _ \ __| /_\    / __| /_\ | |  / __|
+    #  / _ \|   / _| / _ \  | (__ / _ \| |_| (__ 
+    # /_/ \_\_|_\___/_/ \_\  \___/_/ \_\____\___|
+    inv_areas = []
+    for i, inv_size in enumerate(inv_sizes):
+        # Calculate the multiplier for the stage ratio of each stage, we reset the stage ratio back to 1 after the last stage of driver buffer, these are the sizes for inverters on the sink die
+        inv_mult_factor = sweep_params["stage_ratio"] ** i if i < ic_3d_info.design_info.total_nstages - ic_3d_info.design_info.sink_die_nstages else sweep_params["stage_ratio"] ** (i - (ic_3d_info.design_info.total_nstages - ic_3d_info.design_info.sink_die_nstages) )
+        # multiply the fanout factor by the width of the n/pmos tx 
+        nfet_numfins = int(float(inv_size["wn"]) * inv_mult_factor)
+        pfet_numfins = int(float(inv_size["wp"]) * inv_mult_factor)
+        # area of a specific inverter uses f(nfet) + f(pfet) * min_tx_area
+        # min_width_tx_area is in nm^2 so we need to convert to um^2 -> 1e-6 
+        # TODO <TAG> <CONVERT CLEANUP>
+        inv_area = (buff_dse.finfet_tx_area_model(nfet_numfins) + buff_dse.finfet_tx_area_model(pfet_numfins))*(ic_3d_info.design_info.process_info.tx_geom_info.min_width_tx_area*1e-6)
+        inv_areas.append(inv_area)
+        # update inv_infos w/ area info
+        inv_infos[i]["area"] = round(inv_area, 6)
+         # update inv_infos w/ P/N sizes and inv_idx
+        inv_infos[i]["Wp"] = inv_size['wp']
+        inv_infos[i]["Wn"] = inv_size['wn']
+        inv_infos[i]["inv_idx"] = i
+        # Add buffer chain related info (duplication of whats in circuit_info) useful for sorting later
+        inv_infos[i]["n_stages"] = sweep_params["n_stages"]
+        inv_infos[i]["stage_ratio"] = sweep_params["stage_ratio"]
+        inv_infos[i]["add_wlen"] = sweep_params["add_wlen"]
+        inv_infos[i]["ubump_pitch"] = sweep_params["ubump_info"].pitch
+        inv_infos[i]["process"] = sweep_params["process_info"].name
+
+
+    # Select only the inverters which we want to evaluate results for (i.e. not the shape inverters) as we include sink inverters in model
+    meas_invs = inv_infos[ic_3d_info.design_info.shape_nstages:len(inv_infos)]
+    circuit_info["area"] = round(sum( [ inv["area"] for inv in meas_invs] ), 6)                        
+    circuit_info["cost"] = round(buff_dse.calc_cost_updated(ic_3d_info.design_info, ic_3d_info.cost_fx_exps, circuit_info), 6)         
+    # Max target frequency (MHz) the buffer chain captured all measurements at
+    circuit_info["max_freq"] = round(max_freq, 6)
+    # convert circuit_info to a report format
+    # circuit_report = {}
+    # for key, val in circuit_info.items():
+    #     if 
+    # Create a df for printout of the sweep parameters used in this run
+    sweep_param_report = {}
+    for key, val in sweep_params.items():
+        ret_key, ret_val = rg_utils.key_val_2_report(key, val)
+        sweep_param_report[ret_key] = ret_val 
+
+    # vertically concat dfs for reporting
+    sw_iter_report_df = pd.concat([ 
+        pd.DataFrame(sweep_param_report, index=[0]),
+        pd.DataFrame(circuit_info, index=[0]),    
+    ], axis=1)
+
+    invs_df = pd.DataFrame(inv_infos)
+
+    # buff_dse.unit_conversion(ic_3d_info.sp_sim_settings.unit_lookup_factors["time"], x, ic_3d_info.sp_sim_settings.abs_unit_lookups, sig_figs = 5)
+    sw_iter_report_lines = rg_utils.get_df_output_lines(sw_iter_report_df)
+    for lines in rg_utils.create_bordered_str("Circuit Sweep Iteration Information") + sw_iter_report_lines:
+        print(lines)
+
+    inv_report_lines = rg_utils.get_df_output_lines(invs_df)
+    for lines in rg_utils.create_bordered_str("Buffer Chain Inverter Information") + inv_report_lines:
+        print(lines)
+
+    # Output to csv
+    report_output = "ic_3d_reports"
+    os.makedirs(report_output, exist_ok=True)
+    if write_csv_headers:
+        with open(f"{report_output}/buffer_summary_report.csv", "w", newline="") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=sw_iter_report_df.columns)
+            writer.writeheader()
+        with open(f"{report_output}/buffer_inv_report.csv", "w", newline="") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=invs_df.columns)
+            writer.writeheader()
+
+    sw_iter_report_df.to_csv(os.path.join(report_output, f"buffer_summary_report.csv"), mode = "a", header=False, index=False)
+    invs_df.to_csv(os.path.join(report_output, f"buffer_inv_report.csv"), mode = "a", header=False, index=False)
 
 
 def run_buffer_dse(ic_3d_info: rg_ds.Ic3d):
@@ -479,28 +479,13 @@ def tsv_calc(tsv_grids: dict) -> dict:
     # Get total area of all TSVs and KOZs
     KoZ_poly_bbs = [ rect.bb for koz_grid in tsv_grids["KOZ"] for rows in koz_grid.grid for rect in rows ]
     tsv_poly_bbs = [ rect.bb for tsv_grid in tsv_grids["TSV"] for rows in tsv_grid.grid for rect in rows ]
-    ############ THESE TAKE WAY TOO LONG ############
     # TODO take this function out of data structs, just don't want to rn cus of import loop 
     koz_area = rg_ds.get_total_poly_area(KoZ_poly_bbs)
     tsv_area = sum(rect.area for rect in tsv_poly_bbs)
 
     # bounding box of all Polygons for KoZs and TSVs 
-    koz_bb_poly = sh.Polygon(
-        [
-            (min(x for x,_,_,_ in [koz_poly.bounds for koz_poly in KoZ_poly_bbs]), min(y for _,y,_,_ in [koz_poly.bounds for koz_poly in KoZ_poly_bbs])), # BL pos (xmin, ymin)
-            (min(x for x,_,_,_ in [koz_poly.bounds for koz_poly in KoZ_poly_bbs]), max(y for _,_,_,y in [koz_poly.bounds for koz_poly in KoZ_poly_bbs])), # TL pos (xmin, ymax)
-            (max(x for _,_,x,_ in [koz_poly.bounds for koz_poly in KoZ_poly_bbs]), max(y for _,_,_,y in [koz_poly.bounds for koz_poly in KoZ_poly_bbs])), # TR pos (xmax, ymax)
-            (max(x for _,_,x,_ in [koz_poly.bounds for koz_poly in KoZ_poly_bbs]), max(y for _,y,_,_ in [koz_poly.bounds for koz_poly in KoZ_poly_bbs])) # BR pos (xmax, ymin)
-        ]
-    )
-    tsv_bb_poly = sh.Polygon(
-        [
-            (min(x for x,_,_,_ in [tsv_poly.bounds for tsv_poly in tsv_poly_bbs]), min(y for _,y,_,_ in [tsv_poly.bounds for tsv_poly in tsv_poly_bbs])), # BL pos (xmin, ymin)
-            (min(x for x,_,_,_ in [tsv_poly.bounds for tsv_poly in tsv_poly_bbs]), max(y for _,_,_,y in [tsv_poly.bounds for tsv_poly in tsv_poly_bbs])), # TL pos (xmin, ymax)
-            (max(x for _,_,x,_ in [tsv_poly.bounds for tsv_poly in tsv_poly_bbs]), max(y for _,_,_,y in [tsv_poly.bounds for tsv_poly in tsv_poly_bbs])), # TR pos (xmax, ymax)
-            (max(x for _,_,x,_ in [tsv_poly.bounds for tsv_poly in tsv_poly_bbs]), max(y for _,y,_,_ in [tsv_poly.bounds for tsv_poly in tsv_poly_bbs])) # BR pos (xmax, ymin)
-        ]
-    )
+    koz_bb_poly = rg_ds.get_bb_poly(KoZ_poly_bbs)
+    tsv_bb_poly = rg_ds.get_bb_poly(tsv_poly_bbs)
     
     return_dict["TSV"]["area"] = tsv_area
     return_dict["TSV"]["bb"] = tsv_bb_poly
@@ -510,189 +495,149 @@ def tsv_calc(tsv_grids: dict) -> dict:
     return return_dict
 
 
-def get_res_info_from_dims(design_pdn: rg_ds.DesignPDN, dims: List[int], metal_rail_res_per_um: float, single_via_stack_res: float, pwr_rails_per_um: float, current_per_sq_um: float, region_info: dict, source: str):
-    
-    # Assuming checkerboard pattern of power rails
-    # if design_pdn.c4_info.placement_setting == "checkerboard":
-    pwr_rail_xy_radius = [math.sqrt(design_pdn.floorplan.area / (math.prod(dims)))/2]*2
-        # gnd_rail_xy_radius = []
+def get_res_info_from_dims_arr(design_pdn: rg_ds.DesignPDN, dims: np.ndarray, metal_rail_res_per_um: float, single_via_stack_res: float, pwr_rails_per_um: float, current_per_sq_um: float, source: str) -> Dict[str, np.ndarray]:
     """
-    if source == "ubump":
-        scale_factors = [ int(max_dim) // int(pdn_dim) for max_dim, pdn_dim in zip(design_pdn.ubump_info.max_dims, dims) ]
-        pwr_rail_xy_radius = [ ((fac-1)*design_pdn.ubump_info.single_ubump.diameter + fac*(design_pdn.ubump_info.single_ubump.pitch - design_pdn.ubump_info.single_ubump.diameter))/2 for fac in scale_factors ]
-        pwr_rail_region_bump_dims = [max_dim // var_dim for max_dim, var_dim in zip(design_pdn.ubump_info.max_dims, dims)]
-        pwr_rail_radius = [ ((fac-1)*(design_pdn.ubump_info.single_ubump.diameter*2) + fac*(design_pdn.ubump_info.single_ubump.pitch - design_pdn.ubump_info.single_ubump.diameter*2))/2 + design_pdn.ubump_info.single_ubump.diameter for fac in pwr_rail_region_bump_dims ]
-    elif source == "c4":
-        scale_factors = [ max_c4_dim / pdn_dim for max_c4_dim, pdn_dim in zip(design_pdn.c4_info.max_c4_dims, dims) ]
-        pwr_rail_xy_radius = [ ((fac-1)*(design_pdn.c4_info.single_c4.diameter*2) + fac*(design_pdn.c4_info.single_c4.pitch - design_pdn.c4_info.single_c4.diameter*2))/2 + design_pdn.c4_info.single_c4.diameter for fac in scale_factors ]
-        pwr_rail_region_bump_dims = [max_dim // var_dim for max_dim, var_dim in zip(design_pdn.ubump_info.max_dims, dims)]
-        pwr_rail_radius = [ ((fac-1)*(design_pdn.c4_info.single_c4.diameter*2) + fac*(design_pdn.c4_info.single_c4.pitch - design_pdn.c4_info.single_c4.diameter*2))/2 + design_pdn.c4_info.single_c4.diameter for fac in pwr_rail_region_bump_dims ]
+        Array version of `get_res_info_from_dims`, evaluates the power region resistances and IR drops for every row of 'dims' (shape (N, 2)) at once with numpy.
+        The discrete per via IR drops along the critical path are summed for all rows at once, one via at a time, with the compensated 
+        (Neumaier) summation CPython 3.12+ uses in its builtin sum() of floats. Results are bit identical to summing each row's via IR drops 
+        with sum() on those versions, older ones sum floats without compensation so the results may differ in the last few bits.
+
+        Returns:
+            Dict of the same keys as `get_res_info_from_dims` with an array of N values per key ("region_dims" is of shape (N, 2)).
+            Rows for which the power region is smaller than the TSV grid (negative critical path distance) have NaN values.
     """
-
-    pwr_rail_box = sh.box(
-        xmin = 0,
-        ymin = 0,
-        xmax = pwr_rail_xy_radius[0]*2,
-        ymax = pwr_rail_xy_radius[1]*2 
-    )
-    region_dims = [ abs(pwr_rail_box.bounds[2] - pwr_rail_box.bounds[0]), abs(pwr_rail_box.bounds[3] - pwr_rail_box.bounds[1])]
-
-    ######## PRECISE FINDING THE MIDDLE MOST POINT OF THE REGION ########
-    # region_dims = region_info["dims"]
-    # pwr_rail_box = region_info["boxes"][0]
-    # max_dist = region_info["max_dist"]
-
-    tsv_grid_bounds = [abs(design_pdn.tsv_info.tsv_rect_placements.bb_poly.bounds[2] - design_pdn.tsv_info.tsv_rect_placements.bb_poly.bounds[0]),abs(design_pdn.tsv_info.tsv_rect_placements.bb_poly.bounds[3] - design_pdn.tsv_info.tsv_rect_placements.bb_poly.bounds[1])]
-    if source == "ubump":
-        # Crit patch distance
-        # Subtract distance from the edge of TSV region to the edge of power region
-        crit_path_distance = (max(region_dims) - (min(tsv_grid_bounds)))/2
-        #crit_path_distance = (max(region_dims) - (min(tsv_grid_bounds)))/2
-        
-        #crit_path_distance = (region_dims[0] - design_pdn.single_ubump.diameter) + (region_dims[1] - design_pdn.single_ubump.diameter)
-    elif source == "c4":
-        crit_path_distance = (max(region_dims) - (min(tsv_grid_bounds))) / 2
-        # crit_path_distance = (max(region_dims) - design_pdn.c4_info.single_c4.diameter)/2
-
-    assert crit_path_distance >= 0, "Crit path distance is negative"
-
-    ####################### IR DROP USING DISCRETE INTEGRALS AND HOLISTIC APPROACH #######################
-    current_per_region = current_per_sq_um * math.prod(region_dims)
-    # X dimension critical path, only horizontal traversal, we use the y axis of the tsv grid to determine number of pwr rails
-    pwr_rails_per_x_dim = pwr_rails_per_um * tsv_grid_bounds[1] / 2
-    crit_x_distance = (region_dims[0] - tsv_grid_bounds[0]) / 2
-
-    current_per_x_pwr_rail = (current_per_region / 4) / (pwr_rails_per_x_dim * 2) 
-    pwr_rails_per_quarter_x_dim = pwr_rails_per_um * crit_x_distance
-
-    # Y dimension critical path, only horizontal traversal, we use the y axis of the tsv grid to determine number of pwr rails
-    pwr_rails_per_y_dim = pwr_rails_per_um * tsv_grid_bounds[0] / 2
-    crit_y_distance = (region_dims[1] - tsv_grid_bounds[1]) / 2
-
-    current_per_y_pwr_rail = (current_per_region / 4) / (pwr_rails_per_y_dim * 2)
- 
-    pwr_rails_per_quarter_y_dim = pwr_rails_per_um * crit_y_distance
-    
-
-    current_per_quarter_region = (current_per_region / 4) - (current_per_sq_um * crit_x_distance * tsv_grid_bounds[1]) / 2 - (current_per_sq_um * crit_y_distance * tsv_grid_bounds[0]) / 2
-
-    vias_per_x_crit_path = crit_x_distance * pwr_rails_per_um #/ (design_pdn.process_info.mlayers[-1].via_pitch*1e-3)
-    vias_per_y_crit_path = crit_y_distance / (design_pdn.process_info.mlayers[-1].via_pitch*1e-3)
-
-
-    # traversing across the wire measuring each voltage value
-    # current per via will be the amount of current that needs to be distributed in that region divided by # of rails and # of vias on that path
-    current_x_per_via_stack = (current_per_sq_um * crit_x_distance * tsv_grid_bounds[1] / 2) / (pwr_rails_per_x_dim * vias_per_x_crit_path)
-
-    current_x_per_metal_rail = (current_per_quarter_region * 0.5) / pwr_rails_per_quarter_x_dim
-
-    wire_res_bw_vias = ((1/pwr_rails_per_um) * design_pdn.process_info.mlayers[-1].wire_res_per_um)
-
-    #vias_per_pwr_rail = (design_pdn.process_info.mlayers[-1].via_pitch * 1e-3) / pwr_rails_per_um 
-    
-    x_ir_drops = []
-    x_rail_currents = []
-    # GETS IR DROP FOR HORIZONTAL/VERTICAL DISTANCE FROM TSV TO EDGE OF UMBRELLA
-    # Assmes a single via also traverses metal pitch
-    for via_idx in range(math.floor(vias_per_x_crit_path)):
-        # Lost current due to via stack
-        via_lost_current = (current_x_per_via_stack * via_idx)
-        # Perpindicular metal lost current
-        rail_lost_current = ( (current_per_quarter_region / pwr_rails_per_x_dim) * via_idx / pwr_rails_per_quarter_x_dim )
-        # Current is reduced in discrete amounts as we traverse in the x direction
-        x_ir_metal = (current_per_x_pwr_rail - via_lost_current - rail_lost_current) * wire_res_bw_vias
-        x_ir_drops.append(x_ir_metal)
-        x_rail_currents.append(current_per_x_pwr_rail - via_lost_current - rail_lost_current)
-    
-
-    # # GETS IR DROP FOR HORIZONTAL/VERTICAL DISTANCE FROM TSV TO EDGE OF UMBRELLA
-    #for m_idx, current in enumerate(x_rail_currents):
-
-
-
-
-    #total_ir_drop = sum(x_ir_drops)
-
-
-    ####################### IR DROP USING DISCRETE INTEGRALS AND HOLISTIC APPROACH #######################
-
+    dims = np.asarray(dims).reshape(-1, 2)
+    # Assuming checkerboard pattern of power rails
+    pwr_rail_xy_radius = np.sqrt(design_pdn.floorplan.area / np.prod(dims, axis = 1)) / 2
+    region_dims = np.stack([pwr_rail_xy_radius*2, pwr_rail_xy_radius*2], axis = 1)
+
+    tsv_bb_bounds = design_pdn.tsv_info.tsv_rect_placements.bb_poly.bounds
+    tsv_grid_bounds = [abs(tsv_bb_bounds[2] - tsv_bb_bounds[0]), abs(tsv_bb_bounds[3] - tsv_bb_bounds[1])]
+    if source not in ["ubump", "c4"]:
+        raise ValueError(f"Invalid power region source {source}")
+    # Subtract distance from the edge of TSV region to the edge of power region
+    crit_path_distance = (np.max(region_dims, axis = 1) - min(tsv_grid_bounds)) / 2
+    crit_path_distance = np.where(crit_path_distance >= 0, crit_path_distance, np.nan)
+
+    region_area = region_dims[:, 0] * region_dims[:, 1]
     ####################### IR DROP MODELING USING POWER DENSITY AND 1D INTEGRAL OF LINEARLY DECREASING PWR #######################
-    current_per_half_region = (current_per_sq_um * region_dims[0] * region_dims[1]) / 2
+    current_per_half_region = (current_per_sq_um * region_dims[:, 0] * region_dims[:, 1]) / 2
     # single via res / number of vias per half region
-    via_res_per_half_region = single_via_stack_res / (single_via_stack_res * math.prod(region_dims) / 2)
-    # J(r) = current_per_sq_um * (1 - r/R)
-    # If we integrate 0 -> R (1 - r/R) dr we get R / 2 where R is the radius of the power rail or distance traveled
-    # V = current_per_sq_um * (R / 2)
-    # V = half_region_current * (length (R) * metal_rail_res_per_um) / (pwr_rails_per_um * 2 * R ) )
+    via_res_per_half_region = single_via_stack_res / (single_via_stack_res * region_area / 2)
     dist_mstack_ir_drop = current_per_half_region * (1 / 2 * metal_rail_res_per_um + via_res_per_half_region ) / ( pwr_rails_per_um )
-    
-    # print(f"Voltage Drop Integral Calc: {dist_mstack_ir_drop}")
-    ####################### IR DROP MODELING USING POWER DENSITY AND 1D INTEGRAL OF LINEARLY DECREASING PWR #######################
     ####################### IR DROP MODELING USING POWER DENSITY AND DISCRETE VIA / RESISTANCES #######################
-    current_per_region = current_per_sq_um * math.prod(region_dims)
-    pwr_rails_per_region_dim = pwr_rails_per_um * min(region_dims)
+    current_per_region = current_per_sq_um * region_area
+    pwr_rails_per_region_dim = pwr_rails_per_um * np.min(region_dims, axis = 1)
     # Divided by two as current is flowing through half of the region
     current_per_pwr_rail = (current_per_region / 2) / pwr_rails_per_region_dim
     # modeling half a region as a 1D line of resistances and currents
-    # Floored to make sure vias dont go outside of floorplan bounds
     vias_per_crit_path = crit_path_distance / (design_pdn.process_info.mlayers[-1].via_pitch*1e-3)
     # single rail resistance between vias of wire
-    wire_res_bw_vias = (design_pdn.process_info.mlayers[-1].via_pitch * 1e-3 * design_pdn.process_info.mlayers[-1].wire_res_per_um) # / (pwr_rails_per_um * min(region_dims))
-    # traversing across the wire measuring each voltage value
+    wire_res_bw_vias = (design_pdn.process_info.mlayers[-1].via_pitch * 1e-3 * design_pdn.process_info.mlayers[-1].wire_res_per_um)
     current_per_via_stack = current_per_pwr_rail / vias_per_crit_path
-    ir_drops = []
-    for ir_idx in range(math.floor(vias_per_crit_path)):
-        # distance_traversed += design_pdn.process_info.mlayers[-1].via_pitch
-        ir_metal = (current_per_pwr_rail - current_per_via_stack * ir_idx) * wire_res_bw_vias # + single_via_stack_res * current_per_via_stack
-        ir_drops.append(ir_metal)
-
-    # sum all ir drops measured discretely and add an additional ir drop from via stack resistance
-    total_ir_drop = sum(ir_drops) + (single_via_stack_res) * current_per_via_stack
-    # 
+    # Sum of the IR drops of each via segment along the rail, (current_per_pwr_rail - current_per_via_stack * i) * wire_res_bw_vias for i in [0, floor(vias_per_crit_path))
+    # Floored to make sure vias dont go outside of floorplan bounds
+    num_vias = np.floor(vias_per_crit_path)
+    # Terms are accumulated one via at a time for all rows in the order of the per rail loop, with the same compensated (Neumaier) 
+    # summation as python's builtin sum() of floats (CPython 3.12+)
+    rail_ir_drop = np.zeros(len(dims))
+    rail_ir_drop_comp = np.zeros(len(dims))
+    max_num_vias = int(np.max(num_vias, where = ~np.isnan(num_vias), initial = 0))
+    for via_idx in range(max_num_vias):
+        ir_metal = (current_per_pwr_rail - current_per_via_stack * via_idx) * wire_res_bw_vias
+        is_via = via_idx < num_vias
+        ir_sum = rail_ir_drop + ir_metal
+        ir_comp = np.where(np.abs(rail_ir_drop) >= np.abs(ir_metal), (rail_ir_drop - ir_sum) + ir_metal, (ir_metal - ir_sum) + rail_ir_drop)
+        rail_ir_drop_comp = np.where(is_via, rail_ir_drop_comp + ir_comp, rail_ir_drop_comp)
+        rail_ir_drop = np.where(is_via, ir_sum, rail_ir_drop)
+    rail_ir_drop = np.where((rail_ir_drop_comp != 0) & np.isfinite(rail_ir_drop_comp), rail_ir_drop + rail_ir_drop_comp, rail_ir_drop)
+    # add an additional ir drop from via stack resistance
+    total_ir_drop = rail_ir_drop + (single_via_stack_res) * current_per_via_stack
     single_rail_res = crit_path_distance * design_pdn.process_info.mlayers[-1].wire_res_per_um
     single_rail_path_res = single_rail_res + single_via_stack_res
-    
-    single_rail_voltage = total_ir_drop
-    ####################### IR DROP MODELING USING POWER DENSITY AND DISCRETE VIA / RESISTANCES #######################
-    ####################### IR DROP MODELING USING CRITICAL PATH AND NUMBER OF TX PER RAIL #######################
-    """
-        txs_per_crit_region = pwr_rail_box.area / (design_pdn.process_info.tx_geom_info.min_width_tx_area * 1e-6)
-        # Need the amount of current drawn for a power region, add this to current drawn for a C4 Power Region 
-        current_per_crit_region = txs_per_crit_region * design_pdn.current_per_tx
-        region_pwr_rail_dims = [dim*pwr_rails_per_um for dim in region_dims]
-        # Number of Tx per power rail are equal to the number of txs per region divided by the dimension of the power rail, multiply by 2 because there are two metal layers for power
-        tx_per_pwr_rail = txs_per_crit_region / (max(region_pwr_rail_dims)*2) #math.prod(region_pwr_rail_dims)
-
-
-        # Calc resistance of single rail with critical path , single rail + via_stack / num_vias to txs
-        single_rail_res = metal_rail_res_per_um * crit_path_distance #  + (single_via_stack_res / tx_per_pwr_rail)
-        single_rail_path_res = single_rail_res + (single_via_stack_res / (tx_per_pwr_rail * via_stacks_per_sq_um * (design_pdn.process_info.tx_geom_info.min_width_tx_area*1e-6) )) # THIS NEEDS TO BE MULTIPLIED BY VIAS PER TX
-        # total number of vias to deliver power
-        # vias_per_pwr_rail_region = tx_per_pwr_rail * (max(region_pwr_rail_dims)*2) #math.prod(region_pwr_rail_dims)
-        # assuming each tx takes some amount of current lets see how much voltage goes through each rail
-        # (single_rail_path_res scales linearly with single_path_dist) (tx_per_pwr_rail scales quadratically w area of region)
-        
-        #single_rail_voltage = max([single_rail_path_res * tx_per_pwr_rail * design_pdn.current_per_tx, dist_mstack_ir_drop])
-        ####################### IR DROP MODELING USING CRITICAL PATH AND NUMBER OF TX PER RAIL #######################
-        # print(f"Voltage Drop Single Rail: {single_rail_voltage}")
-    """
-    out_dict = {
+
+    return {
         "region_dims": region_dims,
-        # "txs_per_crit_region": txs_per_crit_region,
-        # "region_pwr_rail_dims": region_pwr_rail_dims, 
-        # "tx_per_pwr_rail": tx_per_pwr_rail,
         "single_rail_res": single_rail_res,
         "single_rail_path_res": single_rail_path_res,
-        "single_rail_voltage": single_rail_voltage,
-        # "single_rail_v_calc_tx": single_rail_path_res * tx_per_pwr_rail * design_pdn.current_per_tx,
+        "single_rail_voltage": total_ir_drop,
         "single_rail_v_calc_iavg": dist_mstack_ir_drop,
         "crit_path_distance": crit_path_distance,
         "current_per_crit_region": current_per_region,
         "current_per_pwr_rail": current_per_pwr_rail,
     }
+
+
+def get_res_info_from_dims(design_pdn: rg_ds.DesignPDN, dims: List[int], metal_rail_res_per_um: float, single_via_stack_res: float, pwr_rails_per_um: float, current_per_sq_um: float, region_info: dict, source: str):
+    """
+        Gets the resistances and IR drops of a single power region of a 'dims' grid of power regions, see `get_res_info_from_dims_arr`
+    """
+    res_info = get_res_info_from_dims_arr(design_pdn, np.array([dims]), metal_rail_res_per_um, single_via_stack_res, pwr_rails_per_um, current_per_sq_um, source)
+    assert not np.isnan(res_info["crit_path_distance"][0]), "Crit path distance is negative"
+    out_dict = { key: float(val[0]) for key, val in res_info.items() if key != "region_dims" }
+    out_dict["region_dims"] = [float(dim) for dim in res_info["region_dims"][0]]
     return out_dict
 
 
+def get_pdn_ir_drop_table(design_pdn: rg_ds.DesignPDN, pdn_dims: np.ndarray, ubump_pitches: List[float], ubump_resistances: List[float], via_grid_res: float, metal_rail_res_per_um: float, single_via_stack_res: float, pwr_rails_per_um: float, current_per_sq_um: float) -> pd.DataFrame:
+    """
+        Evaluates the top and bottom die IR drops for every combination of ubump pitch (with resistance in mOhm from 'ubump_resistances') and 
+        C4 / ubump grid dimension in 'pdn_dims', the C4 and ubump grids are swept together as square grids of the same dimension.
+        All combinations are computed at once by broadcasting the pitches against the grid dimensions.
+
+        Returns:
+            DataFrame with a row per combination ordered by pitch then dim, the resistance info of the ubump and C4 power regions 
+            (see `get_res_info_from_dims_arr`) are in the columns prefixed by "ubump." and "c4."
+    """
+    pdn_dims = np.asarray(pdn_dims)
+    dims = np.stack([pdn_dims, pdn_dims], axis = 1)
+    res_infos = {
+        source: get_res_info_from_dims_arr(design_pdn, dims, metal_rail_res_per_um, single_via_stack_res, pwr_rails_per_um, current_per_sq_um, source = source)
+        for source in ["ubump", "c4"]
+    }
+    # pitches along the rows and dims along the columns
+    pitches = np.asarray(ubump_pitches)[:, np.newaxis]
+    single_ubump_res = np.asarray(ubump_resistances)[:, np.newaxis]
+
+    c4_res = (design_pdn.c4_info.single_c4.resistance + design_pdn.tsv_info.resistance) + via_grid_res
+    # ubump resistance in mOhm
+    ubump_res = c4_res + (single_ubump_res*1e-3)
+    # ceil as the only thing holding us back from using more microbumps is the metal resistance
+    num_ubumps_per_pwr_region = np.ceil(( 1 /((pitches)**2))*design_pdn.tsv_info.tsv_rect_placements.bb_poly.area)
+    # Only one top die region inside of each bottom die region (both being fed by 1 C4 bump)
+    c4_current_draw = res_infos["ubump"]["current_per_crit_region"] + res_infos["c4"]["current_per_crit_region"]
+    bottom_die_ir_drop = (c4_res * c4_current_draw) + res_infos["c4"]["single_rail_voltage"]
+    top_die_ir_drop = (c4_res * c4_current_draw) + ((ubump_res / num_ubumps_per_pwr_region) * res_infos["ubump"]["current_per_crit_region"]) + res_infos["ubump"]["single_rail_voltage"]
+
+    table_shape = (len(pitches), len(pdn_dims))
+    ir_drop_table = {
+        "ubump_pitch": np.broadcast_to(pitches, table_shape).ravel(),
+        "single_ubump_res": np.broadcast_to(single_ubump_res, table_shape).ravel(),
+        "dim": np.broadcast_to(pdn_dims, table_shape).ravel(),
+        "c4_res": np.full(math.prod(table_shape), c4_res),
+        "ubump_res": np.broadcast_to(ubump_res, table_shape).ravel(),
+        "num_ubumps_per_pwr_region": np.broadcast_to(num_ubumps_per_pwr_region, table_shape).ravel(),
+        "c4_current_draw": np.broadcast_to(c4_current_draw, table_shape).ravel(),
+        "bottom_die_ir_drop": bottom_die_ir_drop.ravel(),
+        "top_die_ir_drop": top_die_ir_drop.ravel(),
+    }
+    for source, res_info in res_infos.items():
+        for key, vals in res_info.items():
+            if key == "region_dims":
+                ir_drop_table[f"{source}.region_x"] = np.broadcast_to(vals[:, 0], table_shape).ravel()
+                ir_drop_table[f"{source}.region_y"] = np.broadcast_to(vals[:, 1], table_shape).ravel()
+            else:
+                ir_drop_table[f"{source}.{key}"] = np.broadcast_to(vals, table_shape).ravel()
+    return pd.DataFrame(ir_drop_table)
+
+
+def get_res_info_from_ir_drop_row(ir_drop_row: Dict[str, Any], source: str) -> Dict[str, Any]:
+    """
+        Gets the 'source' ("ubump" or "c4") power region resistance info dict of a `get_pdn_ir_drop_table` row in the format of `get_res_info_from_dims`
+    """
+    res_info = { key.removeprefix(f"{source}."): val for key, val in ir_drop_row.items() if key.startswith(f"{source}.") }
+    res_info["region_dims"] = [res_info.pop("region_x"), res_info.pop("region_y")]
+    return res_info
 
 
 def find_tsv_info(design_pdn: rg_ds.DesignPDN, in_dims: List[int], axis: int) -> Tuple[List[dict], List[int]]:
@@ -1470,8 +1415,15 @@ def pdn_modeling(ic_3d_info: rg_ds.Ic3d):
     #ubump_resistances = [(30.9e-3 * (40/pitch)**2 ) for pitch in ubump_pitches]  # scaling resistance from ubump value at 40 um pitch, quadratic scaling as cross sectional area decreases
     ubump_resistances = [8.26, 15.63, 19.29, 40, 99, 17, 97] #mOhm 
     summary_out_infos = []
+    top_metal_rail_res = ic_3d_info.design_pdn.process_info.mlayers[-1].wire_res_per_um
+    # print(f"Top Metal Rail Resistance: {top_metal_rail_res}")
+    # Evaluate every C4 / ubump dimension the power regions can take before becoming smaller than the TSV grid for all pitches at once,
+    # (+2 so sweeps which never meet the IR drop budget still reach a dim with a negative crit path distance)
+    tsv_bb_bounds = ic_3d_info.design_pdn.tsv_info.tsv_rect_placements.bb_poly.bounds
+    max_pdn_dim = math.floor(math.sqrt(ic_3d_info.design_pdn.floorplan.area) / min(tsv_bb_bounds[2] - tsv_bb_bounds[0], tsv_bb_bounds[3] - tsv_bb_bounds[1])) + 2
+    ir_drop_df = get_pdn_ir_drop_table(ic_3d_info.design_pdn, np.arange(1, max_pdn_dim + 1), ubump_pitches, ubump_resistances, via_grid_res, top_metal_rail_res, single_via_stack_res, pwr_rails_per_um, current_per_sq_um)
     # ubump_resistivity = 1.72e-2 #Ohm um
-    for pitch, res in zip(ubump_pitches, ubump_resistances):
+    for pitch_idx, (pitch, res) in enumerate(zip(ubump_pitches, ubump_resistances)):
         single_ubump_info = rg_ds.SingleUbumpInfo(
             pitch = pitch,
             diameter = pitch/2,
@@ -1483,27 +1435,24 @@ def pdn_modeling(ic_3d_info: rg_ds.Ic3d):
         ic_3d_info.design_pdn.update()
         ubump_out_infos = []
         ir_drop_out_infos = []
-        # C4 Dimension Sweep
-        c4_dim = 1
-        # Ubump Dimension Sweep
-        dim = 1
 
-        top_metal_rail_res = ic_3d_info.design_pdn.process_info.mlayers[-1].wire_res_per_um
-        # print(f"Top Metal Rail Resistance: {top_metal_rail_res}")
         num_c4s_list = []
         num_ubumps_list = []
-        while True:
-            # Ubump Dimension Sweep
+        # C4 and Ubump Dimension Sweep, rows of this pitch are in increasing dim order
+        pitch_ir_drop_df = ir_drop_df.iloc[pitch_idx * max_pdn_dim : (pitch_idx + 1) * max_pdn_dim]
+        for ir_drop_row in pitch_ir_drop_df.to_dict("records"):
+            dim = int(ir_drop_row["dim"])
             ubump_dims = [dim, dim]
-            c4_dims = [c4_dim, c4_dim]
+            c4_dims = [dim, dim]
             # Used for plotting values against PDN parameters
             num_c4s_list.append(math.prod(c4_dims))
             num_ubumps_list.append(math.prod(ubump_dims))
             ##################################
             # region_info = get_c4_placements_new(design_pdn, c4_dims)
 
-            ubump_info = get_res_info_from_dims(ic_3d_info.design_pdn, ubump_dims, top_metal_rail_res, single_via_stack_res, pwr_rails_per_um, current_per_sq_um, region_info = None, source = "ubump") 
-            c4_info = get_res_info_from_dims(ic_3d_info.design_pdn, c4_dims, top_metal_rail_res, single_via_stack_res, pwr_rails_per_um, current_per_sq_um, region_info = None, source = "c4") 
+            assert not math.isnan(ir_drop_row["c4.crit_path_distance"]), "Crit path distance is negative"
+            ubump_info = get_res_info_from_ir_drop_row(ir_drop_row, "ubump")
+            c4_info = get_res_info_from_ir_drop_row(ir_drop_row, "c4")
             
             # Info for IR Drop on each stage of the PDN
             bot_ir_drop_info = {}
@@ -1511,22 +1460,13 @@ def pdn_modeling(ic_3d_info: rg_ds.Ic3d):
 
             ubump_out_info = {}
             
-            # Calculate Via stack resistance from TSV grid
-
-            c4_res = (ic_3d_info.design_pdn.c4_info.single_c4.resistance + ic_3d_info.design_pdn.tsv_info.resistance) + via_grid_res
-            # ubump resistance in mOhm
-            ubump_res = c4_res + (ic_3d_info.design_pdn.ubump_info.single_ubump.resistance*1e-3)
-            
-            # ceil as the only thing holding us back from using more microbumps is the metal resistance
-            num_ubumps_per_pwr_region = math.ceil(( 1 /((ic_3d_info.design_pdn.ubump_info.single_ubump.pitch)**2))*ic_3d_info.design_pdn.tsv_info.tsv_rect_placements.bb_poly.area)
-            # We need to know how many Top die regions are inside of each bottom die region
-            #top_regions_per_bot_region = math.prod(c4_info["region_dims"]) / math.prod(ubump_info["region_dims"])
-            top_regions_per_bot_region = 1 
-            # Now we get the amount of current for top region and bottom region (both being fed by 1 C4 bump)
-            c4_current_draw = ( top_regions_per_bot_region * ubump_info["current_per_crit_region"] ) + c4_info["current_per_crit_region"]
-            
-            bottom_die_ir_drop = (c4_res * c4_current_draw) + c4_info["single_rail_voltage"]
-            top_die_ir_drop = (c4_res * c4_current_draw) + ((ubump_res / num_ubumps_per_pwr_region) * ubump_info["current_per_crit_region"]) + ubump_info["single_rail_voltage"]
+            # C4 -> top metal resistance, ubump resistance, current draw and IR drops of each die (see `get_pdn_ir_drop_table`)
+            c4_res = ir_drop_row["c4_res"]
+            ubump_res = ir_drop_row["ubump_res"]
+            num_ubumps_per_pwr_region = ir_drop_row["num_ubumps_per_pwr_region"]
+            c4_current_draw = ir_drop_row["c4_current_draw"]
+            bottom_die_ir_drop = ir_drop_row["bottom_die_ir_drop"]
+            top_die_ir_drop = ir_drop_row["top_die_ir_drop"]
 
             # Save info into struct
             ic_3d_info.design_pdn.c4_info.pdn_dims = c4_dims
@@ -1626,9 +1566,6 @@ def pdn_modeling(ic_3d_info: rg_ds.Ic3d):
 
             if max([bottom_die_ir_drop, top_die_ir_drop]) <= (ic_3d_info.design_pdn.ir_drop_budget*1e-3): #or dim > min(design_pdn.ubump_info.max_dims):
                 break
-            
-            dim += 1
-            c4_dim += 1
         
         # Break out of second loop TODO remove this as we will be incrementing the number of C4 bumps and ubumps at the same time just with different values
         # if max([bottom_die_ir_drop, top_die_ir_drop]) <= (design_pdn.ir_drop_budget*1e-3): #or c4_dim > min(design_pdn.c4_info.max_c4_dims):
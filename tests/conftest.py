@@ -13,6 +13,10 @@ import tests.common.common as tests_common
 import copy
 import json
 import pytest
+import stat
+import textwrap
+from pathlib import Path
+from types import SimpleNamespace
 from functools import wraps
 
 def pytest_addoption(parser: pytest.Parser):
@@ -60,6 +64,76 @@ def create_rg_fixture(
     elif fixture_type == "parse":
         return parse_fixture
 
+# Stand in for hammer-vlsi, each run sleeps for `sleep_time`, appends "<stage> <start time> <end time>" to `runs_fpath`
+# and writes an empty output config for the stage
+# The runs file path is written into the script as hammer is run with the environment RAD-Gen captured at import
+FAKE_HAMMER_SRC = textwrap.dedent('''\
+    #!{python}
+    import os, sys, time
+    flow_stage = sys.argv[-1]
+    out_config_fpath = sys.argv[sys.argv.index("-o") + 1]
+    start_time = time.time()
+    time.sleep({sleep_time})
+    with open({runs_fpath!r}, "a") as runs_file:
+        runs_file.write(f"{{flow_stage}} {{start_time}} {{time.time()}}\\n")
+    with open(out_config_fpath, "w") as out_config_file:
+        out_config_file.write("{{}}")
+''')
+
+def write_fake_hammer(dpath: Path, sleep_time: float = 0) -> SimpleNamespace:
+    """
+        Writes a fake hammer-vlsi executable to `dpath`, returns its path and the path of the file its runs are logged to
+    """
+    hammer_fpath = dpath / "hammer-vlsi"
+    runs_fpath = dpath / "stage_runs.txt"
+    hammer_fpath.write_text(FAKE_HAMMER_SRC.format(python = sys.executable, sleep_time = sleep_time, runs_fpath = str(runs_fpath)))
+    hammer_fpath.chmod(hammer_fpath.stat().st_mode | stat.S_IEXEC)
+    return SimpleNamespace(hammer_fpath = hammer_fpath, runs_fpath = runs_fpath)
+
+def get_fake_hammer_runs(runs_fpath: Path) -> List[Tuple[str, float, float]]:
+    """
+        Returns the (stage, start time, end time) of each fake hammer-vlsi run logged to `runs_fpath`
+    """
+    if not runs_fpath.exists():
+        return []
+    stage_runs = []
+    for line in runs_fpath.read_text().splitlines():
+        flow_stage, start_time, end_time = line.split()
+        stage_runs.append((flow_stage, float(start_time), float(end_time)))
+    return stage_runs
+
+@pytest.fixture
+def fake_flow(tmp_path, monkeypatch) -> SimpleNamespace:
+    """
+        Creates a fake hammer-vlsi, a design config and an RTL file, returns them along with a minimal HammerFlow object
+    """
+    fake_hammer = write_fake_hammer(tmp_path)
+    # RAD-Gen logs are written to the cwd
+    monkeypatch.chdir(tmp_path)
+    obj_dpath = tmp_path / "obj_dir"
+    obj_dpath.mkdir()
+    rtl_fpath = tmp_path / "fake_mod.sv"
+    rtl_fpath.write_text("module fake_mod(); endmodule\n")
+    design_config = {
+        "synthesis.inputs.input_files": [str(rtl_fpath)],
+        "synthesis.inputs.top_module": "fake_mod",
+        "par.inputs.top_module": "fake_mod",
+        "power.inputs.level": "par",
+    }
+    design_config_fpath = tmp_path / "fake_mod.json"
+    design_config_fpath.write_text(json.dumps(design_config))
+    asic_flow = SimpleNamespace(
+        cli_driver_bpath = str(fake_hammer.hammer_fpath),
+        hammer_driver = SimpleNamespace(obj_dir = str(obj_dpath), options = SimpleNamespace(environment_configs = [])),
+    )
+    return SimpleNamespace(
+        asic_flow = asic_flow,
+        design_config = design_config,
+        design_config_fpath = design_config_fpath,
+        rtl_fpath = rtl_fpath,
+        runs_fpath = fake_hammer.runs_fpath,
+    )
+
 # Dict which maps tests to the fixtures which they use as inputs
 test_fixture_mapping = {}
 
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import os, sys
+
+import pytest
+import copy
+import json
+import stat
+import textwrap
+import multiprocessing as mp
+from types import SimpleNamespace
+
+import src.common.data_structs as rg_ds
+import src.ic_3d.buffer_dse as buff_dse
+import src.ic_3d.ic_3d as ic_3d
+
+# Stand in for HSPICE running a buffer sim, the deck written by `get_fake_sp_buffer_lines` has a "* <param> <value>" line per sweep param.
+# The chain passes below a max frequency of 200 MHz per unit of stage ratio, above it the measurements fail.
+# Every run appends the name of its deck to "sims.txt"
+FAKE_HSPICE_SRC = textwrap.dedent('''\
+    #!{python}
+    import os, sys, re
+    sp_fpath = sys.argv[1]
+    with open(os.path.join(os.environ["FAKE_HSPICE_LOG_DPATH"], "sims.txt"), "a") as sims_file:
+        sims_file.write(os.path.basename(sp_fpath) + "\\n")
+    params = dict(re.findall(r"^\\* (\\w+) (\\S+)$", open(sp_fpath).read(), re.MULTILINE))
+    stage_ratio, n_stages, target_freq = int(params["stage_ratio"]), int(params["n_stages"]), float(params["target_freq"])
+    delay = f"{{1e-12 * n_stages * stage_ratio + 1e-15 * float(params['add_wlen']):.6e}}" if target_freq <= 200 * stage_ratio else "failed"
+    # Chain has a shape and a sink die inverter around the buffer stages
+    for inv_idx in range(n_stages + 2):
+        print(f".param inv_wn_{{inv_idx}} = {{stage_ratio}} $ optimized")
+        print(f".param inv_wp_{{inv_idx}} = {{2 * stage_ratio}} $ optimized")
+    print(" ****** transient analysis ******")
+    print(f" tpd= {{delay}}")
+    print(f" max_prop_delay= {{delay}}")
+    print(" .title")
+''')
+
+
+@pytest.fixture
+def fake_hspice(tmp_path, monkeypatch) -> str:
+    """
+        Puts a fake hspice executable on the PATH and returns the directory its runs are logged to.
+    """
+    bin_dpath = tmp_path / "bin"
+    bin_dpath.mkdir()
+    hspice_fpath = bin_dpath / "hspice"
+    hspice_fpath.write_text(FAKE_HSPICE_SRC.format(python = sys.executable))
+    hspice_fpath.chmod(hspice_fpath.stat().st_mode | stat.S_IEXEC)
+    log_dpath = tmp_path / "log"
+    log_dpath.mkdir()
+    monkeypatch.setenv("PATH", str(bin_dpath) + os.pathsep + os.environ.get("PATH", ""))
+    monkeypatch.setenv("FAKE_HSPICE_LOG_DPATH", str(log_dpath))
+    return str(log_dpath)
+
+
+def get_fake_sp_buffer_lines(ic_3d_info, sp_testing_model, sp_title) -> list[str]:
+    sweep_params = sp_testing_model.sweep_params
+    return [
+        f".TITLE {sp_title}",
+        f'.LIB "{ic_3d_info.spice_info.include_sp_file}" INCLUDES',
+        *[f"* {key} {sweep_params[key]}" for key in ["add_wlen", "n_stages", "stage_ratio", "target_freq"]],
+        f"* process {sweep_params['process_info'].name}",
+        f"* inv_sizes {json.dumps(sp_testing_model.inv_sizes, separators = (',', ':'))}",
+        ".END",
+    ]
+
+
+@pytest.fixture
+def fake_buffer_dse(fake_hspice, monkeypatch) -> SimpleNamespace:
+    """
+        Replaces the process / package specific parts of the buffer DSE (library setup, deck contents and reports),
+        returns the reported sweep points and the contents of the spice libraries written for each group.
+    """
+    buffer_dse = SimpleNamespace(reports = [], lib_text = "* process data v1", log_dpath = fake_hspice)
+
+    def get_fake_buffer_dse_group_info(ic_3d_info, process_info, ubump_info, group_tag):
+        group_info = copy.copy(ic_3d_info)
+        group_info.design_info = copy.deepcopy(ic_3d_info.design_info)
+        group_info.spice_info = copy.copy(ic_3d_info.spice_info)
+        includes_dpath = os.path.join(ic_3d_info.spice_info.includes_dir, group_tag)
+        os.makedirs(includes_dpath, exist_ok = True)
+        for lib_fname in ["include_sp_file", "process_data_file", "sweep_data_file", "basic_subckts_file", "subckts_file", "model_file"]:
+            setattr(group_info.spice_info, lib_fname, os.path.join(includes_dpath, f"{lib_fname}.l"))
+            with open(getattr(group_info.spice_info, lib_fname), "w") as fd:
+                print(f"{buffer_dse.lib_text} {lib_fname}", file = fd)
+        return group_info
+
+    def report_fake_buffer_dse_point(ic_3d_info, sweep_params, inv_sizes, measurements, max_freq, write_csv_headers = False):
+        buffer_dse.reports.append({
+            "sweep_params": {key: sweep_params[key] for key in ["add_wlen", "n_stages", "stage_ratio", "target_freq"]},
+            "inv_sizes": inv_sizes,
+            "measurements": measurements,
+            "max_freq": max_freq,
+            "write_csv_headers": write_csv_headers,
+        })
+
+    monkeypatch.setattr(ic_3d, "get_buffer_dse_group_info", get_fake_buffer_dse_group_info)
+    monkeypatch.setattr(ic_3d, "report_buffer_dse_point", report_fake_buffer_dse_point)
+    monkeypatch.setattr(buff_dse, "buffer_sim_setup_updated", lambda ic_3d_info, sweep_params, inv_sizes: SimpleNamespace(sweep_params = sweep_params, inv_sizes = inv_sizes))
+    monkeypatch.setattr(buff_dse, "get_sp_buffer_lines", get_fake_sp_buffer_lines)
+    return buffer_dse
+
+
+def run_sweep(buffer_dse: SimpleNamespace, sp_dpath: str, fanouts: list[int], num_workers: int = 1, use_cache: bool = True) -> tuple[list[dict], list[str]]:
+    """
+        Runs a buffer DSE sweep over 'fanouts' in 'sp_dpath', returns its reported points and the decks which were simulated
+    """
+    ic_3d_info = SimpleNamespace(
+        args = SimpleNamespace(
+            buffer_dse_workers = num_workers,
+            no_buffer_dse_cache = not use_cache,
+            buffer_max_freq = 1000.0,
+            buffer_min_freq = 10.0,
+            buffer_freq_tol = 50.0,
+        ),
+        common = SimpleNamespace(override_outputs = False),
+        res = rg_ds.Regexes(),
+        design_info = SimpleNamespace(),
+        tx_sizing = SimpleNamespace(opt_mode = "NP"),
+        spice_info = SimpleNamespace(
+            sp_dir = sp_dpath,
+            subckt_lib_dir = os.path.join(sp_dpath, "subckts"),
+            includes_dir = os.path.join(sp_dpath, "includes"),
+        ),
+        process_infos = [SimpleNamespace(name = "7nm")],
+        ubump_infos = [SimpleNamespace(pitch = 10)],
+        add_wlens = [0, 100],
+        stage_range = [1, 2],
+        fanout_range = fanouts,
+    )
+    sims_fpath = os.path.join(buffer_dse.log_dpath, "sims.txt")
+    if os.path.exists(sims_fpath):
+        os.remove(sims_fpath)
+    buffer_dse.reports.clear()
+    ic_3d.run_buffer_dse_updated(ic_3d_info)
+    sim_fnames = open(sims_fpath).read().split() if os.path.exists(sims_fpath) else []
+    return list(buffer_dse.reports), sim_fnames
+
+
+@pytest.mark.buff_3d
+def test_buffer_dse_pool_order(fake_buffer_dse, tmp_path):
+    if mp.get_start_method() != "fork":
+        pytest.skip("fake buffer DSE functions only reach pool workers started with fork")
+    serial_reports, serial_sims = run_sweep(fake_buffer_dse, str(tmp_path / "serial"), [2, 4, 8], use_cache = False)
+    assert len(serial_reports) == 2 * 2 * 3
+    assert [report["write_csv_headers"] for report in serial_reports] == [True] + [False] * 11
+    # Max frequency is searched down from the highest target frequency
+    assert [report["max_freq"] for report in serial_reports[:3]] == [pytest.approx(400, abs = 50), pytest.approx(800, abs = 50), 1000.0]
+    assert all(report["max_freq"] <= 200 * report["sweep_params"]["stage_ratio"] for report in serial_reports)
+    assert all(measurement["val"] != "failed" for report in serial_reports for measurement in report["measurements"])
+    # Points simulated by a pool of workers are reported in the same order with the same results
+    pool_reports, pool_sims = run_sweep(fake_buffer_dse, str(tmp_path / "pool"), [2, 4, 8], num_workers = 4, use_cache = False)
+    assert pool_reports == serial_reports
+    assert len(pool_sims) == len(serial_sims)
+
+
+@pytest.mark.buff_3d
+def test_buffer_dse_cache(fake_buffer_dse, tmp_path):
+    sp_dpath = str(tmp_path / "spice")
+    reports, sims = run_sweep(fake_buffer_dse, sp_dpath, [2, 4])
+    assert len(reports) == 2 * 2 * 2 and len(sims) > len(reports)
+    # Nothing is simulated again on a rerun
+    assert run_sweep(fake_buffer_dse, sp_dpath, [2, 4]) == (reports, [])
+    # Adding a fanout only simulates the points of the new fanout
+    ext_reports, ext_sims = run_sweep(fake_buffer_dse, sp_dpath, [2, 4, 8])
+    assert [ext_reports[i] for i in range(len(ext_reports)) if i % 3 != 2] == reports
+    assert len(ext_sims) > 0 and all("-fanout8-" in sim_fname for sim_fname in ext_sims)
+    assert ext_reports == run_sweep(fake_buffer_dse, str(tmp_path / "uncached"), [2, 4, 8], use_cache = False)[0]
+    # Changing the spice libraries simulates every point again
+    fake_buffer_dse.lib_text = "* process data v2"
+    assert len(run_sweep(fake_buffer_dse, sp_dpath, [2, 4, 8])[1]) == len(sims) + len(ext_sims)
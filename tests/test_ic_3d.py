@@ -18,6 +18,7 @@ import shutil
 import json
 from deepdiff import DeepDiff
 import re
+import math
 
 import tests.common.common as tests_common
 
@@ -76,3 +77,146 @@ def test_buffer_dse(ic_3d_tb: type[rg_ds.MetaDataclass], request):
 
 
 
+
+
+def get_res_info_from_dims_scalar(design_pdn, dims: List[int], metal_rail_res_per_um: float, single_via_stack_res: float, pwr_rails_per_um: float, current_per_sq_um: float) -> dict:
+    """
+        Scalar power region resistance / IR drop model which `pdn_modeling.get_res_info_from_dims_arr` replaced, sums the IR drop of each via in a loop
+    """
+    pwr_rail_xy_radius = [math.sqrt(design_pdn.floorplan.area / (math.prod(dims)))/2]*2
+    region_dims = [pwr_rail_xy_radius[0]*2, pwr_rail_xy_radius[1]*2]
+    tsv_bb_bounds = design_pdn.tsv_info.tsv_rect_placements.bb_poly.bounds
+    tsv_grid_bounds = [abs(tsv_bb_bounds[2] - tsv_bb_bounds[0]), abs(tsv_bb_bounds[3] - tsv_bb_bounds[1])]
+    crit_path_distance = (max(region_dims) - (min(tsv_grid_bounds))) / 2
+    current_per_half_region = (current_per_sq_um * region_dims[0] * region_dims[1]) / 2
+    via_res_per_half_region = single_via_stack_res / (single_via_stack_res * math.prod(region_dims) / 2)
+    dist_mstack_ir_drop = current_per_half_region * (1 / 2 * metal_rail_res_per_um + via_res_per_half_region ) / ( pwr_rails_per_um )
+    current_per_region = current_per_sq_um * math.prod(region_dims)
+    pwr_rails_per_region_dim = pwr_rails_per_um * min(region_dims)
+    current_per_pwr_rail = (current_per_region / 2) / pwr_rails_per_region_dim
+    vias_per_crit_path = crit_path_distance / (design_pdn.process_info.mlayers[-1].via_pitch*1e-3)
+    wire_res_bw_vias = (design_pdn.process_info.mlayers[-1].via_pitch * 1e-3 * design_pdn.process_info.mlayers[-1].wire_res_per_um)
+    current_per_via_stack = current_per_pwr_rail / vias_per_crit_path
+    ir_drops = []
+    for ir_idx in range(math.floor(vias_per_crit_path)):
+        ir_drops.append((current_per_pwr_rail - current_per_via_stack * ir_idx) * wire_res_bw_vias)
+    total_ir_drop = sum(ir_drops) + (single_via_stack_res) * current_per_via_stack
+    single_rail_res = crit_path_distance * design_pdn.process_info.mlayers[-1].wire_res_per_um
+    return {
+        "region_dims": region_dims,
+        "single_rail_res": single_rail_res,
+        "single_rail_path_res": single_rail_res + single_via_stack_res,
+        "single_rail_voltage": total_ir_drop,
+        "single_rail_v_calc_iavg": dist_mstack_ir_drop,
+        "crit_path_distance": crit_path_distance,
+        "current_per_crit_region": current_per_region,
+        "current_per_pwr_rail": current_per_pwr_rail,
+    }
+
+
+@pytest.mark.ic_3d
+def test_pdn_res_info_arr_matches_scalar():
+    import numpy as np
+    from types import SimpleNamespace
+    import src.ic_3d.pdn_modeling as pdn
+    design_pdn = SimpleNamespace(
+        floorplan = SimpleNamespace(area = 1.3e6),
+        tsv_info = SimpleNamespace(tsv_rect_placements = SimpleNamespace(bb_poly = SimpleNamespace(bounds = (3.0, 4.0, 13.5, 17.25)))),
+        process_info = SimpleNamespace(mlayers = [SimpleNamespace(via_pitch = 80, wire_res_per_um = 0.37)]),
+    )
+    model_args = dict(metal_rail_res_per_um = 0.21, single_via_stack_res = 1.7, pwr_rails_per_um = 0.35, current_per_sq_um = 1.3e-6)
+    grid_dims = [1, 2, 3, 5, 8, 13, 21, 34, 55]
+    dims = np.array([ [x_dim, y_dim] for x_dim in grid_dims for y_dim in grid_dims ] + [[400, 400]])
+    for source in ["ubump", "c4"]:
+        res_info = pdn.get_res_info_from_dims_arr(design_pdn, dims, source = source, **model_args)
+        for row_idx, row_dims in enumerate(dims[:-1]):
+            scalar_res_info = get_res_info_from_dims_scalar(design_pdn, [int(dim) for dim in row_dims], **model_args)
+            for key, val in scalar_res_info.items():
+                # Results match the scalar model to rounding, bit for bit where sum() uses compensated summation (CPython 3.12+)
+                np.testing.assert_allclose(res_info[key][row_idx], val, rtol = 1e-12, atol = 0, err_msg = key)
+        # Power regions smaller than the TSV grid are NaN rather than asserting
+        assert np.isnan(res_info["single_rail_voltage"][-1]) and np.isnan(res_info["crit_path_distance"][-1])
+
+
+@pytest.mark.ic_3d
+def test_bb_poly():
+    import shapely as sh
+    # Offset columns so the highest ymin isn't the lowest one
+    polys = [sh.box(x, y + x, x + 1, y + x + 1) for x in range(3) for y in range(0, 6, 2)]
+    bb_poly = rg_ds.get_bb_poly(polys)
+    assert bb_poly.bounds == (0.0, 0.0, 3.0, 7.0)
+    # The bounding box is the full rectangle around the polygons
+    assert bb_poly.equals(sh.box(0.0, 0.0, 3.0, 7.0))
+
+
+def get_freq_search_oracle(max_pass_freq: float) -> Tuple[Callable[[float], bool], List[float]]:
+    """
+        Returns an `is_passing` function for `buffer_dse.search_max_freq` which passes up to 'max_pass_freq' and the list of frequencies it is called with
+    """
+    evaluated_freqs = []
+    def is_passing(freq: float) -> bool:
+        evaluated_freqs.append(freq)
+        return freq <= max_pass_freq
+    return is_passing, evaluated_freqs
+
+
+@pytest.mark.buff_3d
+def test_search_max_freq():
+    import src.ic_3d.buffer_dse as buff_dse
+    # max freq passing is returned after a single sim
+    is_passing, evaluated_freqs = get_freq_search_oracle(5000)
+    assert buff_dse.search_max_freq(is_passing, 100, 1000, 10) == 1000
+    assert evaluated_freqs == [1000]
+    # bisection converges to within tol of the pass / fail boundary
+    for max_pass_freq in [100, 137.5, 420, 999]:
+        is_passing, evaluated_freqs = get_freq_search_oracle(max_pass_freq)
+        max_freq = buff_dse.search_max_freq(is_passing, 100, 1000, 10)
+        assert max_freq <= max_pass_freq and max_pass_freq - max_freq <= 10
+        assert len(evaluated_freqs) <= math.ceil(math.log2((1000 - 100) / 10)) + 2
+        # No frequency is simulated twice
+        assert len(evaluated_freqs) == len(set(evaluated_freqs))
+    # min freq failing returns None
+    is_passing, evaluated_freqs = get_freq_search_oracle(50)
+    assert buff_dse.search_max_freq(is_passing, 100, 1000, 10) is None
+    assert evaluated_freqs[-1] == 100 and len(evaluated_freqs) == len(set(evaluated_freqs))
+    with pytest.raises(ValueError):
+        buff_dse.search_max_freq(is_passing, 1000, 100, 10)
+
+
+@pytest.mark.buff_3d
+def test_buffer_sim_key(monkeypatch):
+    from types import SimpleNamespace
+    import src.ic_3d.buffer_dse as buff_dse
+    num_decks = [0]
+    def get_fake_sp_buffer_lines(ic_3d_info, sp_testing_model, sp_title):
+        # Title and library path differ between decks of the same simulation
+        num_decks[0] += 1
+        return [f".TITLE {sp_title} {num_decks[0]}", f'.LIB "/tmp/run_{num_decks[0]}/includes.l" INCLUDES', f"* {sp_testing_model.sweep_params}", f"* {sp_testing_model.inv_sizes}", ".END"]
+    monkeypatch.setattr(buff_dse, "buffer_sim_setup_updated", lambda ic_3d_info, sweep_params, inv_sizes: SimpleNamespace(sweep_params = sweep_params, inv_sizes = inv_sizes))
+    monkeypatch.setattr(buff_dse, "get_sp_buffer_lines", get_fake_sp_buffer_lines)
+    sweep_params = {"process": "7nm", "ubump_pitch": 10, "add_wlen": 0, "n_stages": 2, "stage_ratio": 4, "target_freq": 1000}
+    inv_sizes = [{"wn": 1, "wp": 2}, {"wn": 4, "wp": 8}]
+    key = buff_dse.get_buffer_sim_key(None, sweep_params, inv_sizes, "libs_v1")
+    # Same simulation gets the same key wherever its deck is written
+    assert buff_dse.get_buffer_sim_key(None, dict(sweep_params), inv_sizes, "libs_v1") == key
+    # Anything that changes what is simulated changes the key
+    assert buff_dse.get_buffer_sim_key(None, {**sweep_params, "target_freq": 500}, inv_sizes, "libs_v1") != key
+    assert buff_dse.get_buffer_sim_key(None, sweep_params, [{"wn": 1, "wp": 2}, {"wn": 4, "wp": 9}], "libs_v1") != key
+    assert buff_dse.get_buffer_sim_key(None, sweep_params, inv_sizes, "libs_v2") != key
+
+
+@pytest.mark.buff_3d
+def test_sp_libs_digest(tmp_path):
+    from types import SimpleNamespace
+    import src.ic_3d.buffer_dse as buff_dse
+    lib_fnames = ["include_sp_file", "process_data_file", "sweep_data_file", "basic_subckts_file", "subckts_file", "model_file"]
+    spice_info = SimpleNamespace(**{lib_fname: str(tmp_path / f"{lib_fname}.l") for lib_fname in lib_fnames})
+    for lib_fname in lib_fnames:
+        (tmp_path / f"{lib_fname}.l").write_text(f"* {lib_fname}\n")
+    digest = buff_dse.get_sp_libs_digest(spice_info)
+    assert buff_dse.get_sp_libs_digest(spice_info) == digest
+    # Changing any library included by the buffer sims changes the digest
+    for lib_fname in lib_fnames:
+        (tmp_path / f"{lib_fname}.l").write_text(f"* {lib_fname} v2\n")
+        assert buff_dse.get_sp_libs_digest(spice_info) != digest, lib_fname
+        (tmp_path / f"{lib_fname}.l").write_text(f"* {lib_fname}\n")
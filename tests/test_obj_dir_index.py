@@ -0,0 +1,62 @@
+from __future__ import annotations
+import os, sys
+
+import json
+import pytest
+from contextlib import closing
+
+import src.asic_dse.asic_dse as asic_dse
+
+
+def write_obj_dir(obj_dirs_dpath, obj_dir: str, target_period: str, delay: float, area: float, rep_tag: str = "final") -> None:
+    """
+        Writes an obj dir with the syn output config `get_obj_dir_info` reads VLSI params from and a `rep_tag` stage report
+    """
+    syn_rundir_dpath = obj_dirs_dpath / obj_dir / "syn-rundir"
+    syn_rundir_dpath.mkdir(parents = True, exist_ok = True)
+    (syn_rundir_dpath / "syn-output-full.json").write_text(json.dumps({
+        "vlsi.inputs.placement_constraints": [{"path": "alu"}],
+        "vlsi.core.technology": "asap7",
+        "vlsi.inputs.clocks": [{"period": target_period}],
+        "par.innovus.design_flow_effort": "standard",
+        "par.innovus.floorplan_mode": "generate",
+    }))
+    reports_dpath = obj_dirs_dpath / obj_dir / "reports"
+    reports_dpath.mkdir(exist_ok = True)
+    (reports_dpath / f"{rep_tag}_report.csv").write_text(f"Total Area,Delay,Total Power\n{area},{delay},1.0\n")
+
+
+@pytest.mark.parse
+def test_obj_dir_index_reparse(tmp_path, monkeypatch):
+    obj_dirs_dpath = tmp_path / "obj_dirs"
+    write_obj_dir(obj_dirs_dpath, "pt_0", "1 ns", 0.9, 100)
+    write_obj_dir(obj_dirs_dpath, "pt_1", "1 ns", 0.8, 100)
+    write_obj_dir(obj_dirs_dpath, "pt_2", "2 ns", 1.5, 90)
+    # Only got through synthesis, is never picked over the obj dirs which finished the flow
+    write_obj_dir(obj_dirs_dpath, "pt_3", "2 ns", 0.1, 10, rep_tag = "syn")
+    parsed_obj_dpaths = []
+    get_obj_dir_info = asic_dse.get_obj_dir_info
+    def get_counted_obj_dir_info(obj_dpath: str) -> dict:
+        parsed_obj_dpaths.append(os.path.basename(obj_dpath))
+        return get_obj_dir_info(obj_dpath)
+    monkeypatch.setattr(asic_dse, "get_obj_dir_info", get_counted_obj_dir_info)
+    monkeypatch.chdir(tmp_path)
+
+    index_fpath = str(tmp_path / asic_dse.OBJ_DIR_INDEX_FNAME)
+    with closing(asic_dse.open_obj_dir_index(index_fpath)) as index_conn:
+        obj_dir_infos = asic_dse.get_indexed_obj_dir_infos(str(obj_dirs_dpath), index_conn)
+        assert sorted(parsed_obj_dpaths) == ["pt_0", "pt_1", "pt_2", "pt_3"]
+        assert asic_dse.get_condensed_obj_dirs(str(obj_dirs_dpath), obj_dir_infos, index_conn) == {"pt_1", "pt_2"}
+    # Indexed scores pick the same obj dirs as scoring the parsed infos
+    assert asic_dse.get_condensed_obj_dirs(str(obj_dirs_dpath), obj_dir_infos) == {"pt_1", "pt_2"}
+
+    # Second compile with new results for pt_0 only parses pt_0 again
+    write_obj_dir(obj_dirs_dpath, "pt_0", "1 ns", 0.5, 100)
+    report_fpath = obj_dirs_dpath / "pt_0" / "reports" / "final_report.csv"
+    os.utime(report_fpath, ns = (0, report_fpath.stat().st_mtime_ns + 1))
+    parsed_obj_dpaths.clear()
+    with closing(asic_dse.open_obj_dir_index(index_fpath)) as index_conn:
+        obj_dir_infos = asic_dse.get_indexed_obj_dir_infos(str(obj_dirs_dpath), index_conn)
+        assert parsed_obj_dpaths == ["pt_0"]
+        assert obj_dir_infos["pt_0"]["Delay"] == "0.5"
+        assert asic_dse.get_condensed_obj_dirs(str(obj_dirs_dpath), obj_dir_infos, index_conn) == {"pt_0", "pt_2"}
@@ -0,0 +1,95 @@
+from __future__ import annotations
+import os, sys
+
+import pytest
+import textwrap
+from types import SimpleNamespace
+
+import src.common.data_structs as rg_ds
+import src.asic_dse.hammer_flow as asic_hammer
+
+
+def get_genus_timing_rpt(num_paths: int) -> str:
+    """
+        Returns a Genus style timing report with `num_paths` paths, path 'i' has a data path delay of 900 - i ps
+    """
+    rpt_lines = ["=" * 60, "  Generated by:  Genus(TM) Synthesis Solution", "  Module:        fake_mod", "=" * 60, ""]
+    for i in range(num_paths):
+        rpt_lines += textwrap.dedent(f'''\
+            Path {i + 1}: MET ({80 + i} ps) Setup Check with Pin out_reg[{i}]/CLK->D
+                      Group: clk
+                 Startpoint: (R) in_reg[{i}]/CLK
+                                 Capture       Launch
+                    Clock Edge:+    1000            0
+                       Arrival:=    1000            0
+
+                         Setup:-      20
+                     Data Path:-     {900 - i}
+                         Slack:=      {80 + i}
+
+            #{"-" * 60}
+            #  Timing Point   Flags   Arc   Edge   Cell   Fanout
+            #{"-" * 60}
+              in_reg[{i}]/CLK   -   CLK   R   DFFx1   1
+            #{"-" * 60}
+        ''').splitlines()
+    return "\n".join(rpt_lines) + "\n"
+
+
+GENUS_AREA_RPT = textwrap.dedent('''\
+    ============================================================
+      Generated by:  Genus(TM) Synthesis Solution
+    ============================================================
+
+      Instance   Module  Cell Count  Cell Area  Net Area  Total Area
+    --------------------------------------------------------------
+    fake_mod                    120     300.5      20.5       321.0
+      u_alu     alu_mod          80     200.0      10.0       210.0
+      u_reg     reg_mod          40     100.5      10.5       111.0
+''')
+
+
+@pytest.fixture
+def fake_asic_dse() -> SimpleNamespace:
+    return SimpleNamespace(common = SimpleNamespace(res = rg_ds.Regexes(), report = rg_ds.ReportInfo()))
+
+
+@pytest.mark.parse
+def test_parse_cadence_timing_report(fake_asic_dse, tmp_path):
+    rpt_fpath = tmp_path / "fake_mod.timing.rpt"
+    rpt_fpath.write_text(get_genus_timing_rpt(50))
+    syn_stage = SimpleNamespace(tag = "syn", tool = "cadence")
+    timing_paths = asic_hammer.parse_report_c(fake_asic_dse, "fake_mod", str(rpt_fpath), "timing", syn_stage)
+    assert len(timing_paths) == 50
+    assert timing_paths[0] == {"Setup": 20.0, "Arrival": 900.0, "Delay": 920.0, "Slack": 80.0}
+    assert timing_paths[-1]["Delay"] == 871.0
+    # worst N mode only returns the first (most critical) paths
+    assert asic_hammer.parse_report_c(fake_asic_dse, "fake_mod", str(rpt_fpath), "timing", syn_stage, worst_n = 3) == timing_paths[:3]
+    assert asic_hammer.parse_report_c(fake_asic_dse, "fake_mod", str(rpt_fpath), "timing", syn_stage, summarize = True) == timing_paths[:1]
+    # A path cut off by the end of the report is dropped
+    rpt_fpath.write_text(get_genus_timing_rpt(2) + "Path 3: MET (1 ps) Setup Check\n         Slack:=      1\n")
+    assert len(asic_hammer.parse_report_c(fake_asic_dse, "fake_mod", str(rpt_fpath), "timing", syn_stage)) == 2
+
+
+@pytest.mark.parse
+def test_parse_cadence_area_report(fake_asic_dse, tmp_path):
+    rpt_fpath = tmp_path / "fake_mod.area.rpt"
+    rpt_fpath.write_text(GENUS_AREA_RPT)
+    syn_stage = SimpleNamespace(tag = "syn", tool = "cadence")
+    areas = asic_hammer.parse_report_c(fake_asic_dse, "fake_mod", str(rpt_fpath), "area", syn_stage)
+    assert [ area["Instance"] for area in areas ] == ["fake_mod", "u_alu", "u_reg"]
+    assert areas[0]["Module"] == "NA" and areas[0]["Total Area"] == "321.0"
+    assert areas[1] == {"Instance": "u_alu", "Module": "alu_mod", "Cell Count": "80", "Cell Area": "200.0", "Net Area": "10.0", "Total Area": "210.0"}
+    assert asic_hammer.parse_report_c(fake_asic_dse, "fake_mod", str(rpt_fpath), "area", syn_stage, summarize = True) == areas[:1]
+
+
+@pytest.mark.parse
+def test_get_report_results_worst_timing_path(fake_asic_dse, tmp_path):
+    (tmp_path / "fake_mod.timing.rpt").write_text(get_genus_timing_rpt(20))
+    (tmp_path / "fake_mod.area.rpt").write_text(GENUS_AREA_RPT)
+    syn_stage = SimpleNamespace(tag = "syn", tool = "cadence")
+    results = asic_hammer.get_report_results(fake_asic_dse, "fake_mod", str(tmp_path), syn_stage, timing_worst_n = 1)
+    # Flow results only use the most critical path, area reports are still fully parsed
+    assert results["timing"] == [{"Setup": 20.0, "Arrival": 900.0, "Delay": 920.0, "Slack": 80.0}]
+    assert len(results["area"]) == 3
+    assert len(asic_hammer.get_report_results(fake_asic_dse, "fake_mod", str(tmp_path), syn_stage)["timing"]) == 20
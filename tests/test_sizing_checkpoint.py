@@ -0,0 +1,165 @@
+from __future__ import annotations
+import os, sys
+
+import pytest
+import contextlib
+from types import SimpleNamespace
+
+import src.coffe.tran_sizing as tran_sizing
+import src.coffe.utils as coffe_utils
+
+# Subcircuits of the fake FPGA sized in each sizing iteration, keyed by the FPGA attribute they're stored in
+FAKE_SUBCKTS = {
+    "sb_muxes": ["sb_mux_uid0", "sb_mux_uid1"],
+    "cb_muxes": ["cb_mux_uid0"],
+    "local_muxes": ["local_mux_uid0"],
+    "luts": ["lut_uid0"],
+    "flut_muxes": ["flut_mux_uid0"],
+    "local_ble_outputs": ["local_ble_output_uid0"],
+    "general_ble_outputs": ["general_ble_output_uid0"],
+}
+MAX_ITERATIONS = 2
+
+
+class FakeFPGA:
+    """
+        Stands in for fpga.FPGA in size_fpga_transistors, areas and delays are simple functions of the transistor sizes
+    """
+    def __init__(self):
+        self.specs = SimpleNamespace(enable_carry_chain = 0, enable_bram_block = 0, quick_mode_threshold = float("-inf"))
+        self.hardblocklist = []
+        self.tb_lib = {}
+        self.lut_inputs = {}
+        self.lut_input_drivers = {}
+        self.lut_input_not_drivers = {}
+        self.transistor_sizes = {}
+        self.lb_height = None
+        self.area_dict = {}
+        self.delay_dict = {}
+        for subckt_key, sp_names in FAKE_SUBCKTS.items():
+            subckts = []
+            for i, sp_name in enumerate(sp_names):
+                subckts.append(SimpleNamespace(
+                    sp_name = sp_name,
+                    initial_transistor_sizes = {f"inv_{sp_name}_1_nmos": 1 + i, f"inv_{sp_name}_1_pmos": 2 + i},
+                ))
+                self.transistor_sizes.update(subckts[-1].initial_transistor_sizes)
+            setattr(self, subckt_key, subckts)
+        self.update_area()
+
+    def update_area(self):
+        self.area_dict["tile"] = 100.0 + sum(self.transistor_sizes.values())
+
+    def update_wires(self):
+        pass
+
+    def update_wire_rc(self):
+        pass
+
+    def compute_distance(self):
+        pass
+
+    def update_delays(self, spice_interface):
+        self.delay_dict["rep_crit_path"] = 1e-9 * self.area_dict["tile"] / (self.lb_height or 1.0)
+
+
+@pytest.fixture
+def fake_sizing(monkeypatch) -> SimpleNamespace:
+    """
+        Replaces the spice based parts of transistor sizing, returns the (subcircuit, iteration) of each sizing call
+        and the number of sizing calls after which the next one is interrupted.
+    """
+    sizing = SimpleNamespace(calls = [], interrupt_after = None)
+
+    def fake_size_subcircuit_transistors(fpga_inst, subcircuit, outer_iter, initial_transistor_sizes, **kwargs):
+        if sizing.interrupt_after is not None and len(sizing.calls) == sizing.interrupt_after:
+            raise KeyboardInterrupt
+        sizing.calls.append((subcircuit.sp_name, outer_iter))
+        sizes = {name: size + outer_iter for name, size in initial_transistor_sizes.items()}
+        sizes_detailed = {}
+        for name, size in sizes.items():
+            sizes_detailed[name + "_nmos"] = size
+            sizes_detailed[name + "_pmos"] = 2 * size
+        fpga_inst.transistor_sizes.update(sizes_detailed)
+        fpga_inst.update_area()
+        return sizes, sizes_detailed
+
+    monkeypatch.setattr(tran_sizing, "size_subcircuit_transistors", fake_size_subcircuit_transistors)
+    monkeypatch.setattr(tran_sizing.cost_lib, "get_eval_area", lambda fpga_inst, *args, **kwargs: fpga_inst.area_dict["tile"])
+    monkeypatch.setattr(tran_sizing, "get_current_delay", lambda fpga_inst, is_ram: fpga_inst.delay_dict["rep_crit_path"])
+    monkeypatch.setattr(tran_sizing, "print_results", lambda *args: None)
+    monkeypatch.setattr(tran_sizing, "export_sizing_results", lambda *args: None)
+    monkeypatch.setattr(tran_sizing, "check_if_done", lambda *args: (False, 0))
+    return sizing
+
+
+def run_sizing(arch_dpath: str, resume: bool) -> FakeFPGA:
+    """
+        Sizes a new fake FPGA from the arch directory like `run_coffe_flow`, returns it once sizing is done
+    """
+    fpga_inst = FakeFPGA()
+    run_options = SimpleNamespace(
+        opt_type = "global",
+        re_erf = 1,
+        max_iterations = MAX_ITERATIONS,
+        area_opt_weight = 1,
+        delay_opt_weight = 1,
+        size_hb_interfaces = 0.0,
+        resume = resume,
+    )
+    spice_interface = SimpleNamespace(timing_trace = SimpleNamespace(phase = lambda *args, **kwargs: contextlib.nullcontext()))
+    default_dpath = os.getcwd()
+    os.chdir(arch_dpath)
+    try:
+        tran_sizing.size_fpga_transistors(fpga_inst, run_options, spice_interface)
+    finally:
+        os.chdir(default_dpath)
+    return fpga_inst
+
+
+@pytest.mark.coffe_sizing
+@pytest.mark.parametrize("interrupt_after", [3, 8, 13])
+def test_sizing_interrupt_resume(fake_sizing, tmp_path, interrupt_after):
+    num_subckts = sum(len(sp_names) for sp_names in FAKE_SUBCKTS.values())
+    ref_fpga = run_sizing(coffe_utils.create_output_dir("arch.yaml", str(tmp_path / "ref")), resume = False)
+    ref_calls = list(fake_sizing.calls)
+    assert len(ref_calls) == num_subckts * MAX_ITERATIONS
+    ref_final_sizes = (tmp_path / "ref" / "sizing_results_final.txt").read_text()
+
+    arch_dpath = coffe_utils.create_output_dir("arch.yaml", str(tmp_path / "arch"))
+    fake_sizing.calls.clear()
+    fake_sizing.interrupt_after = interrupt_after
+    with pytest.raises(KeyboardInterrupt):
+        run_sizing(arch_dpath, resume = False)
+    assert fake_sizing.calls == ref_calls[:interrupt_after]
+
+    # Setting up the output dir of the resumed run keeps the checkpoint of the interrupted one
+    ckpt_fpath = os.path.join(arch_dpath, tran_sizing.SIZING_CHECKPOINT_FPATH)
+    assert coffe_utils.create_output_dir("arch.yaml", arch_dpath, keep_contents = True) == arch_dpath
+    assert os.path.isfile(ckpt_fpath)
+    if interrupt_after > num_subckts:
+        assert os.path.isfile(os.path.join(arch_dpath, "sizing_results", "sizes_iteration_1.txt"))
+
+    # Subcircuits sized before the interrupt aren't sized again and the results match an uninterrupted run
+    fake_sizing.calls.clear()
+    fake_sizing.interrupt_after = None
+    resumed_fpga = run_sizing(arch_dpath, resume = True)
+    assert fake_sizing.calls == ref_calls[interrupt_after:]
+    assert resumed_fpga.transistor_sizes == ref_fpga.transistor_sizes
+    assert resumed_fpga.area_dict == ref_fpga.area_dict
+    assert resumed_fpga.delay_dict == ref_fpga.delay_dict
+    assert (tmp_path / "arch" / "sizing_results_final.txt").read_text() == ref_final_sizes
+
+    # A new (not resumed) run starts over
+    coffe_utils.create_output_dir("arch.yaml", arch_dpath)
+    assert not os.path.exists(ckpt_fpath)
+
+
+@pytest.mark.coffe_sizing
+def test_sizing_resume_without_checkpoint(fake_sizing, tmp_path):
+    ref_fpga = run_sizing(coffe_utils.create_output_dir("arch.yaml", str(tmp_path / "ref")), resume = False)
+    ref_calls = list(fake_sizing.calls)
+    fake_sizing.calls.clear()
+    resumed_fpga = run_sizing(coffe_utils.create_output_dir("arch.yaml", str(tmp_path / "arch"), keep_contents = True), resume = True)
+    assert fake_sizing.calls == ref_calls
+    assert resumed_fpga.transistor_sizes == ref_fpga.transistor_sizes
@@ -0,0 +1,262 @@
+from __future__ import annotations
+import os, sys
+
+import pytest
+import stat
+import textwrap
+
+import src.coffe.spice as spice
+
+# Stand in for HSPICE, its behaviour for each run is set by the FAKE_HSPICE_MODE env var:
+# - "ok": writes a .mt0 file with one measurement
+# - "license:<N>": fails to check out a license for the first N runs of a testbench then behaves as "ok"
+# - "convergence": fails with a convergence error
+# Every run appends its -mt value to "mt_args.txt" and records the max number of runs seen at the same time in "max_running.txt"
+FAKE_HSPICE_SRC = textwrap.dedent('''\
+    #!{python}
+    import os, sys, time, glob
+    mode = os.environ.get("FAKE_HSPICE_MODE", "ok")
+    log_dpath = os.environ["FAKE_HSPICE_LOG_DPATH"]
+    num_threads = sys.argv[sys.argv.index("-mt") + 1]
+    sp_filename = sys.argv[sys.argv.index("-i") + 1]
+    tb_name = os.path.splitext(sp_filename)[0]
+    with open(os.path.join(log_dpath, "mt_args.txt"), "a") as mt_file:
+        mt_file.write(num_threads + "\\n")
+
+    # Mark this run as running while it "simulates" to check the number of concurrent runs
+    running_fpath = os.path.join(log_dpath, f"running_{{os.getpid()}}")
+    open(running_fpath, "w").close()
+    time.sleep(0.2)
+    num_running = len(glob.glob(os.path.join(log_dpath, "running_*")))
+    max_fpath = os.path.join(log_dpath, f"max_running_{{os.getpid()}}")
+    with open(max_fpath, "w") as max_file:
+        max_file.write(str(num_running))
+    os.remove(running_fpath)
+
+    if mode.startswith("license:"):
+        count_fpath = os.path.join(log_dpath, f"{{tb_name}}_runs.txt")
+        num_runs = int(open(count_fpath).read()) if os.path.isfile(count_fpath) else 0
+        with open(count_fpath, "w") as count_file:
+            count_file.write(str(num_runs + 1))
+        if num_runs < int(mode.split(":")[1]):
+            print("Error: license checkout failed for hspice, licensed number of users already reached")
+            sys.exit(1)
+    elif mode == "convergence":
+        print("**error** internal timestep too small in transient analysis")
+        sys.exit(1)
+
+    with open(tb_name + ".mt0", "w") as mt0_file:
+        mt0_file.write("$DATA1 SOURCE='HSPICE'\\n.TITLE ''\\nmeas_delay temper alter#\\n1.5e-11 25.0 1\\n")
+''')
+
+
+@pytest.fixture
+def fake_hspice(tmp_path, monkeypatch) -> str:
+    """
+        Puts a fake hspice executable on the PATH and returns the directory its runs are logged to.
+    """
+    bin_dpath = tmp_path / "bin"
+    bin_dpath.mkdir()
+    hspice_fpath = bin_dpath / "hspice"
+    hspice_fpath.write_text(FAKE_HSPICE_SRC.format(python = sys.executable))
+    hspice_fpath.chmod(hspice_fpath.stat().st_mode | stat.S_IEXEC)
+    log_dpath = tmp_path / "log"
+    log_dpath.mkdir()
+    monkeypatch.setenv("PATH", str(bin_dpath) + os.pathsep + os.environ.get("PATH", ""))
+    monkeypatch.setenv("FAKE_HSPICE_LOG_DPATH", str(log_dpath))
+    monkeypatch.setenv("FAKE_HSPICE_MODE", "ok")
+    return str(log_dpath)
+
+
+def make_tbs(tmp_path, num_tbs: int) -> list[str]:
+    """
+        Creates 'num_tbs' testbench directories in an architecture dir and returns the paths to their .sp files.
+    """
+    arch_dpath = tmp_path / "arch"
+    sp_paths = []
+    for i in range(num_tbs):
+        tb_dpath = arch_dpath / f"tb_{i}"
+        tb_dpath.mkdir(parents = True)
+        sp_fpath = tb_dpath / f"tb_{i}.sp"
+        sp_fpath.write_text("* fake testbench\n.end\n")
+        sp_paths.append(str(sp_fpath))
+    return sp_paths
+
+
+def read_mt_args(log_dpath: str) -> list[int]:
+    with open(os.path.join(log_dpath, "mt_args.txt")) as mt_file:
+        return [int(line) for line in mt_file]
+
+
+def read_max_running(log_dpath: str) -> int:
+    max_running = 0
+    for fname in os.listdir(log_dpath):
+        if fname.startswith("max_running_"):
+            with open(os.path.join(log_dpath, fname)) as max_file:
+                max_running = max(max_running, int(max_file.read()))
+    return max_running
+
+
+PARAMETER_DICT = {"tran_size": ["1", "2"]}
+
+
+@pytest.mark.spice
+def test_spice_sim_success(fake_hspice, tmp_path):
+    sp_interface = spice.SpiceInterface("hspice", scheduler = spice.SpiceScheduler(num_cores = 4))
+    sp_path = make_tbs(tmp_path, 1)[0]
+    spice_meas = sp_interface.run_batch([sp_path], {"tran_size": ["1"]})[0]
+    assert spice_meas["meas_delay"][0] == pytest.approx(1.5e-11)
+    # The .mt0 is removed after parsing and a single job gets all cores up to the thread cap
+    assert not os.path.isfile(os.path.splitext(sp_path)[0] + ".mt0")
+    assert read_mt_args(fake_hspice) == [4]
+    assert sp_interface.get_retry_stats() == {}
+
+
+@pytest.mark.spice
+def test_spice_license_failure_retried(fake_hspice, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_HSPICE_MODE", "license:2")
+    sp_interface = spice.SpiceInterface("hspice", scheduler = spice.SpiceScheduler(max_retries = 3, backoff_s = 0.01))
+    sp_path = make_tbs(tmp_path, 1)[0]
+    spice_meas = sp_interface.run_batch([sp_path], {"tran_size": ["1"]})[0]
+    assert spice_meas["meas_delay"][0] == pytest.approx(1.5e-11)
+    assert sp_interface.get_retry_stats() == {spice.SPICE_LICENSE_FAILURE: 2}
+
+
+@pytest.mark.spice
+def test_spice_license_failure_gives_up(fake_hspice, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_HSPICE_MODE", "license:100")
+    sp_interface = spice.SpiceInterface("hspice", scheduler = spice.SpiceScheduler(max_retries = 2, backoff_s = 0.01))
+    sp_path = make_tbs(tmp_path, 1)[0]
+    with pytest.raises(spice.SpiceSimError) as exc_info:
+        sp_interface.run_batch([sp_path], {"tran_size": ["1"]})
+    assert exc_info.value.failure_type == spice.SPICE_LICENSE_FAILURE
+    assert exc_info.value.num_attempts == 3
+
+
+@pytest.mark.spice
+def test_spice_convergence_failure_not_retried(fake_hspice, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_HSPICE_MODE", "convergence")
+    sp_interface = spice.SpiceInterface("hspice", scheduler = spice.SpiceScheduler(max_retries = 5, backoff_s = 0.01))
+    sp_path = make_tbs(tmp_path, 1)[0]
+    with pytest.raises(spice.SpiceSimError) as exc_info:
+        sp_interface.run_batch([sp_path], {"tran_size": ["1"]})
+    assert exc_info.value.failure_type == spice.SPICE_CONVERGENCE_FAILURE
+    assert exc_info.value.num_attempts == 1
+    assert len(read_mt_args(fake_hspice)) == 1
+
+
+@pytest.mark.spice
+def test_spice_batch_license_limit(fake_hspice, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_HSPICE_MODE", "license:1")
+    sp_interface = spice.SpiceInterface(
+        "hspice", num_workers = 4, 
+        scheduler = spice.SpiceScheduler(max_licenses = 2, num_cores = 8, backoff_s = 0.01),
+    )
+    sp_paths = make_tbs(tmp_path, 4)
+    spice_meas_list = sp_interface.run_batch(sp_paths, PARAMETER_DICT)
+    assert len(spice_meas_list) == len(sp_paths)
+    assert all(spice_meas["meas_delay"][0] == pytest.approx(1.5e-11) for spice_meas in spice_meas_list)
+    # No more jobs than licenses at once, each sharing the cores equally, and retries from the workers are counted
+    assert read_max_running(fake_hspice) <= 2
+    assert set(read_mt_args(fake_hspice)) == {4}
+    assert sp_interface.get_retry_stats() == {spice.SPICE_LICENSE_FAILURE: len(sp_paths)}
+    assert sp_interface.get_num_simulations_performed() == len(PARAMETER_DICT["tran_size"]) * len(sp_paths)
+
+
+@pytest.mark.spice
+def test_spice_timing_trace(fake_hspice, tmp_path):
+    sp_interface = spice.SpiceInterface("hspice", num_workers = 2)
+    sp_paths = make_tbs(tmp_path, 2)
+    with sp_interface.timing_trace.phase("sizing", subckt = "tb"):
+        sp_interface.run_batch(sp_paths, PARAMETER_DICT)
+    records = sp_interface.timing_trace.records
+    # Each testbench has its simulator and parse time recorded, tagged with the phase and subcircuit they ran in
+    for sp_path in sp_paths:
+        tb_events = [record["event"] for record in records if record["testbench"] == spice.get_tb_name(sp_path)]
+        assert sorted(tb_events) == ["parse", "sim"]
+    sim_records = [record for record in records if record["event"] == "sim"]
+    assert all(record["phase"] == "sizing" and record["subckt"] == "tb" for record in sim_records)
+    assert sum(record["num_sims"] for record in sim_records) == len(PARAMETER_DICT["tran_size"]) * len(sp_paths)
+    assert [record["event"] for record in records if record["testbench"] == ""] == ["netlist_write", "sim_wall", "phase_total"]
+
+    sp_interface.timing_trace.write_csv(str(tmp_path / "timing_trace.csv"))
+    with open(tmp_path / "timing_trace.csv") as trace_file:
+        assert len(trace_file.readlines()) == len(records) + 1
+
+
+@pytest.mark.spice
+def test_spice_result_cache_hit_miss(fake_hspice, tmp_path):
+    cache_fpath = str(tmp_path / "spice_results_cache.db")
+    sp_path = make_tbs(tmp_path, 1)[0]
+    sp_interface = spice.SpiceInterface("hspice", cache_fpath = cache_fpath, cache_max_entries = 10)
+    sp_interface.run_batch([sp_path], {"tran_size": ["1"]})
+    assert sp_interface.get_cache_stats() == (0, 1)
+    spice_meas = sp_interface.run_batch([sp_path], {"tran_size": ["1"]})[0]
+    assert spice_meas["meas_delay"][0] == pytest.approx(1.5e-11)
+    assert sp_interface.get_cache_stats() == (1, 1)
+    # A new sweep point misses, the cache also persists across interfaces
+    new_interface = spice.SpiceInterface("hspice", cache_fpath = cache_fpath, cache_max_entries = 10)
+    new_interface.run_batch([sp_path], {"tran_size": ["2"]})
+    new_interface.run_batch([sp_path], {"tran_size": ["1"]})
+    assert new_interface.get_cache_stats() == (1, 1)
+    assert len(read_mt_args(fake_hspice)) == 2
+
+
+@pytest.mark.spice
+def test_spice_result_cache_invalidation(fake_hspice, tmp_path):
+    sp_path = make_tbs(tmp_path, 1)[0]
+    includes_fpath = os.path.join(spice.get_sweep_dpath(sp_path), "includes.l")
+    with open(includes_fpath, "w") as includes_file:
+        includes_file.write(".include sweep_data.l\n")
+    sp_interface = spice.SpiceInterface("hspice", cache_fpath = str(tmp_path / "spice_results_cache.db"), cache_max_entries = 10)
+    sp_interface.run_batch([sp_path], {"tran_size": ["1"]})
+    # Changing the netlist or an included library must not return the results simulated for the old one
+    with open(sp_path, "a") as sp_file:
+        sp_file.write("* modified netlist\n")
+    sp_interface.run_batch([sp_path], {"tran_size": ["1"]})
+    with open(includes_fpath, "a") as includes_file:
+        includes_file.write(".include process_data.l\n")
+    sp_interface.run_batch([sp_path], {"tran_size": ["1"]})
+    assert sp_interface.get_cache_stats() == (0, 3)
+    assert len(read_mt_args(fake_hspice)) == 3
+    sp_interface.run_batch([sp_path], {"tran_size": ["1"]})
+    assert sp_interface.get_cache_stats() == (1, 3)
+
+
+@pytest.mark.spice
+def test_spice_result_cache_model_invalidation(fake_hspice, tmp_path):
+    sp_path = make_tbs(tmp_path, 1)[0]
+    sweep_dpath = spice.get_sweep_dpath(sp_path)
+    models_dpath = tmp_path / "models"
+    models_dpath.mkdir()
+    (models_dpath / "model.pm").write_text(".LIB TT\n.include 'corners.inc'\n.ENDL TT\n")
+    (models_dpath / "corners.inc").write_text(".model nmos nmos level=54\n")
+    with open(os.path.join(sweep_dpath, "includes.l"), "w") as includes_file:
+        includes_file.write('.LIB INCLUDES\n.LIB "process_data.l" PROCESS_DATA\n.INCLUDE "sweep_data.l"\n.ENDL INCLUDES\n')
+    with open(os.path.join(sweep_dpath, "process_data.l"), "w") as process_data_file:
+        process_data_file.write(f'.LIB PROCESS_DATA\n.LIB "{models_dpath / "model.pm"}" TT\n.ENDL PROCESS_DATA\n')
+    sp_interface = spice.SpiceInterface("hspice", cache_fpath = str(tmp_path / "spice_results_cache.db"), cache_max_entries = 10)
+    sp_interface.run_batch([sp_path], {"tran_size": ["1"]})
+    # A different sweep rewrites sweep_data.l, which doesn't change the results of the other sweep points
+    sp_interface.run_batch([sp_path], {"tran_size": ["1", "2"]})
+    assert sp_interface.get_cache_stats() == (1, 2)
+    # Changing the model card, or a file it includes, behind the same path must not return the results simulated for the old one
+    (models_dpath / "model.pm").write_text(".LIB TT\n.include 'corners.inc'\n.param vdd = 0.8\n.ENDL TT\n")
+    sp_interface.run_batch([sp_path], {"tran_size": ["1"]})
+    (models_dpath / "corners.inc").write_text(".model nmos nmos level=72\n")
+    sp_interface.run_batch([sp_path], {"tran_size": ["1"]})
+    assert sp_interface.get_cache_stats() == (1, 4)
+    assert len(read_mt_args(fake_hspice)) == 4
+    sp_interface.run_batch([sp_path], {"tran_size": ["1"]})
+    assert sp_interface.get_cache_stats() == (2, 4)
+
+
+@pytest.mark.spice
+def test_spice_result_cache_lru_eviction(tmp_path):
+    cache = spice.SpiceResultCache(str(tmp_path / "spice_results_cache.db"), max_entries = 2)
+    cache.put_many({"a": {"meas_delay": 1.0}})
+    cache.put_many({"b": {"meas_delay": 2.0}})
+    # Using "a" makes "b" the least recently used entry, so it is the one evicted once the cache is full
+    assert cache.get_many(["a", "missing"]) == {"a": {"meas_delay": 1.0}}
+    cache.put_many({"c": {"meas_delay": 3.0}})
+    assert cache.get_many(["a", "b", "c"]) == {"a": {"meas_delay": 1.0}, "c": {"meas_delay": 3.0}}
@@ -0,0 +1,78 @@
+from __future__ import annotations
+import os, sys
+
+import json
+import pytest
+from pathlib import Path
+
+import src.asic_dse.hammer_flow as asic_hammer
+
+import tests.conftest as conftest
+
+def run_syn_par(fake_flow) -> list[str]:
+    """
+        Runs the syn, syn-to-par and par stages like `run_hammer_flow`, returns the stages which hammer-vlsi was invoked for
+    """
+    if fake_flow.runs_fpath.exists():
+        fake_flow.runs_fpath.unlink()
+    config_paths = [str(fake_flow.design_config_fpath)]
+    for flow_stage in ["syn", "syn-to-par", "par"]:
+        out_config, _, _ = asic_hammer.run_hammer_stage(fake_flow.asic_flow, flow_stage, config_paths, update_db = False)
+        assert os.path.exists(out_config)
+        config_paths.append(out_config)
+    return [ flow_stage for flow_stage, _, _ in conftest.get_fake_hammer_runs(fake_flow.runs_fpath) ]
+
+
+@pytest.mark.asic_flow
+def test_stage_fingerprint_skip(fake_flow):
+    assert run_syn_par(fake_flow) == ["syn", "syn-to-par", "par"]
+    syn_fingerprint_fpath = Path(fake_flow.asic_flow.hammer_driver.obj_dir) / "syn-rundir" / "syn-output.fingerprint"
+    assert syn_fingerprint_fpath.exists()
+    # Nothing changed, every stage is skipped
+    assert run_syn_par(fake_flow) == []
+    # A par setting only reruns the par stages
+    fake_flow.design_config["par.inputs.top_module"] = "fake_mod_par"
+    fake_flow.design_config_fpath.write_text(json.dumps(fake_flow.design_config))
+    assert run_syn_par(fake_flow) == ["syn-to-par", "par"]
+    # Power settings don't affect syn or par
+    fake_flow.design_config["power.inputs.level"] = "syn"
+    fake_flow.design_config_fpath.write_text(json.dumps(fake_flow.design_config))
+    assert run_syn_par(fake_flow) == []
+    # An RTL change reruns syn and everything downstream of it
+    fake_flow.rtl_fpath.write_text("module fake_mod(input clk); endmodule\n")
+    assert run_syn_par(fake_flow) == ["syn", "syn-to-par", "par"]
+
+
+@pytest.mark.asic_flow
+def test_stage_fingerprint_disabled_stage(fake_flow):
+    run_syn_par(fake_flow)
+    fake_flow.rtl_fpath.write_text("module fake_mod(input clk); endmodule\n")
+    # Stages disabled in the flow config never run, their stale outputs are left alone
+    out_config, _, _ = asic_hammer.run_hammer_stage(fake_flow.asic_flow, "syn", [str(fake_flow.design_config_fpath)], update_db = False, execute_stage = False)
+    assert os.path.exists(out_config)
+    assert [ flow_stage for flow_stage, _, _ in conftest.get_fake_hammer_runs(fake_flow.runs_fpath) ] == ["syn", "syn-to-par", "par"]
+
+
+@pytest.mark.asic_flow
+def test_parsed_config_cache(fake_flow):
+    config_fpath = str(fake_flow.design_config_fpath)
+    config_dict = asic_hammer.load_hammer_config(config_fpath)
+    assert config_dict["synthesis.inputs.top_module"] == "fake_mod"
+    # Unchanged configs are not parsed again
+    assert asic_hammer.load_hammer_config(config_fpath) is config_dict
+    fake_flow.design_config["synthesis.inputs.top_module"] = "fake_mod_v2"
+    fake_flow.design_config_fpath.write_text(json.dumps(fake_flow.design_config))
+    assert asic_hammer.load_hammer_config(config_fpath)["synthesis.inputs.top_module"] == "fake_mod_v2"
+
+
+@pytest.mark.asic_flow
+def test_report_mtimes(tmp_path):
+    reports_dpath = tmp_path / "reports"
+    assert asic_hammer.get_report_mtimes(str(reports_dpath)) == {}
+    reports_dpath.mkdir()
+    (reports_dpath / "timing.rpt").write_text("old report")
+    prev_rpt_mtimes = asic_hammer.get_report_mtimes(str(reports_dpath))
+    # Reports left behind by a failed PrimeTime run are unchanged
+    assert asic_hammer.get_report_mtimes(str(reports_dpath)) == prev_rpt_mtimes
+    os.utime(reports_dpath / "timing.rpt", ns = (0, prev_rpt_mtimes["timing.rpt"] + 1))
+    assert asic_hammer.get_report_mtimes(str(reports_dpath)) != prev_rpt_mtimes
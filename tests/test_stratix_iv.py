@@ -1,7 +1,7 @@
 from __future__ import annotations
 import os, sys
 
-from typing import Any, List, Tuple, Callable
+from typing import Any, List, Dict, Tuple, Callable
 
 import rad_gen as rg
 import src.common.data_structs as rg_ds
@@ -10,10 +10,15 @@ import src.common.utils as rg_utils
 import pytest
 import inspect
 import argparse
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 import copy
 import dataclasses
 import shutil
+import itertools
+import math
+import contextlib
+from types import SimpleNamespace
+import numpy as np
 
 import json
 from deepdiff import DeepDiff
@@ -81,6 +86,35 @@ def test_stratix_iv_rrg_parse(request: pytest.FixtureRequest):
     args = ["--rr_xml_fpath", rrg_fpath, "--out_dpath", out_dpath, "--generate_plots"]
     rr_parse.main(args)
 
+@pytest.mark.rrg
+@skip_if_fixtures_only
+def test_stratix_iv_rrg_parse_small(request: pytest.FixtureRequest):
+    """
+        Parses a small synthetic rr_graph and checks the mux frequencies and detailed wire info match the golden results,
+        which were written by the xmltodict based parser that `rr_parse.parse_rr_graph` replaced
+    """
+    import src.common.rr_parse as rr_parse
+    tests_tree, test_grp_name, test_name, test_out_dpath, rg_home = tests_common.get_test_info()
+    rrg_fpath: str = os.path.join(
+        tests_tree.search_subtrees(f"tests.data.{test_grp_name}.inputs", is_hier_tag = True)[0].path,
+        "rr_graph_small.xml"
+    )
+    golden_results_dpath: str = tests_tree.search_subtrees(
+        f"tests.data.{test_grp_name}.golden_results.{test_name}", is_hier_tag = True
+    )[0].path
+    out_dpath = os.path.join(test_out_dpath, test_name)
+    cache_dpath = os.path.join(out_dpath, "rr_graph_cache")
+    shutil.rmtree(out_dpath, ignore_errors = True)
+    os.makedirs(out_dpath)
+    # First run parses the XML and writes the cache, second run loads the cached rr_graph
+    for _ in range(2):
+        rr_parse.main(["--rr_xml_fpath", rrg_fpath, "--out_dpath", out_dpath, "--cache_dpath", cache_dpath])
+        for csv_fname in ["rr_mux_freqs.csv", "rr_wires_detailed.csv"]:
+            # Rows are compared as dicts, order of the fanin / fanout columns isn't fixed
+            assert rg_utils.read_csv_to_list(os.path.join(out_dpath, "rr_graph_small", csv_fname)) == \
+                rg_utils.read_csv_to_list(os.path.join(golden_results_dpath, csv_fname)), f"{csv_fname} does not match golden results"
+        assert os.path.isdir(cache_dpath)
+
 @pytest.fixture
 def stratix_iv_passthrough_tb(stratix_iv) -> rg_ds.RadGenArgs:
     rg_args: rg_ds.RadGenArgs = copy.deepcopy(stratix_iv)
@@ -200,3 +234,224 @@ def test_stratix_iv_bram(stratix_iv_bram_tb, request: pytest.FixtureRequest):
     )
 
 
+
+@pytest.fixture
+def stratix_iv_fpga_factory(stratix_iv: rg_ds.RadGenArgs, tmp_path, monkeypatch) -> Callable[[], Any]:
+    """
+        Returns:
+            A function which creates a new FPGA for the stratix_iv arch, generated and with an initialized floorplan (as at the start of sizing)
+    """
+    import src.coffe.fpga as coffe_fpga
+    import src.coffe.spice as coffe_spice
+    rg_args: rg_ds.RadGenArgs = copy.deepcopy(stratix_iv)
+    rg_args.manual_obj_dir = str(tmp_path / "stratix_iv")
+    rg_args.just_config_init = True
+    rg_info, _ = tests_common.run_rad_gen(rg_args, tests_common.get_rg_home())
+    coffe_info: rg_ds.Coffe = rg_info["coffe"]
+    RunOpts = namedtuple('RunOpts', [_field for _field in type(coffe_info).__dataclass_fields__])
+    run_options = RunOpts(*[getattr(coffe_info, _field) for _field in type(coffe_info).__dataclass_fields__])
+    # Spice files are written to the cwd
+    monkeypatch.chdir(tmp_path)
+
+    def make_fpga() -> coffe_fpga.FPGA:
+        spice_interface = coffe_spice.SpiceInterface(run_options.spice_sim_type, 1)
+        fpga_inst = coffe_fpga.FPGA(coffe_info = coffe_info, run_options = run_options, spice_interface = spice_interface)
+        fpga_inst.generate(coffe_info.size_hb_interfaces)
+        fpga_inst.lb_height = math.sqrt(fpga_inst.area_dict["tile"])
+        fpga_inst.update_area()
+        fpga_inst.compute_distance()
+        fpga_inst.update_wires()
+        fpga_inst.update_wire_rc()
+        return fpga_inst
+
+    return make_fpga
+
+@pytest.mark.stratix_iv
+@skip_if_fixtures_only
+def test_stratix_iv_eval_sizing_combos(stratix_iv_fpga_factory: Callable[[], Any], request: pytest.FixtureRequest):
+    """
+        Evaluating the sizing combos of a few subcircuits in a batch gives the same areas, wire RCs and final FPGA state 
+        as setting each combo and updating area, wires and wire RC one after another
+    """
+    import src.coffe.cost as cost_lib
+    import src.coffe.tran_sizing as tran_sizing
+    serial_fpga = stratix_iv_fpga_factory()
+    batch_fpga = stratix_iv_fpga_factory()
+    for subckt_key in ["sb_muxes", "local_muxes", "luts"]:
+        element_names: List[str] = sorted(tran_sizing.format_transistor_sizes_to_basic_subciruits(
+            getattr(serial_fpga, subckt_key)[0].initial_transistor_sizes
+        ).keys())
+        # Only sweep a few of the elements to keep the number of combos small
+        sweep_sizes: List[List[int]] = [[1, 2, 3] if i < 3 else [2] for i in range(len(element_names))]
+        sizing_combos: List[Tuple[int]] = list(itertools.product(*sweep_sizes))
+        inv_ratios: Dict[str, float] = {
+            element_name: 0.75 if i % 2 else 1.5 for i, element_name in enumerate(element_names) if "inv_" in element_name
+        }
+
+        serial_areas: List[float] = []
+        serial_wire_rcs: List[Dict[str, Tuple[float, float]]] = []
+        for combo in sizing_combos:
+            serial_fpga._update_transistor_sizes(element_names, combo, serial_fpga.specs.use_finfet, inv_ratios)
+            serial_fpga.update_area()
+            serial_areas.append(cost_lib.get_eval_area(serial_fpga, "global", getattr(serial_fpga, subckt_key)[0]))
+            serial_fpga.update_wires()
+            serial_fpga.update_wire_rc()
+            serial_wire_rcs.append(dict(serial_fpga.wire_rc_dict))
+
+        batch_subckt = getattr(batch_fpga, subckt_key)[0]
+        batch_areas, batch_wire_rcs = batch_fpga.eval_sizing_combos(
+            element_names,
+            sizing_combos,
+            inv_ratios,
+            eval_area_fn = lambda fpga_inst: cost_lib.get_eval_area(fpga_inst, "global", batch_subckt),
+        )
+        assert batch_areas.tolist() == serial_areas
+        assert set(batch_wire_rcs.keys()) == set(serial_wire_rcs[0].keys())
+        for combo_idx, wire_rc in enumerate(serial_wire_rcs):
+            assert {wire: tuple(rc[combo_idx].tolist()) for wire, rc in batch_wire_rcs.items()} == wire_rc
+        # Both FPGAs are left at the last combo
+        for attr in ["transistor_sizes", "area_dict", "width_dict", "wire_lengths", "wire_layers", "wire_rc_dict"]:
+            assert getattr(batch_fpga, attr) == getattr(serial_fpga, attr), f"{attr} differs after sizing {subckt_key}"
+
+@pytest.mark.stratix_iv
+@skip_if_fixtures_only
+def test_stratix_iv_surrogate_reproducible(stratix_iv_fpga_factory: Callable[[], Any], monkeypatch: pytest.MonkeyPatch, request: pytest.FixtureRequest):
+    """
+        Two surrogate searches of the same sizing ranges with the same seed evaluate the same candidates 
+        and simulate the same combos, so they pick the same best combo
+    """
+    import src.coffe.cost as cost_lib
+    import src.coffe.tran_sizing as tran_sizing
+
+    def fake_sim_sizing_combos(fpga_inst, sizable_circuit, opt_type, element_names, sizing_combos, *args):
+        # Delay falls off with the size of every element so the best combo trades it off against area
+        delays = [1e-11 * sum(1.0 / size for size in combo) for combo in sizing_combos]
+        return delays, [(delay, delay) for delay in delays], np.ones(len(sizing_combos), dtype = bool)
+    monkeypatch.setattr(tran_sizing, "_sim_sizing_combos", fake_sim_sizing_combos)
+
+    run_options = SimpleNamespace(surrogate_sim_budget = 12, surrogate_max_candidates = 200)
+    spice_interface = SimpleNamespace(timing_trace = SimpleNamespace(phase = lambda *args, **kwargs: contextlib.nullcontext()))
+
+    def surrogate_search(seed: int) -> Tuple[List[Tuple[int]], List[int], Tuple[int]]:
+        fpga_inst = stratix_iv_fpga_factory()
+        subckt = fpga_inst.sb_muxes[0]
+        element_names: List[str] = sorted(tran_sizing.format_transistor_sizes_to_basic_subciruits(subckt.initial_transistor_sizes).keys())
+        sizing_ranges: Dict[str, Tuple[int]] = {element_name: (1, 8, 1) for element_name in element_names}
+        element_names, sizing_combos = tran_sizing.sample_ranges(sizing_ranges, run_options.surrogate_max_candidates, seed = seed)
+        area_arr, wire_rc_arrays = fpga_inst.eval_sizing_combos(
+            element_names, 
+            sizing_combos, 
+            eval_area_fn = lambda fpga_inst: cost_lib.get_eval_area(fpga_inst, "global", subckt),
+        )
+        sim_idxs, eval_delay_list, _ = tran_sizing._surrogate_search_combos(
+            fpga_inst, subckt, run_options, "global", element_names, sizing_combos, None, wire_rc_arrays, area_arr.tolist(), 
+            1, 1, [], spice_interface, 0, 0,
+        )
+        costs = cost_lib.cost_function(area_arr[sim_idxs], np.array(eval_delay_list), 1, 1)
+        return sizing_combos, sim_idxs, sizing_combos[sim_idxs[int(np.argmin(costs))]]
+
+    sizing_combos, sim_idxs, best_combo = surrogate_search(seed = 0)
+    assert len(sizing_combos) == run_options.surrogate_max_candidates
+    assert len(sim_idxs) == run_options.surrogate_sim_budget
+    assert surrogate_search(seed = 0) == (sizing_combos, sim_idxs, best_combo)
+    assert surrogate_search(seed = 1)[0] != sizing_combos
+
+@pytest.mark.stratix_iv
+@skip_if_fixtures_only
+def test_stratix_iv_tracked_updates(stratix_iv_fpga_factory: Callable[[], Any], request: pytest.FixtureRequest):
+    """
+        Area, wire and wire RC updates of a sizing iteration (sizing combos of each subcircuit, then a new floorplan) 
+        give the same FPGA state when unchanged subcircuit updates are replayed as when every update is rerun
+    """
+    import src.coffe.tran_sizing as tran_sizing
+    tracked_fpga = stratix_iv_fpga_factory()
+    untracked_fpga = stratix_iv_fpga_factory()
+    untracked_fpga.track_updates = False
+    untracked_fpga.tracked_updates.clear()
+
+    def assert_same_state(step: str):
+        for attr in ["area_dict", "width_dict", "wire_lengths", "wire_layers", "wire_rc_dict"]:
+            assert getattr(tracked_fpga, attr) == getattr(untracked_fpga, attr), f"{attr} differs after {step}"
+        # Block areas are set as attributes of the blocks
+        for block_key, block_attr in itertools.product(
+            ["sb_mux", "cb_mux", "local_mux"], ["block_area", "block_area_sram", "block_area_no_sram", "block_avg_area", "block_avg_area_no_sram"]
+        ):
+            assert getattr(getattr(tracked_fpga, block_key), block_attr) == getattr(getattr(untracked_fpga, block_key), block_attr), \
+                f"{block_key}.{block_attr} differs after {step}"
+
+    for subckt_key in ["sb_muxes", "cb_muxes", "local_muxes", "luts", "local_ble_outputs", "general_ble_outputs"]:
+        element_names: List[str] = sorted(tran_sizing.format_transistor_sizes_to_basic_subciruits(
+            getattr(tracked_fpga, subckt_key)[0].initial_transistor_sizes
+        ).keys())
+        sizing_combos: List[Tuple[int]] = list(itertools.product(*[[1, 3] if i < 2 else [2] for i in range(len(element_names))]))
+        for fpga_inst in [tracked_fpga, untracked_fpga]:
+            fpga_inst.eval_sizing_combos(element_names, sizing_combos)
+            # Keep the best combo, here just the first one
+            fpga_inst._update_transistor_sizes(element_names, sizing_combos[0], fpga_inst.specs.use_finfet)
+            fpga_inst.update_area()
+            fpga_inst.update_wires()
+            fpga_inst.update_wire_rc()
+        assert_same_state(f"sizing {subckt_key}")
+
+    # Next iteration starts from a floorplan for the new sizes
+    for fpga_inst in [tracked_fpga, untracked_fpga]:
+        fpga_inst.lb_height = math.sqrt(fpga_inst.area_dict["tile"])
+        fpga_inst.update_area()
+        fpga_inst.compute_distance()
+        fpga_inst.update_wires()
+        fpga_inst.update_wire_rc()
+    assert_same_state("updating the floorplan")
+    # Replayed updates set the block areas they set when they were run, even if something else changed them since
+    for fpga_inst in [tracked_fpga, untracked_fpga]:
+        fpga_inst.sb_mux.block_area = 0
+        fpga_inst.update_area()
+    assert_same_state("resetting the switch block area")
+    # Only the tracked FPGA recorded updates to replay
+    assert tracked_fpga.tracked_updates and not untracked_fpga.tracked_updates
+
+@pytest.mark.stratix_iv
+def test_tracked_update_in_place_changes(monkeypatch: pytest.MonkeyPatch):
+    """
+        Tracked updates replay attributes set to new values, in debug mode updates which change nested state in place 
+        (which can't be replayed) are rejected
+    """
+    import src.coffe.fpga as fpga
+    import src.coffe.constants as consts
+    monkeypatch.setattr(consts, "VERBOSITY", consts.DEBUG)
+
+    class FakeCkt:
+        def __init__(self):
+            self.num_calls = 0
+            self.tran_areas = {"inv": 1.0}
+            self.load = SimpleNamespace(area = 1.0)
+
+        def update_area(self, area_dict: Dict[str, float]):
+            self.num_calls += 1
+            self.tran_areas = {"inv": 2 * area_dict["inv"]}
+            area_dict["ckt"] = self.tran_areas["inv"]
+
+        def update_area_in_place(self, area_dict: Dict[str, float]):
+            self.tran_areas["inv"] = 2 * area_dict["inv"]
+
+        def update_load_in_place(self, area_dict: Dict[str, float]):
+            self.load.area = area_dict["inv"]
+
+    fpga_inst = SimpleNamespace(track_updates = True, tracked_updates = {})
+    ckt = FakeCkt()
+    area_dict = {"inv": 1.5}
+    fpga.FPGA._run_tracked_update(fpga_inst, ckt, "update_area", [area_dict])
+    ckt.tran_areas = {}
+    area_dict["ckt"] = 0.0
+    # Unchanged inputs replay the recorded dict and attribute writes rather than calling the update
+    fpga.FPGA._run_tracked_update(fpga_inst, ckt, "update_area", [area_dict])
+    assert ckt.num_calls == 1 and ckt.tran_areas == {"inv": 3.0} and area_dict["ckt"] == 3.0
+
+    area_dict["inv"] = 2.0
+    for update_fn_name in ["update_area_in_place", "update_load_in_place"]:
+        with pytest.raises(AssertionError, match = "in place"):
+            fpga.FPGA._run_tracked_update(fpga_inst, ckt, update_fn_name, [area_dict])
+    # Not checked without debug mode
+    monkeypatch.setattr(consts, "VERBOSITY", consts.DEBUG - 1)
+    area_dict["inv"] = 4.0
+    fpga.FPGA._run_tracked_update(fpga_inst, ckt, "update_area_in_place", [area_dict])
+    assert ckt.tran_areas == {"inv": 8.0}
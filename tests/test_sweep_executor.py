@@ -0,0 +1,114 @@
+from __future__ import annotations
+import os, sys
+
+import pytest
+import textwrap
+from types import SimpleNamespace
+
+import src.asic_dse.asic_dse as asic_dse
+
+import tests.conftest as conftest
+
+# Stand in for the RAD-Gen command of a sweep point, runs the syn and par stages of its obj dir through `run_hammer_stage`
+# Exits with an error after the flow if "fail" is passed as the second argument
+FAKE_SWEEP_PT_SRC = textwrap.dedent('''\
+    import os, sys
+    from types import SimpleNamespace
+    sys.path.insert(0, {rad_gen_home!r})
+    import src.asic_dse.hammer_flow as asic_hammer
+    obj_dpath = sys.argv[1]
+    os.makedirs(obj_dpath, exist_ok = True)
+    asic_flow = SimpleNamespace(
+        cli_driver_bpath = {hammer_fpath!r},
+        hammer_driver = SimpleNamespace(obj_dir = obj_dpath, options = SimpleNamespace(environment_configs = [])),
+    )
+    for flow_stage in ["syn", "par"]:
+        asic_hammer.run_hammer_stage(asic_flow, flow_stage, [], update_db = False)
+    print(f"Finished sweep point {{obj_dpath}}")
+    if len(sys.argv) > 2 and sys.argv[2] == "fail":
+        sys.exit(3)
+''')
+
+
+class FakeSweepPtDriver:
+    """
+        Stand in for the RadGenArgs of a sweep point, its RAD-Gen command runs the fake sweep point script
+    """
+    def __init__(self, sweep_pt_fpath: str, obj_dpath: str, fail: bool = False):
+        self.cmd = f"{sys.executable} {sweep_pt_fpath} {obj_dpath}" + (" fail" if fail else "")
+
+    def get_rad_gen_cli_cmd(self, rad_gen_home: str):
+        return self.cmd, self.cmd.split(" ")[2:], {}
+
+
+@pytest.fixture
+def fake_sweep(tmp_path, monkeypatch) -> SimpleNamespace:
+    """
+        Creates the fake hammer-vlsi and sweep point scripts, returns paths used by the tests along with a minimal AsicDSE object
+    """
+    fake_hammer = conftest.write_fake_hammer(tmp_path, sleep_time = 0.3)
+    sweep_pt_fpath = tmp_path / "sweep_pt.py"
+    rad_gen_home = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sweep_pt_fpath.write_text(FAKE_SWEEP_PT_SRC.format(rad_gen_home = rad_gen_home, hammer_fpath = str(fake_hammer.hammer_fpath)))
+    # RAD-Gen logs are written to the cwd
+    monkeypatch.chdir(tmp_path)
+    fake_asic_dse = SimpleNamespace(
+        common = SimpleNamespace(obj_dir = str(tmp_path / "rg_obj_dir"), rad_gen_home_path = rad_gen_home),
+        design_sweep_info = SimpleNamespace(flow_threads = 4, stage_licenses = None, type = "vlsi", top_lvl_module = "fake_mod"),
+    )
+    return SimpleNamespace(
+        asic_dse = fake_asic_dse,
+        sweep_pt_fpath = str(sweep_pt_fpath),
+        obj_dirs_dpath = tmp_path / "obj_dirs",
+        runs_fpath = fake_hammer.runs_fpath,
+    )
+
+
+def get_stage_runs(runs_fpath) -> dict[str, list[tuple[float, float]]]:
+    """
+        Returns the (start, end) times of each fake hammer-vlsi run, keyed by stage
+    """
+    stage_runs = {}
+    for flow_stage, start_time, end_time in conftest.get_fake_hammer_runs(runs_fpath):
+        stage_runs.setdefault(flow_stage, []).append((start_time, end_time))
+    return stage_runs
+
+
+def get_max_overlap(intervals: list[tuple[float, float]]) -> int:
+    """
+        Returns the max number of (start, end) intervals overlapping at any time
+    """
+    events = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+    max_overlap, overlap = 0, 0
+    for _, delta in events:
+        overlap += delta
+        max_overlap = max(max_overlap, overlap)
+    return max_overlap
+
+
+@pytest.mark.asic_sweep
+def test_sweep_points_stage_licenses(fake_sweep):
+    drivers = [ FakeSweepPtDriver(fake_sweep.sweep_pt_fpath, str(fake_sweep.obj_dirs_dpath / f"pt_{i}")) for i in range(4) ]
+    sw_pt_results = asic_dse.run_sweep_points(fake_sweep.asic_dse, drivers, max_workers = 4, stage_licenses = {"syn": 1, "par": 2}, compile_sweep_results = False)
+    assert [ sw_pt_result["returncode"] for sw_pt_result in sw_pt_results ] == [0] * 4
+    for i, sw_pt_result in enumerate(sw_pt_results):
+        assert f"Finished sweep point {fake_sweep.obj_dirs_dpath / f'pt_{i}'}" in open(sw_pt_result["log_fpath"]).read()
+    stage_runs = get_stage_runs(fake_sweep.runs_fpath)
+    assert len(stage_runs["syn"]) == 4 and len(stage_runs["par"]) == 4
+    assert get_max_overlap(stage_runs["syn"]) == 1
+    assert get_max_overlap(stage_runs["par"]) <= 2
+
+
+@pytest.mark.asic_sweep
+def test_sweep_points_max_workers(fake_sweep):
+    drivers = [
+        FakeSweepPtDriver(fake_sweep.sweep_pt_fpath, str(fake_sweep.obj_dirs_dpath / f"pt_{i}"), fail = (i == 1)) for i in range(3)
+    ]
+    # max workers and licenses default to the sweep config values
+    fake_sweep.asic_dse.design_sweep_info.flow_threads = 1
+    sw_pt_results = asic_dse.run_sweep_points(fake_sweep.asic_dse, drivers, compile_sweep_results = False)
+    assert [ sw_pt_result["returncode"] for sw_pt_result in sw_pt_results ] == [0, 3, 0]
+    assert len({ sw_pt_result["log_fpath"] for sw_pt_result in sw_pt_results }) == 3
+    stage_runs = get_stage_runs(fake_sweep.runs_fpath)
+    # With a single worker no stages of different points overlap
+    assert get_max_overlap(stage_runs["syn"] + stage_runs["par"]) == 1